@@ -21,12 +21,14 @@ os.environ['KMP_DUPLICATE_LIB_OK'] = 'TRUE'
 
 from .config import (
     DetectorConfig, CrystalConfig, BeamConfig, NoiseConfig,
-    DetectorConvention, DetectorPivot, CrystalShape
+    DetectorConvention, DetectorPivot, CrystalShape, MosaicSampling
 )
 from .models.detector import Detector
 from .models.crystal import Crystal
 from .simulator import Simulator
 from .io.hkl import read_hkl_file, try_load_hkl_or_fdump
+from .io.fdump_cache import FdumpCache
+from .io.result_cache import ResultCache, canonical_hash
 from .io.smv import write_smv
 from .io.mosflm import read_mosflm_matrix, reciprocal_to_real_cell
 from .io.pgm import write_pgm
@@ -36,7 +38,9 @@ from .utils.units import (
     mm_to_meters, micrometers_to_meters, degrees_to_radians,
     angstroms_to_meters, mrad_to_radians
 )
-from .utils.noise import generate_poisson_noise
+from .utils.hkl_blocks import BlockedHKLGrid
+from .utils.tiling import parse_memory_budget
+from .utils.noise import counter_noise_image, generate_poisson_noise
 from .utils.auto_selection import (
     auto_select_divergence, auto_select_dispersion,
     generate_sources_from_divergence_dispersion
@@ -78,6 +82,16 @@ Examples:
     # Input files
     parser.add_argument('-hkl', type=str, metavar='FILE',
                         help='Text file of "h k l F" (P1 reflections)')
+    parser.add_argument('-hkl_storage', type=str, choices=['dense', 'blocked'], default='dense',
+                        help='Structure-factor storage: dense bounding-box grid (default), or '
+                             '8^3 bricks allocated only where reflections exist (large cells)')
+    parser.add_argument('-fdump_cache', nargs='?', const='', type=str, metavar='DIR',
+                        help='Cache parsed -hkl files as memory-mapped Fdump v2 files keyed by '
+                             'content hash in DIR (default: $NANOBRAG_CACHE_DIR/fdump or '
+                             '~/.cache/nanobrag_torch/fdump)')
+    parser.add_argument('-fdump_cache_size', type=str, metavar='SIZE', default='4G',
+                        help='Size budget of the -fdump_cache directory; least recently '
+                             'used files are evicted (default: 4G)')
     parser.add_argument('-mat', type=str, metavar='FILE',
                         help='3×3 MOSFLM-style A matrix (reciprocal vectors)')
     parser.add_argument('-cell', nargs=6, type=float,
@@ -270,6 +284,12 @@ Examples:
                         help='Binary/tophat spots')
     parser.add_argument('-fudge', type=float, default=1.0,
                         help='Shape parameter scaling')
+    parser.add_argument('-lattice_lut', type=float, metavar='TOL',
+                        help='Evaluate the lattice factor from lookup tables with this '
+                             'error bound relative to the peak (e.g. 1e-4)')
+    parser.add_argument('-lattice_lut_interp', type=str, choices=['linear', 'cubic'],
+                        default='cubic',
+                        help='Interpolation used with -lattice_lut (default: cubic)')
 
     # Mosaicity
     parser.add_argument('-mosaic', '-mosaici', '-mosaic_spr', type=float,
@@ -279,6 +299,12 @@ Examples:
                         help='Number of mosaic domains')
     parser.add_argument('-mosaic_seed', type=int,
                         help='Seed for mosaic rotations')
+    parser.add_argument('-mosaic_sampling', type=str,
+                        choices=[m.value for m in MosaicSampling], default='random',
+                        help='Sampling of mosaic domain rotations: random (default), '
+                             'sobol, halton, stratified, or cap for the spherical-cap '
+                             'rotations of nanoBragg.c. The quasi-random and stratified '
+                             'samplers reach smooth spots with fewer -mosaic_dom')
     parser.add_argument('-misset', nargs='*',
                         help='Misset angles (deg) or "random"')
     parser.add_argument('-misset_seed', type=int,
@@ -293,10 +319,19 @@ Examples:
                         help='Step size')
     parser.add_argument('-phisteps', type=int,
                         help='Number of phi steps')
+    parser.add_argument('-sweep', type=int, metavar='N',
+                        help='Rotation sweep: simulate N consecutive frames, frame i covering '
+                             '-phi + (i-1)*-osc over -osc degrees. Output filenames are '
+                             'printf templates over the frame number 1..N (e.g. img_%%05d.img); '
+                             'names without a %% field get _NNNNN before the extension')
     parser.add_argument('-dmin', type=float, metavar='Å',
                         help='Minimum d-spacing cutoff')
     parser.add_argument('-oversample', type=int,
                         help='Sub-pixel sampling per axis')
+    parser.add_argument('-oversample_adaptive', type=float, metavar='FRAC',
+                        help='Adaptive oversampling: render at 1 subpixel, then refine with '
+                             'the full -oversample grid only pixels whose curvature exceeds '
+                             'FRAC times the maximum (e.g. 0.01)')
     parser.add_argument('-oversample_thick', action='store_true',
                         help='Recompute absorption per subpixel')
     parser.add_argument('-oversample_polar', action='store_true',
@@ -310,6 +345,20 @@ Examples:
                         help='Process detector in chunks of N rows. Reduces peak GPU memory. '
                              'Recommended: 128-256 for 24GB GPU, 64-128 for 12GB GPU. '
                              'Default: None (full vectorization)')
+    parser.add_argument('-mem_budget', '--mem-budget', type=str, metavar='SIZE',
+                        help='Tile pixels, sources, phi, mosaic domains and subpixels so '
+                             'each kernel call fits in SIZE (e.g. 512M, 8G). '
+                             'Overrides -pixel_batch_size')
+    parser.add_argument('-sparse_cutoff', '--sparse-cutoff', type=float, metavar='FRAC',
+                        help='Reflection-driven sparse rendering: evaluate only pixels '
+                             'where F_latt can exceed FRAC*Na*Nb*Nc (e.g. 1e-3)')
+    parser.add_argument('-nproc', type=int, metavar='N',
+                        help='Render with N single-threaded worker processes sharing the '
+                             'structure factors (CPU only): frames of a -sweep, otherwise '
+                             'blocks of detector rows. Output is identical for any N')
+    parser.add_argument('-distributed', action='store_true',
+                        help='Split detector rows over the ranks of a torch.distributed gloo '
+                             'job (launch with torchrun); rank 0 writes the outputs')
 
     parser.add_argument('-roi', nargs=4, type=int,
                         metavar=('xmin', 'xmax', 'ymin', 'ymax'),
@@ -346,6 +395,11 @@ Examples:
                         dest='noisefile', help='SMV with Poisson noise')
     parser.add_argument('-nonoise', action='store_true',
                         help='Suppress noise image generation')
+    parser.add_argument('-noise_rng', choices=['torch', 'philox'], default='torch',
+                        help='Noise generator: torch (default) or philox, counter-based on '
+                             '(seed, frame, pixel) and identical for any chunking or -nproc; '
+                             'with -noisefile as the only output the float image is then '
+                             'rendered and turned into noise in row blocks')
     parser.add_argument('-nopgm', action='store_true',
                         help='Disable PGM output')
 
@@ -354,6 +408,9 @@ Examples:
                         help='Enable tricubic interpolation')
     parser.add_argument('-nointerpolate', action='store_true',
                         help='Disable interpolation')
+    parser.add_argument('-tricubic_cache', action='store_true',
+                        help='Precompute tricubic coefficients for every HKL grid cell '
+                             '(faster interpolation; 64x the HKL grid memory)')
 
     # Misc
     parser.add_argument('-printout', action='store_true',
@@ -364,6 +421,20 @@ Examples:
     parser.add_argument('-trace_pixel', nargs=2, type=int,
                         metavar=('s', 'f'),
                         help='Instrument trace for a pixel')
+    parser.add_argument('-hkl_stats', action='store_true',
+                        help='Report Miller index range and F hit rate once per run')
+    parser.add_argument('-result_cache', nargs='?', const='', type=str, metavar='DIR',
+                        help='Reuse float and noise images of identical earlier runs, keyed by a '
+                             'hash of the configuration and HKL content, from DIR (default: '
+                             '$NANOBRAG_CACHE_DIR/results or ~/.cache/nanobrag_torch/results); '
+                             'also enabled by setting NANOBRAG_RESULT_CACHE')
+    parser.add_argument('-result_cache_size', type=str, metavar='SIZE', default='8G',
+                        help='Size budget of the -result_cache directory; least recently '
+                             'used results are evicted (default: 8G)')
+    parser.add_argument('-no_cache', '--no-cache', action='store_true', dest='no_cache',
+                        help='Disable the result cache (overrides -result_cache and NANOBRAG_RESULT_CACHE)')
+    parser.add_argument('-cache_stats', '--cache-stats', action='store_true', dest='cache_stats',
+                        help='Print entries and size of the result and Fdump caches and exit')
     parser.add_argument('-noprogress', action='store_true',
                         help='Disable progress meter')
     parser.add_argument('-progress', action='store_true',
@@ -374,9 +445,13 @@ Examples:
                         help='Print configuration parameters for debugging')
 
     # Performance options (PERF-PYTORCH-006)
-    parser.add_argument('-dtype', type=str, choices=['float32', 'float64'],
+    parser.add_argument('-dtype', type=str, choices=['float32', 'float64', 'mixed'],
                         default='float32',
-                        help='Floating point precision (float32 for speed, float64 for accuracy)')
+                        help='Floating point precision (float32 for speed, float64 for accuracy, '
+                             'mixed for float64 geometry with float32 physics)')
+    parser.add_argument('-no_range_reduction', action='store_true',
+                        help='Evaluate the float32 lattice transform directly instead of on '
+                             'range-reduced Miller indices with compensated sums')
     parser.add_argument('-device', type=str, choices=['cpu', 'cuda'],
                         default='cpu',
                         help='Device for computation (cpu or cuda)')
@@ -398,6 +473,27 @@ Examples:
     return parser
 
 
+def sweep_filename(template: str, frame: int) -> str:
+    """
+    Output path of one rotation-sweep frame (PERF-SWEEP-001).
+
+    Args:
+        template: printf-style name such as "img_%05d.img"; a name without
+            a % field gets "_NNNNN" inserted before its extension
+        frame: Frame number (1-based)
+
+    Raises:
+        ValueError: If the template does not format a single integer
+    """
+    if '%' not in template:
+        root, ext = os.path.splitext(template)
+        return f"{root}_{frame:05d}{ext}"
+    try:
+        return template % frame
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid sweep filename template '{template}': {e}") from e
+
+
 def determine_beam_center_source(args: argparse.Namespace, config: Dict[str, Any]) -> str:
     """Determine if beam center is explicit or auto-calculated.
 
@@ -488,10 +584,16 @@ def parse_and_validate_args(args: argparse.Namespace) -> Dict[str, Any]:
 
     # Load HKL data
     config['default_F'] = args.default_F
-    if args.hkl:
-        config['hkl_data'] = read_hkl_file(args.hkl, default_F=args.default_F)
+    if args.hkl and args.fdump_cache is not None:
+        cache = FdumpCache(args.fdump_cache or None, parse_memory_budget(args.fdump_cache_size))
+        config['hkl_data'] = cache.load(args.hkl, default_F=args.default_F, storage=args.hkl_storage)
+    elif args.hkl:
+        config['hkl_data'] = read_hkl_file(args.hkl, default_F=args.default_F, storage=args.hkl_storage)
     elif Path('Fdump.bin').exists():
         config['hkl_data'] = try_load_hkl_or_fdump(None, fdump_path="Fdump.bin", default_F=args.default_F)
+        if args.hkl_storage == 'blocked' and config['hkl_data'][0] is not None:
+            grid, hkl_metadata = config['hkl_data']
+            config['hkl_data'] = (BlockedHKLGrid.from_dense(grid, args.default_F), hkl_metadata)
 
     # Wavelength/energy
     if args.energy:
@@ -643,6 +745,13 @@ def parse_and_validate_args(args: argparse.Namespace) -> Dict[str, Any]:
 
     config['fudge'] = args.fudge
 
+    # PERF-LUT-001: Tabulated lattice transform
+    if args.lattice_lut is not None:
+        if not 0 < args.lattice_lut < 1:
+            raise ValueError(f"-lattice_lut tolerance must be in (0, 1), got {args.lattice_lut}")
+        config['lattice_lut_tolerance'] = args.lattice_lut
+        config['lattice_lut_interpolation'] = args.lattice_lut_interp
+
     # Mosaicity
     if args.mosaic:
         config['mosaic_spread_deg'] = args.mosaic
@@ -650,6 +759,7 @@ def parse_and_validate_args(args: argparse.Namespace) -> Dict[str, Any]:
         config['mosaic_domains'] = args.mosaic_dom
     if args.mosaic_seed:
         config['mosaic_seed'] = args.mosaic_seed
+    config['mosaic_sampling'] = args.mosaic_sampling
 
     # Misset
     if args.misset:
@@ -665,6 +775,37 @@ def parse_and_validate_args(args: argparse.Namespace) -> Dict[str, Any]:
     config['osc_deg'] = args.osc if args.osc else 0.0
     config['phi_steps'] = args.phisteps if args.phisteps else 1
 
+    # PERF-SWEEP-001: Rotation sweep
+    if args.sweep is not None:
+        if args.sweep < 1:
+            raise ValueError(f"-sweep needs at least one frame, got {args.sweep}")
+        if not config['osc_deg']:
+            raise ValueError("-sweep requires a non-zero -osc (oscillation range per frame)")
+        for template in (args.floatfile, args.intfile, args.pgmfile, args.noisefile):
+            if template:
+                sweep_filename(template, 1)
+        config['sweep'] = args.sweep
+
+    # PERF-FARM-001: Multi-process rendering
+    if args.nproc is not None:
+        if args.nproc < 1:
+            raise ValueError(f"-nproc must be positive, got {args.nproc}")
+        config['nproc'] = args.nproc
+
+    # PERF-DIST-001: Row tiles over torch.distributed ranks
+    if args.distributed and (args.sweep is not None or args.nproc is not None):
+        raise ValueError("-distributed cannot be combined with -sweep or -nproc")
+
+    # PERF-ADAPTIVE-001: Refinement is a whole-image pass after the coarse render
+    if args.oversample_adaptive is not None:
+        if not 0.0 <= args.oversample_adaptive <= 1.0:
+            raise ValueError(f"-oversample_adaptive must be in [0, 1], got {args.oversample_adaptive}")
+        if (args.sweep is not None or args.nproc is not None or args.distributed
+                or args.sparse_cutoff is not None):
+            raise ValueError(
+                "-oversample_adaptive cannot be combined with -sweep, -nproc, -distributed or -sparse_cutoff"
+            )
+
     # Sampling
     config['dmin'] = args.dmin if args.dmin else 0.0
     config['oversample'] = args.oversample if args.oversample else -1  # -1 means auto-select
@@ -744,6 +885,8 @@ def parse_and_validate_args(args: argparse.Namespace) -> Dict[str, Any]:
         config['dispersion'] = args.dispersion / 100.0  # Convert percent to fraction
 
     # Interpolation
+    config['tricubic_cache'] = args.tricubic_cache
+    config['lattice_range_reduction'] = not args.no_range_reduction
     if args.interpolate:
         config['interpolate'] = True
     elif args.nointerpolate:
@@ -755,6 +898,7 @@ def parse_and_validate_args(args: argparse.Namespace) -> Dict[str, Any]:
     config['pgmfile'] = args.pgmfile
     config['noisefile'] = args.noisefile
     config['suppress_noise'] = args.nonoise
+    config['noise_rng'] = args.noise_rng
     config['scale'] = args.scale
     config['adc'] = args.adc
     config['pgmscale'] = args.pgmscale
@@ -875,6 +1019,252 @@ def print_configuration(crystal_config, detector_config, beam_config, simulator_
     print("="*60 + "\n")
 
 
+def write_outputs(
+    intensity: torch.Tensor,
+    simulator: Simulator,
+    config: Dict[str, Any],
+    detector_config: DetectorConfig,
+    beam_config: BeamConfig,
+    frame: Optional[int] = None,
+) -> None:
+    """
+    Print statistics for one image and write the requested output files.
+
+    Args:
+        intensity: Simulated image (S, F)
+        simulator: Simulator that produced it (for statistics)
+        config: Parsed CLI configuration
+        detector_config: Detector configuration (SMV header fields)
+        beam_config: Beam configuration (SMV header fields)
+        frame: 1-based frame number within a rotation sweep (PERF-SWEEP-001);
+            selects the output filenames, the SMV phi header and the noise seed
+    """
+    phi_deg = config.get('phi_deg', 0.0)
+    osc_deg = config.get('osc_deg', 0.0)
+    seed = config.get('seed')
+    outputs = {key: config.get(key) for key in ('floatfile', 'intfile', 'pgmfile', 'noisefile')}
+    if frame is not None:
+        phi_deg = phi_deg + (frame - 1) * osc_deg
+        if seed is not None:
+            seed = seed + frame - 1
+        outputs = {key: sweep_filename(name, frame) if name else name for key, name in outputs.items()}
+    floatfile, intfile, pgmfile, noisefile = (
+        outputs['floatfile'], outputs['intfile'], outputs['pgmfile'], outputs['noisefile']
+    )
+
+    # Compute statistics
+    stats = simulator.compute_statistics(intensity)
+    print(f"\nStatistics:")
+    print(f"  Max intensity: {stats['max_I']:.3e} at pixel ({stats['max_I_slow']}, {stats['max_I_fast']})")
+    print(f"  Mean: {stats['mean']:.3e}")
+    print(f"  RMS: {stats['RMS']:.3e}")
+    print(f"  RMSD: {stats['RMSD']:.3e}")
+
+    # Write outputs
+    if floatfile:
+        # Write raw float image
+        data = intensity.cpu().numpy().astype(np.float32)
+        data.tofile(floatfile)
+        print(f"Wrote float image to {floatfile}")
+
+    if intfile:
+        # Scale and write SMV per AT-CLI-006
+        scale = config.get('scale')
+        adc_offset = config.get('adc', 40.0)
+
+        if not scale or scale <= 0:
+            # Auto-scale: map max float pixel to approximately 55,000 counts
+            max_val = intensity.max().item()
+            if max_val > 0:
+                # Calculate scale to achieve 55000 after adding ADC
+                scale = (55000.0 - adc_offset) / max_val if adc_offset < 55000 else 55000.0 / max_val
+            else:
+                scale = 1.0
+
+        # Apply scaling per spec: integer pixel = floor(min(65535, float*scale + adc))
+        # Only apply to non-zero pixels (AT-CLI-005)
+        # Pixels outside ROI should remain zero
+        threshold = 1e-10
+        roi_mask = intensity > threshold
+
+        # Calculate scaled values
+        scaled = intensity * scale + adc_offset
+        # Only apply scaling where intensity > 0 (inside ROI)
+        scaled = torch.where(roi_mask, scaled, torch.zeros_like(scaled))
+        # Clip to valid range and floor
+        scaled = scaled.clip(0, 65535)
+        scaled_int = torch.floor(scaled).to(torch.int16).cpu().numpy().astype(np.uint16)
+
+        write_smv(
+            filepath=intfile,
+            image_data=scaled_int,
+            pixel_size_mm=detector_config.pixel_size_mm,
+            distance_mm=detector_config.distance_mm,
+            wavelength_angstrom=beam_config.wavelength_A,
+            beam_center_x_mm=detector_config.beam_center_s,
+            beam_center_y_mm=detector_config.beam_center_f,
+            close_distance_mm=detector_config.close_distance_mm,
+            phi_deg=phi_deg,
+            osc_start_deg=phi_deg,
+            osc_range_deg=osc_deg,
+            twotheta_deg=config.get('twotheta_deg', 0.0),
+            convention=detector_config.detector_convention.name,
+            scale=1.0,  # Already scaled
+            adc_offset=0.0  # Already applied ADC
+        )
+        print(f"Wrote SMV image to {intfile}")
+
+    if pgmfile:
+        # Write PGM per AT-CLI-006
+        # If pgmscale not provided, default to 1.0 per spec
+        pgmscale = config.get('pgmscale', 1.0) if config.get('pgmscale') is not None else 1.0
+        write_pgm(pgmfile, intensity.cpu().numpy(), pgmscale)
+        print(f"Wrote PGM image to {pgmfile}")
+
+    # CLI-FLAGS-003: Honor -nonoise flag
+    if noisefile and not config.get('suppress_noise', False):
+        # Generate and write noise image
+        noise_config = NoiseConfig(
+            seed=seed,
+            adc_offset=config.get('adc', 40.0)
+        )
+        # PERF-RESULTCACHE-001: The noise image of a cached float image is cached under a derived key
+        cache = simulator.result_cache
+        noise_key = None
+        if cache is not None and simulator.last_result_key is not None and seed is not None:
+            noise_key = canonical_hash({'image': simulator.last_result_key, 'noise': noise_config,
+                                        'rng': config.get('noise_rng', 'torch')})
+        cached = cache.load(noise_key) if noise_key is not None else None
+        if cached is not None:
+            noisy_int, overloads = cached['noise'], int(cached['overloads'])
+        elif config.get('noise_rng') == 'philox':
+            # PERF-PHILOX-001: Keyed on the run seed and the frame index rather than a shifted seed
+            noisy = counter_noise_image(intensity, noise_config, config['seed'], frame=(frame or 1) - 1)
+            overloads = int((noisy >= noise_config.overload_value).sum())  # As Simulator.run_noise
+            noisy_int = noisy.to(torch.int16).cpu().numpy().astype(np.uint16)
+        else:
+            # For noise generation, we need to handle ROI properly (AT-CLI-005)
+            # Only apply noise and ADC to pixels inside ROI
+            # First, create a mask for where intensity > 0 (inside ROI)
+            roi_mask = intensity > 0
+
+            # Generate noise for the entire image (but without readout noise)
+            noisy, overloads = generate_poisson_noise(
+                intensity,
+                seed=noise_config.seed,
+                adc_offset=0.0,  # Don't apply ADC globally
+                readout_noise=0.0,  # Don't apply readout noise globally
+                overload_value=noise_config.overload_value
+            )
+
+            # noisy is now an integer tensor, convert back to float for additional operations
+            noisy = noisy.float()
+
+            # Add ADC offset and readout noise only to pixels inside ROI
+            if roi_mask.any():
+                # Apply readout noise only inside ROI
+                if noise_config.readout_noise > 0:
+                    generator = torch.Generator(device=intensity.device)
+                    if noise_config.seed is not None:
+                        generator.manual_seed(noise_config.seed + 1)  # Different seed for readout
+                    readout = torch.normal(
+                        mean=torch.zeros_like(noisy),
+                        std=noise_config.readout_noise,
+                        generator=generator
+                    )
+                    noisy = torch.where(roi_mask, noisy + readout, noisy)
+
+                # Add ADC offset only inside ROI
+                if noise_config.adc_offset > 0:
+                    noisy = torch.where(roi_mask, noisy + noise_config.adc_offset, noisy)
+
+            # Ensure pixels outside ROI remain exactly zero
+            noisy = torch.where(roi_mask, noisy, torch.zeros_like(noisy))
+
+            noisy_int = noisy.to(torch.int16).cpu().numpy().astype(np.uint16)
+        if cached is None and noise_key is not None:
+            cache.store(noise_key, noise=noisy_int, overloads=np.array(overloads))
+
+        write_noise_image(noisefile, noisy_int, overloads, config, detector_config, beam_config, phi_deg, osc_deg)
+
+
+def write_noise_image(
+    noisefile: str,
+    noisy_int: np.ndarray,
+    overloads: int,
+    config: Dict[str, Any],
+    detector_config: DetectorConfig,
+    beam_config: BeamConfig,
+    phi_deg: float,
+    osc_deg: float,
+) -> None:
+    """Write a noise image (uint16 counts, ADC offset applied) as SMV."""
+    write_smv(
+        filepath=noisefile,
+        image_data=noisy_int,
+        pixel_size_mm=detector_config.pixel_size_mm,
+        distance_mm=detector_config.distance_mm,
+        wavelength_angstrom=beam_config.wavelength_A,
+        beam_center_x_mm=detector_config.beam_center_s,
+        beam_center_y_mm=detector_config.beam_center_f,
+        close_distance_mm=detector_config.close_distance_mm,
+        phi_deg=phi_deg,
+        osc_start_deg=phi_deg,
+        osc_range_deg=osc_deg,
+        twotheta_deg=config.get('twotheta_deg', 0.0),
+        convention=detector_config.detector_convention.name,
+        scale=1.0,  # Already scaled
+        adc_offset=0.0  # Already applied ADC
+    )
+    print(f"Wrote noise image to {noisefile} ({overloads} overloads)")
+
+
+def streams_noise(config: Dict[str, Any]) -> bool:
+    """
+    Whether the noise image can be rendered block by block (PERF-PHILOX-001).
+
+    True for -noise_rng philox with -noisefile as the only output, where
+    the full float image is never needed.
+    """
+    return (
+        config.get('noise_rng') == 'philox'
+        and bool(config.get('noisefile'))
+        and not config.get('suppress_noise', False)
+        and not any(config.get(key) for key in ('floatfile', 'intfile', 'pgmfile'))
+    )
+
+
+def result_cache_from_args(args: argparse.Namespace) -> Optional[ResultCache]:
+    """
+    Result cache selected by -result_cache / NANOBRAG_RESULT_CACHE (PERF-RESULTCACHE-001).
+
+    Returns:
+        ResultCache, or None if caching is off or disabled with -no_cache
+    """
+    if args.no_cache:
+        return None
+    directory = args.result_cache
+    if directory is None:
+        directory = os.environ.get('NANOBRAG_RESULT_CACHE')
+        if directory is None:
+            return None
+    return ResultCache(directory or None, parse_memory_budget(args.result_cache_size))
+
+
+def print_cache_stats(args: argparse.Namespace) -> None:
+    """Print the entries and size of the result and Fdump cache directories."""
+    caches = {
+        'Result cache': ResultCache(args.result_cache or os.environ.get('NANOBRAG_RESULT_CACHE') or None,
+                                    parse_memory_budget(args.result_cache_size)),
+        'Fdump cache': FdumpCache(args.fdump_cache or None, parse_memory_budget(args.fdump_cache_size)),
+    }
+    for name, cache in caches.items():
+        stats = cache.stats()
+        print(f"{name}: {stats['directory']}")
+        print(f"  {stats['entries']} entries, {stats['bytes'] / 1024 ** 2:.1f} MiB "
+              f"of {stats['max_bytes'] / 1024 ** 2:.0f} MiB")
+
+
 def main():
     """Main entry point for CLI."""
 
@@ -882,9 +1272,15 @@ def main():
     parser = create_parser()
     args = parser.parse_args()
 
+    if args.cache_stats:
+        print_cache_stats(args)
+        return
+
     try:
         # Parse dtype and device early (DTYPE-DEFAULT-001)
         dtype = torch.float32 if args.dtype == 'float32' else torch.float64
+        # PERF-MIXED-001: -dtype mixed keeps geometry in float64, physics in float32
+        physics_dtype = torch.float32 if args.dtype == 'mixed' else None
         device = torch.device(args.device)
 
         # Validate and convert arguments
@@ -910,8 +1306,13 @@ def main():
                 phi_steps=config.get('phi_steps', 1),
                 mosaic_spread_deg=config.get('mosaic_spread_deg', 0.0),
                 mosaic_domains=config.get('mosaic_domains', 1),
+                mosaic_sampling=MosaicSampling(config.get('mosaic_sampling', 'random')),
                 shape=CrystalShape[config.get('crystal_shape', 'SQUARE')],
                 fudge=config.get('fudge', 1.0),
+                lattice_lut_tolerance=config.get('lattice_lut_tolerance'),
+                lattice_lut_interpolation=config.get('lattice_lut_interpolation', 'cubic'),
+                tricubic_cache=config.get('tricubic_cache', False),
+                lattice_range_reduction=config.get('lattice_range_reduction', True),
                 default_F=config.get('default_F', 0.0),
                 # Phase G1: Pass MOSFLM orientation if provided
                 mosflm_a_star=config.get('mosflm_a_star'),
@@ -1145,7 +1546,9 @@ def main():
             hkl_array, hkl_metadata = hkl_entry
             # Check if we actually got data (not just (None, None))
             if hkl_array is not None:
-                if isinstance(hkl_array, torch.Tensor):
+                if isinstance(hkl_array, BlockedHKLGrid):
+                    crystal.hkl_data = hkl_array.to(device=device, dtype=dtype)
+                elif isinstance(hkl_array, torch.Tensor):
                     crystal.hkl_data = hkl_array.clone().detach().to(device=device, dtype=dtype)
                 else:
                     crystal.hkl_data = torch.tensor(hkl_array, device=device, dtype=dtype)
@@ -1160,12 +1563,15 @@ def main():
             'printout': args.printout,
             'printout_pixel': args.printout_pixel,  # [fast, slow] indices
             'trace_pixel': args.trace_pixel,  # [slow, fast] indices
+            'hkl_stats': args.hkl_stats,  # on-device counters, read once per run
         }
 
         # dtype and device already parsed earlier (DTYPE-DEFAULT-001)
 
         simulator = Simulator(crystal, detector, beam_config=beam_config,
-                            device=device, dtype=dtype, debug_config=debug_config)
+                            device=device, dtype=dtype, debug_config=debug_config,
+                            physics_dtype=physics_dtype,
+                            result_cache=result_cache_from_args(args))
 
         # Print configuration if requested
         if args.show_config:
@@ -1175,7 +1581,12 @@ def main():
         print(f"  Detector: {detector_config.fpixels}x{detector_config.spixels} pixels")
         print(f"  Crystal: {crystal_config.cell_a:.1f}x{crystal_config.cell_b:.1f}x{crystal_config.cell_c:.1f} Å")
         print(f"  Wavelength: {beam_config.wavelength_A:.2f} Å")
-        print(f"  Device: {device}, Dtype: {dtype}")
+        if physics_dtype is not None:
+            print(f"  Device: {device}, Dtype: mixed ({dtype} geometry, {physics_dtype} physics)")
+        else:
+            print(f"  Device: {device}, Dtype: {dtype}")
+        if simulator._range_reduction:
+            print("  float32 lattice transform: range-reduced, compensated sums (-no_range_reduction to disable)")
         if detector_config.detector_convention == DetectorConvention.CUSTOM:
             print(f"  Convention: CUSTOM (using custom detector basis vectors)")
 
@@ -1186,145 +1597,59 @@ def main():
             print(f"  Limiting output to pixel (fast={args.printout_pixel[0]}, slow={args.printout_pixel[1]})")
         if args.trace_pixel:
             print(f"  Tracing pixel (slow={args.trace_pixel[0]}, fast={args.trace_pixel[1]})")
-        if args.pixel_batch_size:
+        if args.sparse_cutoff is not None:
+            print(f"  Sparse rendering: F_latt cutoff {args.sparse_cutoff:g}")
+        if args.mem_budget:
+            print(f"  Memory budget: {args.mem_budget} per tile")
+        elif args.pixel_batch_size:
             print(f"  Pixel batching: {args.pixel_batch_size} rows per chunk")
 
-        intensity = simulator.run(pixel_batch_size=args.pixel_batch_size)
-
-        # Compute statistics
-        stats = simulator.compute_statistics(intensity)
-        print(f"\nStatistics:")
-        print(f"  Max intensity: {stats['max_I']:.3e} at pixel ({stats['max_I_slow']}, {stats['max_I_fast']})")
-        print(f"  Mean: {stats['mean']:.3e}")
-        print(f"  RMS: {stats['RMS']:.3e}")
-        print(f"  RMSD: {stats['RMSD']:.3e}")
-
-        # Write outputs
-        if config.get('floatfile'):
-            # Write raw float image
-            data = intensity.cpu().numpy().astype(np.float32)
-            data.tofile(config['floatfile'])
-            print(f"Wrote float image to {config['floatfile']}")
-
-        if config.get('intfile'):
-            # Scale and write SMV per AT-CLI-006
-            scale = config.get('scale')
-            adc_offset = config.get('adc', 40.0)
-
-            if not scale or scale <= 0:
-                # Auto-scale: map max float pixel to approximately 55,000 counts
-                max_val = intensity.max().item()
-                if max_val > 0:
-                    # Calculate scale to achieve 55000 after adding ADC
-                    scale = (55000.0 - adc_offset) / max_val if adc_offset < 55000 else 55000.0 / max_val
-                else:
-                    scale = 1.0
-
-            # Apply scaling per spec: integer pixel = floor(min(65535, float*scale + adc))
-            # Only apply to non-zero pixels (AT-CLI-005)
-            # Pixels outside ROI should remain zero
-            threshold = 1e-10
-            roi_mask = intensity > threshold
-
-            # Calculate scaled values
-            scaled = intensity * scale + adc_offset
-            # Only apply scaling where intensity > 0 (inside ROI)
-            scaled = torch.where(roi_mask, scaled, torch.zeros_like(scaled))
-            # Clip to valid range and floor
-            scaled = scaled.clip(0, 65535)
-            scaled_int = torch.floor(scaled).to(torch.int16).cpu().numpy().astype(np.uint16)
-
-            write_smv(
-                filepath=config['intfile'],
-                image_data=scaled_int,
-                pixel_size_mm=detector_config.pixel_size_mm,
-                distance_mm=detector_config.distance_mm,
-                wavelength_angstrom=beam_config.wavelength_A,
-                beam_center_x_mm=detector_config.beam_center_s,
-                beam_center_y_mm=detector_config.beam_center_f,
-                close_distance_mm=detector_config.close_distance_mm,
-                phi_deg=config.get('phi_deg', 0.0),
-                osc_start_deg=config.get('phi_deg', 0.0),
-                osc_range_deg=config.get('osc_deg', 0.0),
-                twotheta_deg=config.get('twotheta_deg', 0.0),
-                convention=detector_config.detector_convention.name,
-                scale=1.0,  # Already scaled
-                adc_offset=0.0  # Already applied ADC
-            )
-            print(f"Wrote SMV image to {config['intfile']}")
-
-        if config.get('pgmfile'):
-            # Write PGM per AT-CLI-006
-            # If pgmscale not provided, default to 1.0 per spec
-            pgmscale = config.get('pgmscale', 1.0) if config.get('pgmscale') is not None else 1.0
-            write_pgm(config['pgmfile'], intensity.cpu().numpy(), pgmscale)
-            print(f"Wrote PGM image to {config['pgmfile']}")
-
-        # CLI-FLAGS-003: Honor -nonoise flag
-        if config.get('noisefile') and not config.get('suppress_noise', False):
-            # Generate and write noise image
-            noise_config = NoiseConfig(
-                seed=config.get('seed'),
-                adc_offset=config.get('adc', 40.0)
-            )
-            # For noise generation, we need to handle ROI properly (AT-CLI-005)
-            # Only apply noise and ADC to pixels inside ROI
-            # First, create a mask for where intensity > 0 (inside ROI)
-            roi_mask = intensity > 0
-
-            # Generate noise for the entire image (but without readout noise)
-            noisy, overloads = generate_poisson_noise(
-                intensity,
-                seed=noise_config.seed,
-                adc_offset=0.0,  # Don't apply ADC globally
-                readout_noise=0.0,  # Don't apply readout noise globally
-                overload_value=noise_config.overload_value
-            )
-
-            # noisy is now an integer tensor, convert back to float for additional operations
-            noisy = noisy.float()
-
-            # Add ADC offset and readout noise only to pixels inside ROI
-            if roi_mask.any():
-                # Apply readout noise only inside ROI
-                if noise_config.readout_noise > 0:
-                    generator = torch.Generator(device=intensity.device)
-                    if noise_config.seed is not None:
-                        generator.manual_seed(noise_config.seed + 1)  # Different seed for readout
-                    readout = torch.normal(
-                        mean=torch.zeros_like(noisy),
-                        std=noise_config.readout_noise,
-                        generator=generator
-                    )
-                    noisy = torch.where(roi_mask, noisy + readout, noisy)
-
-                # Add ADC offset only inside ROI
-                if noise_config.adc_offset > 0:
-                    noisy = torch.where(roi_mask, noisy + noise_config.adc_offset, noisy)
-
-            # Ensure pixels outside ROI remain exactly zero
-            noisy = torch.where(roi_mask, noisy, torch.zeros_like(noisy))
-
-            noisy_int = noisy.to(torch.int16).cpu().numpy().astype(np.uint16)
-
-            write_smv(
-                filepath=config['noisefile'],
-                image_data=noisy_int,
-                pixel_size_mm=detector_config.pixel_size_mm,
-                distance_mm=detector_config.distance_mm,
-                wavelength_angstrom=beam_config.wavelength_A,
-                beam_center_x_mm=detector_config.beam_center_s,
-                beam_center_y_mm=detector_config.beam_center_f,
-                close_distance_mm=detector_config.close_distance_mm,
-                phi_deg=config.get('phi_deg', 0.0),
-                osc_start_deg=config.get('phi_deg', 0.0),
-                osc_range_deg=config.get('osc_deg', 0.0),
-                twotheta_deg=config.get('twotheta_deg', 0.0),
-                convention=detector_config.detector_convention.name,
-                scale=1.0,  # Already scaled
-                adc_offset=0.0  # Already applied ADC
-            )
-            print(f"Wrote noise image to {config['noisefile']} ({overloads} overloads)")
+        run_kwargs = dict(pixel_batch_size=args.pixel_batch_size,
+                          mem_budget=args.mem_budget,
+                          sparse_cutoff=args.sparse_cutoff)
+
+        if config.get('sweep'):
+            # PERF-SWEEP-001: One Simulator for the whole sweep; frames are written as they arrive
+            n_frames = config['sweep']
+            print(f"  Sweep: {n_frames} frames of {config['osc_deg']:g}° from {config['phi_deg']:g}°")
+            frames = simulator.run_sweep(config['phi_deg'], config['osc_deg'], n_frames,
+                                         nproc=config.get('nproc', 1), **run_kwargs)
+            for frame, intensity in enumerate(frames, start=1):
+                print(f"\nFrame {frame}/{n_frames}")
+                write_outputs(intensity, simulator, config, detector_config, beam_config, frame=frame)
+        elif args.distributed:
+            # PERF-DIST-001: Rank and world size come from the torchrun environment
+            import torch.distributed as dist
+            dist.init_process_group("gloo")
+            try:
+                print(f"  Distributed: rank {dist.get_rank()} of {dist.get_world_size()}")
+                intensity = simulator.run(distributed=True, **run_kwargs)
+                if intensity is not None:
+                    write_outputs(intensity, simulator, config, detector_config, beam_config)
+            finally:
+                dist.destroy_process_group()
+        elif args.oversample_adaptive is not None:
+            print(f"  Adaptive oversampling: curvature threshold {args.oversample_adaptive:g}")
+            run_kwargs.pop('sparse_cutoff')
+            intensity = simulator.run_adaptive(args.oversample_adaptive, **run_kwargs)
+            write_outputs(intensity, simulator, config, detector_config, beam_config)
+        elif streams_noise(config):
+            # PERF-PHILOX-001: Noise per row block; the float image is never held in full
+            nproc = config.get('nproc') or 1
+            print(f"  Streaming noise image in row blocks ({nproc} process{'es' if nproc > 1 else ''})")
+            noise_config = NoiseConfig(seed=config['seed'], adc_offset=config.get('adc', 40.0))
+            noisy, overloads = simulator.run_noise(noise_config, nproc=nproc, **run_kwargs)
+            noisy_int = noisy.to(torch.int16).numpy().astype(np.uint16)
+            write_noise_image(config['noisefile'], noisy_int, overloads, config, detector_config,
+                              beam_config, config.get('phi_deg', 0.0), config.get('osc_deg', 0.0))
+        elif config.get('nproc') is not None:
+            # PERF-FARM-001: Row blocks of one image over worker processes
+            print(f"  Worker processes: {config['nproc']}")
+            intensity = simulator.run_parallel(config['nproc'], **run_kwargs)
+            write_outputs(intensity, simulator, config, detector_config, beam_config)
+        else:
+            intensity = simulator.run(**run_kwargs)
+            write_outputs(intensity, simulator, config, detector_config, beam_config)
 
         print("\nSimulation complete.")
 
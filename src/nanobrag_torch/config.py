@@ -93,6 +93,16 @@ class CrystalShape(Enum):
     TOPHAT = "tophat"  # Binary spots/top-hat function
 
 
+class MosaicSampling(Enum):
+    """Point sets used to draw mosaic domain rotations (PERF-MOSAIC-001)."""
+
+    RANDOM = "random"          # i.i.d. pseudo-random draws (default)
+    SOBOL = "sobol"            # Owen-scrambled Sobol sequence
+    HALTON = "halton"          # Randomly shifted Halton sequence (bases 2, 3, 5)
+    STRATIFIED = "stratified"  # Latin hypercube: N_mos jittered strata per dimension
+    CAP = "cap"                # nanoBragg.c spherical-cap rotations from the ran1() stream (PERF-RNG-001)
+
+
 @dataclass
 class CrystalConfig:
     """Configuration for crystal properties and orientation.
@@ -137,6 +147,7 @@ class CrystalConfig:
     mosaic_spread_deg: float = 0.0
     mosaic_domains: int = 1
     mosaic_seed: Optional[int] = None
+    mosaic_sampling: MosaicSampling = MosaicSampling.RANDOM  # Sampler for domain rotations
 
     # Crystal size (number of unit cells in each direction)
     N_cells: Tuple[int, int, int] = (1, 1, 1)  # Matches C default
@@ -148,6 +159,21 @@ class CrystalConfig:
     shape: CrystalShape = CrystalShape.SQUARE  # Crystal shape model for F_latt calculation
     fudge: float = 1.0  # Shape parameter scaling factor
 
+    # Tabulated lattice transform (PERF-LUT-001): evaluate F_latt from lookup tables with
+    # this error bound relative to the peak value; None evaluates sin/exp directly
+    lattice_lut_tolerance: Optional[float] = None
+    lattice_lut_interpolation: str = "cubic"  # "linear" or "cubic"
+
+    # Precomputed tricubic interpolation (PERF-TRICUBIC-001): cache the 64 polynomial
+    # coefficients of every HKL grid cell (64× the grid's memory) so that each
+    # interpolated lookup is one gather plus a Horner evaluation
+    tricubic_cache: bool = False
+
+    # float32 lattice transform (PERF-F32-001): evaluate sincg on range-reduced Miller
+    # indices with compensated orientation sums whenever physics runs in float32 and
+    # N_cells is integral; False keeps the direct sin(N·π·h)/sin(π·h) evaluation
+    lattice_range_reduction: bool = True
+
     # Sample size in meters (calculated from N_cells and unit cell dimensions)
     # These are computed in __post_init__ and potentially clipped by beam size
     sample_x: Optional[float] = None  # Sample size along a-axis (meters)
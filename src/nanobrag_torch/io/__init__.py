@@ -3,13 +3,16 @@ I/O module for nanoBragg PyTorch implementation.
 
 Handles file reading and writing operations including:
 - HKL structure factor files
-- Fdump binary cache
+- Fdump binary cache (C-compatible, and the v2 content-addressed cache)
+- Simulation result cache keyed by a configuration hash
 - SMV format images
 - PGM preview images
 - Mask files (SMV format)
 """
 
 from .hkl import read_hkl_file, write_fdump, read_fdump, try_load_hkl_or_fdump
+from .fdump_cache import FdumpCache, read_fdump_v2, write_fdump_v2
+from .result_cache import ResultCache, canonical_hash
 from .smv import write_smv
 from .pgm import write_pgm
 from .mask import read_smv_mask, create_circular_mask, create_rectangle_mask
@@ -19,6 +22,11 @@ __all__ = [
     'write_fdump',
     'read_fdump',
     'try_load_hkl_or_fdump',
+    'FdumpCache',
+    'read_fdump_v2',
+    'write_fdump_v2',
+    'ResultCache',
+    'canonical_hash',
     'write_smv',
     'write_pgm',
     'read_smv_mask',
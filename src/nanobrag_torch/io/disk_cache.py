@@ -0,0 +1,143 @@
+"""
+Shared pieces of the on-disk caches (PERF-FDUMP-001, PERF-RESULTCACHE-001).
+
+Each cache is a directory of files with one suffix, shared by all
+processes of a user. Files are written atomically (temporary file in the
+same directory, then a rename), so a reader never sees a partial entry and
+concurrent writers of the same key just replace each other's identical
+result. Reads refresh a file's mtime; after a store the least recently
+used files are removed until the directory fits in a byte budget.
+"""
+
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional, Union
+
+
+def cache_root() -> Path:
+    """$NANOBRAG_CACHE_DIR, or nanobrag_torch in the user cache directory (XDG_CACHE_HOME or ~/.cache)."""
+    root = os.environ.get("NANOBRAG_CACHE_DIR")
+    if root is not None:
+        return Path(root)
+    return Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "nanobrag_torch"
+
+
+@contextmanager
+def atomic_write(path: Union[str, Path]) -> Iterator[BinaryIO]:
+    """Binary file whose contents replace `path` in one rename when the block succeeds."""
+    path = Path(path)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            yield f
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+class DiskCache:
+    """
+    Directory of `suffix` files with an LRU size budget and hit counters.
+
+    Subclasses define the entry format; they call `_touch()` on a hit,
+    count hits and misses, and call `evict(keep=path)` after a store.
+    """
+
+    suffix = ""
+
+    def __init__(self, directory: Union[str, Path], max_bytes: int):
+        """
+        Args:
+            directory: Cache directory (created on the first store)
+            max_bytes: Size budget of the directory's entries
+
+        Raises:
+            ValueError: If max_bytes is not positive
+        """
+        if max_bytes <= 0:
+            raise ValueError(f"Cache size must be positive, got {max_bytes}")
+        self.directory = Path(directory)
+        self.max_bytes = int(max_bytes)
+        self._hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def _touch(path: Path) -> None:
+        """Mark an entry as recently used."""
+        os.utime(path)
+
+    def _entries(self):
+        """(mtime_ns, size, path) of every entry."""
+        if not self.directory.exists():
+            return []
+        entries = []
+        for path in self.directory.glob(f"*{self.suffix}"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue  # Removed by another process
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+        return entries
+
+    def evict(self, keep: Optional[Path] = None) -> int:
+        """
+        Remove least recently used files until the cache fits in max_bytes.
+
+        Args:
+            keep: File that is never removed (the one just stored)
+
+        Returns:
+            Number of files removed
+        """
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if keep is not None and path == keep:
+                continue
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self) -> int:
+        """Remove every entry and reset the counters; returns the number of files removed."""
+        removed = 0
+        for _, _, path in self._entries():
+            try:
+                path.unlink()
+                removed += 1
+            except FileNotFoundError:
+                pass
+        self._hits = 0
+        self._misses = 0
+        return removed
+
+    def stats(self) -> dict:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with this process's hits, misses and hit rate, and the
+            directory's number of entries, total bytes and budget
+        """
+        sizes = [size for _, size, _ in self._entries()]
+        total = self._hits + self._misses
+        return {
+            'hits': self._hits,
+            'misses': self._misses,
+            'hit_rate': self._hits / total if total > 0 else 0.0,
+            'entries': len(sizes),
+            'bytes': sum(sizes),
+            'max_bytes': self.max_bytes,
+            'directory': str(self.directory),
+        }
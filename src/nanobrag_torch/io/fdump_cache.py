@@ -0,0 +1,257 @@
+"""
+Versioned, memory-mappable Fdump cache (PERF-FDUMP-001).
+
+The C-compatible Fdump.bin (write_fdump/read_fdump) is a text header
+ended by a form feed, followed by a padded float64 grid. It does not
+record which HKL file it came from, so a stale Fdump.bin in the working
+directory is silently reused, and concurrent jobs in one directory
+overwrite each other's copy.
+
+Fdump v2 files sit next to the legacy format:
+
+- a fixed HEADER_SIZE-byte little-endian header: magic, version, payload
+  dtype, the six index bounds, default_F and the SHA-256 of the source
+  HKL file and default_F;
+- the unpadded (h_range, k_range, l_range) grid as float32 or float64,
+  starting at HEADER_SIZE so that it can be mapped without a copy.
+
+Files are written to a temporary file in the target directory and then
+renamed into place, so readers never see a partial file. FdumpCache keeps
+them in a shared directory, named by content hash, and evicts the least
+recently used files beyond a size budget (see disk_cache).
+"""
+
+import hashlib
+import math
+import os
+import struct
+from pathlib import Path
+from typing import Optional, Tuple, Union
+
+import numpy as np
+import torch
+
+from .disk_cache import DiskCache, atomic_write, cache_root
+from .hkl import read_hkl_file
+from ..utils.hkl_blocks import BlockedHKLGrid
+
+FDUMP_V2_MAGIC = b"NBFDUMP2"
+FDUMP_V2_VERSION = 2
+HEADER_SIZE = 128
+CACHE_SUFFIX = ".fdump2"
+DEFAULT_CACHE_BYTES = 4 * 1024 ** 3
+
+# magic, version, dtype code, h_min, h_max, k_min, k_max, l_min, l_max, default_F, source hash
+_HEADER = struct.Struct("<8sII6qd32s")
+_DTYPES = {0: (torch.float32, np.dtype("<f4")), 1: (torch.float64, np.dtype("<f8"))}
+_DTYPE_CODES = {torch.float32: 0, torch.float64: 1}
+_BOUNDS = ('h_min', 'h_max', 'k_min', 'k_max', 'l_min', 'l_max')
+_METADATA_KEYS = _BOUNDS + ('h_range', 'k_range', 'l_range')
+
+
+def hkl_source_hash(hkl_path: Union[str, Path], default_F: float) -> bytes:
+    """SHA-256 of the HKL file contents and default_F (the cache key)."""
+    digest = hashlib.sha256()
+    with open(hkl_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    digest.update(struct.pack("<d", float(default_F)))
+    return digest.digest()
+
+
+def _metadata(bounds) -> dict:
+    metadata = dict(zip(_BOUNDS, (int(b) for b in bounds)))
+    for axis in "hkl":
+        metadata[f'{axis}_range'] = metadata[f'{axis}_max'] - metadata[f'{axis}_min'] + 1
+    return metadata
+
+
+def write_fdump_v2(
+    F_grid: torch.Tensor,
+    metadata: dict,
+    filepath: Union[str, Path],
+    default_F: float = 0.0,
+    source_hash: bytes = b"",
+    dtype: torch.dtype = torch.float32,
+):
+    """
+    Atomically write an Fdump v2 file.
+
+    Args:
+        F_grid: (h_range, k_range, l_range) structure factors
+        metadata: Dict with h_min, h_max, k_min, k_max, l_min, l_max
+        filepath: Output path; replaced in one rename
+        default_F: Default structure factor the grid was built with
+        source_hash: SHA-256 digest of the source (see hkl_source_hash), or empty
+        dtype: Payload dtype, torch.float32 or torch.float64
+
+    Raises:
+        ValueError: If dtype is unsupported, the hash is not 32 bytes, or the
+            grid shape does not match the metadata
+    """
+    if dtype not in _DTYPE_CODES:
+        raise ValueError(f"Fdump v2 payload dtype must be float32 or float64, got {dtype}")
+    if len(source_hash) not in (0, 32):
+        raise ValueError(f"Source hash must be a 32-byte SHA-256 digest, got {len(source_hash)} bytes")
+    bounds = [int(metadata[key]) for key in _BOUNDS]
+    shape = tuple(bounds[2 * i + 1] - bounds[2 * i] + 1 for i in range(3))
+    if tuple(F_grid.shape) != shape:
+        raise ValueError(f"Grid shape {tuple(F_grid.shape)} does not match the metadata ranges {shape}")
+
+    code = _DTYPE_CODES[dtype]
+    header = _HEADER.pack(
+        FDUMP_V2_MAGIC, FDUMP_V2_VERSION, code, *bounds, float(default_F), source_hash.ljust(32, b"\0")
+    )
+    payload = F_grid.detach().to(device="cpu", dtype=dtype).contiguous().numpy()
+    payload = payload.astype(_DTYPES[code][1], copy=False)
+
+    with atomic_write(filepath) as f:
+        f.write(header.ljust(HEADER_SIZE, b"\0"))
+        payload.tofile(f)
+
+
+def read_fdump_v2_header(filepath: Union[str, Path]) -> dict:
+    """
+    Read the header of an Fdump v2 file.
+
+    Returns:
+        dict with the metadata keys of read_hkl_file plus 'dtype',
+        'default_F' and 'source_hash' (bytes)
+
+    Raises:
+        ValueError: If the file is not an Fdump v2 file of a supported version
+    """
+    with open(filepath, 'rb') as f:
+        raw = f.read(HEADER_SIZE)
+    if len(raw) < HEADER_SIZE or not raw.startswith(FDUMP_V2_MAGIC):
+        raise ValueError(f"{filepath} is not an Fdump v2 file")
+    _, version, code, *bounds, default_F, source_hash = _HEADER.unpack_from(raw)
+    if version != FDUMP_V2_VERSION or code not in _DTYPES:
+        raise ValueError(f"Unsupported Fdump v2 version {version} or dtype code {code} in {filepath}")
+    header = _metadata(bounds)
+    header.update(dtype=_DTYPES[code][0], default_F=default_F, source_hash=source_hash)
+    return header
+
+
+def read_fdump_v2(
+    filepath: Union[str, Path], device=None, dtype: Optional[torch.dtype] = None, mmap: bool = True
+) -> Tuple[torch.Tensor, dict]:
+    """
+    Read an Fdump v2 file.
+
+    With mmap=True the payload is mapped copy-on-write (np.memmap), so on
+    the CPU in the stored dtype no data is copied and pages are read on
+    first access. Another device or dtype copies once.
+
+    Args:
+        filepath: Fdump v2 file
+        device: PyTorch device (default CPU)
+        dtype: Grid dtype (default: the stored dtype)
+        mmap: Map the payload instead of reading it
+
+    Returns:
+        tuple: (F_grid, metadata) as returned by read_hkl_file
+
+    Raises:
+        ValueError: If the header is invalid or the payload is truncated
+    """
+    header = read_fdump_v2_header(filepath)
+    shape = (header['h_range'], header['k_range'], header['l_range'])
+    np_dtype = _DTYPES[_DTYPE_CODES[header['dtype']]][1]
+    expected = HEADER_SIZE + math.prod(shape) * np_dtype.itemsize
+    if os.path.getsize(filepath) != expected:
+        raise ValueError(f"{filepath} has {os.path.getsize(filepath)} bytes, expected {expected}")
+
+    if mmap:
+        array = np.memmap(filepath, dtype=np_dtype, mode='c', offset=HEADER_SIZE, shape=shape)
+    else:
+        array = np.fromfile(filepath, dtype=np_dtype, count=math.prod(shape), offset=HEADER_SIZE).reshape(shape)
+    # No-op on little-endian hosts
+    array = array.astype(np_dtype.newbyteorder('='), copy=False)
+
+    F_grid = torch.from_numpy(array).to(
+        device=device if device is not None else torch.device("cpu"),
+        dtype=dtype if dtype is not None else header['dtype'],
+    )
+    metadata = {key: header[key] for key in _METADATA_KEYS}
+    return F_grid, metadata
+
+
+def default_cache_dir() -> Path:
+    """The fdump directory of the user cache (see disk_cache.cache_root)."""
+    return cache_root() / "fdump"
+
+
+class FdumpCache(DiskCache):
+    """
+    Shared directory of Fdump v2 files keyed by HKL content hash.
+
+    Loads mark a file as recently used (its mtime); after each store the
+    least recently used files are removed until the directory fits in
+    max_bytes. Entries from other processes are shared and, because writes
+    are atomic renames, safe to read while another job stores.
+    """
+
+    suffix = CACHE_SUFFIX
+
+    def __init__(self, directory: Optional[Union[str, Path]] = None, max_bytes: int = DEFAULT_CACHE_BYTES):
+        """
+        Args:
+            directory: Cache directory (default: default_cache_dir())
+            max_bytes: Size budget of the directory's Fdump v2 files
+
+        Raises:
+            ValueError: If max_bytes is not positive
+        """
+        super().__init__(directory if directory is not None else default_cache_dir(), max_bytes)
+
+    def path_for(self, source_hash: bytes, dtype: torch.dtype) -> Path:
+        """Cache file of a source hash and payload dtype."""
+        return self.directory / f"{source_hash.hex()}-{str(dtype).replace('torch.', '')}{CACHE_SUFFIX}"
+
+    def load(
+        self,
+        hkl_path: Union[str, Path],
+        default_F: float = 0.0,
+        device=None,
+        dtype: torch.dtype = torch.float32,
+        storage: str = "dense",
+    ) -> Tuple[Union[torch.Tensor, BlockedHKLGrid], dict]:
+        """
+        Structure factors of an HKL file, from the cache or parsed and stored.
+
+        Args:
+            hkl_path: HKL text file
+            default_F: Default structure factor (part of the key)
+            device: PyTorch device
+            dtype: Grid dtype (float32 or float64; part of the key)
+            storage: "dense" or "blocked", as for read_hkl_file
+
+        Returns:
+            tuple: (F_grid, metadata) as returned by read_hkl_file
+        """
+        source_hash = hkl_source_hash(hkl_path, default_F)
+        path = self.path_for(source_hash, dtype)
+        F_grid = None
+        try:
+            if read_fdump_v2_header(path)['source_hash'] == source_hash:
+                F_grid, metadata = read_fdump_v2(path, device=device, dtype=dtype)
+                self._touch(path)
+        except (OSError, ValueError):
+            F_grid = None  # Missing, evicted or damaged: rebuild
+
+        if F_grid is not None:
+            self._hits += 1
+        else:
+            self._misses += 1
+            F_grid, metadata = read_hkl_file(str(hkl_path), default_F=default_F, device=device, dtype=dtype)
+            try:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                write_fdump_v2(F_grid, metadata, path, default_F, source_hash, dtype)
+                self.evict(keep=path)
+            except OSError as e:
+                print(f"Warning: Could not write Fdump cache: {e}")
+
+        if storage == "blocked":
+            F_grid = BlockedHKLGrid.from_dense(F_grid, default_F)
+        return F_grid, metadata
@@ -5,19 +5,62 @@ Implements AT-STR-001, AT-STR-002, and AT-IO-003 from spec-a.md.
 """
 
 import struct
+import warnings
 from pathlib import Path
-from typing import Tuple, Optional
+from typing import Tuple, Optional, Union
 
 import torch
 import numpy as np
 
+from ..utils.hkl_blocks import BlockedHKLGrid
+
+HKL_STORAGE_MODES = ("dense", "blocked")
+
+
+def _parse_reflections(filepath: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Parse "h k l F" lines into arrays (PERF-HKLPARSE-001).
+
+    Blank lines, lines starting with '#', lines with fewer than four fields
+    and lines whose first four fields are not numbers are skipped; further
+    fields are ignored. Well-formed files (the common case, e.g. P1 lists
+    from mtz_to_P1hkl.com) are read in one call to the C parser of
+    np.loadtxt. Any line it rejects sends the file through a line-by-line
+    pass with the same skipping rules, which only builds the arrays.
+
+    Returns:
+        tuple: (hkl, F) float64 arrays of shape (N, 3) and (N,) in file order
+    """
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")  # "input contained no data"
+            table = np.loadtxt(filepath, dtype=np.float64, comments=None, usecols=(0, 1, 2, 3), ndmin=2)
+        table = table.reshape(-1, 4)
+        return table[:, :3], table[:, 3]
+    except ValueError:
+        pass
+
+    rows = []
+    with open(filepath, 'r') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) < 4 or parts[0].startswith('#'):
+                continue
+            try:
+                rows.append((float(parts[0]), float(parts[1]), float(parts[2]), float(parts[3])))
+            except ValueError:
+                continue  # Skip malformed lines
+    table = np.array(rows, dtype=np.float64).reshape(-1, 4)
+    return table[:, :3], table[:, 3]
+
 
 def read_hkl_file(
     filepath: str,
     default_F: float = 0.0,
     device=None,
-    dtype=torch.float32
-) -> Tuple[torch.Tensor, dict]:
+    dtype=torch.float32,
+    storage: str = "dense",
+) -> Tuple[Union[torch.Tensor, BlockedHKLGrid], dict]:
     """
     Read HKL text file with two-pass algorithm matching C implementation.
 
@@ -26,63 +69,54 @@ def read_hkl_file(
     - Second pass: allocate 3D grid and populate with F values
     - Unspecified grid points retain default_F
 
+    Both passes run on arrays (PERF-HKLPARSE-001): the file is parsed in
+    bulk, the bounds are array reductions and the grid is filled with one
+    scatter. Repeated reflections keep the last value, as a sequential fill.
+
     Args:
         filepath: Path to HKL file with "h k l F" format (one per line)
         default_F: Default structure factor for unspecified reflections
         device: PyTorch device
         dtype: PyTorch dtype
+        storage: "dense" for a full grid tensor, or "blocked" for a
+            BlockedHKLGrid that only stores bricks containing reflections
+            (PERF-HKLBLOCK-001); both are indexed the same way
 
     Returns:
         tuple: (F_grid, metadata_dict) where:
-            - F_grid is a 3D tensor indexed by [h-h_min, k-k_min, l-l_min]
+            - F_grid is a 3D grid indexed by [h-h_min, k-k_min, l-l_min]
             - metadata_dict contains h_min, h_max, k_min, k_max, l_min, l_max
+
+    Raises:
+        ValueError: If the file has no valid reflections or storage is unknown
     """
+    if storage not in HKL_STORAGE_MODES:
+        raise ValueError(f"HKL storage must be one of {HKL_STORAGE_MODES}, got {storage!r}")
     device = device if device is not None else torch.device("cpu")
 
     # First pass: find bounds and count reflections
-    h_min, h_max = float('inf'), float('-inf')
-    k_min, k_max = float('inf'), float('-inf')
-    l_min, l_max = float('inf'), float('-inf')
+    hkl, F = _parse_reflections(filepath)
 
-    reflections = []
-    non_integer_warned = False
+    # Indices that cannot be rounded to integers (nan) are malformed lines
+    finite = np.isfinite(hkl).all(axis=1)
+    if not finite.all():
+        hkl, F = hkl[finite], F[finite]
 
-    with open(filepath, 'r') as f:
-        for line in f:
-            line = line.strip()
-            if not line or line.startswith('#'):
-                continue
-
-            parts = line.split()
-            if len(parts) >= 4:
-                try:
-                    h, k, l = float(parts[0]), float(parts[1]), float(parts[2])
-                    F = float(parts[3])
-
-                    # Check for non-integer indices and warn
-                    if not non_integer_warned:
-                        if h != int(h) or k != int(k) or l != int(l):
-                            print(f"WARNING: Non-integer h,k,l values found: {h}, {k}, {l}")
-                            non_integer_warned = True
-
-                    # Track bounds
-                    h_int, k_int, l_int = int(round(h)), int(round(k)), int(round(l))
-                    h_min = min(h_min, h_int)
-                    h_max = max(h_max, h_int)
-                    k_min = min(k_min, k_int)
-                    k_max = max(k_max, k_int)
-                    l_min = min(l_min, l_int)
-                    l_max = max(l_max, l_int)
-
-                    reflections.append((h_int, k_int, l_int, F))
-
-                except ValueError:
-                    continue  # Skip malformed lines
+    # Check for non-integer indices and warn (first offending line only)
+    non_integer = (hkl != np.trunc(hkl)).any(axis=1)
+    if non_integer.any():
+        h, k, l = (float(x) for x in hkl[np.argmax(non_integer)])  # noqa: E741
+        print(f"WARNING: Non-integer h,k,l values found: {h}, {k}, {l}")
 
     # Check if we found any valid reflections
-    if not reflections:
+    if len(F) == 0:
         raise ValueError(f"No valid reflections found in {filepath}")
 
+    # Round half to even, as Python's round()
+    indices = np.rint(hkl).astype(np.int64)
+    h_min, k_min, l_min = (int(x) for x in indices.min(axis=0))
+    h_max, k_max, l_max = (int(x) for x in indices.max(axis=0))
+
     # Calculate ranges (C-style: count of values)
     # C-code reference (nanoBragg.c:2405):
     #   h_range = h_max - h_min + 1;
@@ -95,24 +129,6 @@ def read_hkl_file(
     if h_range <= 0 or k_range <= 0 or l_range <= 0:
         raise ValueError(f"Invalid HKL ranges: h_range={h_range}, k_range={k_range}, l_range={l_range}")
 
-    # Second pass: allocate grid and populate
-    # Grid size is h_range × k_range × l_range (the usable data size)
-    # C allocates (h_range+1) × (k_range+1) × (l_range+1) with padding
-    # but we only need the data portion for in-memory representation
-    F_grid = torch.full(
-        (h_range, k_range, l_range),
-        default_F,
-        device=device,
-        dtype=dtype
-    )
-
-    # Populate grid with actual F values
-    for h, k, l, F in reflections:
-        h_idx = h - h_min
-        k_idx = k - k_min
-        l_idx = l - l_min
-        F_grid[h_idx, k_idx, l_idx] = F
-
     metadata = {
         'h_min': h_min,
         'h_max': h_max,
@@ -125,6 +141,34 @@ def read_hkl_file(
         'l_range': l_range
     }
 
+    indices -= np.array([h_min, k_min, l_min])
+
+    # PERF-HKLBLOCK-001: Memory proportional to the reflections, not the bounding box
+    if storage == "blocked":
+        F_grid = BlockedHKLGrid.from_reflections(
+            torch.from_numpy(indices), torch.from_numpy(F), (h_range, k_range, l_range), default_F,
+            device=device, dtype=dtype
+        )
+        return F_grid, metadata
+
+    # Second pass: allocate grid and populate
+    # Grid size is h_range × k_range × l_range (the usable data size)
+    # C allocates (h_range+1) × (k_range+1) × (l_range+1) with padding
+    # but we only need the data portion for in-memory representation
+    F_grid = torch.full(
+        (h_range, k_range, l_range),
+        default_F,
+        device=device,
+        dtype=dtype
+    )
+
+    # Populate grid with actual F values in one scatter; for repeated
+    # reflections keep the last line (first occurrence in reverse order)
+    voxel = np.ravel_multi_index(indices.T, (h_range, k_range, l_range))
+    _, first_in_reverse = np.unique(voxel[::-1], return_index=True)
+    last = len(voxel) - 1 - first_in_reverse
+    F_grid.view(-1)[torch.from_numpy(voxel[last]).to(device)] = torch.from_numpy(F[last]).to(device=device, dtype=dtype)
+
     return F_grid, metadata
 
 
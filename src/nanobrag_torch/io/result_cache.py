@@ -0,0 +1,149 @@
+"""
+On-disk simulation result cache (PERF-RESULTCACHE-001).
+
+Parity sweeps, reference-image regeneration and notebooks re-run the same
+simulations many times. With a ResultCache, a run whose inputs hash to a
+stored key returns the stored image instead of simulating.
+
+The key is the SHA-256 of a canonical JSON form of the inputs
+(canonical_hash): dataclass configurations field by field, enums by name,
+floats exactly, and tensors and arrays by dtype, shape and a hash of
+their bytes, so the key follows the HKL content rather than a file name.
+Tensors that require grad cannot be keyed; such runs are not cached
+(the stored images carry no autograd graph).
+
+Entries are uncompressed .npz files holding named arrays (the float
+image, optionally a noise image), stored atomically in a shared
+directory with LRU eviction (see disk_cache).
+"""
+
+import dataclasses
+import enum
+import hashlib
+import json
+import zipfile
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+import numpy as np
+import torch
+
+from .disk_cache import DiskCache, atomic_write, cache_root
+from ..utils.hkl_blocks import BlockedHKLGrid
+
+DEFAULT_RESULT_CACHE_BYTES = 8 * 1024 ** 3
+
+
+def _array_form(kind: str, dtype: str, shape, data: np.ndarray) -> dict:
+    digest = hashlib.sha256(np.ascontiguousarray(data).reshape(-1).view(np.uint8)).hexdigest()
+    return {"__array__": kind, "dtype": dtype, "shape": list(shape), "sha256": digest}
+
+
+def canonical(value):
+    """
+    JSON-compatible canonical form of a configuration value.
+
+    Raises:
+        ValueError: For a tensor that requires grad or an unsupported type
+    """
+    if value is None or isinstance(value, (bool, int, str)):
+        return value
+    if isinstance(value, float):
+        return value.hex()
+    if isinstance(value, enum.Enum):
+        return f"{type(value).__name__}.{value.name}"
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        form = {f.name: canonical(getattr(value, f.name)) for f in dataclasses.fields(value)}
+        form["__dataclass__"] = type(value).__qualname__
+        return form
+    if isinstance(value, dict):
+        return {str(key): canonical(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [canonical(item) for item in value]
+    if isinstance(value, torch.Tensor):
+        if value.requires_grad:
+            raise ValueError("Cannot key a tensor that requires grad")
+        data = value.detach().cpu().contiguous().reshape(-1).view(torch.uint8).numpy()
+        return _array_form("tensor", str(value.dtype), value.shape, data)
+    if isinstance(value, np.ndarray):
+        return _array_form("ndarray", value.dtype.str, value.shape, value)
+    if isinstance(value, np.generic):
+        return canonical(value.item())
+    if isinstance(value, BlockedHKLGrid):
+        return {"__blocked__": canonical((tuple(value.shape), value.default_F, *value.tensors()))}
+    if isinstance(value, (Path, torch.dtype, torch.device)):
+        return str(value)
+    raise ValueError(f"Cannot key a value of type {type(value).__name__}")
+
+
+def canonical_hash(value) -> str:
+    """SHA-256 hex digest of the canonical form of `value`."""
+    text = json.dumps(canonical(value), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class ResultCache(DiskCache):
+    """
+    Shared directory of simulation results keyed by canonical_hash().
+
+    Each entry is a set of named arrays, for example {'image': ...} or
+    {'noise': ...}. Loads mark the entry as recently used; stores evict the
+    least recently used entries beyond max_bytes.
+    """
+
+    suffix = ".npz"
+
+    def __init__(
+        self, directory: Optional[Union[str, Path]] = None, max_bytes: int = DEFAULT_RESULT_CACHE_BYTES
+    ):
+        """
+        Args:
+            directory: Cache directory (default: the results directory of the user cache)
+            max_bytes: Size budget of the stored results
+
+        Raises:
+            ValueError: If max_bytes is not positive
+        """
+        super().__init__(directory if directory is not None else cache_root() / "results", max_bytes)
+
+    def path_for(self, key: str) -> Path:
+        """File of a cache key."""
+        return self.directory / f"{key}{self.suffix}"
+
+    def load(self, key: str) -> Optional[Dict[str, np.ndarray]]:
+        """
+        Arrays stored under `key`.
+
+        Returns:
+            dict of name to array, or None if the key is not cached (or the
+            entry is damaged)
+        """
+        path = self.path_for(key)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                arrays = {name: data[name] for name in data.files}
+        except (OSError, ValueError, EOFError, zipfile.BadZipFile):
+            self._misses += 1
+            return None
+        self._touch(path)
+        self._hits += 1
+        return arrays
+
+    def store(self, key: str, **arrays: np.ndarray) -> Optional[Path]:
+        """
+        Store named arrays under `key`, replacing any previous entry.
+
+        Returns:
+            Path of the entry, or None if it could not be written (a warning
+            is printed; the caller's result is unaffected)
+        """
+        path = self.path_for(key)
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with atomic_write(path) as f:
+                np.savez(f, **arrays)
+            self.evict(keep=path)
+        except OSError as e:
+            print(f"Warning: Could not write result cache: {e}")
+            return None
+        return path
@@ -8,13 +8,16 @@ NOTE: The default parameters in this file are configured to match the 'simple_cu
 golden test case, which uses a 10 Å unit cell and a 500×500×500 cell crystal size.
 """
 
-from typing import Optional, Tuple
+from typing import Optional, Tuple, Union
 
 import math
 import torch
 
-from ..config import CrystalConfig, BeamConfig
+from ..config import CrystalConfig, BeamConfig, CrystalShape, MosaicSampling
 from ..utils.geometry import angles_to_rotation_matrix
+from ..utils.hkl_blocks import BlockedHKLGrid
+from ..utils.lattice_lut import LatticeFactorLUT
+from ..utils.tricubic import HKL_HALO, evaluate_tricubic, pad_grid, tricubic_coefficients
 from ..io.hkl import read_hkl_file, try_load_hkl_or_fdump
 
 
@@ -101,13 +104,24 @@ class Crystal:
 
         # Clear the cache when parameters change
         self._geometry_cache = {}
+        # PERF-LUT-001: Lattice-factor tables keyed by shape, N_cells, tolerance, dtype
+        self._lattice_lut_cache = {}
+        # PERF-TRICUBIC-001: (grid, grid version, coefficients) of the current HKL grid
+        self._tricubic_cache = None
+        # PERF-TRICUBIC-002: (grid, grid version, default_F, halo-padded grid)
+        self._halo_cache = None
 
         # Structure factor storage
-        self.hkl_data: Optional[torch.Tensor] = None  # 3D grid [h-h_min][k-k_min][l-l_min]
+        # 3D grid [h-h_min][k-k_min][l-l_min]; dense, or bricked for large cells (PERF-HKLBLOCK-001)
+        self.hkl_data: Optional[Union[torch.Tensor, BlockedHKLGrid]] = None
         self.hkl_metadata: Optional[dict] = None  # Contains h_min, h_max, etc.
 
         # Initialize interpolation warning flag
         self._interpolation_warning_shown = False
+        # PERF-TRICUBIC-002: On-device "some sample was out of range" flag, applied by
+        # check_interpolation_range(). The Simulator defers the check to the end of a run
+        self._interpolation_out_of_range: Optional[torch.Tensor] = None
+        self._defer_range_check = False
 
         # Auto-enable interpolation if crystal is small (matching C code)
         # This can be overridden by explicit CLI flags -interpolate/-nointerpolate
@@ -167,6 +181,9 @@ class Crystal:
 
         # Clear geometry cache when moving devices
         self._geometry_cache = {}
+        self._lattice_lut_cache = {}
+        self._tricubic_cache = None
+        self._halo_cache = None
 
         return self
 
@@ -190,18 +207,121 @@ class Crystal:
                 warnings.warn(f"Unit cell angle {angle_name} is very close to 0° or 180°, which may cause numerical instability")
 
 
-    def load_hkl(self, hkl_path: str, write_cache: bool = True):
+    def get_lattice_lut(self, dtype: Optional[torch.dtype] = None) -> Optional[LatticeFactorLUT]:
+        """Lattice-factor lookup tables for the current shape and N_cells (PERF-LUT-001).
+
+        Tables are built once per (shape, N_cells, tolerance, interpolation, dtype)
+        and cached on the crystal.
+
+        Args:
+            dtype: Table dtype (defaults to the crystal dtype)
+
+        Returns:
+            LatticeFactorLUT, or None if config.lattice_lut_tolerance is unset or the
+            shape (TOPHAT) has nothing to tabulate
+        """
+        tolerance = self.config.lattice_lut_tolerance
+        if tolerance is None or self.config.shape == CrystalShape.TOPHAT:
+            return None
+
+        dtype = dtype if dtype is not None else self.dtype
+        N_cells = tuple(
+            float(n.detach()) if isinstance(n, torch.Tensor) else float(n)
+            for n in (self.N_cells_a, self.N_cells_b, self.N_cells_c)
+        )
+        key = (
+            self.config.shape, N_cells, float(tolerance),
+            self.config.lattice_lut_interpolation, dtype,
+        )
+        lut = self._lattice_lut_cache.get(key)
+        if lut is None:
+            lut = LatticeFactorLUT(
+                self.config.shape, N_cells, float(tolerance),
+                interpolation=self.config.lattice_lut_interpolation,
+                device=self.device, dtype=dtype,
+            )
+            self._lattice_lut_cache[key] = lut
+        return lut
+
+    def get_tricubic_coefficients(self) -> Optional[torch.Tensor]:
+        """Per-cell tricubic polynomial coefficients of hkl_data (PERF-TRICUBIC-001).
+
+        Computed once per HKL grid and rebuilt when hkl_data is replaced or
+        modified in place.
+
+        Returns:
+            (h_range-3, k_range-3, l_range-3, 4, 4, 4) coefficients, or None if
+            config.tricubic_cache is off, hkl_data is not a dense tensor, it
+            requires grad (the live gather keeps d/dF), or it is too small to
+            interpolate
+        """
+        grid = self.hkl_data
+        if (
+            not self.config.tricubic_cache
+            or not isinstance(grid, torch.Tensor)
+            or grid.requires_grad
+            or min(grid.shape) < 4
+        ):
+            return None
+        cached = self._tricubic_cache
+        if cached is None or cached[0] is not grid or cached[1] != grid._version:
+            # Holding the grid keeps its identity unique while the entry is alive
+            cached = (grid, grid._version, tricubic_coefficients(grid))
+            self._tricubic_cache = cached
+        return cached[2]
+
+    def get_padded_hkl_data(self) -> Union[torch.Tensor, BlockedHKLGrid]:
+        """hkl_data with a HKL_HALO-voxel border of default_F (PERF-TRICUBIC-002).
+
+        Cached like the tricubic coefficients; a grid that requires grad is
+        padded on every call so the copy stays in the autograd graph.
+
+        Returns:
+            Grid of the kind of hkl_data, indexed by [h - h_min + HKL_HALO, ...]
+        """
+        grid = self.hkl_data
+        default_F = float(self.config.default_F)
+        storage = grid.bricks if isinstance(grid, BlockedHKLGrid) else grid
+        if storage.requires_grad:
+            return pad_grid(grid, default_F)
+        cached = self._halo_cache
+        if cached is None or cached[0] is not grid or cached[1] != storage._version or cached[2] != default_F:
+            cached = (grid, storage._version, default_F, pad_grid(grid, default_F))
+            self._halo_cache = cached
+        return cached[3]
+
+    def check_interpolation_range(self) -> None:
+        """Apply the out-of-range policy to the samples interpolated since the last check.
+
+        As in nanoBragg, the first sample whose 4x4x4 neighborhood leaves the
+        grid prints a one-time warning and turns interpolation off. The
+        samples themselves already received default_F; this reads the
+        on-device flag, the only host sync of the policy (PERF-TRICUBIC-002).
+        """
+        flag, self._interpolation_out_of_range = self._interpolation_out_of_range, None
+        if flag is None or not bool(flag):
+            return
+        if not self._interpolation_warning_shown:
+            print("WARNING: out of range for three point interpolation")
+            print("WARNING: further warnings will not be printed!")
+            self._interpolation_warning_shown = True
+        self.interpolate = False
+
+    def load_hkl(self, hkl_path: str, write_cache: bool = True, storage: str = "dense"):
         """Load HKL structure factor data from file.
 
         Args:
             hkl_path: Path to HKL text file
             write_cache: Whether to write Fdump.bin cache after loading
+            storage: "dense" grid, or "blocked" to store only bricks that hold
+                reflections (PERF-HKLBLOCK-001)
         """
         self.hkl_data, self.hkl_metadata = read_hkl_file(
             hkl_path,
             default_F=self.config.default_F,
             device=self.device,
-            dtype=self.dtype
+            dtype=self.dtype,
+            storage=storage,
         )
 
         # Note: Auto-enable interpolation is already handled in __init__
@@ -301,6 +421,11 @@ class Crystal:
         """
         Tricubic interpolation of structure factors (AT-STR-002).
 
+        Samples whose neighborhood leaves the grid return default_F; the others
+        are interpolated. Within a batch this is decided per element without a
+        host sync; the C code's switch to nearest-neighbor lookup for later
+        samples is applied by check_interpolation_range() (PERF-TRICUBIC-002).
+
         C-Code Implementation Reference (from nanoBragg.c, lines 3152-3209):
         ```c
         if ( ((h-h_min+3)>h_range) ||
@@ -364,76 +489,83 @@ class Crystal:
             (l_flr - 1 < l_min) | (l_flr + 2 > l_max)
         )
 
-        # Handle out-of-bounds case
-        if torch.any(out_of_bounds):
-            # Print warning only once
-            if not self._interpolation_warning_shown:
-                print("WARNING: out of range for three point interpolation")
-                print("WARNING: further warnings will not be printed!")
-                self._interpolation_warning_shown = True
+        # PERF-TRICUBIC-002: Out-of-range samples get default_F element by element.
+        # The flag stays on the device; the warning and the switch to nearest-neighbor
+        # lookup are applied by check_interpolation_range()
+        with torch.no_grad():
+            any_out_of_bounds = out_of_bounds.any()
+        if self._interpolation_out_of_range is not None:
+            any_out_of_bounds = any_out_of_bounds | self._interpolation_out_of_range
+        self._interpolation_out_of_range = any_out_of_bounds
+        if not self._defer_range_check:
+            self.check_interpolation_range()
 
-            # Disable interpolation permanently
-            self.interpolate = False
-
-            # Return default_F for this evaluation
+        if self.hkl_data is None:
             return torch.full_like(h, float(self.config.default_F), device=self.device, dtype=self.dtype)
 
+        # PERF-TRICUBIC-001: Gather the cell polynomial instead of the 4x4x4 neighborhood.
+        # Trace mode needs the neighborhood itself, so it keeps the polin3 path
+        coefficients = None if self._enable_trace else self.get_tricubic_coefficients()
+        if coefficients is not None:
+            self._last_tricubic_neighborhood = None
+            # Cell (floor - min) is stored at index floor - min - 1; clamping keeps
+            # out-of-range samples on a valid cell until they are masked
+            cell_coefficients = coefficients[
+                (h_flr - h_min - 1).clamp(0, coefficients.shape[0] - 1),
+                (k_flr - k_min - 1).clamp(0, coefficients.shape[1] - 1),
+                (l_flr - l_min - 1).clamp(0, coefficients.shape[2] - 1),
+            ]
+            F_cell = evaluate_tricubic(cell_coefficients, h - h_flr, k - k_flr, l - l_flr)
+            return torch.where(out_of_bounds, torch.full_like(F_cell, self.config.default_F), F_cell)
+
         # Phase C1: Batched Neighborhood Gather Implementation
         # Following design_notes.md Section 2: flatten all batch dimensions, build (B,4,4,4) neighborhoods
 
         # Store original shape for final reshape
         original_shape = h.shape
 
+        # PERF-TRICUBIC-002: Clamp floor cells into the halo of the padded grid so every
+        # gather is valid. Out-of-range queries are moved into their clamped cell (same
+        # fractional part) to keep the discarded interpolants finite
+        grid = self.get_padded_hkl_data()
+        h_cell = h_flr.clamp(h_min - 1, h_max).reshape(-1)
+        k_cell = k_flr.clamp(k_min - 1, k_max).reshape(-1)
+        l_cell = l_flr.clamp(l_min - 1, l_max).reshape(-1)
+        out_of_bounds_flat = out_of_bounds.reshape(-1)
+
         # Flatten all dimensions to (B,) for batched processing
-        h_flat = h.reshape(-1)
-        k_flat = k.reshape(-1)
-        l_flat = l.reshape(-1)
+        h_flat = torch.where(out_of_bounds_flat, h_cell + (h - h_flr).reshape(-1), h.reshape(-1))
+        k_flat = torch.where(out_of_bounds_flat, k_cell + (k - k_flr).reshape(-1), k.reshape(-1))
+        l_flat = torch.where(out_of_bounds_flat, l_cell + (l - l_flr).reshape(-1), l.reshape(-1))
         B = h_flat.shape[0]
 
-        # Recompute floor indices for flattened tensors
-        h_flr_flat = torch.floor(h_flat).long()
-        k_flr_flat = torch.floor(k_flat).long()
-        l_flr_flat = torch.floor(l_flat).long()
-
         # Build offset array [-1, 0, 1, 2] for neighborhood gathering
         offsets = torch.arange(-1, 3, device=self.device, dtype=torch.long)  # (4,)
 
-        # Build coordinate grids for each query point: (B, 4)
-        # h_grid[i] = [h_flr[i]-1, h_flr[i], h_flr[i]+1, h_flr[i]+2]
-        h_grid_coords = h_flr_flat.unsqueeze(-1) + offsets  # (B, 4)
-        k_grid_coords = k_flr_flat.unsqueeze(-1) + offsets  # (B, 4)
-        l_grid_coords = l_flr_flat.unsqueeze(-1) + offsets  # (B, 4)
-
-        # Build the batched 4x4x4 subcubes of structure factors
-        if self.hkl_data is None:
-            # If no HKL data loaded, use default_F everywhere: shape (B, 4, 4, 4)
-            sub_Fhkl = torch.full((B, 4, 4, 4), self.config.default_F, dtype=self.dtype, device=self.device)
-            # Coordinate arrays for polin3 (float, for interpolation): (B, 4)
-            h_indices = h_grid_coords.to(dtype=self.dtype)
-            k_indices = k_grid_coords.to(dtype=self.dtype)
-            l_indices = l_grid_coords.to(dtype=self.dtype)
-        else:
-            # Convert to array indices (relative to hkl_data origin)
-            h_array_grid = h_grid_coords - h_min  # (B, 4)
-            k_array_grid = k_grid_coords - k_min  # (B, 4)
-            l_array_grid = l_grid_coords - l_min  # (B, 4)
-
-            # Advanced indexing to build (B, 4, 4, 4) neighborhoods
-            # Following design_notes.md Section 2.6 broadcasting pattern:
-            # h_array_grid[:, :, None, None] → (B, 4, 1, 1)
-            # k_array_grid[:, None, :, None] → (B, 1, 4, 1)
-            # l_array_grid[:, None, None, :] → (B, 1, 1, 4)
-            # Result: (B, 4, 4, 4)
-            sub_Fhkl = self.hkl_data[
-                h_array_grid[:, :, None, None],
-                k_array_grid[:, None, :, None],
-                l_array_grid[:, None, None, :]
-            ]
-
-            # Coordinate arrays for polin3 (float Miller indices): (B, 4)
-            h_indices = h_grid_coords.to(dtype=self.dtype)
-            k_indices = k_grid_coords.to(dtype=self.dtype)
-            l_indices = l_grid_coords.to(dtype=self.dtype)
+        # PERF-TRICUBIC-002: Gather each distinct floor cell's neighborhood once.
+        # Padded index of the lower corner floor - 1 is floor - min + HKL_HALO - 1
+        size_k, size_l = grid.shape[1], grid.shape[2]
+        corner = (
+            ((h_cell - h_min + HKL_HALO - 1) * size_k + (k_cell - k_min + HKL_HALO - 1)) * size_l
+            + (l_cell - l_min + HKL_HALO - 1)
+        )
+        unique_corners, inverse = torch.unique(corner, return_inverse=True)
+        corner_h = unique_corners // (size_k * size_l)
+        corner_k = (unique_corners // size_l) % size_k
+        corner_l = unique_corners % size_l
+        window = offsets + 1  # (4,) offsets from the lower corner
+        # (U, 4, 4, 4) neighborhoods, one per distinct cell
+        cell_Fhkl = grid[
+            (corner_h[:, None] + window)[:, :, None, None],
+            (corner_k[:, None] + window)[:, None, :, None],
+            (corner_l[:, None] + window)[:, None, None, :],
+        ]
+        sub_Fhkl = cell_Fhkl[inverse]  # (B, 4, 4, 4)
+
+        # Coordinate arrays for polin3 (float Miller indices): (B, 4)
+        h_indices = (h_cell.unsqueeze(-1) + offsets).to(dtype=self.dtype)
+        k_indices = (k_cell.unsqueeze(-1) + offsets).to(dtype=self.dtype)
+        l_indices = (l_cell.unsqueeze(-1) + offsets).to(dtype=self.dtype)
 
         # Phase C3: Shape assertions to prevent silent regressions
         # Verify neighborhood tensor has correct shape for polynomial evaluation
@@ -486,6 +618,8 @@ class Crystal:
             assert F_cell.numel() == 1, \
                 f"Scalar interpolation output must have 1 element, got {F_cell.numel()} (shape {F_cell.shape})"
 
+            F_cell = torch.where(out_of_bounds_flat, torch.full_like(F_cell.reshape(B), self.config.default_F),
+                                 F_cell.reshape(B))
             result = F_cell.reshape(original_shape)
 
             # Phase C3: Verify final output shape matches original input shape
@@ -512,6 +646,9 @@ class Crystal:
             assert F_cell_flat.shape == (B,), \
                 f"Batched interpolation output must have shape ({B},), got {F_cell_flat.shape}"
 
+            F_cell_flat = torch.where(out_of_bounds_flat, torch.full_like(F_cell_flat, self.config.default_F),
+                                      F_cell_flat)
+
             # Reshape back to original input shape
             result = F_cell_flat.reshape(original_shape)
 
@@ -1331,32 +1468,24 @@ class Crystal:
             Gaussian sampling instead of spherical cap sampling, it maintains
             the key property of deterministic, reproducible rotations.
             Default seed is -12345678 per spec-a-core.md:367.
+            config.mosaic_sampling selects i.i.d. draws (default), a
+            scrambled Sobol or shifted Halton sequence, or Latin hypercube
+            strata for the same distribution (PERF-MOSAIC-001), or
+            MosaicSampling.CAP for the C spherical-cap rotations drawn from
+            the ran1() stream of the seed (PERF-RNG-001).
 
         Gradient Correctness (MOSAIC-GRADIENT-001):
             Uses the reparameterization trick: actual_angles = base_noise * scale_param.
             The base_noise is frozen (seeded, no gradient), while mosaic_spread_rad
             carries gradients. This ensures torch.autograd.gradcheck passes.
         """
+        from ..utils.c_random import mosaic_rotation_umat
         from ..utils.geometry import rotate_axis
+        from ..utils.mosaic_sampling import mosaic_base_samples
 
-        # Create deterministic generator from mosaic_seed
+        # Deterministic base samples from mosaic_seed
         # Spec (spec-a-core.md:367): default seed is -12345678
-        gen = torch.Generator(device=self.device)
         seed = config.mosaic_seed if config.mosaic_seed is not None else -12345678
-        # Convert to valid unsigned seed (handle negative C-style seeds)
-        gen.manual_seed(seed & 0x7FFFFFFF)
-
-        # Generate frozen base randomness (same every call with same seed)
-        # These do NOT carry gradients - they are the "noise" in reparameterization
-        base_axes = torch.randn(
-            config.mosaic_domains, 3, device=self.device, dtype=self.dtype, generator=gen
-        )
-        base_angle_scales = torch.randn(
-            config.mosaic_domains, device=self.device, dtype=self.dtype, generator=gen
-        )
-
-        # Normalize axes
-        axes_normalized = base_axes / torch.norm(base_axes, dim=1, keepdim=True)
 
         # Convert mosaic spread to radians (preserves gradient if input is tensor)
         if isinstance(config.mosaic_spread_deg, torch.Tensor):
@@ -1368,6 +1497,25 @@ class Crystal:
                 )
             )
 
+        if config.mosaic_sampling == MosaicSampling.CAP:
+            # PERF-RNG-001: All domains from one ran1() block, as successive
+            # mosaic_rotation_umat(mosaic_spread, umat, &mosaic_seed) calls
+            return mosaic_rotation_umat(
+                mosaic_spread_rad, seed=seed, dtype=self.dtype, device=self.device,
+                n=config.mosaic_domains,
+            )
+
+        # Generate frozen base samples (same every call with same seed)
+        # These do NOT carry gradients - they are the "noise" in reparameterization
+        # PERF-MOSAIC-001: Pseudo-random, low-discrepancy or stratified per config.mosaic_sampling
+        base_axes, base_angle_scales = mosaic_base_samples(
+            config.mosaic_sampling, config.mosaic_domains, seed,
+            device=self.device, dtype=self.dtype,
+        )
+
+        # Normalize axes
+        axes_normalized = base_axes / torch.norm(base_axes, dim=1, keepdim=True)
+
         # Reparameterization: actual_angles = base_noise * scale_parameter
         # Gradient flows through mosaic_spread_rad, not through base_angle_scales
         random_angles = base_angle_scales * mosaic_spread_rad
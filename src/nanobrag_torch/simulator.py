@@ -5,16 +5,117 @@ This module orchestrates the entire diffraction simulation, taking Crystal and
 Detector objects as input and producing the final diffraction pattern.
 """
 
-from typing import Optional, Callable
+import math
+import time
+from dataclasses import dataclass
+from typing import Optional, Callable, Iterator, Tuple, Union
 
 import torch
 
-from .config import BeamConfig, CrystalConfig, CrystalShape
+from .config import BeamConfig, CrystalConfig, CrystalShape, NoiseConfig
 from .models.crystal import Crystal
 from .models.detector import Detector
+from .io.result_cache import ResultCache, canonical_hash
+from .utils.adaptive_sampling import refinement_mask
+from .utils.diagnostics import HKLStatsCounter
+from .utils.distributed import balance_blocks, reduce_to_root, require_process_group
+from .utils.frame_farm import FrameFarm, share_tensors
 from .utils.geometry import dot_product
-from .utils.physics import sincg, sinc3, polarization_factor
+from .utils.geometry_cache import GeometryFactorCache, tensor_key
+from .utils.hkl_blocks import BlockedHKLGrid
+from .utils.lattice_lut import LatticeFactorLUT
+from .utils.noise import counter_noise_image
+from .utils.runtime_cache import get_global_kernel_cache, make_key
+from .utils.physics import kahan_add, pairwise_sum, sincg, sincg_reduced, sinc3, polarization_factor
+from .utils.spots import enumerate_hkl, lattice_halfwidth, project_to_planar_detector
 from .utils.tensor_utils import as_tensor_preserving_grad
+from .utils.tiling import (
+    ELEMENTS_PER_SAMPLE,
+    TRICUBIC_CACHED_ELEMENTS_PER_SAMPLE,
+    TRICUBIC_ELEMENTS_PER_SAMPLE,
+    TilePlan,
+    parse_memory_budget,
+    plan_shot_batch,
+    plan_tiles,
+)
+
+# PERF-COMPACT-001: run() compacts only when fewer than this fraction of the
+# pixels are active. Gathering and scattering a pixel list costs more than
+# rendering the masked pixels of a mostly active grid.
+COMPACT_MAX_ACTIVE_FRACTION = 0.5
+
+
+def _compacts(n_active: int, n_pixels: int) -> bool:
+    """Whether run() renders n_active of n_pixels as a pixel list (PERF-COMPACT-001)."""
+    return n_active < COMPACT_MAX_ACTIVE_FRACTION * n_pixels
+
+
+def _broadcast_rotations(vectors: torch.Tensor, sample_dims: int) -> torch.Tensor:
+    """(*shots, N_phi, N_mos, 3) -> (*shots, 1 × sample_dims, N_phi, N_mos, 3) (PERF-BATCH-001)."""
+    if vectors.dim() == 3:
+        return vectors
+    shots = vectors.shape[:-3]
+    return vectors.reshape(*shots, *([1] * sample_dims), *vectors.shape[-3:])
+
+
+def polarization_for_position(
+    pixel_coords_angstroms: torch.Tensor,
+    incident_beam_direction: torch.Tensor,
+    kahn_factor: float,
+    polarization_axis: Optional[torch.Tensor],
+) -> torch.Tensor:
+    """Kahn polarization factor per source and pixel (PERF-PYTORCH-004 P3.0b).
+
+    Depends only on the detector geometry and beam, so the Simulator computes
+    it once and passes it to the physics kernels as `polar` (PERF-GEOCACHE-001).
+
+    Args:
+        pixel_coords_angstroms: Pixel/subpixel coordinates (S, F, 3) or (batch, 3)
+        incident_beam_direction: Incident unit vector (3,) or per source (n_sources, 3)
+        kahn_factor: Polarization factor for Kahn correction
+        polarization_axis: Polarization axis unit vector (3,)
+
+    Returns:
+        Factor of shape (S, F) or (batch,), with a leading n_sources
+        dimension for batched sources
+    """
+    original_n_dims = pixel_coords_angstroms.dim()
+    pixel_magnitudes = torch.norm(pixel_coords_angstroms, dim=-1, keepdim=True).clamp_min(1e-12)
+    diffracted_beam_unit = pixel_coords_angstroms / pixel_magnitudes
+
+    if incident_beam_direction.dim() == 2:
+        # Multi-source case: expand diffracted to (n_sources, S, F, 3) or (n_sources, batch, 3)
+        # NOTE: incident_beam_direction is cloned in _compute_physics_for_position wrapper
+        # before entering torch.compile to avoid CUDA graphs aliasing violations
+        n_sources = incident_beam_direction.shape[0]
+        if original_n_dims == 2:
+            diffracted_expanded = diffracted_beam_unit.unsqueeze(0).expand(n_sources, -1, -1)
+            incident_expanded = incident_beam_direction.unsqueeze(1).expand(-1, diffracted_beam_unit.shape[0], -1)
+        else:
+            diffracted_expanded = diffracted_beam_unit.unsqueeze(0).expand(n_sources, -1, -1, -1)
+            incident_expanded = incident_beam_direction.unsqueeze(1).unsqueeze(1).expand(-1, diffracted_beam_unit.shape[0], diffracted_beam_unit.shape[1], -1)
+
+        # Use .contiguous() to avoid CUDA graphs tensor reuse errors
+        incident_flat = incident_expanded.reshape(-1, 3).contiguous()
+        diffracted_flat = diffracted_expanded.reshape(-1, 3).contiguous()
+        polar_flat = polarization_factor(kahn_factor, incident_flat, diffracted_flat, polarization_axis)
+
+        # Reshape to match intensity shape: (n_sources, S, F) or (n_sources, batch)
+        if original_n_dims == 2:
+            return polar_flat.reshape(n_sources, -1)
+        return polar_flat.reshape(n_sources, diffracted_beam_unit.shape[0], diffracted_beam_unit.shape[1])
+
+    # Single source case
+    if original_n_dims == 3:
+        incident_flat = incident_beam_direction.unsqueeze(0).unsqueeze(0).expand(diffracted_beam_unit.shape[0], diffracted_beam_unit.shape[1], -1).reshape(-1, 3).contiguous()
+    else:
+        incident_flat = incident_beam_direction.unsqueeze(0).expand(diffracted_beam_unit.shape[0], -1).reshape(-1, 3).contiguous()
+    diffracted_flat = diffracted_beam_unit.reshape(-1, 3).contiguous()
+    polar_flat = polarization_factor(kahn_factor, incident_flat, diffracted_flat, polarization_axis)
+
+    if original_n_dims == 2:
+        return polar_flat.reshape(-1)
+    return polar_flat.reshape(diffracted_beam_unit.shape[0], diffracted_beam_unit.shape[1])
 
 
 def compute_physics_for_position(
@@ -44,6 +145,19 @@ def compute_physics_for_position(
     apply_polarization: bool = True,
     kahn_factor: float = 1.0,
     polarization_axis: Optional[torch.Tensor] = None,
+    # Diagnostics (PERF-LEAN-001)
+    diagnostics: bool = False,
+    hkl_stats: Optional[HKLStatsCounter] = None,
+    # Constant structure factor fast path (PERF-KERNEL-001)
+    constant_F: Optional[float] = None,
+    # Mixed precision (PERF-MIXED-001)
+    physics_dtype: Optional[torch.dtype] = None,
+    # float32-accurate lattice transform (PERF-F32-001)
+    range_reduction: bool = False,
+    # Tabulated lattice transform (PERF-LUT-001)
+    lattice_lut: Optional[LatticeFactorLUT] = None,
+    # Precomputed polarization factor (PERF-GEOCACHE-001)
+    polar: Optional[torch.Tensor] = None,
 ) -> torch.Tensor:
     """Compute physics (Miller indices, structure factors, intensity) for given positions.
 
@@ -91,11 +205,36 @@ def compute_physics_for_position(
         apply_polarization: Whether to apply Kahn polarization correction (default True)
         kahn_factor: Polarization factor for Kahn correction (0=unpolarized, 1=fully polarized)
         polarization_axis: Polarization axis unit vector (3,) or broadcastable shape
+        diagnostics: Emit the per-call [HKL stats] log and return the pre-polarization
+            intensity. Both force host syncs and extra copies, so production runs
+            leave this off (PERF-LEAN-001).
+        hkl_stats: Optional on-device counter updated with h0/k0/l0 and F_cell ranges
+            without host syncs; read once by the caller after the run.
+        constant_F: If given, every structure factor equals this value (no HKL data
+            loaded). The structure-factor gather is skipped and constant_F² is applied
+            once after the phi/mosaic reduction instead of per sample.
+        physics_dtype: If given and different from the geometry dtype, scattering
+            vectors and the Miller-index projection run in the input dtype, then
+            h/k/l are cast to physics_dtype for F_cell/F_latt, the phi/mosaic
+            reduction and polarization (PERF-MIXED-001). None keeps a single dtype.
+        range_reduction: Evaluate the SQUARE lattice factor on range-reduced
+            arguments (sincg_reduced) and reduce over phi/mosaic with a pairwise
+            tree, so float32 keeps its accuracy at high resolution (PERF-F32-001).
+            Requires integral N_cells.
+        lattice_lut: If given, F_latt is interpolated from precomputed tables
+            (SQUARE, ROUND, GAUSS) instead of evaluating sin/exp per sample; see
+            utils/lattice_lut.py for the error bound (PERF-LUT-001).
+        polar: Optional polarization factor from polarization_for_position() for
+            these coordinates and beam directions; computed here when None
+            (PERF-GEOCACHE-001).
 
     Returns:
-        intensity: Computed intensity |F|^2 integrated over phi and mosaic
-            - Single source: shape (S, F) or (batch,)
-            - Multiple sources: weighted sum across sources, shape (S, F) or (batch,)
+        (intensity, intensity_pre_polar):
+            intensity: Computed intensity |F|^2 integrated over phi and mosaic
+                - Single source: shape (S, F) or (batch,)
+                - Multiple sources: weighted sum across sources, shape (S, F) or (batch,)
+            intensity_pre_polar: Same before polarization, or None unless
+                diagnostics=True and polarization is applied
     """
     # Detect if we have batched sources
     is_multi_source = incident_beam_direction.dim() == 2
@@ -168,31 +307,16 @@ def compute_physics_for_position(
     # Calculate Miller indices
     # scattering_vector shape: (S, F, 3) single source, or
     #                          (n_sources, S, F, 3) or (n_sources, batch, 3) multi-source
-    # Need to add phi and mosaic dimensions for broadcasting
-    if is_multi_source:
-        # Multi-source: (n_sources, S, F, 3) -> (n_sources, S, F, 1, 1, 3)
-        #            or (n_sources, batch, 3) -> (n_sources, batch, 1, 1, 3)
-        scattering_broadcast = scattering_vector.unsqueeze(-2).unsqueeze(-2)
-        # rot vectors: (N_phi, N_mos, 3) -> (1, 1, 1, N_phi, N_mos, 3) for (S, F) case
-        #                                or (1, 1, N_phi, N_mos, 3) for batch case
-        # Number of leading dims to add depends on ORIGINAL pixel_coords shape
-        if original_n_dims == 2:
-            # batch case: add 2 leading dims
-            rot_a_broadcast = rot_a.unsqueeze(0).unsqueeze(0)
-            rot_b_broadcast = rot_b.unsqueeze(0).unsqueeze(0)
-            rot_c_broadcast = rot_c.unsqueeze(0).unsqueeze(0)
-        else:
-            # (S, F) case: add 3 leading dims
-            rot_a_broadcast = rot_a.unsqueeze(0).unsqueeze(0).unsqueeze(0)
-            rot_b_broadcast = rot_b.unsqueeze(0).unsqueeze(0).unsqueeze(0)
-            rot_c_broadcast = rot_c.unsqueeze(0).unsqueeze(0).unsqueeze(0)
-    else:
-        # Single source: (S, F, 3) -> (S, F, 1, 1, 3) or (batch, 3) -> (batch, 1, 1, 3)
-        scattering_broadcast = scattering_vector.unsqueeze(-2).unsqueeze(-2)
-        # rot vectors: (N_phi, N_mos, 3) -> (1, 1, N_phi, N_mos, 3)
-        rot_a_broadcast = rot_a.unsqueeze(0).unsqueeze(0)
-        rot_b_broadcast = rot_b.unsqueeze(0).unsqueeze(0)
-        rot_c_broadcast = rot_c.unsqueeze(0).unsqueeze(0)
+    # Need to add phi and mosaic dimensions for broadcasting:
+    # (..., 3) -> (..., 1, 1, 3), and rot vectors (*shots, N_phi, N_mos, 3) ->
+    # (*shots, 1, ..., 1, N_phi, N_mos, 3) with one singleton per source/pixel dimension.
+    # PERF-BATCH-001: Optional leading shot dimensions on the rot vectors become
+    # leading dimensions of the result, one image per shot orientation.
+    scattering_broadcast = scattering_vector.unsqueeze(-2).unsqueeze(-2)
+    sample_dims = scattering_vector.dim() - 1
+    rot_a_broadcast = _broadcast_rotations(rot_a, sample_dims)
+    rot_b_broadcast = _broadcast_rotations(rot_b, sample_dims)
+    rot_c_broadcast = _broadcast_rotations(rot_c, sample_dims)
 
     # NANOBRAG-GOLDEN-001 (A3): Miller index projection using rotated real-space vectors
     # Per nanoBragg.c lines 3108-3110 and docs/spec-db-core.md:35-54:
@@ -210,13 +334,52 @@ def compute_physics_for_position(
     k0 = torch.round(k)
     l0 = torch.round(l)
 
-    # Look up structure factors
-    F_cell = crystal_get_structure_factor(h0, k0, l0)
+    # PERF-F32-001: Offsets from the nearest node, taken before any downcast. h - h0 is
+    # exact in the projection dtype because |h - h0| <= 0.5 (Sterbenz lemma).
+    h_frac = k_frac = l_frac = None
+    if range_reduction or lattice_lut is not None or crystal_shape != CrystalShape.SQUARE:
+        h_frac = h - h0
+        k_frac = k - k0
+        l_frac = l - l0
 
-    # Ensure F_cell is on the same device as h (device-neutral implementation per Core Rule #16)
-    # The crystal.get_structure_factor may return CPU tensors even when h0/k0/l0 are on CUDA
-    if F_cell.device != h.device:
-        F_cell = F_cell.to(device=h.device)
+    # PERF-MIXED-001: The projection above is the precision-critical step (|S|~1e10 m⁻¹
+    # times |a|~1e-8 m); everything downstream tolerates physics_dtype rounding of h/k/l
+    if physics_dtype is not None and h.dtype != physics_dtype:
+        h = h.to(physics_dtype)
+        k = k.to(physics_dtype)
+        l = l.to(physics_dtype)  # noqa: E741
+        h0 = h0.to(physics_dtype)
+        k0 = k0.to(physics_dtype)
+        l0 = l0.to(physics_dtype)
+        if h_frac is not None:
+            h_frac = h_frac.to(physics_dtype)
+            k_frac = k_frac.to(physics_dtype)
+            l_frac = l_frac.to(physics_dtype)
+        rot_a_star = rot_a_star.to(physics_dtype)
+        rot_b_star = rot_b_star.to(physics_dtype)
+        rot_c_star = rot_c_star.to(physics_dtype)
+        # Tensor N_cells would otherwise promote the lattice factor back to the geometry dtype
+        if isinstance(N_cells_a, torch.Tensor):
+            N_cells_a = N_cells_a.to(physics_dtype)
+            N_cells_b = N_cells_b.to(physics_dtype)
+            N_cells_c = N_cells_c.to(physics_dtype)
+
+    # Look up structure factors
+    # PERF-KERNEL-001: With a constant F there is nothing to gather; F_cell is only
+    # materialised when diagnostics need it
+    if constant_F is None:
+        F_cell = crystal_get_structure_factor(h0, k0, l0)
+
+        # Ensure F_cell is on the same device as h (device-neutral implementation per Core Rule #16)
+        # The crystal.get_structure_factor may return CPU tensors even when h0/k0/l0 are on CUDA
+        if F_cell.device != h.device:
+            F_cell = F_cell.to(device=h.device)
+        if physics_dtype is not None and F_cell.dtype != physics_dtype:
+            F_cell = F_cell.to(dtype=physics_dtype)
+    elif diagnostics or hkl_stats is not None:
+        F_cell = torch.full_like(h0, constant_F)
+    else:
+        F_cell = None
 
     # NANOBRAG-GOLDEN-001 (A3): Bounded HKL diagnostics per panel (input.md:15, input.md:36)
     # Emit HKL min/max + hit-rate to explain first divergence when torch output is zero.
@@ -227,7 +390,14 @@ def compute_physics_for_position(
     # The debug print below is intended for eager/debug runs only. Under torch.compile/Dynamo,
     # string formatting can interact badly with graph tracing, so we explicitly skip this block
     # when a Dynamo trace is in progress.
-    log_hkl_stats = apply_polarization
+    #
+    # PERF-LEAN-001: Each .item() below is a device sync and a full reduction, so the log is
+    # only emitted in diagnostics mode (-printout/-trace_pixel). Production runs can opt into
+    # the sync-free HKLStatsCounter instead.
+    if hkl_stats is not None:
+        hkl_stats.update(h0, k0, l0, F_cell)
+
+    log_hkl_stats = diagnostics and apply_polarization
     if log_hkl_stats:
         is_compiling = False
         try:
@@ -298,66 +468,63 @@ def compute_physics_for_position(
     fudge = crystal_fudge
 
     if shape == CrystalShape.SQUARE:
-        # Note: sincg internally handles Na/Nb/Nc > 1 guards per C implementation
-        F_latt_a = sincg(torch.pi * h, Na)
-        F_latt_b = sincg(torch.pi * k, Nb)
-        F_latt_c = sincg(torch.pi * l, Nc)
+        if lattice_lut is not None:
+            # PERF-LUT-001: periodic in the node offset up to a sign, one table per N
+            F_latt_a = lattice_lut.sincg(0, h_frac, h0)
+            F_latt_b = lattice_lut.sincg(1, k_frac, k0)
+            F_latt_c = lattice_lut.sincg(2, l_frac, l0)
+        elif range_reduction:
+            # PERF-F32-001: sin arguments stay within ±π/2 instead of growing as N·π·|h|
+            F_latt_a = sincg_reduced(h_frac, h0, Na)
+            F_latt_b = sincg_reduced(k_frac, k0, Nb)
+            F_latt_c = sincg_reduced(l_frac, l0, Nc)
+        else:
+            # Note: sincg internally handles Na/Nb/Nc > 1 guards per C implementation
+            F_latt_a = sincg(torch.pi * h, Na)
+            F_latt_b = sincg(torch.pi * k, Nb)
+            F_latt_c = sincg(torch.pi * l, Nc)
         F_latt = F_latt_a * F_latt_b * F_latt_c
     elif shape == CrystalShape.ROUND:
-        h_frac = h - h0
-        k_frac = k - k0
-        l_frac = l - l0
         hrad_sqr = (h_frac * h_frac * Na * Na +
                    k_frac * k_frac * Nb * Nb +
                    l_frac * l_frac * Nc * Nc)
         # Use clamp_min to avoid creating fresh tensors in compiled graph (PERF-PYTORCH-004 P1.1)
         hrad_sqr = hrad_sqr.clamp_min(1e-12)
-        F_latt = Na * Nb * Nc * 0.723601254558268 * sinc3(
+        sinc3_fn = lattice_lut.sinc3 if lattice_lut is not None else sinc3
+        F_latt = Na * Nb * Nc * 0.723601254558268 * sinc3_fn(
             torch.pi * torch.sqrt(hrad_sqr * fudge)
         )
     elif shape == CrystalShape.GAUSS:
-        h_frac = h - h0
-        k_frac = k - k0
-        l_frac = l - l0
-        if is_multi_source:
-            # Multi-source: rot_*_star (N_phi, N_mos, 3) -> (1, 1, 1, N_phi, N_mos, 3)
-            delta_r_star = (h_frac.unsqueeze(-1) * rot_a_star.unsqueeze(0).unsqueeze(0).unsqueeze(0) +
-                          k_frac.unsqueeze(-1) * rot_b_star.unsqueeze(0).unsqueeze(0).unsqueeze(0) +
-                          l_frac.unsqueeze(-1) * rot_c_star.unsqueeze(0).unsqueeze(0).unsqueeze(0))
-        else:
-            # Single source: rot_*_star (N_phi, N_mos, 3) -> (1, 1, N_phi, N_mos, 3)
-            delta_r_star = (h_frac.unsqueeze(-1) * rot_a_star.unsqueeze(0).unsqueeze(0) +
-                          k_frac.unsqueeze(-1) * rot_b_star.unsqueeze(0).unsqueeze(0) +
-                          l_frac.unsqueeze(-1) * rot_c_star.unsqueeze(0).unsqueeze(0))
+        # rot_*_star (*shots, N_phi, N_mos, 3) broadcast like the real-space vectors
+        delta_r_star = (h_frac.unsqueeze(-1) * _broadcast_rotations(rot_a_star, sample_dims) +
+                      k_frac.unsqueeze(-1) * _broadcast_rotations(rot_b_star, sample_dims) +
+                      l_frac.unsqueeze(-1) * _broadcast_rotations(rot_c_star, sample_dims))
         rad_star_sqr = torch.sum(delta_r_star * delta_r_star, dim=-1)
         rad_star_sqr = rad_star_sqr * Na * Na * Nb * Nb * Nc * Nc
-        F_latt = Na * Nb * Nc * torch.exp(-(rad_star_sqr / 0.63) * fudge)
-    elif shape == CrystalShape.TOPHAT:
-        h_frac = h - h0
-        k_frac = k - k0
-        l_frac = l - l0
-        if is_multi_source:
-            # Multi-source: rot_*_star (N_phi, N_mos, 3) -> (1, 1, 1, N_phi, N_mos, 3)
-            delta_r_star = (h_frac.unsqueeze(-1) * rot_a_star.unsqueeze(0).unsqueeze(0).unsqueeze(0) +
-                          k_frac.unsqueeze(-1) * rot_b_star.unsqueeze(0).unsqueeze(0).unsqueeze(0) +
-                          l_frac.unsqueeze(-1) * rot_c_star.unsqueeze(0).unsqueeze(0).unsqueeze(0))
+        if lattice_lut is not None:
+            F_latt = Na * Nb * Nc * lattice_lut.gauss((rad_star_sqr / 0.63) * fudge)
         else:
-            # Single source: rot_*_star (N_phi, N_mos, 3) -> (1, 1, N_phi, N_mos, 3)
-            delta_r_star = (h_frac.unsqueeze(-1) * rot_a_star.unsqueeze(0).unsqueeze(0) +
-                          k_frac.unsqueeze(-1) * rot_b_star.unsqueeze(0).unsqueeze(0) +
-                          l_frac.unsqueeze(-1) * rot_c_star.unsqueeze(0).unsqueeze(0))
+            F_latt = Na * Nb * Nc * torch.exp(-(rad_star_sqr / 0.63) * fudge)
+    elif shape == CrystalShape.TOPHAT:
+        # rot_*_star (*shots, N_phi, N_mos, 3) broadcast like the real-space vectors
+        delta_r_star = (h_frac.unsqueeze(-1) * _broadcast_rotations(rot_a_star, sample_dims) +
+                      k_frac.unsqueeze(-1) * _broadcast_rotations(rot_b_star, sample_dims) +
+                      l_frac.unsqueeze(-1) * _broadcast_rotations(rot_c_star, sample_dims))
         rad_star_sqr = torch.sum(delta_r_star * delta_r_star, dim=-1)
         rad_star_sqr = rad_star_sqr * Na * Na * Nb * Nb * Nc * Nc
         inside_cutoff = (rad_star_sqr * fudge) < 0.3969
-        F_latt = torch.where(inside_cutoff,
-                            torch.full_like(rad_star_sqr, Na * Nb * Nc),
-                            torch.zeros_like(rad_star_sqr))
+        # PERF-BATCH-001: Na·Nb·Nc may be a per-shot tensor, so scale a 0/1 mask instead of full_like
+        F_latt = inside_cutoff.to(rad_star_sqr.dtype) * (Na * Nb * Nc)
     else:
         raise ValueError(f"Unsupported crystal shape: {shape}")
 
     # Calculate intensity
-    F_total = F_cell * F_latt
-    intensity = F_total * F_total  # |F|^2
+    if constant_F is None:
+        F_total = F_cell * F_latt
+        intensity = F_total * F_total  # |F|^2
+    else:
+        # |F_latt|^2 only; constant_F^2 is folded in after the reduction below
+        intensity = F_latt * F_latt
 
     # Apply dmin culling
     if dmin_mask is not None:
@@ -370,87 +537,32 @@ def compute_physics_for_position(
 
     # Sum over phi and mosaic dimensions
     # intensity shape before sum: (S, F, N_phi, N_mos) or (n_sources, S, F, N_phi, N_mos) or (n_sources, batch, N_phi, N_mos)
-    intensity = torch.sum(intensity, dim=(-2, -1))
+    if range_reduction:
+        # PERF-F32-001: O(ε·log n) error growth over thousands of orientations
+        intensity = pairwise_sum(intensity, n_dims=2)
+    else:
+        intensity = torch.sum(intensity, dim=(-2, -1))
     # After sum: (S, F) or (n_sources, S, F) or (n_sources, batch)
+    if constant_F is not None:
+        intensity = intensity * (constant_F * constant_F)
 
     # CLI-FLAGS-003 Phase M1: Capture pre-polarization intensity for trace parity
     # This is the I_before_scaling value that C-code logs before multiplying by polar
-    intensity_pre_polar = intensity.clone() if apply_polarization else None
+    # PERF-LEAN-001: Trace-only copy, skipped outside diagnostics mode
+    intensity_pre_polar = intensity.clone() if (apply_polarization and diagnostics) else None
 
     # PERF-PYTORCH-004 P3.0b: Apply polarization PER-SOURCE before weighted sum
     # IMPORTANT: Apply polarization even when kahn_factor==0.0 (unpolarized case)
     # The formula 0.5*(1.0 + cos²(2θ)) is the correct unpolarized correction
     if apply_polarization:
-        # Calculate polarization factor for each source
-        # Need diffracted beam direction: pixel_coords_angstroms normalized
-        pixel_magnitudes = torch.norm(pixel_coords_angstroms, dim=-1, keepdim=True).clamp_min(1e-12)
-        diffracted_beam_unit = pixel_coords_angstroms / pixel_magnitudes
-
-        if is_multi_source:
-            # Multi-source case: apply per-source polarization
-            # diffracted_beam_unit: (S, F, 3) or (batch, 3)
-            # incident_beam_direction: (n_sources, 3)
-            # NOTE: incident_beam_direction is cloned in _compute_physics_for_position wrapper
-            # before entering torch.compile to avoid CUDA graphs aliasing violations
-
-            # Expand diffracted to (n_sources, S, F, 3) or (n_sources, batch, 3)
-            if original_n_dims == 2:
-                # batch case
-                diffracted_expanded = diffracted_beam_unit.unsqueeze(0).expand(n_sources, -1, -1)
-                incident_expanded = incident_beam_direction.unsqueeze(1).expand(-1, diffracted_beam_unit.shape[0], -1)
-            else:
-                # (S, F, 3) case
-                diffracted_expanded = diffracted_beam_unit.unsqueeze(0).expand(n_sources, -1, -1, -1)
-                incident_expanded = incident_beam_direction.unsqueeze(1).unsqueeze(1).expand(-1, diffracted_beam_unit.shape[0], diffracted_beam_unit.shape[1], -1)
-
-            # Flatten for polarization calculation
-            # Use .contiguous() to avoid CUDA graphs tensor reuse errors
-            flat_shape = diffracted_expanded.shape
-            incident_flat = incident_expanded.reshape(-1, 3).contiguous()
-            diffracted_flat = diffracted_expanded.reshape(-1, 3).contiguous()
-
-            # Calculate polarization
-            polar_flat = polarization_factor(
-                kahn_factor,
-                incident_flat,
-                diffracted_flat,
-                polarization_axis
+        # PERF-GEOCACHE-001: The factor depends only on geometry; callers may pass it precomputed
+        if polar is None:
+            polar = polarization_for_position(
+                pixel_coords_angstroms, incident_beam_direction, kahn_factor, polarization_axis
             )
-
-            # Reshape to match intensity shape: (n_sources, S, F) or (n_sources, batch)
-            if original_n_dims == 2:
-                polar = polar_flat.reshape(n_sources, -1)
-            else:
-                polar = polar_flat.reshape(n_sources, diffracted_beam_unit.shape[0], diffracted_beam_unit.shape[1])
-
-            # Apply polarization per source
-            intensity = intensity * polar
-        else:
-            # Single source case
-            # Flatten for polarization calculation
-            # Use .contiguous() to avoid CUDA graphs tensor reuse errors
-            if original_n_dims == 3:
-                incident_flat = incident_beam_direction.unsqueeze(0).unsqueeze(0).expand(diffracted_beam_unit.shape[0], diffracted_beam_unit.shape[1], -1).reshape(-1, 3).contiguous()
-            else:
-                incident_flat = incident_beam_direction.unsqueeze(0).expand(diffracted_beam_unit.shape[0], -1).reshape(-1, 3).contiguous()
-            diffracted_flat = diffracted_beam_unit.reshape(-1, 3).contiguous()
-
-            # Calculate polarization
-            polar_flat = polarization_factor(
-                kahn_factor,
-                incident_flat,
-                diffracted_flat,
-                polarization_axis
-            )
-
-            # Reshape to match intensity shape
-            if original_n_dims == 2:
-                polar = polar_flat.reshape(-1)
-            else:
-                polar = polar_flat.reshape(diffracted_beam_unit.shape[0], diffracted_beam_unit.shape[1])
-
-            # Apply polarization
-            intensity = intensity * polar
+        if physics_dtype is not None:
+            polar = polar.to(physics_dtype)
+        intensity = intensity * polar
 
     # Handle multi-source accumulation
     # SOURCE-WEIGHT-001 Phase C1: Per specs/spec-a-core.md:151, weights are "read but ignored"
@@ -458,16 +570,185 @@ def compute_physics_for_position(
     # C-code reference: golden_suite_generator/nanoBragg.c:2620-2715 ignores source_I during accumulation.
     if is_multi_source:
         # Sum over sources with equal weighting (ignore source_weights parameter)
-        # intensity: (n_sources, S, F) or (n_sources, batch)
-        intensity = torch.sum(intensity, dim=0)
+        # intensity: (*shots, n_sources, S, F) or (*shots, n_sources, batch)
+        source_dim = -original_n_dims
+        intensity = torch.sum(intensity, dim=source_dim)
         # CLI-FLAGS-003 Phase M1: Apply same accumulation to pre-polar intensity
         if intensity_pre_polar is not None:
-            intensity_pre_polar = torch.sum(intensity_pre_polar, dim=0)
+            intensity_pre_polar = torch.sum(intensity_pre_polar, dim=source_dim)
 
     # CLI-FLAGS-003 Phase M1: Return both post-polar (intensity) and pre-polar for trace
     return intensity, intensity_pre_polar
 
 
+def compute_physics_square_unpolarized(
+    pixel_coords_angstroms: torch.Tensor,
+    rot_a: torch.Tensor,
+    rot_b: torch.Tensor,
+    rot_c: torch.Tensor,
+    rot_a_star: torch.Tensor,
+    rot_b_star: torch.Tensor,
+    rot_c_star: torch.Tensor,
+    incident_beam_direction: torch.Tensor,
+    wavelength: torch.Tensor,
+    source_weights: Optional[torch.Tensor] = None,
+    dmin: float = 0.0,
+    crystal_get_structure_factor: Callable[[torch.Tensor, torch.Tensor, torch.Tensor], torch.Tensor] = None,
+    N_cells_a: int = 0,
+    N_cells_b: int = 0,
+    N_cells_c: int = 0,
+    crystal_shape: CrystalShape = CrystalShape.SQUARE,
+    crystal_fudge: float = 1.0,
+    apply_polarization: bool = False,
+    kahn_factor: float = 1.0,
+    polarization_axis: Optional[torch.Tensor] = None,
+    diagnostics: bool = False,
+    hkl_stats: Optional[HKLStatsCounter] = None,
+    constant_F: Optional[float] = None,
+    physics_dtype: Optional[torch.dtype] = None,
+    range_reduction: bool = False,
+    lattice_lut: Optional[LatticeFactorLUT] = None,
+    polar: Optional[torch.Tensor] = None,
+) -> torch.Tensor:
+    """Specialized physics kernel for SQUARE crystals without polarization (PERF-KERNEL-001).
+
+    Drop-in replacement for `compute_physics_for_position` with the same keyword
+    signature, selected by `select_physics_kernel` when the crystal shape is SQUARE
+    and polarization is disabled (-nopolar). Shape dispatch, the reciprocal-vector
+    arguments and the whole polarization block are dead code in that configuration,
+    so this kernel carries none of them: sources are broadcast with views instead of
+    expanded copies and the graph handed to torch.compile is a straight line.
+
+    crystal_shape, crystal_fudge, rot_*_star, apply_polarization, kahn_factor,
+    polarization_axis, polar and diagnostics are accepted for signature compatibility
+    and ignored. With polarization off the generic kernel emits no per-call
+    [HKL stats] log and returns no pre-polarization intensity either.
+
+    Returns:
+        (intensity, None) with intensity shaped as in `compute_physics_for_position`
+    """
+    is_multi_source = incident_beam_direction.dim() == 2
+    spatial_dims = pixel_coords_angstroms.dim() - 1
+
+    pixel_squared_sum = torch.sum(
+        pixel_coords_angstroms * pixel_coords_angstroms, dim=-1, keepdim=True
+    ).clamp_min(1e-12)
+    diffracted_beam_unit = pixel_coords_angstroms / torch.sqrt(pixel_squared_sum)
+
+    if is_multi_source:
+        # (S, F, 3) -> (1, S, F, 3); sources as (n_sources, 1, 1, 3) views, no expand
+        n_sources = incident_beam_direction.shape[0]
+        diffracted_beam_unit = diffracted_beam_unit.unsqueeze(0)
+        incident_beam_direction = incident_beam_direction.view(n_sources, *([1] * spatial_dims), 3)
+        if wavelength.dim() == 1:
+            wavelength = wavelength.view(n_sources, *([1] * spatial_dims), 1)
+
+    scattering_vector = (diffracted_beam_unit - incident_beam_direction) / (wavelength * 1e-10)
+
+    # (..., 3) -> (..., 1, 1, 3) broadcasts against rot vectors of shape (*shots, N_phi, N_mos, 3)
+    scattering_broadcast = scattering_vector.unsqueeze(-2).unsqueeze(-2)
+    sample_dims = scattering_vector.dim() - 1
+    h = dot_product(scattering_broadcast, _broadcast_rotations(rot_a, sample_dims))
+    k = dot_product(scattering_broadcast, _broadcast_rotations(rot_b, sample_dims))
+    l = dot_product(scattering_broadcast, _broadcast_rotations(rot_c, sample_dims))  # noqa: E741
+    h0 = torch.round(h)
+    k0 = torch.round(k)
+    l0 = torch.round(l)
+    needs_frac = range_reduction or lattice_lut is not None
+    if needs_frac:
+        # PERF-F32-001: exact offsets from the nearest node, before any downcast
+        h_frac = h - h0
+        k_frac = k - k0
+        l_frac = l - l0
+
+    # PERF-MIXED-001: Lattice transform and reduction in physics_dtype
+    if physics_dtype is not None and h.dtype != physics_dtype:
+        h, k, l, h0, k0, l0 = (t.to(physics_dtype) for t in (h, k, l, h0, k0, l0))  # noqa: E741
+        if needs_frac:
+            h_frac, k_frac, l_frac = (t.to(physics_dtype) for t in (h_frac, k_frac, l_frac))
+        if isinstance(N_cells_a, torch.Tensor):
+            N_cells_a = N_cells_a.to(physics_dtype)
+            N_cells_b = N_cells_b.to(physics_dtype)
+            N_cells_c = N_cells_c.to(physics_dtype)
+
+    # SQUARE lattice transform uses fractional h,k,l directly (spec-a-core.md §4.3)
+    if lattice_lut is not None:
+        F_latt = (
+            lattice_lut.sincg(0, h_frac, h0)
+            * lattice_lut.sincg(1, k_frac, k0)
+            * lattice_lut.sincg(2, l_frac, l0)
+        )
+    elif range_reduction:
+        F_latt = (
+            sincg_reduced(h_frac, h0, N_cells_a)
+            * sincg_reduced(k_frac, k0, N_cells_b)
+            * sincg_reduced(l_frac, l0, N_cells_c)
+        )
+    else:
+        F_latt = sincg(torch.pi * h, N_cells_a) * sincg(torch.pi * k, N_cells_b) * sincg(torch.pi * l, N_cells_c)
+
+    if constant_F is None or hkl_stats is not None:
+        if constant_F is None:
+            F_cell = crystal_get_structure_factor(h0, k0, l0)
+            if F_cell.device != h.device or F_cell.dtype != h.dtype:
+                F_cell = F_cell.to(device=h.device, dtype=h.dtype)
+        else:
+            F_cell = torch.full_like(h0, constant_F)
+        if hkl_stats is not None:
+            hkl_stats.update(h0, k0, l0, F_cell)
+
+    if constant_F is None:
+        F_total = F_cell * F_latt
+        intensity = F_total * F_total
+    else:
+        intensity = F_latt * F_latt
+
+    if dmin is not None and dmin > 0:
+        stol = 0.5 * torch.norm(scattering_vector, dim=-1)
+        keep_mask = ~((stol > 0) & (stol > 0.5 / dmin))
+        intensity = intensity * keep_mask.unsqueeze(-1).unsqueeze(-1).to(intensity.dtype)
+
+    if range_reduction:
+        intensity = pairwise_sum(intensity, n_dims=2)
+    else:
+        intensity = torch.sum(intensity, dim=(-2, -1))
+    if constant_F is not None:
+        intensity = intensity * (constant_F * constant_F)
+
+    # SOURCE-WEIGHT-001: equal weighting, source_weights are read but ignored
+    if is_multi_source:
+        intensity = torch.sum(intensity, dim=-(spatial_dims + 1))
+
+    return intensity, None
+
+
+@dataclass(frozen=True)
+class KernelSignature:
+    """Configuration properties that decide which physics kernel is used (PERF-KERNEL-001)."""
+    shape: CrystalShape
+    apply_polarization: bool
+    constant_F: Optional[float]
+    range_reduction: bool = False
+
+
+def select_physics_kernel(signature: KernelSignature) -> Callable:
+    """Return the physics kernel specialized for a configuration signature.
+
+    All kernels share the keyword signature of `compute_physics_for_position`;
+    constant_F and range_reduction are passed by the caller, so those paths work
+    with every kernel.
+
+    Args:
+        signature: KernelSignature of the current configuration
+
+    Returns:
+        Pure (uncompiled) kernel function
+    """
+    if signature.shape == CrystalShape.SQUARE and not signature.apply_polarization:
+        return compute_physics_square_unpolarized
+    return compute_physics_for_position
+
+
 class Simulator:
     """
     Main diffraction simulator class.
@@ -485,6 +766,9 @@ class Simulator:
         device=None,
         dtype=torch.float32,
         debug_config: Optional[dict] = None,
+        physics_dtype: Optional[torch.dtype] = None,
+        geometry_cache_budget: Optional[Union[int, str]] = "512M",
+        result_cache: Optional[ResultCache] = None,
     ):
         """
         Initialize simulator with crystal, detector, and configurations.
@@ -497,6 +781,25 @@ class Simulator:
             device: PyTorch device (cpu/cuda)
             dtype: PyTorch data type
             debug_config: Debug configuration with printout, printout_pixel, trace_pixel options
+            physics_dtype: Optional lower precision for the physics stage (PERF-MIXED-001).
+                With dtype=torch.float64 and physics_dtype=torch.float32, pixel
+                coordinates, scattering vectors and the Miller-index projection run in
+                float64 while F_cell/F_latt, the phi/mosaic reduction and the returned
+                image are float32. Accuracy bound: on pixels above 1e-3 of the image
+                maximum the result agrees with the all-float64 image to a relative
+                error of 2e-3, and the image sum to 1e-5 (checked against the
+                triclinic_P1 golden case in tests/test_at_perf_013.py). None (default)
+                runs everything in dtype.
+            geometry_cache_budget: Memory cap for the cross-run cache of geometry-only
+                per-pixel factors (solid angle, subpixel positions, polarization,
+                detector capture fractions), as bytes or a size string such as "512M"
+                (PERF-GEOCACHE-001). None or 0 disables the cache. Entries are keyed by
+                the detector geometry version, beam directions and polarization and
+                absorption settings; call detector.invalidate_cache() after changing
+                detector geometry in place.
+            result_cache: Optional on-disk cache of rendered images (PERF-RESULTCACHE-001).
+                run() returns the stored image when the configuration, HKL data and
+                run arguments hash to a stored key. None (default) disables it.
         """
         self.crystal = crystal
         self.detector = detector
@@ -517,6 +820,8 @@ class Simulator:
                 self.crystal.config.mosaic_domains = crystal_config.mosaic_domains
             if hasattr(crystal_config, 'mosaic_seed'):
                 self.crystal.config.mosaic_seed = crystal_config.mosaic_seed
+            if hasattr(crystal_config, 'mosaic_sampling'):
+                self.crystal.config.mosaic_sampling = crystal_config.mosaic_sampling
             if hasattr(crystal_config, 'spindle_axis'):
                 self.crystal.config.spindle_axis = crystal_config.spindle_axis
         # Use the provided beam_config, or Crystal's beam_config, or default
@@ -534,6 +839,9 @@ class Simulator:
         else:
             self.device = torch.device("cpu")
         self.dtype = dtype
+        # PERF-MIXED-001: Physics precision; None when it equals the geometry dtype
+        self._physics_dtype = physics_dtype if physics_dtype not in (None, dtype) else None
+        self.output_dtype = physics_dtype if physics_dtype is not None else dtype
 
         # PERF-PYTORCH-004 Attempt #14: Ensure detector is on the same device/dtype as simulator
         # This prevents device mismatch errors when detector tensors (beam_vector, pixel_coords)
@@ -547,11 +855,21 @@ class Simulator:
         self.printout_pixel = self.debug_config.get('printout_pixel', None)  # [fast, slow]
         self.trace_pixel = self.debug_config.get('trace_pixel', None)  # [slow, fast]
 
+        # PERF-LEAN-001: Lean production mode unless debug output is requested.
+        # Diagnostics mode enables the per-call [HKL stats] log and trace-only copies;
+        # production runs may instead collect sync-free HKL counters read once per run.
+        self.diagnostics = bool(self.printout or self.trace_pixel)
+        self._hkl_stats = HKLStatsCounter() if self.debug_config.get('hkl_stats', False) else None
+        self.hkl_stats: Optional[dict] = None
+
         # Phase CLI-FLAGS-003 M0a: Enable trace instrumentation on Crystal when trace_pixel is active
         # This guards _last_tricubic_neighborhood population to prevent unconditional debug payload retention
         if self.trace_pixel is not None:
             self.crystal._enable_trace = True
 
+        # PERF-TRICUBIC-002: Interpolation range checks are read once per run, not per call
+        self.crystal._defer_range_check = True
+
         # Set incident beam direction from detector.beam_vector
         # This is critical for convention consistency (AT-PARALLEL-004) and CLI override support (CLI-FLAGS-003 Phase H2)
         # The detector.beam_vector property handles both convention defaults and CUSTOM overrides (e.g., -beam_vector)
@@ -635,6 +953,23 @@ class Simulator:
         # Pre-convert pixel coordinates to correct device/dtype once
         self._cached_pixel_coords_meters = self.detector.get_pixel_coords().to(device=self.device, dtype=self.dtype)
 
+        # PERF-GEOCACHE-001: Geometry-only factors reused across runs
+        self.geometry_cache = GeometryFactorCache(
+            parse_memory_budget(geometry_cache_budget) if geometry_cache_budget else 0
+        )
+        self._geometry_detector = self.detector
+        self._geometry_version = self.detector._geometry_version
+        # PERF-FARM-001: Detector rows [start, end) rendered by a frame-farm worker, or None
+        self._row_window: Optional[Tuple[int, int]] = None
+        # PERF-COMPACT-001: (slow, fast) indices rendered by run_pixels() as an (N, 1) strip, or None
+        self._pixel_list: Optional[Tuple[torch.Tensor, torch.Tensor]] = None
+        # Content hash keying geometry factors of the current pixel list, computed on first use
+        self._pixel_list_key: Optional[str] = None
+
+        # PERF-RESULTCACHE-001: Opt-in on-disk image cache; key of the last cacheable run
+        self.result_cache = result_cache
+        self.last_result_key: Optional[str] = None
+
         # Build ROI mask once and cache it (AT-ROI-001)
         # Start with all pixels enabled
         self._cached_roi_mask = torch.ones(
@@ -670,6 +1005,57 @@ class Simulator:
             mask_array = self.detector.config.mask_array.to(device=self.device, dtype=self.dtype)
             self._cached_roi_mask = self._cached_roi_mask * mask_array
 
+        # PERF-KERNEL-001: Pick the specialized physics kernel for this configuration
+        # and compile it. run() re-checks the signature so that loading HKL data or
+        # toggling polarization after construction swaps the kernel.
+        self._kernel_signature: Optional[KernelSignature] = None
+        self._kernel_key: Optional[Tuple] = None
+        self._refresh_physics_kernel()
+
+    def _kernel_signature_for_config(self) -> KernelSignature:
+        """Build the KernelSignature of the current crystal/beam configuration."""
+        # The constant-F fast path needs a structure factor that is the same for every
+        # reflection (no HKL data) and F_cell values nobody inspects.
+        constant_F = None
+        if (
+            (self.crystal.hkl_data is None or self.crystal.hkl_metadata is None)
+            and not self.diagnostics
+            and self._hkl_stats is None
+        ):
+            constant_F = float(self.crystal.config.default_F)
+        # PERF-F32-001: float32 physics uses the range-reduced lattice factor, which
+        # relies on the (-1)^(N-1) periodicity of sincg and hence on integral N_cells,
+        # unless CrystalConfig.lattice_range_reduction turns it off
+        physics_dtype = self._physics_dtype if self._physics_dtype is not None else self.dtype
+        N_cells = torch.stack([
+            torch.as_tensor(n, dtype=torch.float64).detach().cpu()
+            for n in (self.crystal.N_cells_a, self.crystal.N_cells_b, self.crystal.N_cells_c)
+        ])
+        range_reduction = (
+            self.crystal.config.lattice_range_reduction
+            and physics_dtype == torch.float32
+            and bool(torch.all(N_cells == torch.round(N_cells)))
+        )
+        return KernelSignature(
+            shape=self.crystal.config.shape,
+            apply_polarization=not self.beam_config.nopolar,
+            constant_F=constant_F,
+            range_reduction=range_reduction,
+        )
+
+    def _refresh_physics_kernel(self) -> None:
+        """Select the physics kernel and get its compiled version from the kernel cache."""
+        # PERF-LUT-001: Tables are a runtime argument, cached per configuration by the crystal
+        self._lattice_lut = self.crystal.get_lattice_lut(
+            dtype=self._physics_dtype if self._physics_dtype is not None else self.dtype
+        )
+        signature = self._kernel_signature_for_config()
+        if signature != self._kernel_signature:
+            self._kernel_signature = signature
+            self._constant_F = signature.constant_F
+            self._range_reduction = signature.range_reduction
+            self._physics_kernel = select_physics_kernel(signature)
+
         # Compile the physics computation function with appropriate mode
         # Use max-autotune on GPU to avoid CUDA graph issues with nested compilation
         # Use reduce-overhead on CPU for better performance
@@ -688,25 +1074,296 @@ class Simulator:
             os.environ.get("NANOBRAGG_DISABLE_COMPILE", "0") == "1"
             or os.environ.get("NANOBRAG_DISABLE_COMPILE", "0") == "1"
         )
+        kernel = self._physics_kernel
+
+        if disable_compile:
+            self._kernel_key = None
+            self._compiled_compute_physics = kernel
+            return
+
+        # PERF-KERNELCACHE-001: Compiled kernels are shared across Simulators (and, through
+        # persisted compiler artifacts, across processes) by everything they specialize on
+        mode = "max-autotune" if self.device.type == "cuda" else "reduce-overhead"
+        key = self._kernel_cache_key(kernel, mode)
+        if key == self._kernel_key:
+            return
+        self._kernel_key = key
+        try:
+            self._compiled_compute_physics = get_global_kernel_cache().compile(
+                key, kernel, torch.compile(mode=mode)
+            )
+        except Exception:
+            # Fall back to uncompiled version if torch.compile fails
+            # (e.g., missing CUDA, Triton issues, or compilation errors)
+            self._compiled_compute_physics = kernel
+
+    def _kernel_cache_key(self, kernel: Callable, mode: str) -> Tuple:
+        """Compiled-kernel cache key of the current configuration (PERF-KERNELCACHE-001)."""
+        crystal = self.crystal
+        signature = self._kernel_signature
+        ranks = tuple(
+            torch.as_tensor(getattr(crystal, name)).dim() for name in (
+                'N_cells_a', 'N_cells_b', 'N_cells_c',
+                'cell_a', 'cell_b', 'cell_c', 'cell_alpha', 'cell_beta', 'cell_gamma',
+            )
+        )
+        return make_key(
+            self.device,
+            self._physics_dtype if self._physics_dtype is not None else self.dtype,
+            kernel=f"{kernel.__module__}.{kernel.__qualname__}",
+            mode=mode,
+            shape=signature.shape.name,
+            apply_polarization=signature.apply_polarization,
+            constant_F=signature.constant_F is not None,
+            range_reduction=signature.range_reduction,
+            interpolate=bool(crystal.interpolate),
+            hkl_storage=type(crystal.hkl_data).__name__,
+            lattice_lut=self._lattice_lut is not None,
+            multi_source=self._source_directions is not None and len(self._source_directions) > 1,
+            tensor_ranks=ranks,
+        )
+
+    def _refresh_geometry(self) -> None:
+        """Re-read pixel coordinates after the detector geometry changed (PERF-GEOCACHE-001)."""
+        detector = self.detector
+        if detector is self._geometry_detector and detector._geometry_version == self._geometry_version:
+            return
+        if detector is not self._geometry_detector:
+            # Versions of different detectors are not comparable
+            self.geometry_cache.clear()
+        self._cached_pixel_coords_meters = detector.get_pixel_coords().to(device=self.device, dtype=self.dtype)
+        self._geometry_detector = detector
+        self._geometry_version = detector._geometry_version
+
+    def _geometry_factor(self, key: tuple, compute: Callable, *inputs):
+        """
+        Look up a geometry-only factor in the cross-run cache (PERF-GEOCACHE-001).
+
+        Args:
+            key: Settings the factor depends on besides the detector geometry version
+            compute: Zero-argument function computing the factor
+            *inputs: Tensors the factor is computed from; if any requires grad the
+                cache is bypassed so gradients flow through a fresh computation
+
+        Returns:
+            The cached or freshly computed factor
+        """
+        if torch.is_grad_enabled() and any(
+            isinstance(t, torch.Tensor) and t.requires_grad for t in inputs
+        ):
+            return compute()
+        # PERF-COMPACT-001: Pixel lists are keyed by their content, so masked runs
+        # and repeated run_pixels() calls reuse their factors
+        pixels = None
+        if self._pixel_list is not None:
+            if self._pixel_list_key is None:
+                self._pixel_list_key = canonical_hash(self._pixel_list)
+            pixels = self._pixel_list_key
+        full_key = (self._geometry_version, self._row_window, pixels, str(self.device), self.dtype) + key
+        return self.geometry_cache.get_or_compute(full_key, compute)
+
+    def _solid_angle_key(self) -> tuple:
+        """Detector settings the solid angle depends on besides the pixel positions."""
+        return (
+            bool(self.detector.config.point_pixel),
+            tensor_key(self.detector.close_distance),
+            tensor_key(self.detector.pixel_size),
+        )
+
+    def _polarization(
+        self, pixel_coords_angstroms: torch.Tensor, incident_beam_direction: torch.Tensor, grid_key: tuple
+    ) -> Optional[torch.Tensor]:
+        """Cached Kahn polarization factor for the kernels, or None with -nopolar (PERF-GEOCACHE-001)."""
+        if self.beam_config.nopolar:
+            return None
+        return self._geometry_factor(
+            ("polar",) + grid_key + (
+                tensor_key(incident_beam_direction),
+                tensor_key(self.kahn_factor),
+                tensor_key(self.polarization_axis),
+            ),
+            lambda: polarization_for_position(
+                pixel_coords_angstroms, incident_beam_direction, self.kahn_factor, self.polarization_axis
+            ),
+            pixel_coords_angstroms, incident_beam_direction, self.kahn_factor, self.polarization_axis,
+        )
+
+    def _pixel_geometry(self, pixel_coords_meters: torch.Tensor):
+        """
+        Pixel-center positions in Å and solid angles, cached across runs (PERF-GEOCACHE-001).
+
+        Returns:
+            (pixel_coords_angstroms (S, F, 3), omega_pixel (S, F))
+        """
+        def compute():
+            pixel_coords_angstroms = pixel_coords_meters * 1e10
+
+            # Calculate airpath for pixel centers
+            pixel_squared_sum = torch.sum(
+                pixel_coords_angstroms * pixel_coords_angstroms, dim=-1, keepdim=True
+            )
+            # Use clamp_min to avoid creating fresh tensors in compiled graph (PERF-PYTORCH-004 P1.1)
+            pixel_squared_sum = pixel_squared_sum.clamp_min(1e-12)
+            pixel_magnitudes = torch.sqrt(pixel_squared_sum)
+            airpath = pixel_magnitudes.squeeze(-1)  # Remove last dimension for broadcasting
+            airpath_m = airpath * 1e-10  # Å to meters
+            # Convert detector properties to tensors with correct device/dtype (AT-PERF-DEVICE-001)
+            # Use as_tensor to avoid warnings when value might already be a tensor
+            close_distance_m = torch.as_tensor(self.detector.close_distance, device=airpath_m.device, dtype=airpath_m.dtype)
+            pixel_size_m = torch.as_tensor(self.detector.pixel_size, device=airpath_m.device, dtype=airpath_m.dtype)
+
+            # Calculate solid angle (omega) based on point_pixel mode
+            if self.detector.config.point_pixel:
+                # Point pixel mode: ω = 1 / R^2
+                omega_pixel = 1.0 / (airpath_m * airpath_m)
+            else:
+                # Standard mode with obliquity correction
+                # ω = (pixel_size^2 / R^2) · (close_distance/R)
+                omega_pixel = (
+                    (pixel_size_m * pixel_size_m)
+                    / (airpath_m * airpath_m)
+                    * close_distance_m
+                    / airpath_m
+                )
+            return pixel_coords_angstroms, omega_pixel
+
+        return self._geometry_factor(
+            ("pixel",) + self._solid_angle_key(),
+            compute,
+            pixel_coords_meters, self.detector.close_distance, self.detector.pixel_size,
+        )
+
+    def _subpixel_geometry(self, pixel_coords_meters: torch.Tensor, oversample: int):
+        """
+        Subpixel positions in Å and solid angles, cached across runs (PERF-GEOCACHE-001).
+
+        Returns:
+            (coords (S*F*oversample², 3), omega (S, F, oversample²))
+        """
+        def compute():
+            # Generate subpixel offsets (centered on pixel center)
+            # Per spec: "Compute detector-plane coordinates (meters): Fdet and Sdet at subpixel centers."
+            # Create offsets in fractional pixel units
+            subpixel_step = 1.0 / oversample
+            offset_start = -0.5 + subpixel_step / 2.0
+
+            # Use manual arithmetic to preserve gradients (avoid torch.linspace)
+            subpixel_offsets = offset_start + torch.arange(
+                oversample, device=self.device, dtype=self.dtype
+            ) * subpixel_step
+
+            # Create grid of subpixel offsets
+            sub_s, sub_f = torch.meshgrid(subpixel_offsets, subpixel_offsets, indexing='ij')
+            # Flatten the grid for vectorized processing
+            # Shape: (oversample*oversample,)
+            sub_s_flat = sub_s.flatten()
+            sub_f_flat = sub_f.flatten()
+
+            # Get detector basis vectors for proper coordinate transformation
+            f_axis = self.detector.fdet_vec  # Shape: [3]
+            s_axis = self.detector.sdet_vec  # Shape: [3]
+            S, F = pixel_coords_meters.shape[:2]
+
+            # VECTORIZED: Create all subpixel positions at once
+            # Shape: (oversample*oversample, 3)
+            # Convert detector properties to tensors with correct device/dtype (AT-PERF-DEVICE-001)
+            # Use as_tensor to avoid warnings when value might already be a tensor
+            pixel_size_m_tensor = torch.as_tensor(self.detector.pixel_size, device=pixel_coords_meters.device, dtype=pixel_coords_meters.dtype)
+            delta_s_all = sub_s_flat * pixel_size_m_tensor
+            delta_f_all = sub_f_flat * pixel_size_m_tensor
+
+            # Shape: (oversample*oversample, 3)
+            offset_vectors = delta_s_all.unsqueeze(-1) * s_axis + delta_f_all.unsqueeze(-1) * f_axis
+
+            # Expand pixel_coords for all subpixels
+            # Shape: (S, F, oversample*oversample, 3)
+            pixel_coords_expanded = pixel_coords_meters.unsqueeze(2).expand(S, F, oversample*oversample, 3)
+            offset_vectors_expanded = offset_vectors.unsqueeze(0).unsqueeze(0).expand(S, F, oversample*oversample, 3)
+
+            # All subpixel coordinates at once
+            # Shape: (S, F, oversample*oversample, 3)
+            subpixel_coords_all = pixel_coords_expanded + offset_vectors_expanded
+
+            # Convert to Angstroms for physics
+            subpixel_coords_ang_all = subpixel_coords_all * 1e10
+
+            # VECTORIZED PHYSICS: Process all subpixels at once
+            # Reshape to (S*F*oversample^2, 3) for physics calculation
+            # Use .contiguous() to avoid CUDA graphs tensor reuse errors
+            coords_reshaped = subpixel_coords_ang_all.reshape(-1, 3).contiguous()
+
+            # VECTORIZED AIRPATH AND OMEGA: Calculate for all subpixels
+            sub_squared_all = torch.sum(subpixel_coords_ang_all * subpixel_coords_ang_all, dim=-1)
+            # PERF-PYTORCH-004 Phase 1: Use clamp_min instead of torch.maximum to avoid allocating tensors inside compiled graph
+            sub_squared_all = sub_squared_all.clamp_min(1e-20)
+            sub_magnitudes_all = torch.sqrt(sub_squared_all)
+            airpath_m_all = sub_magnitudes_all * 1e-10
+
+            # Get close_distance from detector (computed during init)
+            # Convert detector properties to tensors with correct device/dtype (AT-PERF-DEVICE-001)
+            # Use as_tensor to avoid warnings when value might already be a tensor
+            close_distance_m = torch.as_tensor(self.detector.close_distance, device=airpath_m_all.device, dtype=airpath_m_all.dtype)
+            pixel_size_m = torch.as_tensor(self.detector.pixel_size, device=airpath_m_all.device, dtype=airpath_m_all.dtype)
+
+            # Calculate solid angle (omega) for all subpixels
+            # Shape: (S, F, oversample*oversample)
+            if self.detector.config.point_pixel:
+                omega_all = 1.0 / (airpath_m_all * airpath_m_all)
+            else:
+                omega_all = (
+                    (pixel_size_m * pixel_size_m)
+                    / (airpath_m_all * airpath_m_all)
+                    * close_distance_m
+                    / airpath_m_all
+                )
+            return coords_reshaped, omega_all
+
+        return self._geometry_factor(
+            ("subpixel", oversample) + self._solid_angle_key(),
+            compute,
+            pixel_coords_meters, self.detector.close_distance, self.detector.pixel_size,
+        )
 
-        if disable_compile:
-            self._compiled_compute_physics = compute_physics_for_position
-        else:
-            try:
-                if self.device.type == "cuda":
-                    self._compiled_compute_physics = torch.compile(mode="max-autotune")(
-                        compute_physics_for_position
-                    )
-                else:
-                    self._compiled_compute_physics = torch.compile(mode="reduce-overhead")(
-                        compute_physics_for_position
-                    )
-            except Exception:
-                # Fall back to uncompiled version if torch.compile fails
-                # (e.g., missing CUDA, Triton issues, or compilation errors)
-                self._compiled_compute_physics = compute_physics_for_position
-
-    def _compute_physics_for_position(self, pixel_coords_angstroms, rot_a, rot_b, rot_c, rot_a_star, rot_b_star, rot_c_star, incident_beam_direction=None, wavelength=None, source_weights=None):
+    def _auto_oversample(self) -> int:
+        """Oversample factor chosen by the C code when -oversample is not given."""
+        # Calculate maximum crystal dimension in meters
+        xtalsize_max = max(
+            abs(self.crystal.config.cell_a * 1e-10 * self.crystal.config.N_cells[0]),  # a*Na in meters
+            abs(self.crystal.config.cell_b * 1e-10 * self.crystal.config.N_cells[1]),  # b*Nb in meters
+            abs(self.crystal.config.cell_c * 1e-10 * self.crystal.config.N_cells[2])   # c*Nc in meters
+        )
+
+        # Calculate reciprocal pixel size in meters
+        # reciprocal_pixel_size = λ * distance / pixel_size (all in meters)
+        wavelength_m = self.wavelength * 1e-10  # Convert from Angstroms to meters
+        distance_m = self.detector.config.distance_mm / 1000.0  # Convert from mm to meters
+        pixel_size_m = self.detector.config.pixel_size_mm / 1000.0  # Convert from mm to meters
+        reciprocal_pixel_size = wavelength_m * distance_m / pixel_size_m
+
+        # Calculate recommended oversample using C formula
+        recommended_oversample = math.ceil(3.0 * xtalsize_max / reciprocal_pixel_size)
+
+        # Ensure at least 1
+        if recommended_oversample <= 0:
+            recommended_oversample = 1
+
+        return recommended_oversample
+
+    def _elements_per_sample(self) -> int:
+        """Live tensor elements per physics sample, for memory planning (PERF-TILING-001)."""
+        elements = ELEMENTS_PER_SAMPLE
+        if self.crystal.interpolate and self.crystal.hkl_data is not None:
+            if self.crystal.get_tricubic_coefficients() is not None:
+                elements += TRICUBIC_CACHED_ELEMENTS_PER_SAMPLE
+            else:
+                elements += TRICUBIC_ELEMENTS_PER_SAMPLE
+        return elements
+
+    def clear_geometry_cache(self) -> None:
+        """Release the cached geometry-only factors (PERF-GEOCACHE-001)."""
+        self.geometry_cache.clear()
+
+    def _compute_physics_for_position(self, pixel_coords_angstroms, rot_a, rot_b, rot_c, rot_a_star, rot_b_star, rot_c_star, incident_beam_direction=None, wavelength=None, source_weights=None, polar=None, N_cells=None):
         """Compatibility shim - calls the pure function compute_physics_for_position.
 
         REFACTORING NOTE (PERF-PYTORCH-004 Phase 0):
@@ -723,6 +1380,10 @@ class Simulator:
             incident_beam_direction: Optional incident beam direction (defaults to self.incident_beam_direction)
             wavelength: Optional wavelength (defaults to self.wavelength)
             source_weights: Optional per-source weights for multi-source accumulation
+            polar: Optional precomputed polarization factor (PERF-GEOCACHE-001)
+            N_cells: Optional (Na, Nb, Nc) tensors overriding the crystal's, broadcastable
+                against the per-shot intensity (PERF-BATCH-001). The lattice-factor
+                tables are built for the crystal's N_cells, so they are not used then.
 
         Returns:
             intensity: Computed intensity |F|^2 integrated over phi and mosaic
@@ -745,8 +1406,22 @@ class Simulator:
         if self.device.type == "cuda":
             torch.compiler.cudagraph_mark_step_begin()
 
+        lattice_lut = self._lattice_lut
+        range_reduction = self._range_reduction
+        if N_cells is None:
+            N_cells = (self.crystal.N_cells_a, self.crystal.N_cells_b, self.crystal.N_cells_c)
+        else:
+            lattice_lut = None
+            range_reduction = range_reduction and all(bool((n == torch.round(n)).all()) for n in N_cells)
+
+        # PERF-LEAN-001: The HKL counter mutates Python state, so keep it out of compiled graphs
+        physics_fn = (
+            self._compiled_compute_physics if self._hkl_stats is None
+            else self._physics_kernel
+        )
+
         # Forward to compiled pure function with explicit parameters
-        return self._compiled_compute_physics(
+        return physics_fn(
             pixel_coords_angstroms=pixel_coords_angstroms,
             rot_a=rot_a,
             rot_b=rot_b,
@@ -759,15 +1434,22 @@ class Simulator:
             source_weights=source_weights,
             dmin=self.beam_config.dmin,
             crystal_get_structure_factor=self.crystal.get_structure_factor,
-            N_cells_a=self.crystal.N_cells_a,
-            N_cells_b=self.crystal.N_cells_b,
-            N_cells_c=self.crystal.N_cells_c,
+            N_cells_a=N_cells[0],
+            N_cells_b=N_cells[1],
+            N_cells_c=N_cells[2],
             crystal_shape=self.crystal.config.shape,
             crystal_fudge=self.crystal.config.fudge,
             # PERF-PYTORCH-004 P3.0b: Pass polarization parameters
             apply_polarization=not self.beam_config.nopolar,
             kahn_factor=self.kahn_factor,
             polarization_axis=self.polarization_axis,
+            diagnostics=self.diagnostics,
+            hkl_stats=self._hkl_stats,
+            constant_F=self._constant_F,
+            physics_dtype=self._physics_dtype,
+            range_reduction=range_reduction,
+            lattice_lut=lattice_lut,
+            polar=polar,
         )
 
     def _run_chunked(
@@ -805,6 +1487,9 @@ class Simulator:
         PIXEL-BATCH-001: Implements the existing but unused pixel_batch_size parameter
         to enable memory-efficient execution on constrained GPUs.
 
+        PERF-BUCKET-001: Chunks run the compiled kernel; the final chunk is padded
+        to pixel_batch_size rows so that all chunks share one compiled graph.
+
         Args:
             pixel_batch_size: Number of rows (slow axis) to process per chunk
             pixel_coords_meters: Full detector pixel coordinates (S, F, 3) in meters
@@ -829,12 +1514,22 @@ class Simulator:
         # Pre-allocate output tensor
         output = torch.zeros(S, F, device=self.device, dtype=self.dtype)
 
+        # PERF-BUCKET-001: Pad the short final chunk to pixel_batch_size rows so that the
+        # compiled kernel sees one chunk shape. Padding repeats the chunk's last row (real
+        # pixels, so no new out-of-range lookups) and is sliced off.
+        pad_chunks = self._pads_kernel_inputs()
+
         # Process chunks along slow axis
         for s_start in range(0, S, pixel_batch_size):
             s_end = min(s_start + pixel_batch_size, S)
+            rows = s_end - s_start
 
             # Extract chunk coordinates
             chunk_coords = pixel_coords_meters[s_start:s_end, :, :]  # (chunk_S, F, 3)
+            if pad_chunks and rows < pixel_batch_size:
+                chunk_coords = torch.cat(
+                    [chunk_coords, chunk_coords[-1:].expand(pixel_batch_size - rows, F, 3)]
+                )
 
             # Extract chunk ROI mask if present
             chunk_roi = roi_mask[s_start:s_end, :] if roi_mask is not None else None
@@ -855,7 +1550,7 @@ class Simulator:
                 steps=steps,
                 oversample=oversample,
                 oversample_omega=oversample_omega,
-            )
+            )[:rows]
 
             # Apply ROI mask if present
             if chunk_roi is not None:
@@ -866,6 +1561,19 @@ class Simulator:
 
         return output
 
+    def _pads_kernel_inputs(self) -> bool:
+        """
+        Whether chunks and tiles are padded to one shape for the compiled kernel (PERF-BUCKET-001).
+
+        The eager paths (HKL statistics, debug output) count or print per
+        pixel, so they are not padded.
+        """
+        return (
+            self._compiled_compute_physics is not self._physics_kernel
+            and self._hkl_stats is None
+            and not self.diagnostics
+        )
+
     def _compute_chunk_intensity(
         self,
         pixel_coords_meters: torch.Tensor,
@@ -892,10 +1600,10 @@ class Simulator:
         - All mosaic domains
         - All oversample positions
 
-        PIXEL-BATCH-001: Uses the pure function compute_physics_for_position directly
-        (not the compiled version) to avoid graph recompilation overhead for each
-        chunk shape. Chunked mode is for memory-constrained scenarios where raw
-        throughput is secondary.
+        PERF-BUCKET-001: Runs the compiled kernel (PERF-KERNEL-001) through
+        _compute_physics_for_position. _run_chunked pads the final chunk to the
+        chunk size, so every chunk has the same shape and one compiled graph
+        serves them all.
 
         Args:
             pixel_coords_meters: Chunk pixel coordinates (chunk_S, F, 3) in meters
@@ -956,45 +1664,25 @@ class Simulator:
             batch_shape = subpixel_coords_ang_all.shape[:-1]
             coords_reshaped = subpixel_coords_ang_all.reshape(-1, 3).contiguous()
 
-            # Compute physics (use pure function, not compiled, to avoid recompilation)
+            # Compute physics (compiled kernel; _run_chunked keeps chunk shapes fixed)
             if n_sources > 1:
                 incident_dirs_batched = -source_directions
                 wavelengths_batched = source_wavelengths_A
 
-                physics_intensity_flat, _ = compute_physics_for_position(
+                physics_intensity_flat, _ = self._compute_physics_for_position(
                     coords_reshaped, rot_a, rot_b, rot_c,
                     rot_a_star, rot_b_star, rot_c_star,
                     incident_beam_direction=incident_dirs_batched,
                     wavelength=wavelengths_batched,
                     source_weights=source_weights,
-                    dmin=self.beam_config.dmin,
-                    crystal_get_structure_factor=self.crystal.get_structure_factor,
-                    N_cells_a=self.crystal.N_cells_a,
-                    N_cells_b=self.crystal.N_cells_b,
-                    N_cells_c=self.crystal.N_cells_c,
-                    crystal_shape=self.crystal.config.shape,
-                    crystal_fudge=self.crystal.config.fudge,
-                    apply_polarization=not self.beam_config.nopolar,
-                    kahn_factor=self.kahn_factor,
-                    polarization_axis=self.polarization_axis,
                 )
             else:
-                physics_intensity_flat, _ = compute_physics_for_position(
+                physics_intensity_flat, _ = self._compute_physics_for_position(
                     coords_reshaped, rot_a, rot_b, rot_c,
                     rot_a_star, rot_b_star, rot_c_star,
                     incident_beam_direction=self.incident_beam_direction,
                     wavelength=self.wavelength,
                     source_weights=None,
-                    dmin=self.beam_config.dmin,
-                    crystal_get_structure_factor=self.crystal.get_structure_factor,
-                    N_cells_a=self.crystal.N_cells_a,
-                    N_cells_b=self.crystal.N_cells_b,
-                    N_cells_c=self.crystal.N_cells_c,
-                    crystal_shape=self.crystal.config.shape,
-                    crystal_fudge=self.crystal.config.fudge,
-                    apply_polarization=not self.beam_config.nopolar,
-                    kahn_factor=self.kahn_factor,
-                    polarization_axis=self.polarization_axis,
                 )
 
             # Reshape back
@@ -1023,8 +1711,8 @@ class Simulator:
                     / airpath_m_all
                 )
 
-            # Apply omega based on oversample flags
-            intensity_all = subpixel_physics_intensity_all.clone()
+            # Apply omega based on oversample flags (out-of-place, no copy needed)
+            intensity_all = subpixel_physics_intensity_all
             if oversample_omega:
                 intensity_all = intensity_all * omega_all
 
@@ -1046,40 +1734,20 @@ class Simulator:
                 incident_dirs_batched = -source_directions
                 wavelengths_batched = source_wavelengths_A
 
-                intensity, _ = compute_physics_for_position(
+                intensity, _ = self._compute_physics_for_position(
                     pixel_coords_angstroms, rot_a, rot_b, rot_c,
                     rot_a_star, rot_b_star, rot_c_star,
                     incident_beam_direction=incident_dirs_batched,
                     wavelength=wavelengths_batched,
                     source_weights=source_weights,
-                    dmin=self.beam_config.dmin,
-                    crystal_get_structure_factor=self.crystal.get_structure_factor,
-                    N_cells_a=self.crystal.N_cells_a,
-                    N_cells_b=self.crystal.N_cells_b,
-                    N_cells_c=self.crystal.N_cells_c,
-                    crystal_shape=self.crystal.config.shape,
-                    crystal_fudge=self.crystal.config.fudge,
-                    apply_polarization=not self.beam_config.nopolar,
-                    kahn_factor=self.kahn_factor,
-                    polarization_axis=self.polarization_axis,
                 )
             else:
-                intensity, _ = compute_physics_for_position(
+                intensity, _ = self._compute_physics_for_position(
                     pixel_coords_angstroms, rot_a, rot_b, rot_c,
                     rot_a_star, rot_b_star, rot_c_star,
                     incident_beam_direction=self.incident_beam_direction,
                     wavelength=self.wavelength,
                     source_weights=None,
-                    dmin=self.beam_config.dmin,
-                    crystal_get_structure_factor=self.crystal.get_structure_factor,
-                    N_cells_a=self.crystal.N_cells_a,
-                    N_cells_b=self.crystal.N_cells_b,
-                    N_cells_c=self.crystal.N_cells_c,
-                    crystal_shape=self.crystal.config.shape,
-                    crystal_fudge=self.crystal.config.fudge,
-                    apply_polarization=not self.beam_config.nopolar,
-                    kahn_factor=self.kahn_factor,
-                    polarization_axis=self.polarization_axis,
                 )
 
             # Calculate and apply omega
@@ -1120,6 +1788,453 @@ class Simulator:
 
         return physical_intensity
 
+    def _accumulate_tiled(
+        self,
+        budget_bytes: Optional[int],
+        pixel_coords_meters: torch.Tensor,
+        rot_a: torch.Tensor,
+        rot_b: torch.Tensor,
+        rot_c: torch.Tensor,
+        rot_a_star: torch.Tensor,
+        rot_b_star: torch.Tensor,
+        rot_c_star: torch.Tensor,
+        n_sources: int,
+        source_directions: Optional[torch.Tensor],
+        source_wavelengths_A: Optional[torch.Tensor],
+        source_weights: Optional[torch.Tensor],
+        oversample: int,
+        oversample_omega: bool,
+        cache_polarization: bool = True,
+    ) -> torch.Tensor:
+        """
+        Accumulate omega-weighted intensity in memory-budgeted tiles.
+
+        PERF-TILING-001: The full path materialises every
+        (source, pixel, subpixel, phi, mosaic) sample at once. Here the sample
+        space is split into tiles along all six axes (rows, columns, sources,
+        phi, mosaic, subpixels) and partial sums are accumulated in place, so
+        peak memory scales with the tile size rather than the total sample count.
+        All reductions are sums, so the result matches the full path up to
+        floating-point summation order.
+
+        The returned tensor corresponds to `normalized_intensity` in run():
+        omega has been applied (per subpixel or last-value), but absorption,
+        r_e²·fluence/steps scaling, background and ROI masking have not.
+
+        Tiles run the compiled kernel (PERF-BUCKET-001): the pixel and subpixel
+        axes of edge tiles are padded to the full tile size, so only the
+        orientation and source edge tiles add compiled shapes. Polarization
+        factors come from the geometry cache (PERF-GEOCACHE-001), keyed by the
+        tile's position.
+
+        Note: with requires_grad inputs autograd keeps every tile's graph alive,
+        so the memory bound applies to inference runs.
+
+        Args:
+            budget_bytes: Memory budget in bytes, or None for a single tile
+            pixel_coords_meters: Full detector pixel coordinates (S, F, 3) in meters
+            rot_a, rot_b, rot_c: Rotated real-space lattice vectors (N_phi, N_mos, 3)
+            rot_a_star, rot_b_star, rot_c_star: Rotated reciprocal vectors (N_phi, N_mos, 3)
+            n_sources: Number of beam sources
+            source_directions: Source direction vectors (n_sources, 3) or None
+            source_wavelengths_A: Source wavelengths in Angstroms (n_sources,) or None
+            source_weights: Source weights (n_sources,) or None
+            oversample: Subpixel oversampling factor
+            oversample_omega: Apply solid angle per subpixel
+            cache_polarization: Cache polarization per tile; False when the pixel
+                coordinates change between runs (sparse footprints)
+
+        Returns:
+            Tensor of shape (S, F) with omega-weighted, unscaled intensities
+        """
+        S, F, _ = pixel_coords_meters.shape
+        n_phi, n_mos = rot_a.shape[0], rot_a.shape[1]
+        n_sub = oversample * oversample
+
+        if budget_bytes is None:
+            plan = TilePlan(rows=S, cols=F, sources=n_sources, phi=n_phi,
+                            mosaic=n_mos, subpixels=n_sub)
+        else:
+            # Per-sample working set, plus the fixed cost of coordinates and accumulator
+            element_size = torch.empty((), dtype=self.dtype).element_size()
+            elements_per_sample = self._elements_per_sample()
+            fixed_bytes = S * F * 4 * element_size
+            if budget_bytes <= fixed_bytes:
+                raise ValueError(
+                    f"Memory budget of {budget_bytes} bytes does not cover the detector "
+                    f"coordinates and accumulator ({fixed_bytes} bytes)"
+                )
+
+            plan = plan_tiles(
+                budget_bytes - fixed_bytes,
+                n_rows=S,
+                n_cols=F,
+                n_sources=n_sources,
+                n_phi=n_phi,
+                n_mosaic=n_mos,
+                n_subpixels=n_sub,
+                bytes_per_sample=elements_per_sample * element_size,
+            )
+
+        # PERF-F32-001: A float32 accumulator summed over many orientation tiles is
+        # Kahan-compensated; a single tile per sample needs no compensation
+        use_kahan = (
+            self._range_reduction
+            and self.dtype == torch.float32
+            and (plan.sources < n_sources or plan.phi < n_phi or plan.mosaic < n_mos)
+        )
+
+        # Subpixel offsets (same construction as run(); zero offset when oversample == 1)
+        subpixel_step = 1.0 / oversample
+        offset_start = -0.5 + subpixel_step / 2.0
+        subpixel_offsets = offset_start + torch.arange(
+            oversample, device=self.device, dtype=self.dtype
+        ) * subpixel_step
+        sub_s, sub_f = torch.meshgrid(subpixel_offsets, subpixel_offsets, indexing='ij')
+        pixel_size_m = torch.as_tensor(
+            self.detector.pixel_size, device=self.device, dtype=self.dtype
+        )
+        offset_vectors = (
+            (sub_s.flatten() * pixel_size_m).unsqueeze(-1) * self.detector.sdet_vec
+            + (sub_f.flatten() * pixel_size_m).unsqueeze(-1) * self.detector.fdet_vec
+        )  # (n_sub, 3)
+
+        close_distance_m = torch.as_tensor(
+            self.detector.close_distance, device=self.device, dtype=self.dtype
+        )
+
+        def solid_angle(coords_angstroms: torch.Tensor) -> torch.Tensor:
+            airpath_m = torch.sqrt(
+                torch.sum(coords_angstroms * coords_angstroms, dim=-1).clamp_min(1e-20)
+            ) * 1e-10
+            if self.detector.config.point_pixel:
+                return 1.0 / (airpath_m * airpath_m)
+            return (
+                (pixel_size_m * pixel_size_m)
+                / (airpath_m * airpath_m)
+                * close_distance_m
+                / airpath_m
+            )
+
+        output = torch.zeros(S, F, device=self.device, dtype=self.dtype)
+        pad_tiles = self._pads_kernel_inputs()
+        tile_points = plan.rows * plan.cols * plan.subpixels
+
+        def tile_polarization(coords: torch.Tensor, incident: torch.Tensor, tile: tuple):
+            if not cache_polarization:
+                if self.beam_config.nopolar:
+                    return None
+                return polarization_for_position(coords, incident, self.kahn_factor, self.polarization_axis)
+            return self._polarization(coords, incident, ("tile", oversample) + tile)
+
+        for s_start in range(0, S, plan.rows):
+            s_end = min(s_start + plan.rows, S)
+            for f_start in range(0, F, plan.cols):
+                f_end = min(f_start + plan.cols, F)
+                tile_coords = pixel_coords_meters[s_start:s_end, f_start:f_end, :]
+                tile_S, tile_F = tile_coords.shape[:2]
+                tile_sum = torch.zeros(tile_S, tile_F, device=self.device, dtype=self.dtype)
+
+                for u_start in range(0, n_sub, plan.subpixels):
+                    u_end = min(u_start + plan.subpixels, n_sub)
+                    sub_coords_ang = (
+                        tile_coords.unsqueeze(2) + offset_vectors[u_start:u_end]
+                    ) * 1e10  # (tile_S, tile_F, n_u, 3)
+                    coords_flat = sub_coords_ang.reshape(-1, 3).contiguous()
+                    n_points = coords_flat.shape[0]
+                    if pad_tiles and n_points < tile_points:
+                        # PERF-BUCKET-001: Repeat the last point (sliced off below)
+                        coords_flat = torch.cat(
+                            [coords_flat, coords_flat[-1:].expand(tile_points - n_points, 3)]
+                        )
+                    tile = (s_start, s_end, f_start, f_end, u_start, u_end, coords_flat.shape[0])
+                    physics = torch.zeros(n_points, device=self.device, dtype=self.dtype)
+                    # PERF-F32-001: Compensate the sequential sum over source/phi/mosaic tiles
+                    compensation = torch.zeros_like(physics) if use_kahan else None
+
+                    for src_start in range(0, n_sources, plan.sources):
+                        src_end = min(src_start + plan.sources, n_sources)
+                        if n_sources > 1:
+                            incident = -source_directions[src_start:src_end]
+                            wavelength = source_wavelengths_A[src_start:src_end]
+                            weights = (
+                                source_weights[src_start:src_end]
+                                if source_weights is not None else None
+                            )
+                        else:
+                            incident = self.incident_beam_direction
+                            wavelength = self.wavelength
+                            weights = None
+                        # PERF-GEOCACHE-001: Shared by every phi/mosaic tile of these sources
+                        polar = tile_polarization(coords_flat, incident, tile)
+
+                        for p_start in range(0, n_phi, plan.phi):
+                            p_end = min(p_start + plan.phi, n_phi)
+                            for m_start in range(0, n_mos, plan.mosaic):
+                                m_end = min(m_start + plan.mosaic, n_mos)
+                                tile_intensity, _ = self._compute_physics_for_position(
+                                    coords_flat,
+                                    rot_a[p_start:p_end, m_start:m_end],
+                                    rot_b[p_start:p_end, m_start:m_end],
+                                    rot_c[p_start:p_end, m_start:m_end],
+                                    rot_a_star[p_start:p_end, m_start:m_end],
+                                    rot_b_star[p_start:p_end, m_start:m_end],
+                                    rot_c_star[p_start:p_end, m_start:m_end],
+                                    incident_beam_direction=incident,
+                                    wavelength=wavelength,
+                                    source_weights=weights,
+                                    polar=polar,
+                                )
+                                tile_intensity = tile_intensity[:n_points]
+                                if compensation is not None:
+                                    physics, compensation = kahan_add(
+                                        physics, compensation, tile_intensity
+                                    )
+                                else:
+                                    physics += tile_intensity
+
+                    physics = physics.reshape(sub_coords_ang.shape[:-1])
+                    if oversample_omega:
+                        physics = physics * solid_angle(sub_coords_ang)
+                    tile_sum += torch.sum(physics, dim=2)
+
+                # Last-value semantics: omega of the final subpixel (pixel center when oversample == 1)
+                if not oversample_omega:
+                    last_coords_ang = (tile_coords + offset_vectors[-1]) * 1e10
+                    tile_sum = tile_sum * solid_angle(last_coords_ang)
+
+                output[s_start:s_end, f_start:f_end] = tile_sum
+
+        return output
+
+    def _sparse_active_mask(
+        self,
+        cutoff: float,
+        pixel_coords_meters: torch.Tensor,
+        rot_a: torch.Tensor,
+        rot_b: torch.Tensor,
+        rot_c: torch.Tensor,
+        rot_a_star: torch.Tensor,
+        rot_b_star: torch.Tensor,
+        rot_c_star: torch.Tensor,
+        n_sources: int,
+        source_directions: Optional[torch.Tensor],
+        source_wavelengths_A: Optional[torch.Tensor],
+        max_block_elements: int = 1 << 22,
+    ) -> torch.Tensor:
+        """
+        Predict which pixels can receive a lattice transform above `cutoff`.
+
+        PERF-SPARSE-001: Enumerates the reciprocal-lattice nodes reachable by the
+        detector (limited by dmin and, when default_F is 0, by the loaded HKL
+        range), keeps those within the F_latt half-width of the Ewald sphere for
+        each orientation and source, and stamps each spot's footprint onto the
+        pixel grid. The footprint radius is the half-width's angular size
+        projected onto the detector at the spot's obliquity, plus one pixel of
+        margin for subpixel sampling.
+
+        Curved detectors fall back to an all-active mask. Inside a frame-farm
+        row window (PERF-FARM-001) the mask covers only the window's rows.
+
+        Orientations are processed in blocks against all sources at once, so
+        the host only synchronizes once per block of max_block_elements
+        node-source-orientation candidates, not per orientation.
+
+        Returns:
+            Boolean mask of shape (S, F)
+        """
+        S, F, _ = pixel_coords_meters.shape
+        if self.detector.config.curved_detector:
+            print("WARNING: sparse rendering requires a planar detector; evaluating all pixels")
+            return torch.ones(S, F, dtype=torch.bool, device=self.device)
+
+        with torch.no_grad():
+            if n_sources > 1:
+                incidents = -source_directions.detach()
+                wavelengths_m = source_wavelengths_A.detach() * 1e-10
+            else:
+                incidents = self.incident_beam_direction.detach().reshape(1, 3)
+                wavelengths_m = self.wavelength.detach().reshape(1) * 1e-10
+
+            a_star = rot_a_star.detach().reshape(-1, 3)
+            b_star = rot_b_star.detach().reshape(-1, 3)
+            c_star = rot_c_star.detach().reshape(-1, 3)
+            n_orientations = a_star.shape[0]
+
+            # Reciprocal-space tolerance around each node (Å⁻¹ → m⁻¹)
+            halfwidth_m = lattice_halfwidth(
+                self.crystal.config.shape,
+                (float(self.crystal.N_cells_a), float(self.crystal.N_cells_b),
+                 float(self.crystal.N_cells_c)),
+                self.crystal.config.fudge,
+                cutoff,
+                tuple(v.norm(dim=-1).max().item() for v in (a_star, b_star, c_star)),
+            ) * 1e10
+
+            # Largest |q| the detector can see, limited by dmin
+            # PERF-FARM-001: Over the whole detector, so row windows stamp the same spots
+            pixel_coords = (
+                self._cached_pixel_coords_meters if self._row_window is not None else pixel_coords_meters
+            ).detach()
+            diffracted = pixel_coords / pixel_coords.norm(dim=-1, keepdim=True).clamp_min(1e-20)
+            q_max = torch.stack([
+                torch.norm(diffracted - incident, dim=-1).max() / wavelength
+                for incident, wavelength in zip(incidents, wavelengths_m)
+            ]).max().item()
+            if self.beam_config.dmin is not None and self.beam_config.dmin > 0:
+                q_max = min(q_max, 1.0 / (self.beam_config.dmin * 1e-10))
+            q_max += halfwidth_m
+
+            # Miller index box: |h| <= |q|·|a| (rot_a/b/c are in meters)
+            bounds = []
+            for real_vec in (rot_a, rot_b, rot_c):
+                n = math.ceil(q_max * real_vec.detach().norm(dim=-1).max().item())
+                bounds.append([-n, n])
+            meta = self.crystal.hkl_metadata
+            if self.crystal.hkl_data is not None and meta is not None and self.crystal.config.default_F == 0:
+                # Nodes outside the loaded range have F = default_F = 0
+                for bound, axis in zip(bounds, ("h", "k", "l")):
+                    bound[0] = max(bound[0], meta[f"{axis}_min"])
+                    bound[1] = min(bound[1], meta[f"{axis}_max"])
+
+            active = torch.zeros(S * F, dtype=torch.bool, device=self.device)
+            if any(lo > hi for lo, hi in bounds):
+                return active.reshape(S, F)
+
+            hkl = enumerate_hkl(*bounds, device=self.device, dtype=a_star.dtype)
+            pixel_size = float(self.detector.pixel_size)
+            row_offset = self._row_window[0] if self._row_window is not None else 0
+
+            bases = torch.stack([a_star, b_star, c_star], dim=1)  # (n_orientations, 3, 3) Å⁻¹
+            k_in = (incidents / wavelengths_m.unsqueeze(-1)).view(1, -1, 1, 3)  # (1, n_src, 1, 3)
+            ewald_radius = (1.0 / wavelengths_m).view(1, -1, 1)
+            candidate_wavelengths = wavelengths_m.view(1, -1, 1).expand(1, -1, hkl.shape[0])
+            block = max(1, max_block_elements // (3 * hkl.shape[0] * len(wavelengths_m)))
+
+            spots = []
+            for start in range(0, n_orientations, block):
+                G = torch.einsum("mj,ojk->omk", hkl, bases[start:start + block]) * 1e10  # (b, M, 3) m⁻¹
+                k_out = G.unsqueeze(1) + k_in  # (b, n_src, M, 3)
+                k_out_norm = k_out.norm(dim=-1)
+                near = (k_out_norm - ewald_radius).abs() <= halfwidth_m
+
+                directions = k_out[near] / k_out_norm[near].unsqueeze(-1)
+                s_cont, f_cont, path_length, obliquity = project_to_planar_detector(
+                    directions,
+                    self.detector.pix0_vector.detach(),
+                    self.detector.fdet_vec.detach(),
+                    self.detector.sdet_vec.detach(),
+                    self.detector.odet_vec.detach(),
+                    pixel_size,
+                )
+                on_plane = obliquity > 0
+                wavelength = candidate_wavelengths.expand(near.shape)[near]
+                radius = (
+                    halfwidth_m * wavelength[on_plane] * path_length[on_plane]
+                    / (obliquity[on_plane] * pixel_size)
+                ) + 1.0
+                # PERF-FARM-001: Spot positions are detector rows; shift into the row window
+                spots.append((s_cont[on_plane] - row_offset, f_cont[on_plane], radius))
+
+            s_all, f_all, radius_all = (torch.cat(parts) for parts in zip(*spots))
+            if radius_all.numel() > 0:
+                self._stamp_footprints(active, s_all, f_all, radius_all, S, F)
+
+        return active.reshape(S, F)
+
+    @staticmethod
+    def _stamp_footprints(
+        active: torch.Tensor,
+        s_cont: torch.Tensor,
+        f_cont: torch.Tensor,
+        radius: torch.Tensor,
+        S: int,
+        F: int,
+        max_window_elements: int = 1 << 22,
+    ) -> None:
+        """Mark pixels within `radius` pixels of each spot center in the flat `active` mask."""
+        r_max = min(int(math.ceil(radius.max().item())), max(S, F))
+        offsets = torch.arange(-r_max, r_max + 1, device=active.device)
+        ds, df = torch.meshgrid(offsets, offsets, indexing='ij')
+        ds = ds.reshape(1, -1)
+        df = df.reshape(1, -1)
+        dist_sqr = (ds * ds + df * df).to(radius.dtype)
+
+        s_center = torch.floor(s_cont).long().unsqueeze(-1)
+        f_center = torch.floor(f_cont).long().unsqueeze(-1)
+        spots_per_chunk = max(1, max_window_elements // ds.shape[1])
+
+        for start in range(0, s_center.shape[0], spots_per_chunk):
+            end = start + spots_per_chunk
+            s_idx = s_center[start:end] + ds
+            f_idx = f_center[start:end] + df
+            keep = (
+                (dist_sqr <= (radius[start:end].unsqueeze(-1) + 0.5) ** 2)
+                & (s_idx >= 0) & (s_idx < S) & (f_idx >= 0) & (f_idx < F)
+            )
+            active[(s_idx * F + f_idx)[keep]] = True
+
+    def _accumulate_sparse(
+        self,
+        cutoff: float,
+        budget_bytes: Optional[int],
+        pixel_coords_meters: torch.Tensor,
+        rot_a: torch.Tensor,
+        rot_b: torch.Tensor,
+        rot_c: torch.Tensor,
+        rot_a_star: torch.Tensor,
+        rot_b_star: torch.Tensor,
+        rot_c_star: torch.Tensor,
+        n_sources: int,
+        source_directions: Optional[torch.Tensor],
+        source_wavelengths_A: Optional[torch.Tensor],
+        source_weights: Optional[torch.Tensor],
+        oversample: int,
+        oversample_omega: bool,
+    ) -> torch.Tensor:
+        """
+        Reflection-driven ("splatting") accumulation over predicted spot footprints.
+
+        PERF-SPARSE-001: Pixels outside every footprint are left at zero; pixels
+        inside are evaluated with the exact physics (all sources, phi steps,
+        mosaic domains and subpixels), so the only approximation is dropping
+        lattice-transform tails below `cutoff`·Na·Nb·Nc.
+
+        Returns:
+            Tensor of shape (S, F), same contract as _accumulate_tiled()
+        """
+        S, F, _ = pixel_coords_meters.shape
+        active = self._sparse_active_mask(
+            cutoff, pixel_coords_meters,
+            rot_a, rot_b, rot_c, rot_a_star, rot_b_star, rot_c_star,
+            n_sources, source_directions, source_wavelengths_A,
+        )
+
+        output = torch.zeros(S, F, device=self.device, dtype=self.dtype)
+        active_coords = pixel_coords_meters[active]
+        if active_coords.shape[0] == 0:
+            return output
+
+        # Evaluate active pixels as an (N, 1) strip so tiling/oversampling are reused
+        active_intensity = self._accumulate_tiled(
+            budget_bytes=budget_bytes,
+            pixel_coords_meters=active_coords.unsqueeze(1),
+            rot_a=rot_a,
+            rot_b=rot_b,
+            rot_c=rot_c,
+            rot_a_star=rot_a_star,
+            rot_b_star=rot_b_star,
+            rot_c_star=rot_c_star,
+            n_sources=n_sources,
+            source_directions=source_directions,
+            source_wavelengths_A=source_wavelengths_A,
+            source_weights=source_weights,
+            oversample=oversample,
+            oversample_omega=oversample_omega,
+            cache_polarization=False,
+        )
+        return output.masked_scatter(active, active_intensity.reshape(-1))
+
     def run(
         self,
         pixel_batch_size: Optional[int] = None,
@@ -1128,6 +2243,9 @@ class Simulator:
         oversample_omega: Optional[bool] = None,
         oversample_polar: Optional[bool] = None,
         oversample_thick: Optional[bool] = None,
+        mem_budget: Optional[Union[int, str]] = None,
+        sparse_cutoff: Optional[float] = None,
+        distributed: bool = False,
     ) -> torch.Tensor:
         """
         Run the diffraction simulation with crystal rotation and mosaicity.
@@ -1193,10 +2311,138 @@ class Simulator:
             oversample_omega: Apply solid angle per subpixel. Defaults to detector config.
             oversample_polar: Apply polarization per subpixel. Defaults to detector config.
             oversample_thick: Apply absorption per subpixel. Defaults to detector config.
+            mem_budget: If specified, accumulate the image in tiles over pixels,
+                sources, phi steps, mosaic domains and subpixels so that peak
+                memory of a kernel call stays within this budget. Accepts bytes
+                or a size string such as "8G" (PERF-TILING-001). Takes precedence
+                over pixel_batch_size. Ignored when -printout/-trace_pixel is active,
+                since debug output needs the full intermediate tensors.
+            sparse_cutoff: If specified (0 < cutoff < 1), render in reflection-driven
+                sparse mode: only pixels inside predicted spot footprints, where
+                |F_latt| can exceed cutoff × Na·Nb·Nc, are evaluated; all others are
+                zero (PERF-SPARSE-001). Intended for large crystals, where most
+                pixels carry no lattice transform. Combines with mem_budget and has
+                the same debug-output restriction.
+            distributed: If True, render blocks of detector rows on the ranks of the
+                initialized torch.distributed process group (gloo) and sum them on
+                rank 0 (PERF-DIST-001). Blocks are assigned by estimated cost, so
+                sparse rendering balances spot-rich rows. Must be called on every rank.
+
+        With a result_cache, whole-image runs whose inputs match a stored
+        entry return the stored image without simulating (PERF-RESULTCACHE-001);
+        see result_key(). A cache hit skips the run's side effects (logs,
+        HKL statistics, the interpolation range check).
 
         Returns:
             torch.Tensor: Final diffraction image with shape (spixels, fpixels).
+                In distributed mode, ranks other than 0 return None.
         """
+        run_kwargs = dict(
+            pixel_batch_size=pixel_batch_size,
+            override_a_star=override_a_star,
+            oversample=oversample,
+            oversample_omega=oversample_omega,
+            oversample_polar=oversample_polar,
+            oversample_thick=oversample_thick,
+            mem_budget=mem_budget,
+            sparse_cutoff=sparse_cutoff,
+        )
+        key = None if distributed else self.result_key(run_kwargs)
+        self.last_result_key = key
+        if key is not None:
+            cached = self.result_cache.load(key)
+            if cached is not None:
+                return torch.from_numpy(cached['image']).to(device=self.device, dtype=self.output_dtype)
+
+        image = self._render(distributed=distributed, **run_kwargs)
+        if key is not None:
+            self.result_cache.store(key, image=image.detach().cpu().numpy())
+        return image
+
+    def result_key(self, run_kwargs: dict) -> Optional[str]:
+        """
+        Result-cache key of a run with these arguments (PERF-RESULTCACHE-001).
+
+        Hashes what a run reads: the crystal, detector and beam configurations,
+        the crystal's cell tensors and interpolation mode, the HKL grid and its
+        bounds, the pixel positions and ROI mask, sources and fluence, dtypes,
+        device type, debug options, the run arguments and the package version.
+
+        Returns:
+            Hex key, or None if there is no result_cache or the run cannot be
+            cached: debug output or HKL statistics are requested, only part of
+            the detector is rendered, or an input requires grad
+        """
+        if (
+            self.result_cache is None
+            or self.diagnostics
+            or self._hkl_stats is not None
+            or self._row_window is not None
+            or self._pixel_list is not None
+        ):
+            return None
+        from . import __version__
+
+        self._refresh_geometry()
+        crystal = self.crystal
+        state = {
+            'version': __version__,
+            'crystal_config': crystal.config,
+            'detector_config': self.detector.config,
+            'beam_config': self.beam_config,
+            'crystal': {
+                name: getattr(crystal, name) for name in (
+                    'cell_a', 'cell_b', 'cell_c', 'cell_alpha', 'cell_beta', 'cell_gamma',
+                    'N_cells_a', 'N_cells_b', 'N_cells_c',
+                )
+            },
+            'interpolate': bool(crystal.interpolate),
+            'hkl': (crystal.hkl_data, crystal.hkl_metadata),
+            'pixels': (self._cached_pixel_coords_meters, self._cached_roi_mask),
+            'sources': (self._source_directions, self._source_wavelengths_A, self._source_weights),
+            'fluence': self.fluence,
+            'dtypes': (self.dtype, self._physics_dtype, self.output_dtype),
+            'device': self.device.type,
+            'debug_config': self.debug_config,
+            'run': run_kwargs,
+        }
+        try:
+            return canonical_hash(state)
+        except ValueError:
+            return None
+
+    def _render(
+        self,
+        pixel_batch_size: Optional[int] = None,
+        override_a_star: Optional[torch.Tensor] = None,
+        oversample: Optional[int] = None,
+        oversample_omega: Optional[bool] = None,
+        oversample_polar: Optional[bool] = None,
+        oversample_thick: Optional[bool] = None,
+        mem_budget: Optional[Union[int, str]] = None,
+        sparse_cutoff: Optional[float] = None,
+        distributed: bool = False,
+    ) -> torch.Tensor:
+        """Render the image of run(), bypassing the result cache."""
+        if distributed:
+            return self._run_distributed(dict(
+                pixel_batch_size=pixel_batch_size,
+                override_a_star=override_a_star,
+                oversample=oversample,
+                oversample_omega=oversample_omega,
+                oversample_polar=oversample_polar,
+                oversample_thick=oversample_thick,
+                mem_budget=mem_budget,
+                sparse_cutoff=sparse_cutoff,
+            ))
+
+        # PERF-LEAN-001: Start a fresh set of on-device HKL counters for this run
+        if self._hkl_stats is not None:
+            self._hkl_stats.reset()
+
+        # PERF-KERNEL-001: HKL data or -nopolar may have changed since construction
+        self._refresh_physics_kernel()
+
         # Unified vectorization path (spec-compliant fresh rotations)
         # Get oversampling parameters from detector config if not provided
         if oversample is None:
@@ -1210,29 +2456,7 @@ class Simulator:
 
         # Auto-select oversample if set to -1 (matches C behavior)
         if oversample == -1:
-            # Calculate maximum crystal dimension in meters
-            xtalsize_max = max(
-                abs(self.crystal.config.cell_a * 1e-10 * self.crystal.config.N_cells[0]),  # a*Na in meters
-                abs(self.crystal.config.cell_b * 1e-10 * self.crystal.config.N_cells[1]),  # b*Nb in meters
-                abs(self.crystal.config.cell_c * 1e-10 * self.crystal.config.N_cells[2])   # c*Nc in meters
-            )
-
-            # Calculate reciprocal pixel size in meters
-            # reciprocal_pixel_size = λ * distance / pixel_size (all in meters)
-            wavelength_m = self.wavelength * 1e-10  # Convert from Angstroms to meters
-            distance_m = self.detector.config.distance_mm / 1000.0  # Convert from mm to meters
-            pixel_size_m = self.detector.config.pixel_size_mm / 1000.0  # Convert from mm to meters
-            reciprocal_pixel_size = wavelength_m * distance_m / pixel_size_m
-
-            # Calculate recommended oversample using C formula
-            import math
-            recommended_oversample = math.ceil(3.0 * xtalsize_max / reciprocal_pixel_size)
-
-            # Ensure at least 1
-            if recommended_oversample <= 0:
-                recommended_oversample = 1
-
-            oversample = recommended_oversample
+            oversample = self._auto_oversample()
             print(f"auto-selected {oversample}-fold oversampling")
 
         # For now, we'll implement the base case without oversampling for this test
@@ -1243,8 +2467,30 @@ class Simulator:
         roi_mask = self._cached_roi_mask
 
         # PERF-PYTORCH-004 P3.4: Use cached pixel coordinates instead of fetching/converting every run
+        self._refresh_geometry()
         pixel_coords_meters = self._cached_pixel_coords_meters
 
+        # PERF-FARM-001 / PERF-COMPACT-001: Restrict to a row block or a pixel list
+        pixel_coords_meters = self._select_pixels(pixel_coords_meters)
+        roi_mask = self._select_pixels(roi_mask)
+
+        # PERF-COMPACT-001: Evaluate only pixels inside the ROI/mask and within dmin
+        # when few are active; otherwise the ROI multiply below zeroes the rest.
+        # Sparse rendering already evaluates a pixel subset, and debug output needs the full grid
+        if (self._pixel_list is None and sparse_cutoff is None
+                and not (self.printout or self.trace_pixel)):
+            active = self._active_pixel_mask(pixel_coords_meters, roi_mask, oversample)
+            if active is not None and _compacts(int(active.sum()), active.numel()):
+                return self._run_compacted(active, roi_mask, dict(
+                    pixel_batch_size=pixel_batch_size,
+                    override_a_star=override_a_star,
+                    oversample=oversample,
+                    oversample_omega=oversample_omega,
+                    oversample_polar=oversample_polar,
+                    oversample_thick=oversample_thick,
+                    mem_budget=mem_budget,
+                ))
+
         # Get rotated lattice vectors for all phi steps and mosaic domains
         # Shape: (N_phi, N_mos, 3)
         # PERF-PYTORCH-006: Convert crystal vectors to correct device/dtype
@@ -1327,8 +2573,20 @@ class Simulator:
         # PIXEL-BATCH-001: Route to chunked execution path for memory-constrained scenarios
         # When pixel_batch_size is specified and less than detector rows, process in chunks
         S, F, _ = pixel_coords_meters.shape
-        if pixel_batch_size is not None and pixel_batch_size < S:
-            return self._run_chunked(
+
+        # PERF-TILING-001: Memory-budgeted tiling replaces row chunking when requested
+        use_tiled = mem_budget is not None
+        # PERF-SPARSE-001: Reflection-driven rendering over predicted spot footprints
+        use_sparse = sparse_cutoff is not None
+        if use_sparse and not 0.0 < sparse_cutoff < 1.0:
+            raise ValueError(f"sparse_cutoff must be in (0, 1), got {sparse_cutoff}")
+        if (use_tiled or use_sparse) and (self.printout or self.trace_pixel):
+            print("WARNING: mem_budget/sparse_cutoff ignored while printout/trace_pixel is active")
+            use_tiled = False
+            use_sparse = False
+
+        if pixel_batch_size is not None and pixel_batch_size < S and not (use_tiled or use_sparse):
+            chunked_intensity = self._run_chunked(
                 pixel_batch_size=pixel_batch_size,
                 pixel_coords_meters=pixel_coords_meters,
                 rot_a=rot_a,
@@ -1348,64 +2606,56 @@ class Simulator:
                 oversample_thick=oversample_thick,
                 roi_mask=roi_mask,
             )
+            self._report_hkl_stats()
+            return chunked_intensity.to(dtype=self.output_dtype)
 
         # Apply physical scaling factors (from nanoBragg.c ~line 3050)
         # Solid angle correction, converting all units to meters for calculation
 
         # Check if we're doing subpixel sampling
-        if oversample > 1:
+        if use_sparse:
+            normalized_intensity = self._accumulate_sparse(
+                cutoff=sparse_cutoff,
+                budget_bytes=parse_memory_budget(mem_budget) if use_tiled else None,
+                pixel_coords_meters=pixel_coords_meters,
+                rot_a=rot_a,
+                rot_b=rot_b,
+                rot_c=rot_c,
+                rot_a_star=rot_a_star,
+                rot_b_star=rot_b_star,
+                rot_c_star=rot_c_star,
+                n_sources=n_sources,
+                source_directions=source_directions,
+                source_wavelengths_A=source_wavelengths_A,
+                source_weights=source_weights,
+                oversample=oversample,
+                oversample_omega=oversample_omega,
+            )
+        elif use_tiled:
+            # PERF-TILING-001: Accumulate over tiles; omega is folded in per tile
+            # and absorption/scaling/ROI are applied below as in the full path
+            normalized_intensity = self._accumulate_tiled(
+                budget_bytes=parse_memory_budget(mem_budget),
+                pixel_coords_meters=pixel_coords_meters,
+                rot_a=rot_a,
+                rot_b=rot_b,
+                rot_c=rot_c,
+                rot_a_star=rot_a_star,
+                rot_b_star=rot_b_star,
+                rot_c_star=rot_c_star,
+                n_sources=n_sources,
+                source_directions=source_directions,
+                source_wavelengths_A=source_wavelengths_A,
+                source_weights=source_weights,
+                oversample=oversample,
+                oversample_omega=oversample_omega,
+            )
+        elif oversample > 1:
             # VECTORIZED IMPLEMENTATION: Process all subpixels in parallel
-            # Generate subpixel offsets (centered on pixel center)
-            # Per spec: "Compute detector-plane coordinates (meters): Fdet and Sdet at subpixel centers."
-            # Create offsets in fractional pixel units
-            subpixel_step = 1.0 / oversample
-            offset_start = -0.5 + subpixel_step / 2.0
-
-            # Use manual arithmetic to preserve gradients (avoid torch.linspace)
-            subpixel_offsets = offset_start + torch.arange(
-                oversample, device=self.device, dtype=self.dtype
-            ) * subpixel_step
-
-            # Create grid of subpixel offsets
-            sub_s, sub_f = torch.meshgrid(subpixel_offsets, subpixel_offsets, indexing='ij')
-            # Flatten the grid for vectorized processing
-            # Shape: (oversample*oversample,)
-            sub_s_flat = sub_s.flatten()
-            sub_f_flat = sub_f.flatten()
-
-            # Get detector basis vectors for proper coordinate transformation
-            f_axis = self.detector.fdet_vec  # Shape: [3]
-            s_axis = self.detector.sdet_vec  # Shape: [3]
+            # PERF-GEOCACHE-001: Subpixel positions and solid angles come from the geometry cache
+            coords_reshaped, omega_all = self._subpixel_geometry(pixel_coords_meters, oversample)
             S, F = pixel_coords_meters.shape[:2]
-
-            # VECTORIZED: Create all subpixel positions at once
-            # Shape: (oversample*oversample, 3)
-            # Convert detector properties to tensors with correct device/dtype (AT-PERF-DEVICE-001)
-            # Use as_tensor to avoid warnings when value might already be a tensor
-            pixel_size_m_tensor = torch.as_tensor(self.detector.pixel_size, device=pixel_coords_meters.device, dtype=pixel_coords_meters.dtype)
-            delta_s_all = sub_s_flat * pixel_size_m_tensor
-            delta_f_all = sub_f_flat * pixel_size_m_tensor
-
-            # Shape: (oversample*oversample, 3)
-            offset_vectors = delta_s_all.unsqueeze(-1) * s_axis + delta_f_all.unsqueeze(-1) * f_axis
-
-            # Expand pixel_coords for all subpixels
-            # Shape: (S, F, oversample*oversample, 3)
-            pixel_coords_expanded = pixel_coords_meters.unsqueeze(2).expand(S, F, oversample*oversample, 3)
-            offset_vectors_expanded = offset_vectors.unsqueeze(0).unsqueeze(0).expand(S, F, oversample*oversample, 3)
-
-            # All subpixel coordinates at once
-            # Shape: (S, F, oversample*oversample, 3)
-            subpixel_coords_all = pixel_coords_expanded + offset_vectors_expanded
-
-            # Convert to Angstroms for physics
-            subpixel_coords_ang_all = subpixel_coords_all * 1e10
-
-            # VECTORIZED PHYSICS: Process all subpixels at once
-            # Reshape to (S*F*oversample^2, 3) for physics calculation
-            # Use .contiguous() to avoid CUDA graphs tensor reuse errors
-            batch_shape = subpixel_coords_ang_all.shape[:-1]
-            coords_reshaped = subpixel_coords_ang_all.reshape(-1, 3).contiguous()
+            batch_shape = (S, F, oversample * oversample)
 
             # Compute physics for all subpixels and sources (VECTORIZED)
             if n_sources > 1:
@@ -1422,7 +2672,8 @@ class Simulator:
                     coords_reshaped, rot_a, rot_b, rot_c, rot_a_star, rot_b_star, rot_c_star,
                     incident_beam_direction=incident_dirs_batched,
                     wavelength=wavelengths_batched,
-                    source_weights=source_weights
+                    source_weights=source_weights,
+                    polar=self._polarization(coords_reshaped, incident_dirs_batched, ("subpixel", oversample)),
                 )
 
                 # Reshape back to (S, F, oversample*oversample)
@@ -1437,7 +2688,8 @@ class Simulator:
                 # Single source case: use default beam parameters
                 # CLI-FLAGS-003 Phase M1: Unpack both post-polar and pre-polar intensities
                 physics_intensity_flat, physics_intensity_pre_polar_flat = self._compute_physics_for_position(
-                    coords_reshaped, rot_a, rot_b, rot_c, rot_a_star, rot_b_star, rot_c_star
+                    coords_reshaped, rot_a, rot_b, rot_c, rot_a_star, rot_b_star, rot_c_star,
+                    polar=self._polarization(coords_reshaped, self.incident_beam_direction, ("subpixel", oversample)),
                 )
 
                 # Reshape back to (S, F, oversample*oversample)
@@ -1452,33 +2704,9 @@ class Simulator:
             # Only omega needs to be applied here for subpixel oversampling
             # NOTE: Do NOT divide by steps here - normalization happens once at final scaling (line ~1130)
 
-            # VECTORIZED AIRPATH AND OMEGA: Calculate for all subpixels
-            sub_squared_all = torch.sum(subpixel_coords_ang_all * subpixel_coords_ang_all, dim=-1)
-            # PERF-PYTORCH-004 Phase 1: Use clamp_min instead of torch.maximum to avoid allocating tensors inside compiled graph
-            sub_squared_all = sub_squared_all.clamp_min(1e-20)
-            sub_magnitudes_all = torch.sqrt(sub_squared_all)
-            airpath_m_all = sub_magnitudes_all * 1e-10
-
-            # Get close_distance from detector (computed during init)
-            # Convert detector properties to tensors with correct device/dtype (AT-PERF-DEVICE-001)
-            # Use as_tensor to avoid warnings when value might already be a tensor
-            close_distance_m = torch.as_tensor(self.detector.close_distance, device=airpath_m_all.device, dtype=airpath_m_all.dtype)
-            pixel_size_m = torch.as_tensor(self.detector.pixel_size, device=airpath_m_all.device, dtype=airpath_m_all.dtype)
-
-            # Calculate solid angle (omega) for all subpixels
-            # Shape: (S, F, oversample*oversample)
-            if self.detector.config.point_pixel:
-                omega_all = 1.0 / (airpath_m_all * airpath_m_all)
-            else:
-                omega_all = (
-                    (pixel_size_m * pixel_size_m)
-                    / (airpath_m_all * airpath_m_all)
-                    * close_distance_m
-                    / airpath_m_all
-                )
-
             # Apply omega based on oversample flags
-            intensity_all = subpixel_physics_intensity_all.clone()
+            # PERF-LEAN-001: The multiply below is out-of-place, so no defensive copy is needed
+            intensity_all = subpixel_physics_intensity_all
 
             if oversample_omega:
                 # Apply omega per subpixel
@@ -1489,7 +2717,8 @@ class Simulator:
             accumulated_intensity = torch.sum(intensity_all, dim=2)
 
             # Save pre-normalization intensity for trace (before last-value multiplication)
-            I_before_normalization = accumulated_intensity.clone()
+            # PERF-LEAN-001: Trace-only copy, skipped in production mode
+            I_before_normalization = accumulated_intensity.clone() if self.diagnostics else None
 
             # CLI-FLAGS-003 Phase M1c: Also sum pre-polar intensity for debug trace
             # C17 polarization guard: subpixel_physics_intensity_pre_polar_all is None when nopolar=True
@@ -1509,7 +2738,8 @@ class Simulator:
         else:
             # No subpixel sampling - compute physics once for pixel centers
             # SPEC MODE: Global vectorization per specs/spec-a-core.md:204-240
-            pixel_coords_angstroms = pixel_coords_meters * 1e10
+            # PERF-GEOCACHE-001: Positions in Å and solid angles come from the geometry cache
+            pixel_coords_angstroms, omega_pixel = self._pixel_geometry(pixel_coords_meters)
 
             # Compute physics for pixel centers with multiple sources if available
             if n_sources > 1:
@@ -1526,53 +2756,28 @@ class Simulator:
                     pixel_coords_angstroms, rot_a, rot_b, rot_c, rot_a_star, rot_b_star, rot_c_star,
                     incident_beam_direction=incident_dirs_batched,
                     wavelength=wavelengths_batched,
-                    source_weights=source_weights
+                    source_weights=source_weights,
+                    polar=self._polarization(pixel_coords_angstroms, incident_dirs_batched, ("pixel",)),
                 )
                 # The weighted sum over sources is done inside _compute_physics_for_position
             else:
                 # Single source case: use default beam parameters
                 # CLI-FLAGS-003 Phase M1: Unpack both post-polar and pre-polar intensities
                 intensity, I_before_normalization_pre_polar = self._compute_physics_for_position(
-                    pixel_coords_angstroms, rot_a, rot_b, rot_c, rot_a_star, rot_b_star, rot_c_star
+                    pixel_coords_angstroms, rot_a, rot_b, rot_c, rot_a_star, rot_b_star, rot_c_star,
+                    polar=self._polarization(pixel_coords_angstroms, self.incident_beam_direction, ("pixel",)),
                 )
 
             # CLI-FLAGS-003 Phase M1: Save both post-polar (current intensity) and pre-polar for trace
             # The current intensity already has polarization applied (from compute_physics_for_position)
-            I_before_normalization = intensity.clone()
+            # PERF-LEAN-001: Trace-only copy, skipped in production mode
+            I_before_normalization = intensity.clone() if self.diagnostics else None
 
             # PERF-PYTORCH-004 P3.0b: Polarization is now applied per-source inside compute_physics_for_position
             # Only omega needs to be applied here
             # NOTE: Do NOT divide by steps here - normalization happens once at final scaling (line ~1130)
             normalized_intensity = intensity
 
-            # Calculate airpath for pixel centers
-            pixel_squared_sum = torch.sum(
-                pixel_coords_angstroms * pixel_coords_angstroms, dim=-1, keepdim=True
-            )
-            # Use clamp_min to avoid creating fresh tensors in compiled graph (PERF-PYTORCH-004 P1.1)
-            pixel_squared_sum = pixel_squared_sum.clamp_min(1e-12)
-            pixel_magnitudes = torch.sqrt(pixel_squared_sum)
-            airpath = pixel_magnitudes.squeeze(-1)  # Remove last dimension for broadcasting
-            airpath_m = airpath * 1e-10  # Å to meters
-            # Convert detector properties to tensors with correct device/dtype (AT-PERF-DEVICE-001)
-            # Use as_tensor to avoid warnings when value might already be a tensor
-            close_distance_m = torch.as_tensor(self.detector.close_distance, device=airpath_m.device, dtype=airpath_m.dtype)
-            pixel_size_m = torch.as_tensor(self.detector.pixel_size, device=airpath_m.device, dtype=airpath_m.dtype)
-
-            # Calculate solid angle (omega) based on point_pixel mode
-            if self.detector.config.point_pixel:
-                # Point pixel mode: ω = 1 / R^2
-                omega_pixel = 1.0 / (airpath_m * airpath_m)
-            else:
-                # Standard mode with obliquity correction
-                # ω = (pixel_size^2 / R^2) · (close_distance/R)
-                omega_pixel = (
-                    (pixel_size_m * pixel_size_m)
-                    / (airpath_m * airpath_m)
-                    * close_distance_m
-                    / airpath_m
-                )
-
             # Apply omega directly
             normalized_intensity = normalized_intensity * omega_pixel
 
@@ -1635,7 +2840,7 @@ class Simulator:
 
         # Add water background if configured (AT-BKG-001)
         if self.beam_config.water_size_um > 0:
-            water_background = self._calculate_water_background()
+            water_background = self._select_pixels(self._calculate_water_background())
             physical_intensity = physical_intensity + water_background
 
         # Apply ROI/mask filter (AT-ROI-001)
@@ -1729,9 +2934,733 @@ class Simulator:
                 I_before_normalization_pre_polar  # Pre-polar accumulated intensity
             )
 
+        self._report_hkl_stats()
+
         # PERF-PYTORCH-006: Ensure output matches requested dtype
         # Some intermediate operations may upcast for precision, but final output should match dtype
-        return physical_intensity.to(dtype=self.dtype)
+        # PERF-MIXED-001: In mixed mode the image is returned in the physics dtype
+        return physical_intensity.to(dtype=self.output_dtype)
+
+    def run_pixels(
+        self,
+        slow_idx: torch.Tensor,
+        fast_idx: torch.Tensor,
+        pixel_batch_size: Optional[int] = None,
+        override_a_star: Optional[torch.Tensor] = None,
+        oversample: Optional[int] = None,
+        oversample_omega: Optional[bool] = None,
+        oversample_polar: Optional[bool] = None,
+        oversample_thick: Optional[bool] = None,
+        mem_budget: Optional[Union[int, str]] = None,
+    ) -> torch.Tensor:
+        """
+        Intensities at an arbitrary set of detector pixels (PERF-COMPACT-001).
+
+        Gathers the listed pixels into an (N, 1) strip and runs the regular
+        pipeline on it (physics, solid angle, polarization, absorption,
+        scaling, background and ROI/mask), so the cost scales with N rather
+        than with the detector size. The result equals run()[slow_idx, fast_idx]
+        up to floating-point rounding.
+
+        Args:
+            slow_idx: Slow-axis (row) indices, any shape
+            fast_idx: Fast-axis (column) indices, same shape as slow_idx
+            Remaining arguments: As for run()
+
+        Returns:
+            torch.Tensor: Intensities with the shape of slow_idx
+
+        Raises:
+            ValueError: If the index shapes differ or an index is out of range
+        """
+        slow_idx = torch.as_tensor(slow_idx, device=self.device, dtype=torch.long)
+        fast_idx = torch.as_tensor(fast_idx, device=self.device, dtype=torch.long)
+        if slow_idx.shape != fast_idx.shape:
+            raise ValueError(
+                f"slow_idx and fast_idx must have the same shape, got "
+                f"{tuple(slow_idx.shape)} and {tuple(fast_idx.shape)}"
+            )
+        S, F = self.detector.spixels, self.detector.fpixels
+        if slow_idx.numel() > 0 and not bool(
+            (slow_idx >= 0).all() & (slow_idx < S).all() & (fast_idx >= 0).all() & (fast_idx < F).all()
+        ):
+            raise ValueError(f"Pixel indices out of range for a {S}x{F} detector")
+        if slow_idx.numel() == 0:
+            return torch.zeros(slow_idx.shape, device=self.device, dtype=self.output_dtype)
+
+        saved = (self._row_window, self._pixel_list, self._pixel_list_key)
+        self._row_window = None
+        self._pixel_list = (slow_idx.reshape(-1), fast_idx.reshape(-1))
+        self._pixel_list_key = None
+        try:
+            values = self.run(
+                pixel_batch_size=pixel_batch_size,
+                override_a_star=override_a_star,
+                oversample=oversample,
+                oversample_omega=oversample_omega,
+                oversample_polar=oversample_polar,
+                oversample_thick=oversample_thick,
+                mem_budget=mem_budget,
+            )
+        finally:
+            self._row_window, self._pixel_list, self._pixel_list_key = saved
+        return values.reshape(slow_idx.shape)
+
+    def _select_pixels(self, full: torch.Tensor) -> torch.Tensor:
+        """
+        Restrict a full-detector (S, F, ...) tensor to the pixels being rendered.
+
+        PERF-FARM-001: a row block (start:end, F, ...).
+        PERF-COMPACT-001: a pixel list as an (N, 1, ...) strip.
+        """
+        if self._pixel_list is not None:
+            slow_idx, fast_idx = self._pixel_list
+            return full[slow_idx, fast_idx].unsqueeze(1)
+        if self._row_window is not None:
+            return full[slice(*self._row_window)]
+        return full
+
+    def _active_pixel_mask(
+        self, pixel_coords_meters: torch.Tensor, roi_mask: torch.Tensor, oversample: int
+    ) -> Optional[torch.Tensor]:
+        """
+        Pixels that can receive a nonzero intensity, or None if all can (PERF-COMPACT-001).
+
+        A pixel is inactive if the ROI/mask zeroes it, or if every subpixel is
+        beyond dmin for every source, in which case the kernel would cull all of
+        its samples. The dmin test mirrors the kernel's with a small margin, so
+        borderline pixels stay active and are culled by the kernel itself.
+        """
+        active = roi_mask != 0
+        dmin = self.beam_config.dmin
+        if dmin is not None and dmin > 0:
+            if self._source_directions is not None:
+                incident = -self._source_directions
+                wavelength = self._source_wavelengths_A
+            else:
+                incident = self.incident_beam_direction.reshape(1, 3)
+                wavelength = self.wavelength.reshape(1)
+
+            def compute():
+                if oversample > 1:
+                    coords, _ = self._subpixel_geometry(pixel_coords_meters, oversample)
+                else:
+                    coords, _ = self._pixel_geometry(pixel_coords_meters)
+                coords = coords.detach().reshape(-1, 3)
+                diffracted = coords / torch.sqrt(
+                    torch.sum(coords * coords, dim=-1, keepdim=True).clamp_min(1e-12)
+                )
+                # (n_sources, samples, 3), q in m⁻¹ as in the kernel
+                q = (diffracted.unsqueeze(0) - incident.detach().reshape(-1, 1, 3)) / (
+                    wavelength.detach().reshape(-1, 1, 1) * 1e-10
+                )
+                stol = 0.5 * torch.norm(q, dim=-1)
+                kept = (stol <= 0) | (stol <= (0.5 / dmin) * (1 + 1e-6))
+                return kept.any(dim=0).reshape(*pixel_coords_meters.shape[:2], -1).any(dim=-1)
+
+            active = active & self._geometry_factor(
+                ("dmin", dmin, oversample, tensor_key(incident), tensor_key(wavelength)),
+                compute,
+            )
+        if bool(active.all()):
+            return None
+        return active
+
+    def _run_compacted(self, active: torch.Tensor, roi_mask: torch.Tensor, run_kwargs: dict) -> torch.Tensor:
+        """
+        Render only the active pixels and scatter them into the image (PERF-COMPACT-001).
+
+        Inactive pixels receive no diffraction, so they hold what run() would
+        give them without it: the water background times the ROI mask.
+        """
+        slow_idx, fast_idx = torch.nonzero(active, as_tuple=True)
+        if self._row_window is not None:
+            slow_idx = slow_idx + self._row_window[0]
+        values = self.run_pixels(slow_idx, fast_idx, **run_kwargs)
+
+        image = torch.zeros(active.shape, device=self.device, dtype=self.output_dtype)
+        if self.beam_config.water_size_um > 0:
+            background = self._select_pixels(self._calculate_water_background())
+            image = (background * roi_mask).to(self.output_dtype)
+        return image.masked_scatter(active, values)
+
+    def run_adaptive(
+        self,
+        threshold: float = 0.01,
+        coarse_oversample: int = 1,
+        pixel_batch_size: Optional[int] = None,
+        override_a_star: Optional[torch.Tensor] = None,
+        oversample: Optional[int] = None,
+        oversample_omega: Optional[bool] = None,
+        oversample_polar: Optional[bool] = None,
+        oversample_thick: Optional[bool] = None,
+        mem_budget: Optional[Union[int, str]] = None,
+    ) -> torch.Tensor:
+        """
+        Render with subpixel sampling only where the pattern is sharp (PERF-ADAPTIVE-001).
+
+        A coarse pass renders every pixel with coarse_oversample² subpixels.
+        Pixels whose local curvature is at least threshold times the largest
+        curvature in the coarse image (spot peaks and flanks), grown by one
+        pixel, are then re-rendered with the full oversample² grid via
+        run_pixels(). Every pixel is normalized by its own number of steps,
+        so flat regions keep the cheap coarse value and refined pixels match
+        run(oversample=oversample).
+
+        Args:
+            threshold: Fraction of the maximum curvature in [0, 1] above which a
+                pixel is refined; 0 refines every pixel (equivalent to run())
+            coarse_oversample: Subpixels per axis of the coarse pass
+            oversample: Subpixels per axis of refined pixels. Defaults to the
+                detector config; -1 selects it automatically as in run()
+            Remaining arguments: As for run()
+
+        Returns:
+            torch.Tensor: Final diffraction image with shape (spixels, fpixels)
+
+        Raises:
+            ValueError: If threshold is outside [0, 1] or coarse_oversample < 1
+        """
+        if not 0.0 <= threshold <= 1.0:
+            raise ValueError(f"Adaptive oversampling threshold must be in [0, 1], got {threshold}")
+        if coarse_oversample < 1:
+            raise ValueError(f"coarse_oversample must be positive, got {coarse_oversample}")
+        if oversample is None:
+            oversample = self.detector.config.oversample
+        if oversample == -1:
+            oversample = self._auto_oversample()
+            print(f"auto-selected {oversample}-fold oversampling")
+
+        run_kwargs = dict(
+            pixel_batch_size=pixel_batch_size,
+            override_a_star=override_a_star,
+            oversample_omega=oversample_omega,
+            oversample_polar=oversample_polar,
+            oversample_thick=oversample_thick,
+            mem_budget=mem_budget,
+        )
+        coarse = self.run(oversample=min(coarse_oversample, oversample), **run_kwargs)
+        if oversample <= coarse_oversample:
+            return coarse
+
+        refine = refinement_mask(coarse, threshold, valid=self._cached_roi_mask != 0)
+        slow_idx, fast_idx = torch.nonzero(refine, as_tuple=True)
+        if slow_idx.numel() == 0:
+            return coarse
+        values = self.run_pixels(slow_idx, fast_idx, oversample=oversample, **run_kwargs)
+        return coarse.index_put((slow_idx, fast_idx), values)
+
+    def run_sweep(
+        self,
+        start_deg: float,
+        osc_deg: float,
+        n_frames: int,
+        nproc: int = 1,
+        **run_kwargs,
+    ) -> Iterator[torch.Tensor]:
+        """
+        Simulate a rotation sweep of consecutive oscillation frames (PERF-SWEEP-001).
+
+        Frame i integrates phi over [start_deg + i·osc_deg, start_deg + (i+1)·osc_deg)
+        with crystal.config.phi_steps steps, exactly as run() would with
+        phi_start_deg and osc_range_deg set to those values. Detector geometry,
+        structure factors, the compiled kernel and the geometry-factor cache are
+        built once and reused by every frame. Frames are yielded one at a time,
+        so memory stays flat regardless of n_frames.
+
+        With nproc > 1 the frames are rendered by a pool of worker processes
+        into one shared (n_frames, S, F) buffer (PERF-FARM-001) when the first
+        frame is requested, and are then yielded from it. Each worker renders
+        whole frames with run(), so the images are bit-identical to nproc=1
+        at the same number of intra-op threads (one per worker).
+
+        Args:
+            start_deg: Spindle angle at the start of the first frame
+            osc_deg: Oscillation range per frame (may be negative)
+            n_frames: Number of frames
+            nproc: Number of worker processes (CPU only)
+            **run_kwargs: Forwarded to run() for every frame
+
+        Returns:
+            Generator yielding n_frames images of shape (S, F). The crystal's
+            phi_start_deg and osc_range_deg are restored when it finishes or
+            is closed.
+
+        Raises:
+            ValueError: If n_frames < 1, osc_deg is zero, or nproc > 1 off the CPU
+        """
+        if n_frames < 1:
+            raise ValueError(f"Sweep needs at least one frame, got n_frames={n_frames}")
+        if osc_deg == 0:
+            raise ValueError("Sweep oscillation range must be non-zero")
+        if self._farm_nproc(nproc) > 1:
+            return self._farm_sweep_frames(float(start_deg), float(osc_deg), int(n_frames), nproc, run_kwargs)
+        return self._sweep_frames(float(start_deg), float(osc_deg), int(n_frames), run_kwargs)
+
+    def _sweep_frames(self, start_deg: float, osc_deg: float, n_frames: int, run_kwargs: dict):
+        config = self.crystal.config
+        saved = (config.phi_start_deg, config.osc_range_deg)
+        try:
+            for frame in range(n_frames):
+                config.phi_start_deg = start_deg + frame * osc_deg
+                config.osc_range_deg = osc_deg
+                yield self.run(**run_kwargs)
+        finally:
+            config.phi_start_deg, config.osc_range_deg = saved
+
+    def run_batch(
+        self,
+        orientations: torch.Tensor,
+        N_cells: Optional[torch.Tensor] = None,
+        fluence: Optional[torch.Tensor] = None,
+        batch_size: Optional[int] = None,
+        mem_budget: Union[int, str] = "1G",
+        oversample: Optional[int] = None,
+        oversample_omega: Optional[bool] = None,
+        oversample_thick: Optional[bool] = None,
+    ) -> torch.Tensor:
+        """
+        Simulate many still shots of differently oriented crystals (PERF-BATCH-001).
+
+        Serial crystallography needs thousands of images that differ only in
+        crystal orientation (and possibly size and fluence). Instead of one
+        run() per shot, shots are an extra leading batch axis of the physics
+        kernel, so detector geometry, polarization, structure factors and the
+        compiled kernel are shared and each kernel call covers several shots.
+
+        Shot i uses the lattice vectors of this crystal (misset, phi steps and
+        mosaic domains included) transformed by orientations[i]: real-space
+        vectors as M·a and reciprocal vectors as M⁻ᵀ·a*. With M a rotation this
+        reorients the crystal; a general M also changes the cell.
+
+        Args:
+            orientations: Orientation matrices (B, 3, 3)
+            N_cells: Optional per-shot crystal sizes (B, 3); defaults to the crystal's
+            fluence: Optional per-shot fluence (B,) in photons/m²; defaults to the beam's
+            batch_size: Shots per kernel call; by default as many as fit in mem_budget
+            mem_budget: Memory budget for one kernel call, in bytes or as a size string
+            oversample: Number of subpixel samples per axis. Defaults to detector config.
+            oversample_omega: Apply solid angle per subpixel. Defaults to detector config.
+            oversample_thick: Apply absorption per subpixel. Defaults to detector config.
+
+        Returns:
+            Images of shape (B, S, F). Use iter_batch() to stream them instead.
+
+        Raises:
+            ValueError: On inconsistent shapes, a non-positive batch_size, or a
+                budget too small for a single shot
+        """
+        self._validate_batch(orientations, N_cells, fluence, batch_size)
+        return torch.cat(list(self._batch_chunks(
+            orientations, N_cells, fluence, batch_size, mem_budget,
+            oversample, oversample_omega, oversample_thick,
+        )), dim=0)
+
+    def iter_batch(
+        self,
+        orientations: torch.Tensor,
+        N_cells: Optional[torch.Tensor] = None,
+        fluence: Optional[torch.Tensor] = None,
+        batch_size: Optional[int] = None,
+        mem_budget: Union[int, str] = "1G",
+        oversample: Optional[int] = None,
+        oversample_omega: Optional[bool] = None,
+        oversample_thick: Optional[bool] = None,
+    ) -> Iterator[torch.Tensor]:
+        """
+        Like run_batch(), but yield the (S, F) image of each shot in order.
+
+        Only one kernel batch of images is held at a time, so memory stays
+        flat regardless of the number of shots.
+        """
+        self._validate_batch(orientations, N_cells, fluence, batch_size)
+        return self._batch_shots(self._batch_chunks(
+            orientations, N_cells, fluence, batch_size, mem_budget,
+            oversample, oversample_omega, oversample_thick,
+        ))
+
+    @staticmethod
+    def _batch_shots(chunks: Iterator[torch.Tensor]):
+        for chunk in chunks:
+            yield from chunk.unbind(0)
+
+    @staticmethod
+    def _validate_batch(orientations, N_cells, fluence, batch_size) -> None:
+        if orientations.dim() != 3 or orientations.shape[1:] != (3, 3):
+            raise ValueError(f"orientations must have shape (B, 3, 3), got {tuple(orientations.shape)}")
+        n_shots = orientations.shape[0]
+        if n_shots < 1:
+            raise ValueError("orientations must contain at least one shot")
+        if N_cells is not None and tuple(N_cells.shape) != (n_shots, 3):
+            raise ValueError(f"N_cells must have shape ({n_shots}, 3), got {tuple(N_cells.shape)}")
+        if fluence is not None and tuple(fluence.shape) != (n_shots,):
+            raise ValueError(f"fluence must have shape ({n_shots},), got {tuple(fluence.shape)}")
+        if batch_size is not None and batch_size < 1:
+            raise ValueError(f"batch_size must be positive, got {batch_size}")
+
+    def _batch_chunks(
+        self,
+        orientations: torch.Tensor,
+        N_cells: Optional[torch.Tensor],
+        fluence: Optional[torch.Tensor],
+        batch_size: Optional[int],
+        mem_budget: Union[int, str],
+        oversample: Optional[int],
+        oversample_omega: Optional[bool],
+        oversample_thick: Optional[bool],
+    ):
+        """Yield (b, S, F) images per kernel batch; see run_batch()."""
+        if self._hkl_stats is not None:
+            self._hkl_stats.reset()
+        self._refresh_physics_kernel()
+
+        if oversample is None:
+            oversample = self.detector.config.oversample
+        if oversample_omega is None:
+            oversample_omega = self.detector.config.oversample_omega
+        if oversample_thick is None:
+            oversample_thick = self.detector.config.oversample_thick
+        if oversample == -1:
+            oversample = self._auto_oversample()
+            print(f"auto-selected {oversample}-fold oversampling")
+
+        self._refresh_geometry()
+        pixel_coords_meters = self._cached_pixel_coords_meters
+        S, F = pixel_coords_meters.shape[:2]
+
+        # Shared (N_phi, N_mos, 3) lattice vectors; real-space vectors in meters as in run()
+        (rot_a, rot_b, rot_c), (rot_a_star, rot_b_star, rot_c_star) = (
+            self.crystal.get_rotated_real_vectors(self.crystal.config)
+        )
+        real = [v.to(device=self.device, dtype=self.dtype) * 1e-10 for v in (rot_a, rot_b, rot_c)]
+        reciprocal = [v.to(device=self.device, dtype=self.dtype) for v in (rot_a_star, rot_b_star, rot_c_star)]
+
+        if self._source_directions is not None:
+            n_sources = len(self._source_directions)
+            incident = -self._source_directions
+            wavelength = self._source_wavelengths_A
+            source_weights = self._source_weights
+        else:
+            n_sources = 1
+            incident = self.incident_beam_direction
+            wavelength = None
+            source_weights = None
+
+        phi_steps = self.crystal.config.phi_steps
+        mosaic_domains = self.crystal.config.mosaic_domains
+        steps = n_sources * phi_steps * mosaic_domains * oversample * oversample
+
+        # PERF-GEOCACHE-001: Geometry and polarization are shared by every shot
+        if oversample > 1:
+            coords, omega = self._subpixel_geometry(pixel_coords_meters, oversample)
+            polar = self._polarization(coords, incident, ("subpixel", oversample))
+        else:
+            coords, omega = self._pixel_geometry(pixel_coords_meters)
+            polar = self._polarization(coords, incident, ("pixel",))
+
+        n_shots = orientations.shape[0]
+        if batch_size is None:
+            element_size = torch.empty((), dtype=self.dtype).element_size()
+            elements_per_sample = self._elements_per_sample()
+            batch_size = plan_shot_batch(
+                parse_memory_budget(mem_budget),
+                n_shots,
+                samples_per_shot=S * F * oversample * oversample * n_sources * phi_steps * mosaic_domains,
+                bytes_per_sample=elements_per_sample * element_size,
+            )
+
+        orientations = orientations.to(device=self.device, dtype=self.dtype)
+        inverse_transpose = torch.linalg.inv(orientations).transpose(-1, -2)
+        if N_cells is not None:
+            # Per-shot sizes broadcast as (b, 1, ...) against (b, [sources], *samples, N_phi, N_mos)
+            N_cells = N_cells.to(device=self.device, dtype=self.dtype)
+            n_view = (-1,) + (1,) * (coords.dim() - 1 + (n_sources > 1) + 2)
+        if fluence is not None:
+            fluence = fluence.to(device=self.device, dtype=self.dtype)
+
+        for start in range(0, n_shots, batch_size):
+            shots = slice(start, start + batch_size)
+            # (b, 3, 3) applied to (N_phi, N_mos, 3) -> (b, N_phi, N_mos, 3)
+            rot = [torch.einsum("bij,pmj->bpmi", orientations[shots], v) for v in real]
+            rot_star = [torch.einsum("bij,pmj->bpmi", inverse_transpose[shots], v) for v in reciprocal]
+            shot_N_cells = None
+            if N_cells is not None:
+                shot_N_cells = tuple(N_cells[shots, axis].reshape(n_view) for axis in range(3))
+
+            intensity, _ = self._compute_physics_for_position(
+                coords, *rot, *rot_star,
+                incident_beam_direction=incident,
+                wavelength=wavelength,
+                source_weights=source_weights,
+                polar=polar,
+                N_cells=shot_N_cells,
+            )
+
+            if oversample > 1:
+                intensity = intensity.reshape(-1, S, F, oversample * oversample)
+                if oversample_omega:
+                    intensity = torch.sum(intensity * omega, dim=-1)
+                else:
+                    intensity = torch.sum(intensity, dim=-1) * omega[:, :, -1]
+            else:
+                intensity = intensity * omega
+
+            if (self.detector.config.detector_thick_um is not None and
+                self.detector.config.detector_thick_um > 0 and
+                self.detector.config.detector_abs_um is not None and
+                self.detector.config.detector_abs_um > 0):
+                intensity = self._apply_detector_absorption(intensity, pixel_coords_meters, oversample_thick)
+
+            shot_fluence = self.fluence if fluence is None else fluence[shots].view(-1, 1, 1)
+            physical_intensity = intensity / steps * self.r_e_sqr * shot_fluence
+            if self.beam_config.water_size_um > 0:
+                physical_intensity = physical_intensity + self._calculate_water_background()
+            physical_intensity = physical_intensity * self._cached_roi_mask.to(physical_intensity.device)
+
+            yield physical_intensity.to(dtype=self.output_dtype)
+
+        self._report_hkl_stats()
+
+    def _farm_sweep_frames(
+        self, start_deg: float, osc_deg: float, n_frames: int, nproc: int, run_kwargs: dict
+    ):
+        config = self.crystal.config
+        run_kwargs = self._prepare_farm(run_kwargs)
+        S, F = self._cached_pixel_coords_meters.shape[:2]
+
+        def render(frame: int) -> torch.Tensor:
+            # Runs in a forked worker, so the crystal configuration is the worker's own copy
+            config.phi_start_deg = start_deg + frame * osc_deg
+            config.osc_range_deg = osc_deg
+            return self.run(**run_kwargs)
+
+        output = torch.empty(n_frames, S, F, dtype=self.output_dtype)
+        FrameFarm(nproc).map(render, output, list(range(n_frames)))
+        yield from output.unbind(0)
+
+    def run_parallel(self, nproc: int, block_rows: int = 16, **run_kwargs) -> torch.Tensor:
+        """
+        Render one image with detector row blocks spread over worker processes (PERF-FARM-001).
+
+        The structure-factor gather does not scale with intra-op threads, so
+        on many-core CPUs several single-threaded processes beat one process
+        with many threads. Workers are forked from this process and share the
+        structure factors, pixel coordinates and output image through shared
+        memory. Each block of rows runs through run() unchanged, restricted to
+        its rows, and blocks are handed out dynamically to balance uneven cost.
+
+        The image depends only on block_rows, not on nproc: nproc=1 computes
+        the same blocks in this process and gives a bit-identical image at the
+        same number of intra-op threads. It matches run() to rounding.
+
+        Args:
+            nproc: Number of worker processes
+            block_rows: Detector rows per work item
+            **run_kwargs: Forwarded to run() for every block
+
+        Returns:
+            torch.Tensor: Image of shape (spixels, fpixels)
+
+        Raises:
+            ValueError: If block_rows is not positive or nproc > 1 off the CPU
+        """
+        if block_rows < 1:
+            raise ValueError(f"block_rows must be positive, got {block_rows}")
+        nproc = self._farm_nproc(nproc)
+        if nproc == 1 and (self.printout or self.trace_pixel or self._hkl_stats is not None):
+            # Debug output and HKL statistics describe the whole image
+            return self.run(**run_kwargs)
+        run_kwargs = self._prepare_farm(run_kwargs)
+        S, F = self._cached_pixel_coords_meters.shape[:2]
+        blocks = [slice(start, min(start + block_rows, S)) for start in range(0, S, block_rows)]
+
+        def render(index: int) -> torch.Tensor:
+            return self._render_rows(blocks[index], run_kwargs)
+
+        output = torch.empty(S, F, dtype=self.output_dtype)
+        return FrameFarm(nproc).map(render, output, blocks)
+
+    def run_noise(
+        self, noise_config: NoiseConfig, frame: int = 0, block_rows: int = 16, nproc: int = 1, **run_kwargs
+    ) -> Tuple[torch.Tensor, int]:
+        """
+        Render a noise image block by block without the full float image (PERF-PHILOX-001).
+
+        Each block of detector rows is rendered as in run_parallel() and
+        turned into noise right away with counter_noise_image(), keyed on
+        the seed, the frame index and the pixel's index in the full image, so
+        only one block of the float image exists at a time (per worker) and
+        the noise does not depend on block_rows or nproc. Pixels with zero
+        intensity (outside the ROI or mask) are 0, as in the CLI noise image.
+
+        Args:
+            noise_config: Seed, ADC offset, readout noise, overload value and
+                intfile_scale (applied to the intensity before the noise)
+            frame: Frame index within a sweep
+            block_rows: Detector rows per work item
+            nproc: Number of worker processes
+            **run_kwargs: Forwarded to run() for every block
+
+        Returns:
+            Tuple of (int32 noise image of shape (spixels, fpixels),
+            number of overloaded pixels)
+
+        Raises:
+            ValueError: If block_rows is not positive or nproc > 1 off the CPU
+        """
+        if block_rows < 1:
+            raise ValueError(f"block_rows must be positive, got {block_rows}")
+        nproc = self._farm_nproc(nproc)
+        seed = noise_config.seed if noise_config.seed is not None else -int(time.time())
+        run_kwargs = self._prepare_farm(run_kwargs)
+        S, F = self._cached_pixel_coords_meters.shape[:2]
+        if self.printout or self.trace_pixel or self._hkl_stats is not None:
+            # Debug output and HKL statistics describe the whole image
+            block_rows = S
+        blocks = [slice(start, min(start + block_rows, S)) for start in range(0, S, block_rows)]
+
+        def render(index: int) -> torch.Tensor:
+            rows = blocks[index]
+            intensity = self._render_rows(rows, run_kwargs)
+            pixel_index = torch.arange(rows.start * F, rows.stop * F, device=intensity.device).view(-1, F)
+            return counter_noise_image(intensity, noise_config, seed, frame=frame, pixel_index=pixel_index)
+
+        output = torch.empty(S, F, dtype=torch.int32)
+        FrameFarm(nproc).map(render, output, blocks)
+        return output, int((output >= noise_config.overload_value).sum())
+
+    def _farm_nproc(self, nproc: int) -> int:
+        """Validate nproc; debug output and HKL statistics fall back to one process."""
+        if nproc < 1:
+            raise ValueError(f"nproc must be positive, got {nproc}")
+        if nproc > 1 and self.device.type != "cpu":
+            raise ValueError(f"Multi-process execution requires the CPU device, got {self.device}")
+        if nproc > 1 and (self.printout or self.trace_pixel or self._hkl_stats is not None):
+            print("WARNING: nproc ignored while printout/trace_pixel/hkl_stats is active")
+            return 1
+        return nproc
+
+    def _prepare_farm(self, run_kwargs: dict) -> dict:
+        """
+        Set up state shared by all work items before workers fork (PERF-FARM-001).
+
+        Moves the large read-only tensors to shared memory after _prepare_blocks().
+        """
+        run_kwargs = self._prepare_blocks(run_kwargs)
+        hkl_data = self.crystal.hkl_data
+        share_tensors(
+            *(hkl_data.tensors() if isinstance(hkl_data, BlockedHKLGrid) else (hkl_data,)),
+            self._cached_pixel_coords_meters,
+            self._cached_roi_mask,
+        )
+        return run_kwargs
+
+    def _prepare_blocks(self, run_kwargs: dict) -> dict:
+        """
+        Resolve per-image state once before rendering row blocks separately.
+
+        Selects the kernel, refreshes the pixel coordinates and resolves
+        auto-oversampling, which would otherwise be printed for every block.
+        """
+        self._refresh_physics_kernel()
+        self._refresh_geometry()
+        run_kwargs = dict(run_kwargs)
+        if run_kwargs.get("oversample") is None and self.detector.config.oversample == -1:
+            run_kwargs["oversample"] = self._auto_oversample()
+            print(f"auto-selected {run_kwargs['oversample']}-fold oversampling")
+        return run_kwargs
+
+    def _render_rows(self, rows: slice, run_kwargs: dict) -> torch.Tensor:
+        """run() restricted to a block of detector rows (PERF-FARM-001)."""
+        self._row_window = (rows.start, rows.stop)
+        try:
+            return self.run(**run_kwargs)
+        finally:
+            self._row_window = None
+
+    def _run_distributed(self, run_kwargs: dict, block_rows: int = 16) -> Optional[torch.Tensor]:
+        """
+        Render row blocks on the ranks of the default process group (PERF-DIST-001).
+
+        Every rank computes the same cost-balanced assignment, renders its
+        blocks into a zero image, and the images are summed on rank 0.
+        Debug output and HKL statistics describe a whole image, so with those
+        enabled rank 0 renders everything and the other ranks return None.
+        """
+        require_process_group()
+        rank = torch.distributed.get_rank()
+        if self.printout or self.trace_pixel or self._hkl_stats is not None:
+            print("WARNING: distributed rendering ignored while printout/trace_pixel/hkl_stats is active")
+            return self.run(**run_kwargs) if rank == 0 else None
+
+        run_kwargs = self._prepare_blocks(run_kwargs)
+        S, F = self._cached_pixel_coords_meters.shape[:2]
+        blocks = [slice(start, min(start + block_rows, S)) for start in range(0, S, block_rows)]
+        assignment = balance_blocks(self._block_costs(blocks, run_kwargs), torch.distributed.get_world_size())
+
+        # gloo collectives run on CPU tensors
+        image = torch.zeros(S, F, dtype=self.output_dtype)
+        for index in assignment[rank]:
+            image[blocks[index]] = self._render_rows(blocks[index], run_kwargs).detach().cpu()
+        image = reduce_to_root(image)
+        return image.to(self.device) if image is not None else None
+
+    def _block_costs(self, blocks, run_kwargs: dict) -> list:
+        """
+        Estimated cost of rendering each block of rows (PERF-DIST-001).
+
+        Every evaluated pixel costs the same number of (source, phi, mosaic,
+        subpixel) samples, so the cost is the count of evaluated pixels: the
+        pixels inside the ROI/mask and within dmin in dense mode where
+        compacted execution skips the others (PERF-COMPACT-001), every pixel
+        of a dense block that is not compacted, the predicted spot footprints
+        in sparse mode, plus a small per-pixel term for mask prediction and
+        assembly.
+        """
+        S, F = self._cached_pixel_coords_meters.shape[:2]
+        cutoff = run_kwargs.get("sparse_cutoff")
+        if cutoff is None:
+            oversample = run_kwargs.get("oversample") or self.detector.config.oversample
+            active = self._active_pixel_mask(self._cached_pixel_coords_meters, self._cached_roi_mask, oversample)
+            if active is None:
+                return [float((block.stop - block.start) * F) for block in blocks]
+            active_per_row = active.sum(dim=1).cpu()
+            costs = []
+            for block in blocks:
+                pixels = (block.stop - block.start) * F
+                n_active = int(active_per_row[block].sum())
+                # Each block decides on compaction as run() does under its row window
+                evaluated = n_active if _compacts(n_active, pixels) else pixels
+                costs.append(float(evaluated) + 0.01 * pixels)
+            return costs
+
+        (rot_a, rot_b, rot_c), (rot_a_star, rot_b_star, rot_c_star) = (
+            self.crystal.get_rotated_real_vectors(self.crystal.config)
+        )
+        real = [v.to(device=self.device, dtype=self.dtype) * 1e-10 for v in (rot_a, rot_b, rot_c)]
+        reciprocal = [v.to(device=self.device, dtype=self.dtype) for v in (rot_a_star, rot_b_star, rot_c_star)]
+        n_sources = len(self._source_directions) if self._source_directions is not None else 1
+        active = self._sparse_active_mask(
+            cutoff, self._cached_pixel_coords_meters, *real, *reciprocal,
+            n_sources, self._source_directions, self._source_wavelengths_A,
+        )
+        active_per_row = active.sum(dim=1).cpu()
+        return [
+            float(active_per_row[block].sum()) + 0.01 * (block.stop - block.start) * F
+            for block in blocks
+        ]
+
+    def _report_hkl_stats(self) -> None:
+        """Read the on-device HKL counters once and log them (PERF-LEAN-001).
+
+        Also applies the deferred interpolation range check (PERF-TRICUBIC-002).
+        """
+        self.crystal.check_interpolation_range()
+        if self._hkl_stats is None:
+            return
+        self.hkl_stats = self._hkl_stats.read()
+        if self.hkl_stats is not None:
+            print(HKLStatsCounter.format(self.hkl_stats))
 
     def _apply_debug_output(self,
                            physical_intensity,
@@ -2103,6 +4032,7 @@ class Simulator:
                                 apply_polarization=not self.beam_config.nopolar,
                                 kahn_factor=self.kahn_factor,
                                 polarization_axis=self.polarization_axis,
+                                diagnostics=True,
                             )
 
                             # Extract scalar values (detach from graph for logging)
@@ -2317,7 +4247,7 @@ class Simulator:
         ```
 
         Args:
-            intensity: Input intensity tensor [S, F]
+            intensity: Input intensity tensor [..., S, F]
             pixel_coords_meters: Pixel coordinates in meters [S, F, 3]
             oversample_thick: If True, apply absorption per layer; if False, use last-value semantics
 
@@ -2336,75 +4266,81 @@ class Simulator:
         - Preserves gradient flow for detector_thick_um, detector_abs_um, and geometry parameters
         """
         # Get detector parameters
-        thickness_m = self.detector.config.detector_thick_um * 1e-6  # μm to meters
+        thickness_um = self.detector.config.detector_thick_um
         thicksteps = self.detector.config.detector_thicksteps
+        abs_um = self.detector.config.detector_abs_um
 
-        # Calculate μ (absorption coefficient) from attenuation depth
-        # μ = 1 / (attenuation_depth_m)
-        attenuation_depth_m = self.detector.config.detector_abs_um * 1e-6  # μm to meters
-        mu = 1.0 / attenuation_depth_m  # m^-1
-
-        # Get detector normal vector (odet_vector)
-        detector_normal = self.detector.odet_vec  # Shape: [3]
-
-        # Calculate observation directions (normalized pixel coordinates)
-        # o = pixel_coords / |pixel_coords|
-        pixel_distances = torch.sqrt(torch.sum(pixel_coords_meters**2, dim=-1, keepdim=True))
-        # PERF-PYTORCH-004 Phase 1: Use clamp_min instead of torch.maximum to avoid allocating tensors inside compiled graph
-        observation_dirs = pixel_coords_meters / pixel_distances.clamp_min(1e-10)
-
-        # Calculate parallax factor: ρ = d·o
-        # detector_normal shape: [3], observation_dirs shape: [S, F, 3]
-        # Result shape: [S, F]
-        # NOTE: C code does NOT take absolute value (nanoBragg.c line 2903)
-        # Parallax can be negative for certain detector orientations
-        parallax = torch.sum(detector_normal.unsqueeze(0).unsqueeze(0) * observation_dirs, dim=-1)
-        # Clamp to avoid division by zero, but preserve sign
-        parallax = torch.where(
-            torch.abs(parallax) < 1e-10,
-            torch.sign(parallax) * 1e-10,
-            parallax
-        )
+        def capture_fractions():
+            thickness_m = thickness_um * 1e-6  # μm to meters
 
-        # Calculate layer thickness
-        delta_z = thickness_m / thicksteps
+            # Calculate μ (absorption coefficient) from attenuation depth
+            # μ = 1 / (attenuation_depth_m)
+            attenuation_depth_m = abs_um * 1e-6  # μm to meters
+            mu = 1.0 / attenuation_depth_m  # m^-1
 
-        # VECTORIZED THICKNESS IMPLEMENTATION
-        if oversample_thick:
-            # Create all layer indices at once
-            t_indices = torch.arange(thicksteps, device=intensity.device, dtype=intensity.dtype)
+            # Get detector normal vector (odet_vector)
+            detector_normal = self.detector.odet_vec  # Shape: [3]
+
+            # Calculate observation directions (normalized pixel coordinates)
+            # o = pixel_coords / |pixel_coords|
+            pixel_distances = torch.sqrt(torch.sum(pixel_coords_meters**2, dim=-1, keepdim=True))
+            # PERF-PYTORCH-004 Phase 1: Use clamp_min instead of torch.maximum to avoid allocating tensors inside compiled graph
+            observation_dirs = pixel_coords_meters / pixel_distances.clamp_min(1e-10)
+
+            # Calculate parallax factor: ρ = d·o
+            # detector_normal shape: [3], observation_dirs shape: [S, F, 3]
+            # Result shape: [S, F]
+            # NOTE: C code does NOT take absolute value (nanoBragg.c line 2903)
+            # Parallax can be negative for certain detector orientations
+            parallax = torch.sum(detector_normal.unsqueeze(0).unsqueeze(0) * observation_dirs, dim=-1)
+            # Clamp to avoid division by zero, but preserve sign
+            parallax = torch.where(
+                torch.abs(parallax) < 1e-10,
+                torch.sign(parallax) * 1e-10,
+                parallax
+            )
 
-            # Calculate capture fractions for all layers at once
-            # Shape: (thicksteps, 1, 1) for broadcasting with (S, F)
-            t_expanded = t_indices.reshape(-1, 1, 1)
+            # Calculate layer thickness
+            delta_z = thickness_m / thicksteps
 
-            # Calculate all capture fractions in parallel
-            # exp(−t·Δz·μ/ρ) − exp(−(t+1)·Δz·μ/ρ)
-            # Expand parallax to (1, S, F) for broadcasting
-            parallax_expanded = parallax.unsqueeze(0)
+            # VECTORIZED THICKNESS IMPLEMENTATION
+            if oversample_thick:
+                # Create all layer indices at once
+                t_indices = torch.arange(thicksteps, device=parallax.device, dtype=parallax.dtype)
 
-            exp_start_all = torch.exp(-t_expanded * delta_z * mu / parallax_expanded)
-            exp_end_all = torch.exp(-(t_expanded + 1) * delta_z * mu / parallax_expanded)
-            capture_fractions = exp_start_all - exp_end_all  # Shape: (thicksteps, S, F)
+                # Calculate capture fractions for all layers at once
+                # Shape: (thicksteps, 1, 1) for broadcasting with (S, F)
+                t_expanded = t_indices.reshape(-1, 1, 1)
 
-            # Apply capture fractions to intensity
-            # Shape: intensity (S, F) -> expand to (1, S, F)
-            intensity_expanded = intensity.unsqueeze(0)
+                # Calculate all capture fractions in parallel
+                # exp(−t·Δz·μ/ρ) − exp(−(t+1)·Δz·μ/ρ)
+                # Expand parallax to (1, S, F) for broadcasting
+                parallax_expanded = parallax.unsqueeze(0)
 
-            # Multiply and sum over all layers
-            # Shape: (thicksteps, S, F) * (1, S, F) -> sum over dim 0 -> (S, F)
-            result = torch.sum(intensity_expanded * capture_fractions, dim=0)
+                exp_start_all = torch.exp(-t_expanded * delta_z * mu / parallax_expanded)
+                exp_end_all = torch.exp(-(t_expanded + 1) * delta_z * mu / parallax_expanded)
+                return exp_start_all - exp_end_all  # Shape: (thicksteps, S, F)
 
-        else:
-            # Use last-value semantics: multiply by last layer's capture fraction
+            # Use last-value semantics: last layer's capture fraction
             t = thicksteps - 1  # Last layer
             exp_start = torch.exp(-t * delta_z * mu / parallax)
             exp_end = torch.exp(-(t + 1) * delta_z * mu / parallax)
-            capture_fraction = exp_start - exp_end
-
-            result = intensity * capture_fraction
+            return exp_start - exp_end
+
+        # PERF-GEOCACHE-001: Capture fractions depend only on geometry and the
+        # detector material, so they are cached across runs
+        capture_fraction = self._geometry_factor(
+            ("capture", tensor_key(thickness_um), tensor_key(abs_um), thicksteps,
+             bool(oversample_thick), tensor_key(self.detector.odet_vec)),
+            capture_fractions,
+            pixel_coords_meters, thickness_um, abs_um, self.detector.odet_vec,
+        )
 
-        return result
+        if oversample_thick:
+            # Multiply and sum over all layers
+            # Shape: (thicksteps, S, F) * (..., 1, S, F) -> sum over the layer dim -> (..., S, F)
+            return torch.sum(intensity.unsqueeze(-3) * capture_fraction, dim=-3)
+        return intensity * capture_fraction
 
     def estimate_memory(self, target_gpu_gb: float = 24.0) -> dict:
         """
@@ -25,9 +25,23 @@ replicates this via the LCGRandom class (CLCG):
 Key Functions:
 --------------
 - mosaic_rotation_umat(): Generates random rotation matrix for mosaic/misset
-  Consumes **3 RNG values** per call (axis direction + angle scaling)
+  Consumes **3 RNG values** per call (axis direction + angle scaling);
+  with n=N, returns (N, 3, 3) matrices from 3N consecutive values, as
+  used for the mosaic domains of MosaicSampling.CAP
 - CLCG.ran1(): Generates single uniform random value in [0, 1)
   Advances internal state by 1 step (equivalent to C's `ran1(&seed)`)
+- CLCG.ran1_block(): The next n values of the same sequence as a tensor
+- lcg_states(): Consecutive states of an affine LCG as a tensor
+
+Vectorized Generation (PERF-RNG-001):
+-------------------------------------
+LCG states are computed with modular jump-ahead: step i is the affine map
+x -> A_i*x + C_i (mod m) obtained by composing the one-step maps with a
+log2(n)-round parallel prefix scan, so a block of n states costs O(log n)
+tensor operations instead of n Python iterations. Moduli are below 2^31,
+so every product fits in int64. The Bays-Durham shuffle of ran1() picks
+each output by the previous one and stays sequential; ran1_block() runs
+it as a plain integer loop over the precomputed states.
 
 Determinism Requirements:
 --------------------------
@@ -50,9 +64,55 @@ References:
 
 import math
 import torch
-from typing import Optional, Tuple
+from typing import Optional, Tuple, Union
 import numpy as np
 
+from .tensor_utils import as_tensor_preserving_grad
+
+
+def lcg_states(
+    x0: int,
+    n: int,
+    multiplier: int,
+    increment: int,
+    modulus: int,
+    device: Union[str, torch.device] = 'cpu',
+) -> torch.Tensor:
+    """The states x_1..x_n of x_{i+1} = (multiplier*x_i + increment) mod modulus.
+
+    Uses modular jump-ahead (PERF-RNG-001): an inclusive prefix scan over
+    the affine maps (A, C) with (A2, C2) o (A1, C1) = (A2*A1, A2*C1 + C2)
+    gives every x_i = A_i*x_0 + C_i in ceil(log2(n)) rounds.
+
+    Args:
+        x0: Initial state (reduced modulo `modulus`)
+        n: Number of states
+        multiplier, increment: LCG constants, below modulus
+        modulus: LCG modulus, at most 2^31 so that products fit in int64
+        device: Device of the result
+
+    Returns:
+        int64 tensor of shape (n,)
+
+    Raises:
+        ValueError: If modulus exceeds 2^31 or n is negative
+    """
+    if modulus > 2 ** 31:
+        raise ValueError(f"LCG modulus must be at most 2^31, got {modulus}")
+    if n < 0:
+        raise ValueError(f"Number of states must be non-negative, got {n}")
+    A = torch.full((n,), multiplier % modulus, dtype=torch.int64, device=device)
+    C = torch.full((n,), increment % modulus, dtype=torch.int64, device=device)
+    shift = 1
+    while shift < n:
+        # Compose map i (later) with map i - shift (earlier)
+        A_tail = (A[shift:] * A[:-shift]) % modulus
+        C_tail = (A[shift:] * C[:-shift] + C[shift:]) % modulus
+        A = torch.cat([A[:shift], A_tail])
+        C = torch.cat([C[:shift], C_tail])
+        shift *= 2
+    return (A * (x0 % modulus) + C) % modulus
+
 
 class CLCG:
     """C-compatible Linear Congruential Generator (LCG).
@@ -129,12 +189,8 @@ class CLCG:
         self.iv = [0] * self.NTAB
         self._initialized = False
 
-    def ran1(self) -> float:
-        """Generate a uniform random deviate between 0 and 1.
-
-        Returns:
-            A float between 0 and RNMX (approximately 1.0).
-        """
+    def _ensure_initialized(self):
+        """Load the shuffle table on first use (the C code's first-time branch)."""
         if not self._initialized or self.idum <= 0:
             # Initialize the generator
             if self.idum < 1:
@@ -152,6 +208,14 @@ class CLCG:
             self.iy = self.iv[0]
             self._initialized = True
 
+    def ran1(self) -> float:
+        """Generate a uniform random deviate between 0 and 1.
+
+        Returns:
+            A float between 0 and RNMX (approximately 1.0).
+        """
+        self._ensure_initialized()
+
         # Normal operation
         k = self.idum // self.IQ
         self.idum = self.IA * (self.idum - k * self.IQ) - self.IR * k
@@ -165,12 +229,51 @@ class CLCG:
         temp = self.AM * self.iy
         return min(temp, self.RNMX)
 
+    def ran1_block(
+        self,
+        n: int,
+        dtype: torch.dtype = torch.float64,
+        device: torch.device = torch.device('cpu'),
+    ) -> torch.Tensor:
+        """Generate the next n deviates of the ran1() sequence as a tensor.
+
+        Equivalent to n calls of ran1(), including the state left behind,
+        so scalar and block calls can be mixed (PERF-RNG-001). The Park-Miller
+        states come from lcg_states() (Schrage's method computes the same
+        product modulo IM); the shuffle is a sequential integer loop.
+
+        Args:
+            n: Number of deviates
+            dtype: Data type of the result (values are computed in float64)
+            device: Device of the result
+
+        Returns:
+            Tensor of shape (n,)
+        """
+        self._ensure_initialized()
+        states = lcg_states(self.idum, n, self.IA, 0, self.IM).tolist()
+
+        iy, iv, ndiv = self.iy, self.iv, self.NDIV
+        outputs = [0] * n
+        for i, state in enumerate(states):
+            j = iy // ndiv
+            iy = iv[j]
+            iv[j] = state
+            outputs[i] = iy
+        if n > 0:
+            self.idum = states[-1]
+            self.iy = iy
+
+        values = torch.tensor(outputs, dtype=torch.int64).to(torch.float64) * self.AM
+        return values.clamp(max=self.RNMX).to(dtype=dtype, device=device)
+
 
 def mosaic_rotation_umat(
     mosaicity: float,
     seed: Optional[int] = None,
     dtype: Optional[torch.dtype] = None,
-    device: torch.device = torch.device('cpu')
+    device: torch.device = torch.device('cpu'),
+    n: Optional[int] = None,
 ) -> torch.Tensor:
     """Generate a random unitary rotation matrix within a spherical cap.
 
@@ -228,13 +331,17 @@ def mosaic_rotation_umat(
     ```
 
     Args:
-        mosaicity: Maximum rotation angle in radians.
+        mosaicity: Maximum rotation angle in radians; a tensor keeps its
+            autograd graph
         seed: Random seed for reproducibility.
         dtype: Data type for output tensor (default: torch.get_default_dtype())
         device: Device for output tensor (default: CPU)
+        n: If given, return n matrices from one generator stream, as n
+            successive C calls sharing a seed pointer (PERF-RNG-001)
 
     Returns:
-        A 3x3 unitary rotation matrix as a torch.Tensor.
+        A 3x3 unitary rotation matrix as a torch.Tensor, or (n, 3, 3)
+        matrices if n is given.
 
     RNG Consumption:
     ----------------
@@ -262,26 +369,34 @@ def mosaic_rotation_umat(
         dtype = torch.get_default_dtype()
 
     rng = CLCG(seed)
+    count = 1 if n is None else n
+
+    # Make three random uniform deviates on [-1:1] per matrix
+    # PERF-RNG-001: Consecutive deviates of one stream, as N successive C calls
+    r1, r2, r3 = (2.0 * rng.ran1_block(3 * count, device=device) - 1.0).reshape(count, 3).unbind(1)
+    mosaicity = as_tensor_preserving_grad(mosaicity, device, torch.float64)
+
+    entries = _umat_entries(mosaicity, r1, r2, r3)
+    umats = torch.stack(entries, dim=-1).reshape(count, 3, 3).to(dtype=dtype)
+    return umats[0] if n is None else umats
 
-    # Make three random uniform deviates on [-1:1]
-    r1 = 2.0 * rng.ran1() - 1.0
-    r2 = 2.0 * rng.ran1() - 1.0
-    r3 = 2.0 * rng.ran1() - 1.0
 
-    xyrad = math.sqrt(1.0 - r2 * r2)
-    rot = mosaicity * math.pow(1.0 - r3 * r3, 1.0/3.0)
+def _umat_entries(mosaicity: torch.Tensor, r1: torch.Tensor, r2: torch.Tensor, r3: torch.Tensor) -> list:
+    """Row-major entries of the spherical-cap rotations of deviates r1, r2, r3."""
+    xyrad = torch.sqrt(1.0 - r2 * r2)
+    rot = mosaicity * torch.pow(1.0 - r3 * r3, 1.0/3.0)
 
-    v1 = xyrad * math.sin(math.pi * r1)
-    v2 = xyrad * math.cos(math.pi * r1)
+    v1 = xyrad * torch.sin(math.pi * r1)
+    v2 = xyrad * torch.cos(math.pi * r1)
     v3 = r2
 
     # Quaternion calculation
-    t1 = math.cos(rot)
+    t1 = torch.cos(rot)
     t2 = 1.0 - t1
     t3 = v1 * v1
     t6 = t2 * v1
     t7 = t6 * v2
-    t8 = math.sin(rot)
+    t8 = torch.sin(rot)
     t9 = t8 * v3
     t11 = t6 * v3
     t12 = t8 * v2
@@ -291,18 +406,17 @@ def mosaic_rotation_umat(
     t24 = v3 * v3
 
     # Populate the unitary rotation matrix
-    umat = torch.zeros(3, 3, dtype=dtype, device=device)
-    umat[0, 0] = t1 + t2 * t3      # uxx
-    umat[0, 1] = t7 - t9            # uxy
-    umat[0, 2] = t11 + t12          # uxz
-    umat[1, 0] = t7 + t9            # uyx
-    umat[1, 1] = t1 + t2 * t15      # uyy
-    umat[1, 2] = t19 - t20          # uyz
-    umat[2, 0] = t11 - t12          # uzx
-    umat[2, 1] = t19 + t20          # uzy
-    umat[2, 2] = t1 + t2 * t24      # uzz
-
-    return umat
+    return [
+        t1 + t2 * t3,   # uxx
+        t7 - t9,        # uxy
+        t11 + t12,      # uxz
+        t7 + t9,        # uyx
+        t1 + t2 * t15,  # uyy
+        t19 - t20,      # uyz
+        t11 - t12,      # uzx
+        t19 + t20,      # uzy
+        t1 + t2 * t24,  # uzz
+    ]
 
 
 def umat2misset(umat: torch.Tensor) -> Tuple[float, float, float]:
@@ -0,0 +1,89 @@
+"""
+On-device diagnostics counters.
+
+The physics kernel used to log Miller-index ranges and the structure-factor
+hit rate on every call, which costs one host sync per `.item()`. These
+counters keep running reductions on the device instead and are read back
+once, at the end of a run (PERF-LEAN-001).
+"""
+
+from typing import Optional
+
+import torch
+
+
+class HKLStatsCounter:
+    """
+    Running min/max of rounded Miller indices and nonzero-F hit rate.
+
+    `update()` only issues device reductions and never synchronises with the
+    host; `read()` performs the single transfer.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        """Clear accumulated statistics."""
+        self._mins: Optional[torch.Tensor] = None
+        self._maxs: Optional[torch.Tensor] = None
+        self._nonzero: Optional[torch.Tensor] = None
+        self._total = 0
+
+    def update(
+        self,
+        h0: torch.Tensor,
+        k0: torch.Tensor,
+        l0: torch.Tensor,  # noqa: E741
+        F_cell: torch.Tensor,
+    ) -> None:
+        """Fold one kernel call's indices and structure factors into the counters."""
+        with torch.no_grad():
+            mins = torch.stack([h0.min(), k0.min(), l0.min()])
+            maxs = torch.stack([h0.max(), k0.max(), l0.max()])
+            nonzero = (F_cell != 0).sum()
+
+            if self._mins is None:
+                self._mins, self._maxs, self._nonzero = mins, maxs, nonzero
+            else:
+                self._mins = torch.minimum(self._mins, mins)
+                self._maxs = torch.maximum(self._maxs, maxs)
+                self._nonzero = self._nonzero + nonzero
+            self._total += F_cell.numel()
+
+    def read(self) -> Optional[dict]:
+        """
+        Transfer the counters to the host.
+
+        Returns:
+            dict with h/k/l min and max, nonzero_F, total and hit_rate (percent),
+            or None if no kernel call was recorded
+        """
+        if self._mins is None:
+            return None
+
+        values = torch.cat([
+            self._mins.to(torch.float64),
+            self._maxs.to(torch.float64),
+            self._nonzero.to(torch.float64).reshape(1),
+        ]).tolist()
+        h_min, k_min, l_min, h_max, k_max, l_max, nonzero = values
+        total = self._total
+        return {
+            'h_min': h_min, 'h_max': h_max,
+            'k_min': k_min, 'k_max': k_max,
+            'l_min': l_min, 'l_max': l_max,
+            'nonzero_F': int(nonzero),
+            'total': total,
+            'hit_rate': (nonzero / total * 100) if total > 0 else 0.0,
+        }
+
+    @staticmethod
+    def format(stats: dict) -> str:
+        """Format statistics in the same single-line layout as the per-call log."""
+        return (
+            f"[HKL stats] h=[{stats['h_min']:.0f},{stats['h_max']:.0f}] "
+            f"k=[{stats['k_min']:.0f},{stats['k_max']:.0f}] "
+            f"l=[{stats['l_min']:.0f},{stats['l_max']:.0f}] "
+            f"hit_rate={stats['nonzero_F']}/{stats['total']} ({stats['hit_rate']:.2f}%)"
+        )
@@ -0,0 +1,77 @@
+"""
+Distributed pixel-domain decomposition (PERF-DIST-001).
+
+A single very large detector image is split into blocks of detector rows
+that are rendered by the ranks of a torch.distributed process group (CPU
+gloo backend) and summed into the full image on rank 0.
+
+Design:
+- Every rank derives the same block-to-rank assignment from the same
+  inputs, so no scheduling messages are exchanged; the only collective is
+  the final reduce
+- Blocks are weighted by an estimated cost (evaluated pixels × samples per
+  pixel) and assigned greedily, heaviest first, to the least-loaded rank
+  (LPT scheduling, within 4/3 of the optimal makespan)
+- Ranks write their blocks into a zero image and the images are summed on
+  rank 0. Blocks are disjoint, so the sum only adds zeros and the result is
+  bit-identical to rendering the same blocks in one process
+- Works unchanged from several local processes (tests) to a cluster
+  launched with torchrun
+"""
+
+import heapq
+from typing import List, Optional, Sequence
+
+import torch
+import torch.distributed as dist
+
+
+def balance_blocks(costs: Sequence[float], n_ranks: int) -> List[List[int]]:
+    """
+    Assign blocks to ranks so that the estimated cost per rank is balanced.
+
+    Args:
+        costs: Estimated cost of each block
+        n_ranks: Number of ranks
+
+    Returns:
+        For each rank, the ascending list of its block indices
+
+    Raises:
+        ValueError: If n_ranks is not positive or a cost is negative
+    """
+    if n_ranks < 1:
+        raise ValueError(f"n_ranks must be positive, got {n_ranks}")
+    if any(cost < 0 for cost in costs):
+        raise ValueError("Block costs must be non-negative")
+
+    # Ties are broken by index so that every rank computes the same assignment
+    order = sorted(range(len(costs)), key=lambda i: (-costs[i], i))
+    loads = [(0.0, rank) for rank in range(n_ranks)]
+    assignment: List[List[int]] = [[] for _ in range(n_ranks)]
+    for block in order:
+        load, rank = heapq.heappop(loads)
+        assignment[rank].append(block)
+        heapq.heappush(loads, (load + costs[block], rank))
+    return [sorted(blocks) for blocks in assignment]
+
+
+def require_process_group() -> None:
+    """Raise ValueError unless torch.distributed is initialized."""
+    if not dist.is_available() or not dist.is_initialized():
+        raise ValueError(
+            "Distributed rendering requires an initialized torch.distributed process group "
+            "(e.g. torch.distributed.init_process_group('gloo'))"
+        )
+
+
+def reduce_to_root(image: torch.Tensor, group=None) -> Optional[torch.Tensor]:
+    """
+    Sum the per-rank partial images into rank 0 of `group`.
+
+    Returns:
+        The summed image on rank 0, None on every other rank
+    """
+    root = dist.get_global_rank(group, 0) if group is not None else 0
+    dist.reduce(image, dst=root, op=dist.ReduceOp.SUM, group=group)
+    return image if dist.get_rank(group) == 0 else None
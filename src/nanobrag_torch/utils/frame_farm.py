@@ -0,0 +1,162 @@
+"""
+Multi-process frame farm (PERF-FARM-001).
+
+The structure-factor gather in the physics kernels is memory-latency bound,
+and PyTorch intra-op threading stops scaling after a few threads. The frame
+farm instead spreads independent work items (whole frames of a sweep, or
+blocks of detector rows of one image) over worker processes that each run
+with a single intra-op thread.
+
+Design:
+- Workers are forked, so they inherit the Simulator with its structure
+  factors, pixel coordinates and kernels. The large read-only tensors are
+  moved to shared memory first (share_tensors), so workers map the same
+  pages instead of each holding a private copy
+- Results are written in place into one preallocated shared output buffer;
+  only a work counter and the report of the first failure cross process
+  boundaries. The parent drains the report queue while it waits, so a
+  report never blocks a worker on a full pipe
+- Items are handed out dynamically from a shared counter, so expensive rows
+  (strong spots, many sources) do not stall a statically assigned worker
+- A work item runs exactly the code a single-process run would, on the same
+  inputs, so results are bit-identical to running the items in one process
+  with the same number of intra-op threads
+"""
+
+import traceback
+from typing import Callable, Hashable, Optional, Sequence
+
+import torch
+import torch.multiprocessing as mp
+
+# Longest traceback forwarded from the failing worker
+_MAX_ERROR_CHARS = 4000
+# Seconds between checks of the error queue while waiting for workers
+_POLL_SECONDS = 0.05
+
+
+def share_tensors(*tensors: Optional[torch.Tensor]) -> None:
+    """Move CPU tensors to shared memory in place (None and shared tensors are skipped)."""
+    for tensor in tensors:
+        if isinstance(tensor, torch.Tensor) and tensor.device.type == "cpu" and not tensor.is_shared():
+            tensor.share_memory_()
+
+
+def _next_item(counter) -> int:
+    with counter.get_lock():
+        index = counter.value
+        counter.value += 1
+    return index
+
+
+def _worker(work, output, targets, counter, failed, errors, threads):
+    torch.set_num_threads(threads)
+    n_items = len(targets)
+    while True:
+        index = _next_item(counter)
+        if index >= n_items:
+            return
+        try:
+            with torch.no_grad():
+                output[targets[index]] = work(index)
+        except BaseException:
+            # Stop the other workers from picking up further items; only the
+            # first failure is reported (the others usually repeat it)
+            with counter.get_lock():
+                counter.value = n_items
+                first = failed.value == 0
+                failed.value = 1
+            if first:
+                errors.put((index, traceback.format_exc()[-_MAX_ERROR_CHARS:]))
+            return
+
+
+class FrameFarm:
+    """
+    Pool of forked worker processes filling a shared output buffer.
+
+    Used by Simulator.run_parallel() (row blocks) and Simulator.run_sweep()
+    (frames) when nproc > 1.
+    """
+
+    def __init__(self, nproc: int, threads_per_worker: int = 1):
+        """
+        Args:
+            nproc: Number of worker processes; 1 runs every item in this process
+            threads_per_worker: Intra-op threads per worker
+
+        Raises:
+            ValueError: If nproc or threads_per_worker is not positive
+            RuntimeError: If the platform cannot fork worker processes
+        """
+        if nproc < 1:
+            raise ValueError(f"nproc must be positive, got {nproc}")
+        if threads_per_worker < 1:
+            raise ValueError(f"threads_per_worker must be positive, got {threads_per_worker}")
+        if nproc > 1 and "fork" not in mp.get_all_start_methods():
+            raise RuntimeError("Multi-process execution requires the 'fork' start method")
+        self.nproc = nproc
+        self.threads_per_worker = threads_per_worker
+
+    def map(
+        self,
+        work: Callable[[int], torch.Tensor],
+        output: torch.Tensor,
+        targets: Sequence[Hashable],
+    ) -> torch.Tensor:
+        """
+        Evaluate work(i) for every item and store it in output[targets[i]].
+
+        Args:
+            work: Function of the item index returning a tensor that fits output[targets[i]]
+            output: Preallocated CPU buffer; moved to shared memory before forking
+            targets: Index (int, slice, tuple) into output for each item
+
+        Returns:
+            output, filled in place
+
+        Raises:
+            ValueError: If output is not on the CPU
+            RuntimeError: If a work item raised or a worker died
+        """
+        if output.device.type != "cpu":
+            raise ValueError(f"Frame farm output must be on the CPU, got {output.device}")
+        n_items = len(targets)
+        if self.nproc == 1 or n_items <= 1:
+            with torch.no_grad():
+                for index, target in enumerate(targets):
+                    output[target] = work(index)
+            return output
+
+        share_tensors(output)
+        ctx = mp.get_context("fork")
+        counter = ctx.Value("l", 0)
+        failed = ctx.RawValue("i", 0)  # Guarded by the counter's lock
+        errors = ctx.SimpleQueue()
+        workers = [
+            ctx.Process(
+                target=_worker,
+                args=(work, output, targets, counter, failed, errors, self.threads_per_worker),
+                daemon=True,
+            )
+            for _ in range(min(self.nproc, n_items))
+        ]
+        for worker in workers:
+            worker.start()
+        reports = []
+        for worker in workers:
+            # Keep reading reports while waiting so that no worker blocks in put()
+            while worker.exitcode is None:
+                worker.join(_POLL_SECONDS)
+                while not errors.empty():
+                    reports.append(errors.get())
+        while not errors.empty():
+            reports.append(errors.get())
+
+        if reports:
+            index, report = reports[0]
+            raise RuntimeError(f"Frame farm work item {index} failed:\n{report}")
+        exit_codes = [worker.exitcode for worker in workers if worker.exitcode != 0]
+        if exit_codes:
+            raise RuntimeError(f"Frame farm worker exited abnormally (exit codes {exit_codes})")
+        return output
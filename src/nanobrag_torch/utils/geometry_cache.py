@@ -0,0 +1,141 @@
+"""
+Cross-run cache of geometry-only per-pixel factors (PERF-GEOCACHE-001).
+
+Solid angle, subpixel positions, polarization and detector capture
+fractions depend only on the detector geometry, the beam directions and
+the polarization/absorption settings, not on the crystal. Repeated
+Simulator.run() calls (phi sweeps, refinement loops over crystal
+parameters) would otherwise recompute them on every frame.
+
+Design:
+- Entries are keyed by plain tuples built by the Simulator from the
+  detector geometry version, beam directions and settings, so any change
+  to those produces a new key and stale entries are never read
+- Least-recently-used eviction under a byte cap; an entry larger than the
+  cap is computed but not stored
+- Callers bypass the cache when inputs require grad, so autograd always
+  sees the live computation graph
+"""
+
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Tuple
+
+import torch
+
+
+def _entry_bytes(value: Any) -> int:
+    """Bytes held by a tensor or a (nested) tuple of tensors."""
+    if isinstance(value, torch.Tensor):
+        return value.numel() * value.element_size()
+    if isinstance(value, (tuple, list)):
+        return sum(_entry_bytes(v) for v in value)
+    return 0
+
+
+def tensor_key(value: Any) -> Hashable:
+    """
+    Hashable key component for a small tensor or scalar.
+
+    Tensors are keyed by device, dtype and values (one host sync for the
+    beam/polarization vectors, which hold a handful of elements).
+    """
+    if isinstance(value, torch.Tensor):
+        flat = value.detach().reshape(-1)
+        return (str(flat.device), flat.dtype, tuple(flat.tolist()))
+    return value
+
+
+class GeometryFactorCache:
+    """
+    LRU cache of geometry-only tensors bounded by total size in bytes.
+
+    Owned by a Simulator; see Simulator.clear_geometry_cache().
+    """
+
+    def __init__(self, max_bytes: int):
+        """
+        Args:
+            max_bytes: Upper bound on the bytes held by cached tensors
+
+        Raises:
+            ValueError: If max_bytes is negative
+        """
+        if max_bytes < 0:
+            raise ValueError(f"Geometry cache size must be non-negative, got {max_bytes}")
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int]]" = OrderedDict()
+        self.max_bytes = int(max_bytes)
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes currently held."""
+        return self._bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Return the entry for key, computing and storing it on a miss.
+
+        Args:
+            key: Hashable key covering every input of `compute`
+            compute: Zero-argument function producing a tensor or tuple of tensors
+
+        Returns:
+            Cached or freshly computed value
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+
+        self._misses += 1
+        value = compute()
+        size = _entry_bytes(value)
+        if size > self.max_bytes:
+            return value
+
+        self._entries[key] = (value, size)
+        self._bytes += size
+        self._evict(self.max_bytes)
+        return value
+
+    def resize(self, max_bytes: int) -> None:
+        """Change the byte cap, evicting least-recently-used entries as needed."""
+        if max_bytes < 0:
+            raise ValueError(f"Geometry cache size must be non-negative, got {max_bytes}")
+        self.max_bytes = int(max_bytes)
+        self._evict(self.max_bytes)
+
+    def _evict(self, limit: int) -> None:
+        while self._bytes > limit and self._entries:
+            _, (_, size) = self._entries.popitem(last=False)
+            self._bytes -= size
+
+    def clear(self) -> None:
+        """Release all cached tensors."""
+        self._entries.clear()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+
+    def stats(self) -> dict:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with hits, misses, hit rate, entry count and bytes held
+        """
+        total = self._hits + self._misses
+        return {
+            'hits': self._hits,
+            'misses': self._misses,
+            'hit_rate': self._hits / total if total > 0 else 0.0,
+            'size': len(self._entries),
+            'bytes': self._bytes,
+            'max_bytes': self.max_bytes,
+        }
@@ -0,0 +1,205 @@
+"""
+Blocked sparse structure-factor storage (PERF-HKLBLOCK-001).
+
+A dense HKL grid covers the bounding box of the reflection list, so its
+size grows with the cube of the resolution and cell edge: a ribosome-sized
+cell at 2 Å needs billions of voxels for a few million reflections. Most
+of the box is outside the resolution sphere or the asymmetric unit and
+holds default_F.
+
+BlockedHKLGrid splits the box into bricks of brick_size³ voxels and only
+stores bricks that contain a reflection:
+
+- bricks: (n_occupied + 1, b, b, b) values; slot 0 is a shared brick
+  filled with default_F that every empty brick points to
+- brick_index: int32 grid of brick slots, one entry per brick of the box
+
+A lookup is two gathers (brick slot, then voxel), both vectorized and
+branch-free, so the grid drops in wherever the dense tensor is indexed
+as grid[h_idx, k_idx, l_idx]. Memory is proportional to the occupied
+bricks plus 4 bytes per b³ voxels of the bounding box.
+"""
+
+import math
+from typing import Optional, Sequence, Tuple
+
+import torch
+
+DEFAULT_BRICK_SIZE = 8
+
+
+class BlockedHKLGrid:
+    """
+    Structure factors on a (h_range, k_range, l_range) grid stored as bricks.
+
+    Supports the subset of the tensor interface used for structure-factor
+    lookups: shape, dtype, device, to(), and indexing with a tuple of three
+    broadcastable integer index tensors. Indices must be inside the grid;
+    callers clamp or bounds-check them as they do for the dense grid.
+    """
+
+    def __init__(
+        self,
+        bricks: torch.Tensor,
+        brick_index: torch.Tensor,
+        shape: Sequence[int],
+        default_F: float,
+    ):
+        """
+        Args:
+            bricks: (n_slots, b, b, b) brick values; slot 0 holds default_F
+            brick_index: (ceil(h_range/b), ceil(k_range/b), ceil(l_range/b)) int32 slots
+            shape: (h_range, k_range, l_range) of the grid
+            default_F: Value of voxels without a reflection
+
+        Raises:
+            ValueError: If the brick size is not a power of two or the index
+                does not cover the grid
+        """
+        b = bricks.shape[-1]
+        if bricks.dim() != 4 or bricks.shape[1:] != (b, b, b) or b & (b - 1):
+            raise ValueError(f"Bricks must have shape (n, b, b, b) with b a power of two, got {tuple(bricks.shape)}")
+        expected = tuple(math.ceil(n / b) for n in shape)
+        if tuple(brick_index.shape) != expected:
+            raise ValueError(f"Brick index shape {tuple(brick_index.shape)} does not match {expected} for grid {tuple(shape)}")
+        self.bricks = bricks
+        self.brick_index = brick_index
+        self.shape = torch.Size(shape)
+        self.default_F = float(default_F)
+        self.brick_size = b
+        self._shift = b.bit_length() - 1
+
+    @classmethod
+    def from_reflections(
+        cls,
+        indices: torch.Tensor,
+        values: torch.Tensor,
+        shape: Sequence[int],
+        default_F: float = 0.0,
+        brick_size: int = DEFAULT_BRICK_SIZE,
+        device=None,
+        dtype: torch.dtype = torch.float32,
+    ) -> "BlockedHKLGrid":
+        """
+        Build the grid from a reflection list.
+
+        Args:
+            indices: (N, 3) integer grid indices (h - h_min, k - k_min, l - l_min)
+            values: (N,) structure factors; for repeated indices the last one wins,
+                as when filling a dense grid in file order
+            shape: (h_range, k_range, l_range)
+            default_F: Value of voxels without a reflection
+            brick_size: Brick edge length (power of two)
+            device: Device of the grid
+            dtype: Dtype of the values
+
+        Raises:
+            ValueError: If brick_size is not a power of two or an index is outside the grid
+        """
+        if brick_size < 1 or brick_size & (brick_size - 1):
+            raise ValueError(f"brick_size must be a power of two, got {brick_size}")
+        device = device if device is not None else torch.device("cpu")
+        indices = torch.as_tensor(indices, dtype=torch.long, device=device).reshape(-1, 3)
+        values = torch.as_tensor(values, device=device).reshape(-1).to(dtype)
+        extent = torch.tensor(tuple(shape), dtype=torch.long, device=device)
+        if indices.numel() and bool(((indices < 0) | (indices >= extent)).any()):
+            raise ValueError(f"Reflection indices outside the {tuple(shape)} grid")
+
+        shift = brick_size.bit_length() - 1
+        grid = tuple(math.ceil(n / brick_size) for n in shape)
+
+        # Last occurrence of every voxel, matching a sequential dense fill
+        voxel = (indices[:, 0] * shape[1] + indices[:, 1]) * shape[2] + indices[:, 2]
+        unique_voxels, inverse = torch.unique(voxel, return_inverse=True)
+        order = torch.arange(voxel.numel(), device=device)
+        last = torch.full((unique_voxels.numel(),), -1, dtype=torch.long, device=device)
+        last = last.scatter_reduce(0, inverse, order, reduce="amax")
+        indices, values = indices[last], values[last]
+
+        coarse = indices >> shift
+        brick_id = (coarse[:, 0] * grid[1] + coarse[:, 1]) * grid[2] + coarse[:, 2]
+        occupied, slot = torch.unique(brick_id, return_inverse=True)
+
+        brick_index = torch.zeros(math.prod(grid), dtype=torch.int32, device=device)
+        brick_index[occupied] = torch.arange(1, occupied.numel() + 1, dtype=torch.int32, device=device)
+        bricks = torch.full(
+            (occupied.numel() + 1, brick_size, brick_size, brick_size), default_F, dtype=dtype, device=device
+        )
+        local = indices & (brick_size - 1)
+        bricks[slot + 1, local[:, 0], local[:, 1], local[:, 2]] = values
+        return cls(bricks, brick_index.reshape(grid), shape, default_F)
+
+    @classmethod
+    def from_dense(
+        cls, grid: torch.Tensor, default_F: float = 0.0, brick_size: int = DEFAULT_BRICK_SIZE
+    ) -> "BlockedHKLGrid":
+        """Convert a dense grid; voxels equal to default_F are not stored."""
+        indices = torch.nonzero(grid != default_F)
+        values = grid[indices[:, 0], indices[:, 1], indices[:, 2]]
+        return cls.from_reflections(
+            indices, values, grid.shape, default_F, brick_size, device=grid.device, dtype=grid.dtype
+        )
+
+    @property
+    def dtype(self) -> torch.dtype:
+        return self.bricks.dtype
+
+    @property
+    def device(self) -> torch.device:
+        return self.bricks.device
+
+    @property
+    def num_bricks(self) -> int:
+        """Number of stored bricks, excluding the shared default brick."""
+        return self.bricks.shape[0] - 1
+
+    @property
+    def nbytes(self) -> int:
+        return (self.bricks.numel() * self.bricks.element_size()
+                + self.brick_index.numel() * self.brick_index.element_size())
+
+    def tensors(self) -> Tuple[torch.Tensor, torch.Tensor]:
+        """The storage tensors (bricks, brick_index), e.g. for moving to shared memory."""
+        return self.bricks, self.brick_index
+
+    def to(self, device=None, dtype: Optional[torch.dtype] = None) -> "BlockedHKLGrid":
+        """Copy of the grid with values on `device` as `dtype` (the index stays int32)."""
+        return BlockedHKLGrid(
+            self.bricks.to(device=device, dtype=dtype),
+            self.brick_index.to(device=device),
+            self.shape,
+            self.default_F,
+        )
+
+    def padded(self, width: int) -> "BlockedHKLGrid":
+        """Copy with a `width`-voxel border of default_F on every side (only stored voxels move)."""
+        b = self.brick_size
+        coarse = torch.nonzero(self.brick_index)
+        slots = self.brick_index[coarse[:, 0], coarse[:, 1], coarse[:, 2]].long()
+        stored = self.bricks[slots]
+        local = torch.nonzero(stored != self.default_F)
+        values = stored[local[:, 0], local[:, 1], local[:, 2], local[:, 3]]
+        indices = coarse[local[:, 0]] * b + local[:, 1:] + width
+        return BlockedHKLGrid.from_reflections(
+            indices, values, tuple(n + 2 * width for n in self.shape), self.default_F, b,
+            device=self.device, dtype=self.dtype,
+        )
+
+    def __getitem__(self, index: Tuple[torch.Tensor, torch.Tensor, torch.Tensor]) -> torch.Tensor:
+        """Values at broadcastable (h_idx, k_idx, l_idx) grid indices."""
+        h_idx, k_idx, l_idx = torch.broadcast_tensors(
+            *(torch.as_tensor(i, dtype=torch.long, device=self.device) for i in index)
+        )
+        s, mask = self._shift, self.brick_size - 1
+        slot = self.brick_index[h_idx >> s, k_idx >> s, l_idx >> s].long()
+        offset = ((slot * self.brick_size + (h_idx & mask)) * self.brick_size + (k_idx & mask)) * self.brick_size + (l_idx & mask)
+        return torch.take(self.bricks, offset)
+
+    def to_dense(self) -> torch.Tensor:
+        """The equivalent dense (h_range, k_range, l_range) grid."""
+        axes = [torch.arange(n, device=self.device) for n in self.shape]
+        return self[torch.meshgrid(*axes, indexing="ij")]
+
+    def __repr__(self) -> str:
+        return (f"BlockedHKLGrid(shape={tuple(self.shape)}, brick_size={self.brick_size}, "
+                f"bricks={self.num_bricks}, dtype={self.dtype}, device={self.device})")
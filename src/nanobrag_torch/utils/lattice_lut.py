@@ -0,0 +1,225 @@
+"""
+Tabulated lattice transforms (PERF-LUT-001).
+
+The lattice factor F_latt is evaluated on every (pixel, subpixel, source,
+phi, mosaic) sample, i.e. hundreds of millions of sin/exp calls per frame.
+Every shape model is a smooth function of a single variable once the
+Miller indices are reduced to their offset from the nearest node:
+
+- SQUARE: sincg(π(h0+d), N) = (-1)^((N-1)·h0) · g_N(|d|) with the even
+  Dirichlet kernel g_N(d) = sin(Nπd)/sin(πd) on d ∈ [0, 1/2]
+- ROUND: sinc3(x) with x = π·sqrt(hrad²·fudge)
+- GAUSS: exp(-y) with y = rad²·fudge/0.63
+
+This module tabulates those functions on a uniform grid and interpolates
+them (linear, or cubic Hermite using the tabulated derivative). Gradients
+flow through the interpolation weights, so d/dh is the derivative of the
+interpolant. TOPHAT has no transcendental and is not tabulated.
+
+Error bounds (relative to the peak value N for sincg, 1 for sinc3/exp):
+g_N is a sum of N cosines with frequencies up to π(N-1), so
+|g_N^(k)| ≤ N·(π(N-1))^k; sinc3(x) = E[cos(x·u)] for a density on [-1, 1],
+so |sinc3^(k)| ≤ 1; |exp^(k)(-y)| ≤ 1. With grid step Δ, linear
+interpolation errs by at most Δ²/8·max|f''| and cubic Hermite by
+Δ⁴/384·max|f''''|, from which the grid step is chosen. The sinc3 and exp
+tables are truncated where the function itself falls below the tolerance.
+"""
+
+import math
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import torch
+
+from ..config import CrystalShape
+
+INTERPOLATION_MODES = ("linear", "cubic")
+
+
+def _grid_step(tolerance: float, derivative_scale: float, interpolation: str) -> float:
+    """Largest grid step meeting `tolerance` for a function with |f^(k)| ≤ derivative_scale^k."""
+    if derivative_scale <= 0:
+        return math.inf
+    if interpolation == "linear":
+        return math.sqrt(8.0 * tolerance) / derivative_scale
+    return (384.0 * tolerance) ** 0.25 / derivative_scale
+
+
+@dataclass
+class LookupTable:
+    """Uniformly sampled function with its derivative."""
+    x0: float
+    dx: float
+    values: torch.Tensor
+    derivatives: torch.Tensor
+    interpolation: str
+
+    def __call__(self, x: torch.Tensor) -> torch.Tensor:
+        """Interpolate the table at x (clamped to the tabulated range)."""
+        n = self.values.shape[0]
+        t = ((x - self.x0) / self.dx).clamp(0, n - 1)
+        i = torch.floor(t).clamp(max=n - 2).long()
+        u = t - i.to(t.dtype)
+        y0 = self.values[i]
+        y1 = self.values[i + 1]
+        if self.interpolation == "linear":
+            return y0 + u * (y1 - y0)
+
+        # Cubic Hermite on [i, i+1] with tangents scaled to unit spacing
+        m0 = self.derivatives[i] * self.dx
+        m1 = self.derivatives[i + 1] * self.dx
+        u2 = u * u
+        u3 = u2 * u
+        return (
+            (2 * u3 - 3 * u2 + 1) * y0
+            + (u3 - 2 * u2 + u) * m0
+            + (-2 * u3 + 3 * u2) * y1
+            + (u3 - u2) * m1
+        )
+
+
+def _dirichlet_table(N: int, tolerance: float, interpolation: str, device, dtype) -> LookupTable:
+    """g_N(d) = sin(Nπd)/sin(πd) on [0, 1/2], built from its cosine series in float64."""
+    step = _grid_step(tolerance, math.pi * (N - 1), interpolation)
+    n = max(2, math.ceil(0.5 / step) + 1)
+    d = torch.linspace(0.0, 0.5, n, dtype=torch.float64)
+    # g_N(d) = Σ_j cos(ω_j d), ω_j = π(N-1-2j), j = 0..N-1 (exact at d = 0)
+    omega = math.pi * (N - 1 - 2 * torch.arange(N, dtype=torch.float64))
+    phase = d.unsqueeze(-1) * omega
+    values = torch.cos(phase).sum(dim=-1)
+    derivatives = -(omega * torch.sin(phase)).sum(dim=-1)
+    return LookupTable(
+        x0=0.0, dx=0.5 / (n - 1),
+        values=values.to(device=device, dtype=dtype),
+        derivatives=derivatives.to(device=device, dtype=dtype),
+        interpolation=interpolation,
+    )
+
+
+def _sinc3_table(tolerance: float, interpolation: str, device, dtype) -> LookupTable:
+    """sinc3(x) = 3(sin x/x - cos x)/x² on [0, x_max]; |sinc3| ≤ 3/x² + 3/x³ beyond."""
+    # Beyond x_max both the clamped table value and sinc3 itself are below tolerance/2
+    x_max = max(10.0, math.sqrt(12.0 / tolerance))
+    step = _grid_step(tolerance, 1.0, interpolation)
+    n = max(2, math.ceil(x_max / step) + 1)
+    x = torch.linspace(0.0, x_max, n, dtype=torch.float64)
+    x_safe = torch.where(x == 0, torch.ones_like(x), x)
+    sin_x, cos_x = torch.sin(x_safe), torch.cos(x_safe)
+    values = 3.0 * (sin_x / x_safe - cos_x) / (x_safe * x_safe)
+    # d/dx sinc3 = 3·sin x/x² - 3·sinc3(x)/x
+    derivatives = 3.0 * (sin_x / x_safe) / x_safe - 3.0 * values / x_safe
+    values = torch.where(x == 0, torch.ones_like(x), values)
+    derivatives = torch.where(x == 0, torch.zeros_like(x), derivatives)
+    return LookupTable(
+        x0=0.0, dx=x_max / (n - 1),
+        values=values.to(device=device, dtype=dtype),
+        derivatives=derivatives.to(device=device, dtype=dtype),
+        interpolation=interpolation,
+    )
+
+
+def _exp_table(tolerance: float, interpolation: str, device, dtype) -> LookupTable:
+    """exp(-y) on [0, ln(1/tolerance)]; the clamped tail stays below tolerance."""
+    y_max = math.log(1.0 / tolerance)
+    step = _grid_step(tolerance, 1.0, interpolation)
+    n = max(2, math.ceil(y_max / step) + 1)
+    y = torch.linspace(0.0, y_max, n, dtype=torch.float64)
+    values = torch.exp(-y)
+    return LookupTable(
+        x0=0.0, dx=y_max / (n - 1),
+        values=values.to(device=device, dtype=dtype),
+        derivatives=(-values).to(device=device, dtype=dtype),
+        interpolation=interpolation,
+    )
+
+
+class LatticeFactorLUT:
+    """
+    Lattice-factor tables for one crystal shape and (Na, Nb, Nc).
+
+    Built by Crystal.get_lattice_lut() and passed to the physics kernels as
+    `lattice_lut`; the kernels call the method matching the crystal shape.
+    """
+
+    def __init__(
+        self,
+        shape: CrystalShape,
+        N_cells: Tuple[int, int, int],
+        tolerance: float,
+        interpolation: str = "cubic",
+        device=None,
+        dtype=torch.float64,
+    ):
+        """
+        Args:
+            shape: Crystal shape model
+            N_cells: (Na, Nb, Nc); must be integral for SQUARE
+            tolerance: Interpolation error bound relative to the peak value
+            interpolation: "linear" or "cubic"
+            device: Table device
+            dtype: Table dtype
+
+        Raises:
+            ValueError: On an invalid tolerance or interpolation mode, or
+                non-integral N_cells for the SQUARE shape
+        """
+        if not 0 < tolerance < 1:
+            raise ValueError(f"Lattice LUT tolerance must be in (0, 1), got {tolerance}")
+        if interpolation not in INTERPOLATION_MODES:
+            raise ValueError(
+                f"Lattice LUT interpolation must be one of {INTERPOLATION_MODES}, got '{interpolation}'"
+            )
+
+        self.shape = shape
+        self.tolerance = tolerance
+        self.interpolation = interpolation
+        self._sincg: Dict[int, LookupTable] = {}
+        self._sincg_axes: Tuple[Optional[LookupTable], ...] = (None, None, None)
+        self._radial: Optional[LookupTable] = None
+
+        if shape == CrystalShape.SQUARE:
+            if any(float(n) != round(float(n)) for n in N_cells):
+                raise ValueError(
+                    f"Lattice LUT for the SQUARE shape requires integral N_cells, got {N_cells}"
+                )
+            axes = []
+            for n in (int(round(float(n))) for n in N_cells):
+                if n not in self._sincg:
+                    self._sincg[n] = _dirichlet_table(n, tolerance, interpolation, device, dtype)
+                axes.append(self._sincg[n])
+            self._sincg_axes = tuple(axes)
+            self._N = tuple(int(round(float(n))) for n in N_cells)
+        elif shape == CrystalShape.ROUND:
+            self._radial = _sinc3_table(tolerance, interpolation, device, dtype)
+        elif shape == CrystalShape.GAUSS:
+            self._radial = _exp_table(tolerance, interpolation, device, dtype)
+
+    @property
+    def table_bytes(self) -> int:
+        """Memory held by the tables."""
+        tables = list(self._sincg.values()) + ([self._radial] if self._radial is not None else [])
+        return sum(t.values.numel() * t.values.element_size() * 2 for t in tables)
+
+    def sincg(self, axis: int, d: torch.Tensor, n0: torch.Tensor) -> torch.Tensor:
+        """
+        sincg(π·(n0 + d), N_axis) from the table.
+
+        Args:
+            axis: 0, 1, 2 for a, b, c
+            d: Offset from the nearest integer index, in [-1/2, 1/2]
+            n0: Nearest integer index
+        """
+        value = self._sincg_axes[axis](torch.abs(d))
+        if self._N[axis] % 2 == 0:
+            # (-1)^((N-1)·n0) alternates with n0 only for even N
+            is_odd = (torch.abs(n0) % 2) >= 0.5
+            value = torch.where(is_odd, -value, value)
+        return value
+
+    def sinc3(self, x: torch.Tensor) -> torch.Tensor:
+        """sinc3(x) for x ≥ 0 (ROUND shape)."""
+        return self._radial(x)
+
+    def gauss(self, y: torch.Tensor) -> torch.Tensor:
+        """exp(-y) for y ≥ 0 (GAUSS shape)."""
+        return self._radial(y)
@@ -0,0 +1,128 @@
+"""
+Base samples for mosaic domain rotations (PERF-MOSAIC-001).
+
+A mosaic domain is a rotation by angle θ = s · mosaic_spread about a unit
+axis u, with u uniform on the sphere and s standard normal. The mosaic
+average over N_mos domains is a Monte Carlo estimate of the integral over
+that distribution. With i.i.d. draws its error decreases as 1/√N_mos.
+Low-discrepancy and stratified point sets cover the distribution more
+evenly and converge faster for the smooth integrands of mosaic spots.
+
+Every sampler maps points of the unit cube [0, 1)³ to (u, s):
+- (u₀, u₁) → axis via z = 1 - 2u₀, φ = 2πu₁. This map is area-preserving,
+  so equal-volume cells of the cube are equal-area patches of the sphere
+- u₂ → s = Φ⁻¹(u₂), the standard normal quantile
+
+The base samples depend only on the sampler, N_mos and the seed. They are
+generated without gradients; the Crystal scales s by mosaic_spread_deg,
+so gradients flow through the spread as before.
+"""
+
+import math
+from typing import Tuple
+
+import torch
+
+from ..config import MosaicSampling
+
+# Primes used as Halton bases for the three cube dimensions
+_HALTON_BASES = (2, 3, 5)
+
+# Keeps Φ⁻¹(u) finite for points on the cube boundary
+_QUANTILE_EPS = 1e-12
+
+
+def _seed_generator(seed: int) -> torch.Generator:
+    gen = torch.Generator()
+    # Convert to valid unsigned seed (handle negative C-style seeds)
+    gen.manual_seed(seed & 0x7FFFFFFF)
+    return gen
+
+
+def radical_inverse(indices: torch.Tensor, base: int) -> torch.Tensor:
+    """
+    Van der Corput radical inverse of non-negative integers in the given base.
+
+    Mirrors the base-`base` digits of each index about the radix point,
+    e.g. 6 = 110₂ → 0.011₂ = 0.375.
+    """
+    result = torch.zeros(indices.shape, dtype=torch.float64)
+    remaining = indices.clone()
+    scale = 1.0 / base
+    while bool((remaining > 0).any()):
+        result += (remaining % base).to(torch.float64) * scale
+        remaining = remaining // base
+        scale /= base
+    return result
+
+
+def unit_cube_points(method: MosaicSampling, n: int, seed: int) -> torch.Tensor:
+    """
+    n points in [0, 1)³ (float64, CPU) drawn with the given sampler.
+
+    Args:
+        method: Any sampler other than MosaicSampling.RANDOM and MosaicSampling.CAP
+        n: Number of points
+        seed: Seed of the scrambling, shift or stratum jitter
+
+    Returns:
+        (n, 3) tensor
+    """
+    gen = _seed_generator(seed)
+    if method == MosaicSampling.SOBOL:
+        engine = torch.quasirandom.SobolEngine(3, scramble=True, seed=seed & 0x7FFFFFFF)
+        return engine.draw(n, dtype=torch.float64)
+    if method == MosaicSampling.HALTON:
+        # Index 0 maps to the origin in every base, so start at 1
+        indices = torch.arange(1, n + 1)
+        points = torch.stack([radical_inverse(indices, base) for base in _HALTON_BASES], dim=1)
+        # Cranley-Patterson rotation: a seeded shift modulo 1 randomizes the
+        # sequence without changing its discrepancy
+        shift = torch.rand(3, generator=gen, dtype=torch.float64)
+        return torch.remainder(points + shift, 1.0)
+    if method == MosaicSampling.STRATIFIED:
+        # Latin hypercube: each dimension has exactly one point per stratum
+        # [k/n, (k+1)/n), with strata paired across dimensions at random
+        strata = torch.stack([torch.randperm(n, generator=gen) for _ in range(3)], dim=1)
+        jitter = torch.rand(n, 3, generator=gen, dtype=torch.float64)
+        return (strata.to(torch.float64) + jitter) / n
+    raise ValueError(f"No unit-cube point set for mosaic sampling {method}")
+
+
+def mosaic_base_samples(
+    method: MosaicSampling,
+    n: int,
+    seed: int,
+    device=None,
+    dtype: torch.dtype = torch.float64,
+) -> Tuple[torch.Tensor, torch.Tensor]:
+    """
+    Rotation axes and standard-normal angle scales for n mosaic domains.
+
+    Args:
+        method: Sampler
+        n: Number of mosaic domains
+        seed: Mosaic seed (C-style negative seeds are accepted)
+        device: Device of the returned tensors
+        dtype: Dtype of the returned tensors
+
+    Returns:
+        axes: (n, 3) rotation axes; unit vectors except for RANDOM, whose
+            Gaussian vectors are normalized by the caller as before
+        angle_scales: (n,) standard-normal scale of each rotation angle
+    """
+    if method == MosaicSampling.RANDOM:
+        # The original sampler, unchanged so that existing seeds give the same domains
+        gen = torch.Generator(device=device)
+        gen.manual_seed(seed & 0x7FFFFFFF)
+        axes = torch.randn(n, 3, device=device, dtype=dtype, generator=gen)
+        angle_scales = torch.randn(n, device=device, dtype=dtype, generator=gen)
+        return axes, angle_scales
+
+    points = unit_cube_points(method, n, seed)
+    z = 1.0 - 2.0 * points[:, 0]
+    phi = 2.0 * math.pi * points[:, 1]
+    radius = torch.sqrt(torch.clamp(1.0 - z * z, min=0.0))
+    axes = torch.stack([radius * torch.cos(phi), radius * torch.sin(phi), z], dim=1)
+    angle_scales = torch.special.ndtri(points[:, 2].clamp(_QUANTILE_EPS, 1.0 - _QUANTILE_EPS))
+    return axes.to(device=device, dtype=dtype), angle_scales.to(device=device, dtype=dtype)
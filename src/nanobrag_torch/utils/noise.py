@@ -5,11 +5,38 @@ This module implements Poisson noise generation following the spec requirements:
 - Exact Poisson for means < 12
 - Rejection sampling for means between 12 and 1e6
 - Gaussian approximation for means > 1e6
+
+generate_counter_noise() draws the same three regimes from a counter-based
+generator (PERF-PHILOX-001): every random number is Philox-4x32-10 of the
+counter (pixel index, frame, draw) under the key (seed), so a pixel's
+noise does not depend on which other pixels are generated with it, in what
+order, in which chunk or in which process.
 """
 
+import math
+
 import torch
 from typing import Optional, Union
 
+from ..config import NoiseConfig
+from .c_random import lcg_states
+
+_MASK32 = 0xFFFFFFFF
+_PHILOX_M0 = 0xD2511F53
+_PHILOX_M1 = 0xCD9E8D57
+_PHILOX_W0 = 0x9E3779B9
+_PHILOX_W1 = 0xBB67AE85
+
+# Draw indices (fourth counter word): the small/large regimes use draw 0,
+# rejection round t uses draw 1 + t, the normal approximation after the
+# last round and readout noise their own draws
+_DRAW_REJECTION = 1
+_DRAW_READOUT = _MASK32
+_MAX_REJECTION_ROUNDS = 64
+_DRAW_FALLBACK = _DRAW_REJECTION + _MAX_REJECTION_ROUNDS
+# P(Poisson(12) >= 64) < 1e-25
+_MAX_INVERSION_COUNT = 64
+
 
 def generate_poisson_noise(
     mean: torch.Tensor,
@@ -165,11 +192,251 @@ def lcg_random(
     RAND_MULT = 1103515245
     RAND_ADD = 12345
 
-    values = torch.zeros(n, dtype=dtype, device=device)
-    current = seed
+    # PERF-RNG-001: All n states at once by jump-ahead; masking with RAND_MAX
+    # is reduction modulo RAND_MAX + 1, and only the seed's low 31 bits matter
+    states = lcg_states(seed, n, RAND_MULT, RAND_ADD, RAND_MAX + 1, device=device)
+    return (states.to(torch.float64) / float(RAND_MAX)).to(dtype)
+
+
+def _mulhilo32(multiplier: int, x: torch.Tensor):
+    """High and low 32-bit words of multiplier * x, for 32-bit values held in int64."""
+    # 16 x 32-bit partial products stay below 2^48, so nothing overflows int64
+    p_lo = x * (multiplier & 0xFFFF)
+    p_hi = x * (multiplier >> 16)
+    mid = ((p_hi & 0xFFFF) << 16) + p_lo
+    return (p_hi >> 16) + (mid >> 32), mid & _MASK32
+
+
+def philox4x32(counter: torch.Tensor, key: tuple, rounds: int = 10) -> torch.Tensor:
+    """
+    Philox-4x32 block function (Salmon et al., SC'11), as in Random123.
+
+    Args:
+        counter: (..., 4) int64 tensor of 32-bit counter words
+        key: Two 32-bit key words
+        rounds: Number of rounds (10 for Philox-4x32-10)
+
+    Returns:
+        (..., 4) int64 tensor of 32-bit output words
+    """
+    c0, c1, c2, c3 = counter.unbind(-1)
+    k0, k1 = key[0] & _MASK32, key[1] & _MASK32
+    for _ in range(rounds):
+        hi0, lo0 = _mulhilo32(_PHILOX_M0, c0)
+        hi1, lo1 = _mulhilo32(_PHILOX_M1, c2)
+        c0, c1, c2, c3 = hi1 ^ c1 ^ k0, lo1, hi0 ^ c3 ^ k1, lo0
+        k0 = (k0 + _PHILOX_W0) & _MASK32
+        k1 = (k1 + _PHILOX_W1) & _MASK32
+    return torch.stack([c0, c1, c2, c3], dim=-1)
+
+
+def counter_uniforms(seed: int, frame: int, pixel_index: torch.Tensor, draw: int) -> torch.Tensor:
+    """
+    Two uniform deviates in (0, 1) per pixel from one Philox block.
+
+    Args:
+        seed: Generator key (any integer; its low 64 bits are used)
+        frame: Frame index (third counter word)
+        pixel_index: int64 tensor of pixel indices (first two counter words)
+        draw: Draw index (fourth counter word)
 
-    for i in range(n):
-        current = (RAND_MULT * current + RAND_ADD) & RAND_MAX
-        values[i] = float(current) / float(RAND_MAX)
+    Returns:
+        float64 tensor of shape pixel_index.shape + (2,), each value built
+        from 52 random bits
+    """
+    pixel_index = pixel_index.to(torch.int64)
+    counter = torch.stack([
+        pixel_index & _MASK32,
+        (pixel_index >> 32) & _MASK32,
+        torch.full_like(pixel_index, frame & _MASK32),
+        torch.full_like(pixel_index, draw & _MASK32),
+    ], dim=-1)
+    words = philox4x32(counter, (seed & _MASK32, (seed >> 32) & _MASK32))
+    bits = ((words[..., 0::2] >> 6) << 26) | (words[..., 1::2] >> 6)
+    return (bits.to(torch.float64) + 0.5) * 2.0 ** -52
+
+
+def _box_muller(uniforms: torch.Tensor) -> torch.Tensor:
+    """Standard normal deviate from the two uniforms of counter_uniforms()."""
+    u1, u2 = uniforms.unbind(-1)
+    return torch.sqrt(-2.0 * torch.log(u1)) * torch.cos(2.0 * math.pi * u2)
+
+
+def _poisson_small(lam: torch.Tensor, u: torch.Tensor) -> torch.Tensor:
+    """Poisson counts by inversion of the CDF (means below 12)."""
+    p = torch.exp(-lam)
+    cdf = p
+    k = torch.zeros_like(lam)
+    for j in range(1, _MAX_INVERSION_COUNT + 1):
+        k = k + (u > cdf)
+        p = p * lam / j
+        cdf = cdf + p
+    return k
+
+
+def _poisson_ptrs(lam: torch.Tensor, seed: int, frame: int, pixel_index: torch.Tensor) -> torch.Tensor:
+    """
+    Poisson counts by transformed rejection (PTRS, Hörmann 1993; means >= 10).
+
+    Round t of every pixel uses draw 1 + t, so the count depends only on the
+    pixel's own counters. Rounds continue while any pixel is unresolved;
+    the rare pixel left after the last round takes the normal approximation
+    from a draw no round uses.
+    """
+    slam = torch.sqrt(lam)
+    loglam = torch.log(lam)
+    b = 0.931 + 2.53 * slam
+    a = -0.059 + 0.02483 * b
+    log_invalpha = torch.log(1.1239 + 1.1328 / (b - 3.4))
+    vr = 0.9277 - 3.6224 / (b - 2.0)
+
+    counts = torch.zeros_like(lam)
+    pending = torch.arange(lam.numel(), device=lam.device)
+    for t in range(_MAX_REJECTION_ROUNDS):
+        if pending.numel() == 0:
+            break
+        uniforms = counter_uniforms(seed, frame, pixel_index[pending], _DRAW_REJECTION + t)
+        U = uniforms[:, 0] - 0.5
+        V = uniforms[:, 1]
+        us = 0.5 - torch.abs(U)
+        lam_p, a_p, b_p = lam[pending], a[pending], b[pending]
+        k = torch.floor((2.0 * a_p / us + b_p) * U + lam_p + 0.43)
+        fast = (us >= 0.07) & (V <= vr[pending])
+        rejected = (k < 0) | ((us < 0.013) & (V > us))
+        log_ratio = torch.log(V) + log_invalpha[pending] - torch.log(a_p / (us * us) + b_p)
+        exact = log_ratio <= -lam_p + k * loglam[pending] - torch.lgamma(k + 1.0)
+        accepted = fast | (~rejected & exact)
+        counts[pending[accepted]] = k[accepted]
+        pending = pending[~accepted]
+    if pending.numel() > 0:
+        z = _box_muller(counter_uniforms(seed, frame, pixel_index[pending], _DRAW_FALLBACK))
+        counts[pending] = torch.round(lam[pending] + slam[pending] * z)
+    return torch.clamp(counts, min=0.0)
+
+
+def counter_poisson(
+    mean: torch.Tensor, seed: int, frame: int = 0, pixel_index: Optional[torch.Tensor] = None
+) -> torch.Tensor:
+    """
+    Poisson counts of `mean` from the counter-based generator (PERF-PHILOX-001).
+
+    Uses the three regimes of generate_poisson_noise: inversion for means
+    below 12, transformed rejection up to 1e6, and round(N(mean, mean))
+    above.
+
+    Args:
+        mean: Expected counts (any shape; negative values count as 0)
+        seed: Generator key
+        frame: Frame index
+        pixel_index: Index of each pixel in the full image, same shape as
+            mean (default: 0..mean.numel()-1 in row-major order)
 
-    return values
\ No newline at end of file
+    Returns:
+        float64 tensor of counts with the shape of mean
+    """
+    if pixel_index is None:
+        pixel_index = torch.arange(mean.numel(), device=mean.device).reshape(mean.shape)
+    lam = mean.detach().to(torch.float64).clamp(min=0.0).reshape(-1)
+    pixel_index = pixel_index.to(device=lam.device, dtype=torch.int64).reshape(-1)
+    counts = torch.zeros_like(lam)
+
+    small = lam < 12
+    medium = (lam >= 12) & (lam <= 1e6)
+    large = lam > 1e6
+
+    if small.any():
+        u = counter_uniforms(seed, frame, pixel_index[small], 0)[:, 0]
+        counts[small] = _poisson_small(lam[small], u)
+    if medium.any():
+        counts[medium] = _poisson_ptrs(lam[medium], seed, frame, pixel_index[medium])
+    if large.any():
+        z = _box_muller(counter_uniforms(seed, frame, pixel_index[large], 0))
+        counts[large] = torch.round(lam[large] + torch.sqrt(lam[large]) * z)
+    return counts.reshape(mean.shape)
+
+
+def generate_counter_noise(
+    mean: torch.Tensor,
+    seed: int,
+    frame: int = 0,
+    pixel_index: Optional[torch.Tensor] = None,
+    adc_offset: float = 40.0,
+    readout_noise: float = 3.0,
+    overload_value: float = 65535.0,
+) -> tuple[torch.Tensor, int]:
+    """
+    Detector noise image from the counter-based generator (PERF-PHILOX-001).
+
+    Same steps as generate_poisson_noise (Poisson counts, Gaussian readout
+    noise, ADC offset, clipping at 0 and overload_value), but every pixel's
+    random numbers are keyed on (seed, frame, pixel index). Generating an
+    image in row chunks, tiles or worker processes, with pixel_index giving
+    each piece's position in the full image, reproduces the whole-image
+    result exactly.
+
+    Args:
+        mean: Input intensities (photon counts) as float tensor
+        seed: Random seed (generator key)
+        frame: Frame index within a sweep (part of the counter)
+        pixel_index: Index of each pixel in the full image, same shape as
+            mean (default: row-major positions within mean)
+        adc_offset: ADC offset to add to all pixels
+        readout_noise: Gaussian readout noise sigma
+        overload_value: Maximum value before saturation
+
+    Returns:
+        Tuple of (noisy image, overload count)
+        - noisy image: int32 tensor with the shape of mean
+        - overload_count: Number of pixels at or above overload_value after
+          rounding (so that it can be recounted from the clipped image)
+    """
+    if pixel_index is None:
+        pixel_index = torch.arange(mean.numel(), device=mean.device).reshape(mean.shape)
+    noisy = counter_poisson(mean, seed, frame, pixel_index)
+
+    if readout_noise > 0:
+        uniforms = counter_uniforms(seed, frame, pixel_index.to(noisy.device).reshape(-1), _DRAW_READOUT)
+        noisy = noisy + readout_noise * _box_muller(uniforms).reshape(noisy.shape)
+
+    noisy = torch.round(torch.clamp(noisy + adc_offset, min=0))
+    overload_count = (noisy >= overload_value).sum().item()
+    noisy = torch.clamp(noisy, max=overload_value)
+    return noisy.to(torch.int32), overload_count
+
+
+def counter_noise_image(
+    intensity: torch.Tensor,
+    noise_config: NoiseConfig,
+    seed: int,
+    frame: int = 0,
+    pixel_index: Optional[torch.Tensor] = None,
+) -> torch.Tensor:
+    """
+    Noise image of rendered intensities as written by the CLI (PERF-PHILOX-001).
+
+    Scales the intensities by noise_config.intfile_scale, applies
+    generate_counter_noise() and sets pixels with zero intensity (outside
+    the ROI or mask) to 0. Simulator.run_noise() calls it per block and the
+    CLI on the whole image, so both give the same noise image.
+
+    Args:
+        intensity: Rendered intensities
+        noise_config: ADC offset, readout noise, overload value and intfile_scale
+        seed: Generator key
+        frame: Frame index within a sweep
+        pixel_index: Index of each pixel in the full image, same shape as
+            intensity (default: row-major positions within intensity)
+
+    Returns:
+        int32 noise image with the shape of intensity
+    """
+    noisy, _ = generate_counter_noise(
+        intensity * noise_config.intfile_scale,
+        seed,
+        frame=frame,
+        pixel_index=pixel_index,
+        adc_offset=noise_config.adc_offset,
+        readout_noise=noise_config.readout_noise,
+        overload_value=noise_config.overload_value,
+    )
+    return torch.where(intensity > 0, noisy, torch.zeros_like(noisy))
@@ -5,6 +5,8 @@ This module contains PyTorch implementations of physical models and
 calculations from the original C code.
 """
 
+from typing import Tuple
+
 import torch
 
 
@@ -119,6 +121,101 @@ def sincg(u: torch.Tensor, N: torch.Tensor) -> torch.Tensor:
     return result
 
 
+
+@_get_compile_decorator()
+def sincg_reduced(h_frac: torch.Tensor, h0: torch.Tensor, N: torch.Tensor) -> torch.Tensor:
+    """
+    Evaluate sincg(π·(h0 + h_frac), N) on range-reduced arguments.
+
+    For integer N the grating factor is periodic up to a sign:
+
+        sin(Nπ(h0+d)) / sin(π(h0+d)) = (-1)^((N-1)·h0) · sin(Nπd) / sin(πd)
+
+    and sin(Nπd) = (-1)^m · sin(πr) with m = round(N·d), r = N·d - m. Both sine
+    arguments therefore stay within [-π/2, π/2], so float32 keeps its full
+    relative precision where `sincg(π·h, N)` would evaluate sin(N·π·h) on an
+    argument of order N·π·|h| and lose most significant bits (PERF-F32-001).
+
+    Args:
+        h_frac: Offset from the nearest integer index, h - round(h), in [-0.5, 0.5]
+        h0: Nearest integer index, round(h)
+        N: Number of unit cells (scalar or tensor); must be integral
+
+    Returns:
+        torch.Tensor: Same values as sincg(π·(h0 + h_frac), N)
+    """
+    if N.device != h_frac.device:
+        N = N.to(device=h_frac.device)
+    if N.ndim == 0:
+        N = N.expand_as(h_frac)
+
+    eps = 1e-10
+
+    Nd = N * h_frac
+    m = torch.round(Nd)
+    r = Nd - m
+
+    # (-1)^((N-1)·h0 + m), evaluated on magnitudes as in sincg
+    sign_exponent = h0 * (N - 1) + m
+    is_odd = (torch.abs(sign_exponent) % 2) >= 0.5
+    sign_factor = torch.where(is_odd, -torch.ones_like(h_frac), torch.ones_like(h_frac))
+
+    sin_d = torch.sin(torch.pi * h_frac)
+    sin_r = torch.sin(torch.pi * r)
+
+    # Safe denominator keeps the unused branch finite so gradients stay clean at nodes
+    at_node = torch.abs(sin_d) < eps
+    safe_sin_d = torch.where(at_node, torch.ones_like(sin_d), sin_d)
+
+    return sign_factor * torch.where(at_node, N, sin_r / safe_sin_d)
+
+
+def pairwise_sum(x: torch.Tensor, n_dims: int = 1) -> torch.Tensor:
+    """
+    Sum over the trailing `n_dims` dimensions with a pairwise tree.
+
+    The rounding error of the tree grows as O(ε·log n) rather than the O(ε·n)
+    bound of a sequential sum, independent of how the backend schedules its own
+    reduction. Used for float32 reductions over phi × mosaic (PERF-F32-001).
+
+    Args:
+        x: Input tensor
+        n_dims: Number of trailing dimensions to reduce
+
+    Returns:
+        torch.Tensor: x summed over its last n_dims dimensions
+    """
+    x = x.reshape(*x.shape[:x.dim() - n_dims], -1)
+    while x.shape[-1] > 1:
+        if x.shape[-1] % 2:
+            x = torch.nn.functional.pad(x, (0, 1))
+        x = x[..., 0::2] + x[..., 1::2]
+    return x[..., 0]
+
+
+def kahan_add(
+    total: torch.Tensor, compensation: torch.Tensor, value: torch.Tensor
+) -> Tuple[torch.Tensor, torch.Tensor]:
+    """
+    One step of Kahan-compensated accumulation: total += value.
+
+    Used where partial results are accumulated sequentially across tiles, so
+    the accumulated rounding error stays O(ε) regardless of the tile count.
+
+    Args:
+        total: Running sum
+        compensation: Running compensation term (start from zeros)
+        value: Addend
+
+    Returns:
+        (total, compensation) after the update
+    """
+    y = value - compensation
+    t = total + y
+    compensation = (t - total) - y
+    return t, compensation
+
+
 @_get_compile_decorator()
 def sinc3(x: torch.Tensor) -> torch.Tensor:
     """
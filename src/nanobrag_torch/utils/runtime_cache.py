@@ -5,16 +5,108 @@ Implements shared cache for torch.compile'd functions to avoid
 recompilation overhead across Simulator instances with matching
 runtime parameters.
 
-Design per PERF-PYTORCH-004 Phase 2.1:
+Design per PERF-PYTORCH-004 Phase 2.1, extended by PERF-KERNELCACHE-001:
 - Module-level singleton for simplicity
-- Cache key: (device, dtype, oversample, n_sources)
+- Cache key: device, dtype and every specialization input of the compiled
+  kernel (see make_key); the Simulator passes the kernel variant, compile
+  mode, crystal shape, polarization, interpolation mode, constant-F and
+  range-reduction paths and the ranks of the crystal tensors
+- Least recently used entries are evicted beyond max_entries
+- Compiled artifacts persist in a cache directory: after the first call of
+  a new kernel, torch.compiler.save_cache_artifacts() is stored under the
+  key, and a fresh process loads it (load_cache_artifacts) before
+  compiling, so Inductor and autograd caches start warm. Requires
+  PyTorch >= 2.7; older versions only keep the in-process cache (and
+  Inductor's own FX graph cache)
 - Thread-safe via simple locking (future extension if needed)
-- Explicit invalidation when cache grows too large
 """
 
-from typing import Optional, Tuple, Callable
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Hashable, Optional, Tuple, Union
+
 import torch
 
+from ..io.disk_cache import DiskCache, atomic_write, cache_root
+
+DEFAULT_ARTIFACT_BYTES = 2 * 1024 ** 3
+
+
+def make_key(device: torch.device, dtype: torch.dtype, **specialization: Hashable) -> Tuple:
+    """
+    Generate a cache key from the device, dtype and specialization inputs.
+
+    Args:
+        device: PyTorch device (cpu/cuda:0/etc)
+        dtype: PyTorch data type (float32/float64)
+        **specialization: Hashable inputs the compiled code depends on
+            (kernel variant, compile mode, tensor ranks, ...)
+
+    Returns:
+        Tuple suitable for dict key
+    """
+    # Normalize device to ensure 'cuda:0' and 'cuda' match
+    device = torch.device(device)
+    device_str = str(device)
+    if device.type == 'cuda' and device.index is None:
+        device_str = 'cuda:0'
+
+    return (device_str, dtype) + tuple(sorted(specialization.items()))
+
+
+class _ArtifactStore(DiskCache):
+    """Directory of serialized compiler caches, one file per kernel key."""
+
+    suffix = ".kernel"
+
+    def path_for(self, key: Tuple) -> Path:
+        """File of a kernel key (also keyed by the PyTorch version)."""
+        digest = hashlib.sha256(f"{torch.__version__}|{key!r}".encode()).hexdigest()
+        return self.directory / f"{digest}{self.suffix}"
+
+    def read(self, key: Tuple) -> Optional[bytes]:
+        """Artifacts stored under `key`, or None."""
+        path = self.path_for(key)
+        try:
+            data = path.read_bytes()
+        except OSError:
+            self._misses += 1
+            return None
+        self._touch(path)
+        self._hits += 1
+        return data
+
+    def write(self, key: Tuple, data: bytes):
+        """Store artifacts under `key` (a warning is printed if that fails)."""
+        path = self.path_for(key)
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with atomic_write(path) as f:
+                f.write(data)
+            self.evict(keep=path)
+        except OSError as e:
+            print(f"Warning: Could not write kernel cache: {e}")
+
+
+class _TimedKernel:
+    """Compiled kernel that reports the duration of its first (compiling) call."""
+
+    def __init__(self, fn: Callable, on_first_call: Callable[[float], None]):
+        self._fn = fn
+        self._on_first_call = on_first_call
+
+    def __call__(self, *args, **kwargs):
+        if self._on_first_call is None:
+            return self._fn(*args, **kwargs)
+        start = time.perf_counter()
+        result = self._fn(*args, **kwargs)
+        on_first_call, self._on_first_call = self._on_first_call, None
+        on_first_call(time.perf_counter() - start)
+        return result
+
 
 class CompiledKernelCache:
     """
@@ -24,111 +116,153 @@ class CompiledKernelCache:
     the same compiled kernel, avoiding 0.5-6s compilation overhead.
     """
 
-    def __init__(self, max_entries: int = 50):
+    def __init__(
+        self,
+        max_entries: int = 50,
+        directory: Optional[Union[str, Path]] = None,
+        max_bytes: int = DEFAULT_ARTIFACT_BYTES,
+    ):
         """
         Initialize cache.
 
         Args:
             max_entries: Maximum number of compiled kernels to cache.
-                When exceeded, the entire cache is cleared (simple LRU alternative).
+                When exceeded, the least recently used kernel is dropped.
+            directory: Directory of persisted compiler artifacts, or None to
+                cache in this process only
+            max_bytes: Size budget of the artifact directory
+
+        Raises:
+            ValueError: If max_entries or max_bytes is not positive
         """
-        self._cache = {}
+        if max_entries <= 0:
+            raise ValueError(f"max_entries must be positive, got {max_entries}")
+        self._cache: "OrderedDict[Tuple, Callable]" = OrderedDict()
         self._max_entries = max_entries
+        self._artifacts = _ArtifactStore(directory, max_bytes) if directory is not None else None
+        self._reset_counters()
+
+    def _reset_counters(self):
         self._hits = 0
         self._misses = 0
+        self._evictions = 0
+        self._compiles = 0
+        self._compile_seconds = 0.0
+        self._artifact_loads = 0
 
-    def _make_key(
-        self,
-        device: torch.device,
-        dtype: torch.dtype,
-        oversample: int,
-        n_sources: int
-    ) -> Tuple:
-        """
-        Generate cache key from runtime parameters.
-
-        Args:
-            device: PyTorch device (cpu/cuda:0/etc)
-            dtype: PyTorch data type (float32/float64)
-            oversample: Subpixel grid size
-            n_sources: Number of beam sources (divergence/dispersion)
-
-        Returns:
-            Tuple suitable for dict key
-        """
-        # Normalize device to ensure 'cuda:0' and 'cuda' match
-        device_str = str(device)
-        if device.type == 'cuda' and device.index is None:
-            device_str = f'cuda:0'
-
-        return (device_str, dtype, oversample, n_sources)
-
-    def get(
-        self,
-        device: torch.device,
-        dtype: torch.dtype,
-        oversample: int,
-        n_sources: int
-    ) -> Optional[Callable]:
+    def get(self, key: Tuple) -> Optional[Callable]:
         """
         Retrieve compiled kernel from cache.
 
         Args:
-            device: PyTorch device
-            dtype: PyTorch data type
-            oversample: Subpixel grid size
-            n_sources: Number of beam sources
+            key: Key from make_key()
 
         Returns:
             Compiled function if found, None otherwise
         """
-        key = self._make_key(device, dtype, oversample, n_sources)
         compiled_fn = self._cache.get(key)
 
         if compiled_fn is not None:
             self._hits += 1
+            self._cache.move_to_end(key)
         else:
             self._misses += 1
 
         return compiled_fn
 
-    def put(
-        self,
-        device: torch.device,
-        dtype: torch.dtype,
-        oversample: int,
-        n_sources: int,
-        compiled_fn: Callable
-    ):
+    def put(self, key: Tuple, compiled_fn: Callable):
         """
         Store compiled kernel in cache.
 
         Args:
-            device: PyTorch device
-            dtype: PyTorch data type
-            oversample: Subpixel grid size
-            n_sources: Number of beam sources
+            key: Key from make_key()
             compiled_fn: Compiled function to cache
         """
-        # Simple eviction: clear entire cache when too large
-        if len(self._cache) >= self._max_entries:
-            self._cache.clear()
-
-        key = self._make_key(device, dtype, oversample, n_sources)
         self._cache[key] = compiled_fn
+        self._cache.move_to_end(key)
+        while len(self._cache) > self._max_entries:
+            self._cache.popitem(last=False)
+            self._evictions += 1
+
+    def compile(self, key: Tuple, kernel: Callable, compiler: Callable[[Callable], Callable]) -> Callable:
+        """
+        Cached compiled version of `kernel`, compiling it on a miss.
+
+        On a miss, persisted artifacts of the key are loaded first, then
+        `compiler(kernel)` is stored. Its first call is timed (torch.compile
+        compiles lazily) and afterwards the compiler artifacts are persisted.
+
+        Args:
+            key: Key from make_key(); must cover everything `compiler` specializes on
+            kernel: Function to compile
+            compiler: Returns the compiled function, e.g. torch.compile(mode=...)
+
+        Returns:
+            Compiled function
+
+        Raises:
+            Exception: Whatever `compiler` raises (nothing is cached then)
+        """
+        compiled_fn = self.get(key)
+        if compiled_fn is not None:
+            return compiled_fn
+
+        self._load_artifacts(key)
+        compiled_fn = _TimedKernel(compiler(kernel), lambda seconds: self._compiled(key, seconds))
+        self.put(key, compiled_fn)
+        return compiled_fn
 
-    def clear(self):
-        """Clear all cached kernels."""
+    def _compiled(self, key: Tuple, seconds: float):
+        self._compiles += 1
+        self._compile_seconds += seconds
+        self._save_artifacts(key)
+
+    def _load_artifacts(self, key: Tuple):
+        load = getattr(torch.compiler, "load_cache_artifacts", None)
+        if self._artifacts is None or load is None:
+            return
+        data = self._artifacts.read(key)
+        if data is None:
+            return
+        try:
+            load(data)
+        except Exception:
+            return  # Artifacts of another build or a damaged file: compile from scratch
+        self._artifact_loads += 1
+
+    def _save_artifacts(self, key: Tuple):
+        save = getattr(torch.compiler, "save_cache_artifacts", None)
+        if self._artifacts is None or save is None:
+            return
+        try:
+            artifacts = save()
+        except Exception:
+            return
+        if artifacts:
+            self._artifacts.write(key, artifacts[0])
+
+    def clear(self, artifacts: bool = False):
+        """
+        Clear all cached kernels.
+
+        Args:
+            artifacts: Also delete the persisted compiler artifacts
+        """
         self._cache.clear()
-        self._hits = 0
-        self._misses = 0
+        self._reset_counters()
+        if artifacts and self._artifacts is not None:
+            self._artifacts.clear()
 
     def stats(self) -> dict:
         """
         Get cache statistics.
 
         Returns:
-            Dictionary with hits, misses, and hit rate
+            Dictionary with hits, misses, hit rate, size, evictions, the
+            number of kernels compiled and the seconds spent in their first
+            (compiling) calls, and the number of persisted artifacts loaded,
+            plus 'artifacts' (disk_cache stats of the artifact directory, or
+            None)
         """
         total = self._hits + self._misses
         hit_rate = self._hits / total if total > 0 else 0.0
@@ -137,12 +271,24 @@ class CompiledKernelCache:
             'hits': self._hits,
             'misses': self._misses,
             'hit_rate': hit_rate,
-            'size': len(self._cache)
+            'size': len(self._cache),
+            'evictions': self._evictions,
+            'compiles': self._compiles,
+            'compile_seconds': self._compile_seconds,
+            'artifact_loads': self._artifact_loads,
+            'artifacts': self._artifacts.stats() if self._artifacts is not None else None,
         }
 
 
+def _default_artifact_dir() -> Optional[Path]:
+    """kernels in the user cache, or None if NANOBRAG_KERNEL_CACHE=0."""
+    if os.environ.get("NANOBRAG_KERNEL_CACHE", "1") == "0":
+        return None
+    return cache_root() / "kernels"
+
+
 # Global singleton cache
-_global_kernel_cache = CompiledKernelCache()
+_global_kernel_cache = CompiledKernelCache(directory=_default_artifact_dir())
 
 
 def get_global_kernel_cache() -> CompiledKernelCache:
@@ -0,0 +1,133 @@
+"""
+Reflection-driven spot prediction for sparse rendering.
+
+For large crystals the lattice transform F_latt is negligible almost
+everywhere, so the dense path spends most of its time evaluating sincg on
+pixels that receive no intensity. These helpers predict, from the reciprocal
+lattice and the Ewald sphere, which detector pixels can carry a lattice
+transform above a fractional cutoff. The Simulator then evaluates the exact
+physics only on those pixels (PERF-SPARSE-001).
+
+All functions are geometry-only and run without gradients; the selected
+pixels are a discrete set, and the physics evaluated on them stays
+differentiable.
+"""
+
+import math
+from typing import Tuple
+
+import torch
+
+from ..config import CrystalShape
+
+
+def lattice_halfwidth(
+    shape: CrystalShape,
+    N_cells: Tuple[float, float, float],
+    fudge: float,
+    cutoff: float,
+    reciprocal_lengths: Tuple[float, float, float],
+) -> float:
+    """
+    Reciprocal-space radius outside which |F_latt| / (Na·Nb·Nc) < cutoff.
+
+    Bounds per shape (Δh is the offset from the nearest node in index units):
+    - SQUARE: |sincg(πΔh, N)| / N ≤ 1 / (π N |Δh|) outside the main lobe
+      (|Δh| < 1/N), so each axis needs |Δh| ≤ max(1/N, 1/(π N c)).
+    - ROUND: |sinc3(x)| ≤ 3/x² beyond its first zero (x ≈ 4.493), with
+      x = π·hrad·√fudge and hrad = |(Δh·Na, Δk·Nb, Δl·Nc)|.
+    - GAUSS: exp(-rad²/0.63·fudge) ≥ c with rad = |Δr*|·Na·Nb·Nc.
+    - TOPHAT: rad²·fudge < 0.3969.
+
+    Args:
+        shape: Crystal shape model
+        N_cells: (Na, Nb, Nc)
+        fudge: Shape fudge factor
+        cutoff: Fractional F_latt cutoff in (0, 1)
+        reciprocal_lengths: (|a*|, |b*|, |c*|) in Å⁻¹
+
+    Returns:
+        Radius in Å⁻¹ (conservative: per-axis bounds are combined with the
+        triangle inequality)
+    """
+    Na, Nb, Nc = (float(n) for n in N_cells)
+
+    if shape == CrystalShape.SQUARE:
+        per_axis = [
+            min(0.5, max(1.0 / n, 1.0 / (math.pi * n * cutoff)))
+            for n in (Na, Nb, Nc)
+        ]
+        return sum(dh * length for dh, length in zip(per_axis, reciprocal_lengths))
+
+    if shape == CrystalShape.ROUND:
+        hrad = max(4.493 / math.pi, math.sqrt(3.0 / cutoff) / math.pi) / math.sqrt(fudge)
+        per_axis = [min(0.5, hrad / n) for n in (Na, Nb, Nc)]
+        return sum(dh * length for dh, length in zip(per_axis, reciprocal_lengths))
+
+    if shape == CrystalShape.GAUSS:
+        rad = math.sqrt(0.63 * math.log(1.0 / cutoff) / fudge)
+        return rad / (Na * Nb * Nc)
+
+    if shape == CrystalShape.TOPHAT:
+        rad = math.sqrt(0.3969 / fudge)
+        return rad / (Na * Nb * Nc)
+
+    raise ValueError(f"Unsupported crystal shape: {shape}")
+
+
+def enumerate_hkl(
+    h_range: Tuple[int, int],
+    k_range: Tuple[int, int],
+    l_range: Tuple[int, int],
+    device=None,
+    dtype=torch.float64,
+) -> torch.Tensor:
+    """
+    Enumerate integer Miller indices in an inclusive box.
+
+    Args:
+        h_range, k_range, l_range: Inclusive (min, max) bounds
+        device: Output device
+        dtype: Output dtype
+
+    Returns:
+        Tensor of shape (M, 3) with one (h, k, l) row per node
+    """
+    h = torch.arange(h_range[0], h_range[1] + 1, device=device, dtype=dtype)
+    k = torch.arange(k_range[0], k_range[1] + 1, device=device, dtype=dtype)
+    l = torch.arange(l_range[0], l_range[1] + 1, device=device, dtype=dtype)  # noqa: E741
+    grid = torch.stack(torch.meshgrid(h, k, l, indexing="ij"), dim=-1)
+    return grid.reshape(-1, 3)
+
+
+def project_to_planar_detector(
+    directions: torch.Tensor,
+    pix0_vector: torch.Tensor,
+    fdet_vec: torch.Tensor,
+    sdet_vec: torch.Tensor,
+    odet_vec: torch.Tensor,
+    pixel_size: float,
+) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor, torch.Tensor]:
+    """
+    Intersect diffracted unit vectors with the detector plane.
+
+    Pixel (s, f) has its center at pix0 + (s+0.5)·p·sdet + (f+0.5)·p·fdet, so
+    the continuous coordinates returned here floor to the pixel index.
+
+    Args:
+        directions: Diffracted unit vectors (M, 3)
+        pix0_vector, fdet_vec, sdet_vec, odet_vec: Detector geometry (3,)
+        pixel_size: Pixel size in meters
+
+    Returns:
+        (s, f, path_length, obliquity): continuous slow/fast coordinates in
+        pixels, sample-to-hit distance in meters and cos of the incidence angle.
+        Rays that miss the plane have obliquity <= 0.
+    """
+    close_distance = torch.dot(pix0_vector, odet_vec)
+    obliquity = directions @ odet_vec
+    path_length = close_distance / obliquity.clamp_min(1e-12)
+    hits = directions * path_length.unsqueeze(-1) - pix0_vector
+    s = (hits @ sdet_vec) / pixel_size
+    f = (hits @ fdet_vec) / pixel_size
+    return s, f, path_length, obliquity
@@ -0,0 +1,184 @@
+"""
+Memory-budgeted tile planning for Simulator.run.
+
+The physics kernel materialises one intensity sample per
+(source, pixel, subpixel, phi, mosaic) combination before reducing over
+phi and mosaic. For large detectors with many orientations this product no
+longer fits in memory, so the tiled execution path walks the sample space
+in tiles whose size is derived from a user-supplied memory budget.
+
+Design per PERF-TILING-001:
+- Pure planning helpers (no tensors), so they can be unit tested in isolation
+- Tiles shrink one axis at a time in a fixed priority order; the first axis
+  that brings the tile under budget stops the search
+- Peak memory scales with the tile size, not with the total sample count
+"""
+
+import math
+import re
+from dataclasses import dataclass
+from typing import Union
+
+
+# Live intermediates per sample inside compute_physics_for_position:
+# scattering/Miller components, rounded indices, F_cell, the three sincg
+# factors and their guards, F_latt, |F|² and the dmin mask.
+ELEMENTS_PER_SAMPLE = 32
+
+# Extra live elements per sample for tricubic interpolation (4×4×4
+# neighbourhood × autograd overhead, matching Simulator.estimate_memory).
+TRICUBIC_ELEMENTS_PER_SAMPLE = 64 * 4
+
+# With precomputed tricubic coefficients (PERF-TRICUBIC-001): the gathered
+# 4×4×4 cell polynomial plus the Horner partial sums.
+TRICUBIC_CACHED_ELEMENTS_PER_SAMPLE = 64 + 16 + 4
+
+_SIZE_SUFFIXES = {
+    "": 1,
+    "K": 1024,
+    "M": 1024 ** 2,
+    "G": 1024 ** 3,
+    "T": 1024 ** 4,
+}
+
+_SIZE_PATTERN = re.compile(r"^\s*([0-9]*\.?[0-9]+)\s*([KMGT]?)(I?B)?\s*$", re.IGNORECASE)
+
+
+def parse_memory_budget(value: Union[int, float, str]) -> int:
+    """
+    Parse a memory budget into bytes.
+
+    Accepts plain byte counts (``8589934592``) or strings with a binary
+    suffix (``"512M"``, ``"8G"``, ``"8GB"``, ``"8GiB"``).
+
+    Args:
+        value: Budget as a number of bytes or a size string
+
+    Returns:
+        Budget in bytes
+
+    Raises:
+        ValueError: If the value cannot be parsed or is not positive
+    """
+    if isinstance(value, (int, float)):
+        n_bytes = int(value)
+    else:
+        match = _SIZE_PATTERN.match(str(value))
+        if match is None:
+            raise ValueError(
+                f"Invalid memory budget '{value}' (expected e.g. 512M, 8G or a byte count)"
+            )
+        number, suffix, _ = match.groups()
+        n_bytes = int(float(number) * _SIZE_SUFFIXES[suffix.upper()])
+
+    if n_bytes <= 0:
+        raise ValueError(f"Memory budget must be positive, got {value}")
+    return n_bytes
+
+
+@dataclass
+class TilePlan:
+    """Tile extents along each axis of the sample space."""
+    rows: int
+    cols: int
+    sources: int
+    phi: int
+    mosaic: int
+    subpixels: int
+
+    @property
+    def samples(self) -> int:
+        """Number of samples materialised per kernel call."""
+        return self.rows * self.cols * self.sources * self.phi * self.mosaic * self.subpixels
+
+
+def plan_tiles(
+    budget_bytes: int,
+    n_rows: int,
+    n_cols: int,
+    n_sources: int,
+    n_phi: int,
+    n_mosaic: int,
+    n_subpixels: int,
+    bytes_per_sample: int,
+) -> TilePlan:
+    """
+    Choose tile extents so that one kernel call fits in ``budget_bytes``.
+
+    Axes are shrunk in the order rows → subpixels → mosaic → phi → sources →
+    columns. Each axis is reduced only as far as needed, so small problems run
+    as a single tile and large ones keep the widest possible inner reduction.
+
+    Args:
+        budget_bytes: Memory available for per-sample intermediates
+        n_rows, n_cols: Detector extents (slow, fast)
+        n_sources: Number of beam sources
+        n_phi: Number of phi steps
+        n_mosaic: Number of mosaic domains
+        n_subpixels: Subpixels per pixel (oversample²)
+        bytes_per_sample: Estimated live bytes per sample
+
+    Returns:
+        TilePlan whose sample count fits the budget
+
+    Raises:
+        ValueError: If even a single-sample tile exceeds the budget
+    """
+    max_samples = budget_bytes // bytes_per_sample
+    if max_samples < 1:
+        raise ValueError(
+            f"Memory budget of {budget_bytes} bytes is too small for a single sample "
+            f"({bytes_per_sample} bytes)"
+        )
+
+    extents = {
+        "rows": n_rows,
+        "cols": n_cols,
+        "sources": n_sources,
+        "phi": n_phi,
+        "mosaic": n_mosaic,
+        "subpixels": n_subpixels,
+    }
+
+    for axis in ("rows", "subpixels", "mosaic", "phi", "sources", "cols"):
+        total = math.prod(extents.values())
+        if total <= max_samples:
+            break
+        others = total // extents[axis]
+        extents[axis] = max(1, min(extents[axis], max_samples // others))
+
+    return TilePlan(**extents)
+
+
+def plan_shot_batch(
+    budget_bytes: int,
+    n_shots: int,
+    samples_per_shot: int,
+    bytes_per_sample: int,
+) -> int:
+    """
+    Choose how many shots of a batched simulation go into one kernel call.
+
+    PERF-BATCH-001: Every shot of Simulator.run_batch materialises the full
+    (source, pixel, subpixel, phi, mosaic) sample space, so the shot axis is
+    the outermost tile.
+
+    Args:
+        budget_bytes: Memory available for per-sample intermediates
+        n_shots: Total number of shots
+        samples_per_shot: Samples materialised per shot
+        bytes_per_sample: Estimated live bytes per sample
+
+    Returns:
+        Shots per kernel call, between 1 and n_shots
+
+    Raises:
+        ValueError: If a single shot exceeds the budget
+    """
+    shot_bytes = samples_per_shot * bytes_per_sample
+    if shot_bytes > budget_bytes:
+        raise ValueError(
+            f"Memory budget of {budget_bytes} bytes is too small for a single shot "
+            f"({shot_bytes} bytes); use run() with mem_budget for tiling within a shot"
+        )
+    return max(1, min(n_shots, budget_bytes // shot_bytes))
@@ -0,0 +1,122 @@
+"""
+Precomputed tricubic interpolation coefficients (PERF-TRICUBIC-001).
+
+nanoBragg interpolates structure factors with polin3: 4-point Lagrange
+interpolation along l, then k, then h, over the 4×4×4 grid points
+floor(x)-1 .. floor(x)+2 around each query. Evaluated from scratch, that
+is 21 one-dimensional interpolations with their temporaries for each of
+the S×F×phi×mosaic×oversample² samples.
+
+On a unit-spaced grid the interpolant inside a cell is a fixed tricubic
+polynomial in the fractional offsets t = x - floor(x) ∈ [0, 1):
+
+    F(t_h, t_k, t_l) = Σ_pqr C[p, q, r] · t_h^p · t_k^q · t_l^r
+
+with C = Y ×₁ M ×₂ M ×₃ M, where Y is the 4×4×4 neighbourhood and
+M[i, p] is the t^p coefficient of the Lagrange basis polynomial of node
+i - 1. The coefficients depend only on the HKL grid, so they are computed
+once per grid. A query is then one gather of 64 coefficients and a
+Horner evaluation. The result equals polin3 up to rounding.
+
+Without the coefficient cache (differentiable or bricked grids) the
+neighbourhoods are gathered from a halo-padded copy of the grid with
+HKL_HALO voxels of default_F on every side (PERF-TRICUBIC-002). Floor
+cells are clamped into the padded range, so every gather is valid and
+out-of-range samples are masked to default_F element by element instead
+of branching on the whole batch.
+"""
+
+import torch
+
+from .hkl_blocks import BlockedHKLGrid
+
+# M[i, p]: coefficient of t^p in the Lagrange basis polynomial of node i - 1
+# for the nodes -1, 0, 1, 2
+LAGRANGE_MONOMIAL = (
+    (0.0, -1.0 / 3.0, 0.5, -1.0 / 6.0),
+    (1.0, -0.5, -1.0, 0.5),
+    (0.0, 1.0, 0.5, -0.5),
+    (0.0, -1.0 / 6.0, 0.0, 1.0 / 6.0),
+)
+
+# Cells per chunk along h when building coefficients (bounds float64 temporaries)
+_BUILD_CHUNK_CELLS = 2 ** 16
+
+# Border width of the padded grid: a clamped floor cell f - 1 .. f + 2 stays
+# inside it for every f in [min - 1, max], whatever the grid size
+HKL_HALO = 2
+
+
+def tricubic_coefficients(grid: torch.Tensor) -> torch.Tensor:
+    """
+    Monomial coefficients of the tricubic interpolant of every interior cell.
+
+    Cell (i, j, k) spans grid indices i..i+1 (and so on). Its interpolant
+    uses grid points i-1 .. i+2, so cells are stored for i = 1 .. R-3;
+    entry [c] belongs to cell c + 1.
+
+    Args:
+        grid: (R_h, R_k, R_l) structure factors, each R ≥ 4
+
+    Returns:
+        (R_h-3, R_k-3, R_l-3, 4, 4, 4) coefficients C[..., p, q, r] of
+        t_h^p · t_k^q · t_l^r, in the dtype of grid (computed in float64)
+
+    Raises:
+        ValueError: If the grid is not 3D or has fewer than 4 points along an axis
+    """
+    if grid.dim() != 3 or min(grid.shape) < 4:
+        raise ValueError(f"Tricubic coefficients need a 3D grid with at least 4 points per axis, got {tuple(grid.shape)}")
+    M = torch.tensor(LAGRANGE_MONOMIAL, dtype=torch.float64, device=grid.device)
+    n_h, n_k, n_l = (n - 3 for n in grid.shape)
+    coefficients = torch.empty((n_h, n_k, n_l, 4, 4, 4), dtype=grid.dtype, device=grid.device)
+
+    chunk = max(1, _BUILD_CHUNK_CELLS // (n_k * n_l))
+    for start in range(0, n_h, chunk):
+        stop = min(start + chunk, n_h)
+        Y = grid[start:stop + 3].detach().to(torch.float64)
+        # Sliding 4-point windows along each axis, contracted with M:
+        # (h, k, l, i, j, k') → (h, k, l, p, q, r)
+        windows = Y.unfold(0, 4, 1).unfold(1, 4, 1).unfold(2, 4, 1)
+        coefficients[start:stop] = torch.einsum(
+            "hklijm,ip,jq,mr->hklpqr", windows, M, M, M
+        ).to(grid.dtype)
+    return coefficients
+
+
+def evaluate_tricubic(
+    coefficients: torch.Tensor, t_h: torch.Tensor, t_k: torch.Tensor, t_l: torch.Tensor
+) -> torch.Tensor:
+    """
+    Evaluate gathered cell polynomials at fractional offsets (Horner's rule).
+
+    Args:
+        coefficients: (..., 4, 4, 4) coefficients C[p, q, r]
+        t_h, t_k, t_l: (...) offsets from the cell's lower corner
+
+    Returns:
+        (...) interpolated values
+    """
+    t_l = t_l[..., None, None]
+    c = ((coefficients[..., 3] * t_l + coefficients[..., 2]) * t_l + coefficients[..., 1]) * t_l + coefficients[..., 0]
+    t_k = t_k[..., None]
+    c = ((c[..., 3] * t_k + c[..., 2]) * t_k + c[..., 1]) * t_k + c[..., 0]
+    return ((c[..., 3] * t_h + c[..., 2]) * t_h + c[..., 1]) * t_h + c[..., 0]
+
+
+def pad_grid(grid, default_F: float, width: int = HKL_HALO):
+    """
+    Copy of an HKL grid with a `width`-voxel border on every side.
+
+    Args:
+        grid: (R_h, R_k, R_l) dense tensor or BlockedHKLGrid
+        default_F: Border value of a dense grid (a BlockedHKLGrid uses its own default_F)
+        width: Border width in voxels
+
+    Returns:
+        Grid of the same kind, shape (R_h + 2w, R_k + 2w, R_l + 2w); index
+        i + width of the result holds index i of the input
+    """
+    if isinstance(grid, BlockedHKLGrid):
+        return grid.padded(width)
+    return torch.nn.functional.pad(grid, (width,) * 6, mode="constant", value=float(default_F))
@@ -0,0 +1,148 @@
+"""
+AT-PERF-009: Memory-budgeted tiled accumulation (PERF-TILING-001).
+
+Tests that Simulator.run(mem_budget=...) tiles the sample space over pixels,
+sources, phi steps, mosaic domains and subpixels, and reproduces the fully
+vectorized image.
+"""
+
+import os
+import pytest
+import torch
+
+from nanobrag_torch import simulator as simulator_module
+from nanobrag_torch.config import CrystalConfig, DetectorConfig, BeamConfig
+from nanobrag_torch.models.crystal import Crystal
+from nanobrag_torch.models.detector import Detector
+from nanobrag_torch.simulator import Simulator
+from nanobrag_torch.utils.runtime_cache import CompiledKernelCache
+from nanobrag_torch.utils.tiling import parse_memory_budget, plan_tiles
+
+os.environ['KMP_DUPLICATE_LIB_OK'] = 'TRUE'
+
+
+def _make_simulator(n_sources=1, dtype=torch.float64):
+    crystal_config = CrystalConfig(
+        cell_a=100.0, cell_b=100.0, cell_c=100.0,
+        N_cells=(5, 5, 5),
+        default_F=100.0,
+        phi_start_deg=0.0,
+        osc_range_deg=0.3,
+        phi_steps=3,
+        mosaic_spread_deg=0.5,
+        mosaic_domains=4,
+    )
+    detector_config = DetectorConfig(
+        spixels=24, fpixels=20,
+        distance_mm=100.0,
+        pixel_size_mm=0.1,
+        oversample=2,
+    )
+    beam_kwargs = dict(wavelength_A=6.2, fluence=1e12)
+    if n_sources > 1:
+        angles = torch.linspace(-2e-3, 2e-3, n_sources, dtype=torch.float64)
+        directions = torch.stack(
+            [-torch.cos(angles), torch.sin(angles), torch.zeros_like(angles)], dim=1
+        )
+        beam_kwargs.update(
+            source_directions=directions,
+            source_wavelengths=torch.full((n_sources,), 6.2e-10, dtype=torch.float64),
+            source_weights=torch.ones(n_sources, dtype=torch.float64),
+        )
+    beam_config = BeamConfig(**beam_kwargs)
+
+    crystal = Crystal(crystal_config, beam_config=beam_config, dtype=dtype)
+    detector = Detector(detector_config, dtype=dtype)
+    return Simulator(crystal, detector, beam_config=beam_config, dtype=dtype)
+
+
+class TestParseMemoryBudget:
+    """Memory budget strings map to bytes."""
+
+    def test_suffixes(self):
+        assert parse_memory_budget("8G") == 8 * 1024 ** 3
+        assert parse_memory_budget("512M") == 512 * 1024 ** 2
+        assert parse_memory_budget("8GiB") == 8 * 1024 ** 3
+        assert parse_memory_budget("1.5k") == 1536
+        assert parse_memory_budget(4096) == 4096
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            parse_memory_budget("eight gigs")
+        with pytest.raises(ValueError):
+            parse_memory_budget(0)
+
+
+class TestPlanTiles:
+    """Tile plans respect the budget and shrink axes in priority order."""
+
+    def test_fits_in_one_tile(self):
+        plan = plan_tiles(10 ** 9, 8, 8, 2, 3, 4, 4, bytes_per_sample=100)
+        assert (plan.rows, plan.cols, plan.sources, plan.phi, plan.mosaic, plan.subpixels) == \
+            (8, 8, 2, 3, 4, 4)
+
+    def test_rows_shrink_first(self):
+        # 8 × 8 × 2 × 3 × 4 × 4 = 6144 samples; allow 1600
+        plan = plan_tiles(1600 * 100, 8, 8, 2, 3, 4, 4, bytes_per_sample=100)
+        assert plan.rows == 2
+        assert plan.subpixels == 4 and plan.mosaic == 4
+        assert plan.samples <= 1600
+
+    def test_all_axes_can_shrink(self):
+        plan = plan_tiles(100, 8, 8, 2, 3, 4, 4, bytes_per_sample=100)
+        assert plan.samples == 1
+
+    def test_budget_too_small(self):
+        with pytest.raises(ValueError):
+            plan_tiles(10, 8, 8, 1, 1, 1, 1, bytes_per_sample=100)
+
+
+class TestAT_PERF_009:
+    """Tiled accumulation matches the fully vectorized image."""
+
+    @pytest.mark.parametrize("n_sources", [1, 3])
+    @pytest.mark.parametrize("budget", ["64M", "2M", "200K"])
+    def test_tiled_matches_full(self, n_sources, budget):
+        sim = _make_simulator(n_sources=n_sources)
+        reference = sim.run()
+        tiled = sim.run(mem_budget=budget)
+        assert tiled.shape == reference.shape
+        torch.testing.assert_close(tiled, reference, rtol=1e-10, atol=1e-20)
+
+    def test_tiled_matches_full_oversample_omega(self):
+        sim = _make_simulator()
+        reference = sim.run(oversample_omega=True)
+        tiled = sim.run(oversample_omega=True, mem_budget="200K")
+        torch.testing.assert_close(tiled, reference, rtol=1e-10, atol=1e-20)
+
+    def test_budget_below_fixed_cost_raises(self):
+        sim = _make_simulator()
+        with pytest.raises(ValueError, match="does not cover"):
+            sim.run(mem_budget=1024)
+
+    def test_tiles_run_compiled_kernel_with_cached_polarization(self, monkeypatch):
+        monkeypatch.delenv("NANOBRAG_DISABLE_COMPILE", raising=False)
+        monkeypatch.delenv("NANOBRAGG_DISABLE_COMPILE", raising=False)
+        calls = []
+
+        def compiler(kernel):
+            def compiled(*args, **kwargs):
+                calls.append((kwargs['pixel_coords_angstroms'].shape[0], kwargs['polar'] is not None))
+                return kernel(*args, **kwargs)
+            return compiled
+
+        cache = CompiledKernelCache()
+        monkeypatch.setattr(simulator_module, "get_global_kernel_cache", lambda: cache)
+        monkeypatch.setattr(simulator_module.torch, "compile", lambda **kwargs: compiler)
+
+        sim = _make_simulator()
+        reference = sim.run()
+        calls.clear()
+        tiled = sim.run(mem_budget="200K")
+        torch.testing.assert_close(tiled, reference, rtol=1e-10, atol=1e-20)
+        assert len(calls) > 1 and all(polar for _, polar in calls)
+        assert len({points for points, _ in calls}) == 1  # Edge tiles are padded
+
+        hits = sim.geometry_cache.stats()['hits']
+        sim.run(mem_budget="200K")
+        assert sim.geometry_cache.stats()['hits'] > hits
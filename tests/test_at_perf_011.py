@@ -0,0 +1,96 @@
+"""
+AT-PERF-011: Lean production mode (PERF-LEAN-001).
+
+Tests that runs without -printout/-trace_pixel skip the per-call HKL
+diagnostics and trace-only copies, and that the optional on-device HKL
+counters are read once per run.
+"""
+
+import os
+import torch
+
+from nanobrag_torch.config import CrystalConfig, DetectorConfig, BeamConfig
+from nanobrag_torch.models.crystal import Crystal
+from nanobrag_torch.models.detector import Detector
+from nanobrag_torch.simulator import Simulator, compute_physics_for_position
+from nanobrag_torch.utils.diagnostics import HKLStatsCounter
+
+os.environ['KMP_DUPLICATE_LIB_OK'] = 'TRUE'
+
+
+def _make_simulator(debug_config=None):
+    crystal_config = CrystalConfig(
+        cell_a=100.0, cell_b=100.0, cell_c=100.0,
+        N_cells=(5, 5, 5),
+        default_F=100.0,
+    )
+    detector_config = DetectorConfig(
+        spixels=32, fpixels=32,
+        distance_mm=100.0,
+        pixel_size_mm=0.1,
+        oversample=1,
+    )
+    beam_config = BeamConfig(wavelength_A=6.2, fluence=1e12)
+    crystal = Crystal(crystal_config, beam_config=beam_config, dtype=torch.float64)
+    detector = Detector(detector_config, dtype=torch.float64)
+    return Simulator(crystal, detector, beam_config=beam_config,
+                     dtype=torch.float64, debug_config=debug_config)
+
+
+class TestAT_PERF_011:
+    """Production mode is lean; diagnostics are opt-in."""
+
+    def test_production_mode_is_default(self, capsys):
+        sim = _make_simulator()
+        assert sim.diagnostics is False
+        sim.run()
+        assert "[HKL stats]" not in capsys.readouterr().out
+
+    def test_printout_enables_diagnostics(self):
+        sim = _make_simulator(debug_config={'printout': True})
+        assert sim.diagnostics is True
+
+    def test_pre_polar_only_in_diagnostics(self):
+        coords = torch.tensor([[0.1, 0.001, 0.002]], dtype=torch.float64) * 1e10
+        rot = torch.eye(3, dtype=torch.float64).reshape(3, 1, 1, 3) * 1e-8
+        kwargs = dict(
+            pixel_coords_angstroms=coords,
+            rot_a=rot[0], rot_b=rot[1], rot_c=rot[2],
+            rot_a_star=rot[0] * 1e16, rot_b_star=rot[1] * 1e16, rot_c_star=rot[2] * 1e16,
+            incident_beam_direction=torch.tensor([1.0, 0.0, 0.0], dtype=torch.float64),
+            wavelength=torch.tensor(6.2, dtype=torch.float64),
+            crystal_get_structure_factor=lambda h, k, l: torch.full_like(h, 100.0),
+            N_cells_a=torch.tensor(5.0, dtype=torch.float64),
+            N_cells_b=torch.tensor(5.0, dtype=torch.float64),
+            N_cells_c=torch.tensor(5.0, dtype=torch.float64),
+            polarization_axis=torch.tensor([0.0, 0.0, 1.0], dtype=torch.float64),
+        )
+        lean, lean_pre = compute_physics_for_position(**kwargs)
+        diag, diag_pre = compute_physics_for_position(diagnostics=True, **kwargs)
+        assert lean_pre is None
+        assert diag_pre is not None
+        torch.testing.assert_close(lean, diag)
+
+    def test_hkl_counters_read_once_per_run(self, capsys):
+        sim = _make_simulator(debug_config={'hkl_stats': True})
+        sim.run()
+        out = capsys.readouterr().out
+        assert out.count("[HKL stats]") == 1
+
+        stats = sim.hkl_stats
+        assert stats['total'] == 32 * 32
+        assert stats['nonzero_F'] == 32 * 32  # default_F everywhere
+        assert stats['h_min'] <= stats['h_max']
+
+    def test_counter_accumulates_across_updates(self):
+        counter = HKLStatsCounter()
+        assert counter.read() is None
+        counter.update(torch.tensor([0.0, 2.0]), torch.tensor([1.0, 1.0]),
+                       torch.tensor([-3.0, 0.0]), torch.tensor([0.0, 5.0]))
+        counter.update(torch.tensor([-1.0]), torch.tensor([4.0]),
+                       torch.tensor([1.0]), torch.tensor([2.0]))
+        stats = counter.read()
+        assert (stats['h_min'], stats['h_max']) == (-1.0, 2.0)
+        assert (stats['k_min'], stats['k_max']) == (1.0, 4.0)
+        assert (stats['l_min'], stats['l_max']) == (-3.0, 1.0)
+        assert stats['nonzero_F'] == 2 and stats['total'] == 3
@@ -0,0 +1,151 @@
+"""
+AT-PERF-012: Specialized physics kernels (PERF-KERNEL-001).
+
+Tests that the Simulator selects a physics kernel once per configuration
+signature (crystal shape, polarization, constant structure factor) and that
+every specialization reproduces the generic kernel.
+"""
+
+import os
+import pytest
+import torch
+
+from nanobrag_torch.config import CrystalConfig, DetectorConfig, BeamConfig, CrystalShape
+from nanobrag_torch.models.crystal import Crystal
+from nanobrag_torch.models.detector import Detector
+from nanobrag_torch.simulator import (
+    KernelSignature,
+    Simulator,
+    compute_physics_for_position,
+    compute_physics_square_unpolarized,
+    select_physics_kernel,
+)
+
+os.environ['KMP_DUPLICATE_LIB_OK'] = 'TRUE'
+
+
+def _make_simulator(nopolar=False, shape=CrystalShape.SQUARE, n_sources=1):
+    crystal_config = CrystalConfig(
+        cell_a=100.0, cell_b=100.0, cell_c=100.0,
+        N_cells=(5, 5, 5),
+        default_F=100.0,
+        phi_steps=2,
+        osc_range_deg=0.2,
+        mosaic_spread_deg=0.3,
+        mosaic_domains=3,
+        shape=shape,
+    )
+    detector_config = DetectorConfig(
+        spixels=24, fpixels=24,
+        distance_mm=100.0,
+        pixel_size_mm=0.1,
+    )
+    beam_kwargs = dict(wavelength_A=6.2, fluence=1e12, nopolar=nopolar, dmin=2.0)
+    if n_sources > 1:
+        angles = torch.linspace(-2e-3, 2e-3, n_sources, dtype=torch.float64)
+        beam_kwargs.update(
+            source_directions=torch.stack(
+                [-torch.cos(angles), torch.sin(angles), torch.zeros_like(angles)], dim=1
+            ),
+            source_wavelengths=torch.linspace(6.1e-10, 6.3e-10, n_sources, dtype=torch.float64),
+        )
+    beam_config = BeamConfig(**beam_kwargs)
+    crystal = Crystal(crystal_config, beam_config=beam_config, dtype=torch.float64)
+    detector = Detector(detector_config, dtype=torch.float64)
+    return Simulator(crystal, detector, beam_config=beam_config, dtype=torch.float64)
+
+
+def _kernel_inputs(sim, n_sources=1):
+    (rot_a, rot_b, rot_c), (rot_a_star, rot_b_star, rot_c_star) = \
+        sim.crystal.get_rotated_real_vectors(sim.crystal.config)
+    kwargs = dict(
+        pixel_coords_angstroms=sim.detector.get_pixel_coords() * 1e10,
+        rot_a=rot_a * 1e-10, rot_b=rot_b * 1e-10, rot_c=rot_c * 1e-10,
+        rot_a_star=rot_a_star, rot_b_star=rot_b_star, rot_c_star=rot_c_star,
+        incident_beam_direction=sim.incident_beam_direction,
+        wavelength=sim.wavelength,
+        dmin=2.0,
+        crystal_get_structure_factor=sim.crystal.get_structure_factor,
+        N_cells_a=sim.crystal.N_cells_a,
+        N_cells_b=sim.crystal.N_cells_b,
+        N_cells_c=sim.crystal.N_cells_c,
+        apply_polarization=False,
+        polarization_axis=sim.polarization_axis,
+    )
+    if n_sources > 1:
+        kwargs.update(
+            incident_beam_direction=-sim._source_directions,
+            wavelength=sim._source_wavelengths_A,
+        )
+    return kwargs
+
+
+class TestKernelSelection:
+    """Kernel choice follows the configuration signature."""
+
+    def test_select(self):
+        lean = select_physics_kernel(KernelSignature(CrystalShape.SQUARE, False, None))
+        assert lean is compute_physics_square_unpolarized
+        for signature in (
+            KernelSignature(CrystalShape.SQUARE, True, 100.0),
+            KernelSignature(CrystalShape.GAUSS, False, None),
+            KernelSignature(CrystalShape.ROUND, True, None),
+        ):
+            assert select_physics_kernel(signature) is compute_physics_for_position
+
+    def test_simulator_selects_once(self):
+        sim = _make_simulator(nopolar=True)
+        assert sim._physics_kernel is compute_physics_square_unpolarized
+        assert sim._constant_F == 100.0
+        compiled = sim._compiled_compute_physics
+        sim.run()
+        assert sim._compiled_compute_physics is compiled
+
+    def test_hkl_data_disables_constant_F(self):
+        sim = _make_simulator()
+        assert sim._constant_F == 100.0
+        reference = sim.run()
+
+        # Attach a table holding default_F everywhere: gather path, same image
+        sim.crystal.hkl_data = torch.full((21, 21, 21), 100.0, dtype=torch.float64)
+        sim.crystal.hkl_metadata = {
+            'h_min': -10, 'h_max': 10, 'k_min': -10, 'k_max': 10,
+            'l_min': -10, 'l_max': 10,
+            'h_range': 20, 'k_range': 20, 'l_range': 20,
+        }
+        sim.crystal.interpolate = False
+        gathered = sim.run()
+        assert sim._constant_F is None
+        torch.testing.assert_close(gathered, reference, rtol=1e-12, atol=0.0)
+
+
+class TestAT_PERF_012:
+    """Specialized kernels reproduce the generic kernel."""
+
+    @pytest.mark.parametrize("n_sources", [1, 3])
+    @pytest.mark.parametrize("constant_F", [None, 100.0])
+    def test_square_unpolarized_matches_generic(self, n_sources, constant_F):
+        sim = _make_simulator(nopolar=True, n_sources=n_sources)
+        kwargs = _kernel_inputs(sim, n_sources=n_sources)
+        reference, _ = compute_physics_for_position(**kwargs)
+        lean, pre_polar = compute_physics_square_unpolarized(constant_F=constant_F, **kwargs)
+        assert pre_polar is None
+        torch.testing.assert_close(lean, reference, rtol=1e-12, atol=0.0)
+
+    @pytest.mark.parametrize("shape", list(CrystalShape))
+    def test_constant_F_matches_lookup(self, shape):
+        sim = _make_simulator(shape=shape)
+        kwargs = _kernel_inputs(sim)
+        kwargs.update(crystal_shape=shape, apply_polarization=True, kahn_factor=sim.kahn_factor)
+        reference, _ = compute_physics_for_position(**kwargs)
+        fast, _ = compute_physics_for_position(constant_F=100.0, **kwargs)
+        torch.testing.assert_close(fast, reference, rtol=1e-12, atol=0.0)
+
+    def test_constant_F_with_gradients(self):
+        sim = _make_simulator(nopolar=True)
+        kwargs = _kernel_inputs(sim)
+        wavelength = sim.wavelength.clone().requires_grad_(True)
+        kwargs['wavelength'] = wavelength
+        intensity, _ = compute_physics_square_unpolarized(constant_F=100.0, **kwargs)
+        intensity.sum().backward()
+        assert wavelength.grad is not None and torch.isfinite(wavelength.grad)
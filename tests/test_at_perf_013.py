@@ -0,0 +1,107 @@
+"""
+AT-PERF-013: Mixed-precision execution (PERF-MIXED-001).
+
+Tests that Simulator(dtype=torch.float64, physics_dtype=torch.float32) keeps
+the geometry in float64, evaluates the physics in float32, and stays within
+the documented accuracy bound of the all-float64 image and the C golden data.
+"""
+
+import os
+from pathlib import Path
+
+import numpy as np
+import pytest
+import torch
+
+from nanobrag_torch.config import (
+    BeamConfig,
+    CrystalConfig,
+    DetectorConfig,
+    DetectorConvention,
+    DetectorPivot,
+)
+from nanobrag_torch.models.crystal import Crystal
+from nanobrag_torch.models.detector import Detector
+from nanobrag_torch.simulator import Simulator, compute_physics_for_position
+
+os.environ['KMP_DUPLICATE_LIB_OK'] = 'TRUE'
+
+GOLDEN_IMAGE = Path(__file__).parent / "golden_data" / "triclinic_P1" / "image.bin"
+
+# Documented bound (Simulator.__init__ docstring)
+RTOL_BRIGHT = 2e-3
+BRIGHT_FRACTION = 1e-3
+RTOL_SUM = 1e-5
+
+
+def _make_triclinic_simulator(physics_dtype=None):
+    """Canonical triclinic_P1 golden case (tests/golden_data/triclinic_P1/params.json)."""
+    crystal_config = CrystalConfig(
+        cell_a=70.0, cell_b=80.0, cell_c=90.0,
+        cell_alpha=75.0, cell_beta=85.0, cell_gamma=95.0,
+        N_cells=(5, 5, 5),
+        misset_deg=(-89.968546, -31.328953, 177.753396),
+        default_F=100.0,
+    )
+    detector_config = DetectorConfig(
+        spixels=512, fpixels=512,
+        pixel_size_mm=0.1,
+        distance_mm=100.0,
+        detector_convention=DetectorConvention.MOSFLM,
+        detector_pivot=DetectorPivot.BEAM,
+    )
+    beam_config = BeamConfig(wavelength_A=1.0)
+    crystal = Crystal(crystal_config, beam_config=beam_config, dtype=torch.float64)
+    detector = Detector(detector_config, dtype=torch.float64)
+    return Simulator(crystal, detector, beam_config=beam_config,
+                     dtype=torch.float64, physics_dtype=physics_dtype)
+
+
+class TestAT_PERF_013:
+    """Mixed precision stays within its accuracy bound."""
+
+    def test_output_dtype(self):
+        sim = _make_triclinic_simulator(physics_dtype=torch.float32)
+        assert sim.output_dtype == torch.float32
+        assert sim.run().dtype == torch.float32
+
+        same = _make_triclinic_simulator(physics_dtype=torch.float64)
+        assert same._physics_dtype is None
+        assert same.output_dtype == torch.float64
+
+    def test_kernel_casts_after_projection(self):
+        coords = torch.tensor([[0.1, 0.004, 0.002]], dtype=torch.float64) * 1e10
+        rot = torch.eye(3, dtype=torch.float64).reshape(3, 1, 1, 3) * 1e-8
+        intensity, _ = compute_physics_for_position(
+            pixel_coords_angstroms=coords,
+            rot_a=rot[0], rot_b=rot[1], rot_c=rot[2],
+            rot_a_star=rot[0] * 1e16, rot_b_star=rot[1] * 1e16, rot_c_star=rot[2] * 1e16,
+            incident_beam_direction=torch.tensor([1.0, 0.0, 0.0], dtype=torch.float64),
+            wavelength=torch.tensor(1.0, dtype=torch.float64),
+            crystal_get_structure_factor=lambda h, k, l: torch.full_like(h, 100.0, dtype=torch.float64),
+            N_cells_a=torch.tensor(5.0, dtype=torch.float64),
+            N_cells_b=torch.tensor(5.0, dtype=torch.float64),
+            N_cells_c=torch.tensor(5.0, dtype=torch.float64),
+            polarization_axis=torch.tensor([0.0, 0.0, 1.0], dtype=torch.float64),
+            physics_dtype=torch.float32,
+        )
+        assert intensity.dtype == torch.float32
+
+    def test_accuracy_bound_vs_float64(self):
+        reference = _make_triclinic_simulator().run()
+        mixed = _make_triclinic_simulator(physics_dtype=torch.float32).run().to(torch.float64)
+
+        bright = reference > BRIGHT_FRACTION * reference.max()
+        assert bright.any()
+        rel = ((mixed - reference).abs() / reference)[bright]
+        assert rel.max() <= RTOL_BRIGHT, f"max relative error {rel.max():.3e}"
+        assert (mixed.sum() - reference.sum()).abs() <= RTOL_SUM * reference.sum()
+
+    @pytest.mark.skipif(not GOLDEN_IMAGE.exists(), reason="golden image not available")
+    def test_golden_correlation(self):
+        golden = torch.from_numpy(
+            np.fromfile(GOLDEN_IMAGE, dtype=np.float32).reshape(512, 512)
+        ).to(torch.float64)
+        mixed = _make_triclinic_simulator(physics_dtype=torch.float32).run().to(torch.float64)
+        corr = torch.corrcoef(torch.stack([golden.flatten(), mixed.flatten()]))[0, 1]
+        assert corr >= 0.9995
@@ -0,0 +1,115 @@
+"""
+AT-PERF-015: Tabulated lattice transforms (PERF-LUT-001).
+
+Tests that the lattice-factor lookup tables meet their configured error
+bound for every tabulated shape, carry gradients through h, are cached per
+crystal, and reproduce the directly evaluated image.
+"""
+
+import os
+import pytest
+import torch
+
+from nanobrag_torch.config import CrystalConfig, DetectorConfig, BeamConfig, CrystalShape
+from nanobrag_torch.models.crystal import Crystal
+from nanobrag_torch.models.detector import Detector
+from nanobrag_torch.simulator import Simulator
+from nanobrag_torch.utils.lattice_lut import LatticeFactorLUT
+from nanobrag_torch.utils.physics import sincg, sinc3
+
+os.environ['KMP_DUPLICATE_LIB_OK'] = 'TRUE'
+
+
+def _lut_sincg(lut, h, axis=0):
+    h0 = torch.round(h)
+    return lut.sincg(axis, h - h0, h0)
+
+
+def _make_simulator(shape=CrystalShape.SQUARE, tolerance=None):
+    crystal_config = CrystalConfig(
+        cell_a=100.0, cell_b=100.0, cell_c=100.0,
+        N_cells=(6, 7, 8),
+        default_F=100.0,
+        misset_deg=(10.0, 5.0, 3.0),
+        phi_steps=2,
+        osc_range_deg=0.2,
+        shape=shape,
+        lattice_lut_tolerance=tolerance,
+    )
+    detector_config = DetectorConfig(
+        spixels=48, fpixels=48,
+        distance_mm=100.0,
+        pixel_size_mm=0.2,
+    )
+    beam_config = BeamConfig(wavelength_A=1.0, fluence=1e12)
+    crystal = Crystal(crystal_config, beam_config=beam_config, dtype=torch.float64)
+    detector = Detector(detector_config, dtype=torch.float64)
+    return Simulator(crystal, detector, beam_config=beam_config, dtype=torch.float64)
+
+
+class TestLatticeFactorLUT:
+    """Tables meet their error bound."""
+
+    @pytest.mark.parametrize("interpolation", ["linear", "cubic"])
+    @pytest.mark.parametrize("tolerance", [1e-3, 1e-5])
+    @pytest.mark.parametrize("N", [1, 4, 5, 20])
+    def test_sincg_bound(self, N, tolerance, interpolation):
+        lut = LatticeFactorLUT(CrystalShape.SQUARE, (N, N, N), tolerance, interpolation)
+        h = torch.linspace(-12.0, 12.0, 200001, dtype=torch.float64)
+        N_t = torch.tensor(float(N), dtype=torch.float64)
+        err = (_lut_sincg(lut, h) - sincg(torch.pi * h, N_t)).abs().max()
+        assert err <= tolerance * N
+
+    @pytest.mark.parametrize("interpolation", ["linear", "cubic"])
+    def test_sinc3_bound(self, interpolation):
+        tolerance = 1e-4
+        lut = LatticeFactorLUT(CrystalShape.ROUND, (5, 5, 5), tolerance, interpolation)
+        x = torch.linspace(0.0, 500.0, 200001, dtype=torch.float64)
+        assert (lut.sinc3(x) - sinc3(x)).abs().max() <= tolerance
+
+    @pytest.mark.parametrize("interpolation", ["linear", "cubic"])
+    def test_gauss_bound(self, interpolation):
+        tolerance = 1e-4
+        lut = LatticeFactorLUT(CrystalShape.GAUSS, (5, 5, 5), tolerance, interpolation)
+        y = torch.linspace(0.0, 40.0, 100001, dtype=torch.float64)
+        assert (lut.gauss(y) - torch.exp(-y)).abs().max() <= tolerance
+
+    def test_gradient_through_h(self):
+        lut = LatticeFactorLUT(CrystalShape.SQUARE, (5, 5, 5), 1e-8, "cubic")
+        h = torch.tensor([0.07, 1.21, -2.33, 3.4], dtype=torch.float64, requires_grad=True)
+        _lut_sincg(lut, h).sum().backward()
+
+        h_ref = h.detach().clone().requires_grad_(True)
+        sincg(torch.pi * h_ref, torch.tensor(5.0, dtype=torch.float64)).sum().backward()
+        torch.testing.assert_close(h.grad, h_ref.grad, rtol=1e-3, atol=1e-3)
+
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError, match="tolerance"):
+            LatticeFactorLUT(CrystalShape.SQUARE, (5, 5, 5), 0.0)
+        with pytest.raises(ValueError, match="interpolation"):
+            LatticeFactorLUT(CrystalShape.SQUARE, (5, 5, 5), 1e-4, "quintic")
+        with pytest.raises(ValueError, match="integral"):
+            LatticeFactorLUT(CrystalShape.SQUARE, (5.5, 5, 5), 1e-4)
+
+
+class TestAT_PERF_015:
+    """Simulator integration."""
+
+    def test_crystal_caches_tables(self):
+        sim = _make_simulator(tolerance=1e-5)
+        lut = sim.crystal.get_lattice_lut()
+        assert lut is sim.crystal.get_lattice_lut()
+        assert sim._lattice_lut is lut
+
+        assert _make_simulator().crystal.get_lattice_lut() is None
+        assert _make_simulator(CrystalShape.TOPHAT, 1e-5).crystal.get_lattice_lut() is None
+
+    @pytest.mark.parametrize("shape", [CrystalShape.SQUARE, CrystalShape.ROUND, CrystalShape.GAUSS])
+    def test_lut_image_matches_direct(self, shape):
+        direct = _make_simulator(shape).run()
+        tabulated = _make_simulator(shape, tolerance=1e-7).run()
+
+        bright = direct > 1e-2 * direct.max()
+        assert bright.any()
+        rel = ((tabulated - direct).abs() / direct)[bright]
+        assert rel.max() <= 1e-3
@@ -0,0 +1,146 @@
+"""
+AT-PERF-016: Cross-run cache of geometry-only factors (PERF-GEOCACHE-001).
+
+Tests that solid angles, polarization and capture fractions are reused across
+runs, that the cache is invalidated by detector and beam changes, that it
+respects its memory cap and can be released, and that it is bypassed when
+geometry inputs require grad.
+"""
+
+import os
+import pytest
+import torch
+
+from nanobrag_torch.config import CrystalConfig, DetectorConfig, BeamConfig
+from nanobrag_torch.models.crystal import Crystal
+from nanobrag_torch.models.detector import Detector
+from nanobrag_torch.simulator import Simulator
+from nanobrag_torch.utils.geometry_cache import GeometryFactorCache
+
+os.environ['KMP_DUPLICATE_LIB_OK'] = 'TRUE'
+
+
+def _make_simulator(distance_mm=100.0, thick_um=0.0, n_sources=1, **sim_kwargs):
+    crystal_config = CrystalConfig(
+        cell_a=100.0, cell_b=100.0, cell_c=100.0,
+        N_cells=(5, 5, 5),
+        default_F=100.0,
+        misset_deg=(10.0, 5.0, 3.0),
+        phi_steps=2,
+        osc_range_deg=0.2,
+    )
+    detector_kwargs = dict(spixels=32, fpixels=32, distance_mm=distance_mm, pixel_size_mm=0.2)
+    if thick_um > 0:
+        detector_kwargs.update(detector_thick_um=thick_um, detector_abs_um=300.0, detector_thicksteps=3)
+    detector_config = DetectorConfig(**detector_kwargs)
+    beam_kwargs = dict(wavelength_A=1.0, fluence=1e12, polarization_factor=0.5)
+    if n_sources > 1:
+        angles = torch.linspace(-2e-3, 2e-3, n_sources, dtype=torch.float64)
+        beam_kwargs.update(
+            source_directions=torch.stack(
+                [-torch.cos(angles), torch.sin(angles), torch.zeros_like(angles)], dim=1
+            ),
+            source_wavelengths=torch.full((n_sources,), 1e-10, dtype=torch.float64),
+        )
+    beam_config = BeamConfig(**beam_kwargs)
+    crystal = Crystal(crystal_config, beam_config=beam_config, dtype=torch.float64)
+    detector = Detector(detector_config, dtype=torch.float64)
+    return Simulator(crystal, detector, beam_config=beam_config, dtype=torch.float64, **sim_kwargs)
+
+
+class TestGeometryFactorCache:
+    """LRU bookkeeping."""
+
+    def test_lru_eviction_under_cap(self):
+        cache = GeometryFactorCache(max_bytes=3 * 800)
+        for key in range(3):
+            cache.get_or_compute(key, lambda: torch.zeros(100, dtype=torch.float64))
+        cache.get_or_compute(0, lambda: pytest.fail("entry 0 should be cached"))
+        cache.get_or_compute(3, lambda: torch.zeros(100, dtype=torch.float64))
+        assert len(cache) == 3 and cache.nbytes == 3 * 800
+        # Entry 1 was least recently used
+        calls = []
+        cache.get_or_compute(1, lambda: calls.append(1) or torch.zeros(1))
+        assert calls == [1]
+
+    def test_oversized_entry_not_stored(self):
+        cache = GeometryFactorCache(max_bytes=100)
+        value = cache.get_or_compute("big", lambda: torch.zeros(1000))
+        assert value.numel() == 1000
+        assert len(cache) == 0 and cache.nbytes == 0
+
+    def test_resize_and_clear(self):
+        cache = GeometryFactorCache(max_bytes=10_000)
+        for key in range(4):
+            cache.get_or_compute(key, lambda: torch.zeros(250))
+        cache.resize(2000)
+        assert cache.nbytes <= 2000
+        cache.clear()
+        assert len(cache) == 0 and cache.nbytes == 0
+        with pytest.raises(ValueError):
+            GeometryFactorCache(max_bytes=-1)
+
+
+class TestAT_PERF_016:
+    """Simulator integration."""
+
+    @pytest.mark.parametrize("oversample", [1, 2])
+    @pytest.mark.parametrize("n_sources", [1, 3])
+    def test_reuse_across_runs(self, oversample, n_sources):
+        sim = _make_simulator(thick_um=100.0, n_sources=n_sources)
+        first = sim.run(oversample=oversample)
+        misses = sim.geometry_cache.stats()['misses']
+        assert misses > 0 and sim.geometry_cache.nbytes > 0
+
+        second = sim.run(oversample=oversample)
+        stats = sim.geometry_cache.stats()
+        assert stats['misses'] == misses
+        assert stats['hits'] >= misses
+        torch.testing.assert_close(second, first, rtol=0.0, atol=0.0)
+
+        uncached = _make_simulator(
+            thick_um=100.0, n_sources=n_sources, geometry_cache_budget=None
+        ).run(oversample=oversample)
+        torch.testing.assert_close(first, uncached, rtol=1e-12, atol=0.0)
+
+    def test_beam_change_invalidates(self):
+        sim = _make_simulator()
+        sim.run()
+        sim.kahn_factor = torch.tensor(1.0, dtype=torch.float64)
+        changed = sim.run()
+
+        reference = _make_simulator()
+        reference.kahn_factor = torch.tensor(1.0, dtype=torch.float64)
+        torch.testing.assert_close(changed, reference.run(), rtol=1e-12, atol=0.0)
+
+    def test_detector_change_invalidates(self):
+        sim = _make_simulator()
+        sim.run()
+        other = _make_simulator(distance_mm=150.0)
+        sim.detector = other.detector
+        torch.testing.assert_close(sim.run(), other.run(), rtol=1e-12, atol=0.0)
+
+    def test_cap_and_release(self):
+        sim = _make_simulator(geometry_cache_budget="16K")
+        sim.run(oversample=2)
+        assert sim.geometry_cache.nbytes <= 16 * 1024
+
+        sim = _make_simulator()
+        sim.run()
+        assert sim.geometry_cache.nbytes > 0
+        sim.clear_geometry_cache()
+        assert sim.geometry_cache.nbytes == 0
+
+        disabled = _make_simulator(geometry_cache_budget=None)
+        disabled.run()
+        assert len(disabled.geometry_cache) == 0
+
+    def test_bypassed_for_gradients(self):
+        sim = _make_simulator()
+        sim.run()
+        cached = len(sim.geometry_cache)
+        axis = sim.polarization_axis.clone().requires_grad_(True)
+        sim.polarization_axis = axis
+        sim.run().sum().backward()
+        assert axis.grad is not None and torch.isfinite(axis.grad).all()
+        assert len(sim.geometry_cache) == cached
@@ -0,0 +1,144 @@
+"""
+AT-PERF-017: Rotation sweeps (PERF-SWEEP-001).
+
+Tests that Simulator.run_sweep yields the same frames as separate runs at
+each oscillation start, restores the crystal configuration, and that the
+CLI -sweep mode writes one templated file per frame.
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pytest
+import torch
+
+from nanobrag_torch.__main__ import sweep_filename
+from nanobrag_torch.config import CrystalConfig, DetectorConfig, BeamConfig
+from nanobrag_torch.models.crystal import Crystal
+from nanobrag_torch.models.detector import Detector
+from nanobrag_torch.simulator import Simulator
+
+os.environ['KMP_DUPLICATE_LIB_OK'] = 'TRUE'
+
+
+def _make_simulator(phi_start_deg=0.0, osc_range_deg=0.5):
+    crystal_config = CrystalConfig(
+        cell_a=100.0, cell_b=100.0, cell_c=100.0,
+        N_cells=(5, 5, 5),
+        default_F=100.0,
+        misset_deg=(10.0, 5.0, 3.0),
+        phi_start_deg=phi_start_deg,
+        osc_range_deg=osc_range_deg,
+        phi_steps=3,
+    )
+    detector_config = DetectorConfig(spixels=32, fpixels=32, distance_mm=100.0, pixel_size_mm=0.2)
+    beam_config = BeamConfig(wavelength_A=1.0, fluence=1e12)
+    crystal = Crystal(crystal_config, beam_config=beam_config, dtype=torch.float64)
+    detector = Detector(detector_config, dtype=torch.float64)
+    return Simulator(crystal, detector, beam_config=beam_config, dtype=torch.float64)
+
+
+def run_cli(*args):
+    """Run the CLI with given arguments."""
+    cmd = [sys.executable, "-m", "nanobrag_torch"] + list(args)
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        print(f"STDOUT: {result.stdout}")
+        print(f"STDERR: {result.stderr}")
+    return result
+
+
+class TestRunSweep:
+    """Simulator.run_sweep API."""
+
+    def test_frames_match_individual_runs(self):
+        sim = _make_simulator(phi_start_deg=7.0, osc_range_deg=3.0)
+        frames = list(sim.run_sweep(10.0, 0.5, 3))
+        assert len(frames) == 3
+
+        for i, frame in enumerate(frames):
+            reference = _make_simulator(phi_start_deg=10.0 + 0.5 * i).run()
+            torch.testing.assert_close(frame, reference, rtol=1e-12, atol=0.0)
+        assert not torch.equal(frames[0], frames[2])
+
+        # Crystal configuration is restored after the sweep
+        assert sim.crystal.config.phi_start_deg == 7.0
+        assert sim.crystal.config.osc_range_deg == 3.0
+
+    def test_generator_is_lazy_and_restores_on_close(self):
+        sim = _make_simulator()
+        frames = sim.run_sweep(0.0, 0.1, 1000)
+        next(frames)
+        assert sim.crystal.config.phi_start_deg == 0.0
+        next(frames)
+        assert sim.crystal.config.phi_start_deg == pytest.approx(0.1)
+        frames.close()
+        assert sim.crystal.config.phi_start_deg == 0.0
+        assert sim.crystal.config.osc_range_deg == 0.5
+
+    def test_reuses_compiled_kernel(self):
+        sim = _make_simulator()
+        compiled = sim._compiled_compute_physics
+        for _ in sim.run_sweep(0.0, 0.5, 3):
+            assert sim._compiled_compute_physics is compiled
+
+    def test_invalid_arguments(self):
+        sim = _make_simulator()
+        with pytest.raises(ValueError, match="at least one frame"):
+            sim.run_sweep(0.0, 0.5, 0)
+        with pytest.raises(ValueError, match="non-zero"):
+            sim.run_sweep(0.0, 0.0, 10)
+
+
+class TestAT_PERF_017:
+    """CLI -sweep mode."""
+
+    def test_sweep_filename(self):
+        assert sweep_filename("img_%05d.img", 12) == "img_00012.img"
+        assert sweep_filename("out/image.bin", 3) == "out/image_00003.bin"
+        with pytest.raises(ValueError, match="template"):
+            sweep_filename("img_%s_%d.img", 1)
+
+    def test_cli_sweep_writes_frames(self):
+        common = [
+            "-cell", "100", "100", "100", "90", "90", "90",
+            "-default_F", "100",
+            "-lambda", "1.0",
+            "-N", "5",
+            "-distance", "100",
+            "-detpixels", "24",
+            "-phisteps", "2",
+            "-misset", "10", "5", "3",
+            "-dtype", "float64",
+        ]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmpdir = Path(tmpdir)
+            result = run_cli(
+                *common, "-phi", "2", "-osc", "0.5", "-sweep", "3",
+                "-floatfile", str(tmpdir / "frame_%03d.bin"),
+            )
+            assert result.returncode == 0, f"CLI failed: {result.stderr}"
+
+            for frame in (1, 2, 3):
+                single = tmpdir / f"single_{frame}.bin"
+                result = run_cli(
+                    *common, "-phi", str(2 + 0.5 * (frame - 1)), "-osc", "0.5",
+                    "-floatfile", str(single),
+                )
+                assert result.returncode == 0, f"CLI failed: {result.stderr}"
+                swept = np.fromfile(tmpdir / f"frame_{frame:03d}.bin", dtype=np.float32)
+                np.testing.assert_allclose(swept, np.fromfile(single, dtype=np.float32), rtol=1e-6)
+            assert not (tmpdir / "frame_004.bin").exists()
+
+    def test_cli_sweep_requires_osc(self):
+        result = run_cli(
+            "-cell", "100", "100", "100", "90", "90", "90",
+            "-default_F", "100", "-lambda", "1.0", "-N", "5",
+            "-distance", "100", "-detpixels", "8", "-sweep", "2",
+        )
+        assert result.returncode != 0
+        assert "-osc" in result.stderr
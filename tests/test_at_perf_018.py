@@ -0,0 +1,158 @@
+"""
+AT-PERF-018: Batched multi-orientation simulation (PERF-BATCH-001).
+
+Tests that Simulator.run_batch reproduces separate runs of individually
+reoriented crystals, honours per-shot crystal sizes and fluences, streams
+the same images through iter_batch, and splits shots under a memory budget.
+"""
+
+import os
+
+import pytest
+import torch
+
+from nanobrag_torch.config import CrystalConfig, DetectorConfig, BeamConfig, CrystalShape
+from nanobrag_torch.models.crystal import Crystal
+from nanobrag_torch.models.detector import Detector
+from nanobrag_torch.simulator import Simulator
+from nanobrag_torch.utils.geometry import angles_to_rotation_matrix
+from nanobrag_torch.utils.tiling import plan_shot_batch
+
+os.environ['KMP_DUPLICATE_LIB_OK'] = 'TRUE'
+
+
+def _make_simulator(N_cells=(5, 5, 5), fluence=1e12, n_sources=1, shape=CrystalShape.SQUARE, **detector_kwargs):
+    crystal_config = CrystalConfig(
+        cell_a=100.0, cell_b=100.0, cell_c=100.0,
+        N_cells=N_cells,
+        default_F=100.0,
+        misset_deg=(10.0, 5.0, 3.0),
+        phi_steps=2,
+        osc_range_deg=0.2,
+        shape=shape,
+    )
+    detector_config = DetectorConfig(
+        spixels=24, fpixels=24, distance_mm=100.0, pixel_size_mm=0.2, **detector_kwargs
+    )
+    beam_kwargs = dict(wavelength_A=1.0, fluence=fluence, polarization_factor=0.5)
+    if n_sources > 1:
+        angles = torch.linspace(-2e-3, 2e-3, n_sources, dtype=torch.float64)
+        beam_kwargs.update(
+            source_directions=torch.stack(
+                [-torch.cos(angles), torch.sin(angles), torch.zeros_like(angles)], dim=1
+            ),
+            source_wavelengths=torch.full((n_sources,), 1e-10, dtype=torch.float64),
+        )
+    beam_config = BeamConfig(**beam_kwargs)
+    crystal = Crystal(crystal_config, beam_config=beam_config, dtype=torch.float64)
+    detector = Detector(detector_config, dtype=torch.float64)
+    return Simulator(crystal, detector, beam_config=beam_config, dtype=torch.float64)
+
+
+def _orientations(n):
+    angles = torch.linspace(0.0, 0.3, n, dtype=torch.float64)
+    return torch.stack([
+        angles_to_rotation_matrix(a, 0.5 * a, -a) for a in angles
+    ])
+
+
+def _reoriented_run(sim, orientation, **run_kwargs):
+    """run() with the crystal's lattice vectors transformed by `orientation`."""
+    original = sim.crystal.get_rotated_real_vectors
+
+    def rotated(config):
+        real, reciprocal = original(config)
+        inverse_transpose = torch.linalg.inv(orientation).T
+        return (
+            tuple(v @ orientation.T for v in real),
+            tuple(v @ inverse_transpose.T for v in reciprocal),
+        )
+
+    sim.crystal.get_rotated_real_vectors = rotated
+    try:
+        return sim.run(**run_kwargs)
+    finally:
+        sim.crystal.get_rotated_real_vectors = original
+
+
+class TestPlanShotBatch:
+    """Shot-axis planning."""
+
+    def test_fits_budget(self):
+        assert plan_shot_batch(10_000, n_shots=100, samples_per_shot=10, bytes_per_sample=100) == 10
+        assert plan_shot_batch(10**9, n_shots=7, samples_per_shot=10, bytes_per_sample=100) == 7
+        assert plan_shot_batch(1000, n_shots=7, samples_per_shot=10, bytes_per_sample=100) == 1
+
+    def test_single_shot_over_budget(self):
+        with pytest.raises(ValueError, match="single shot"):
+            plan_shot_batch(999, n_shots=7, samples_per_shot=10, bytes_per_sample=100)
+
+
+class TestAT_PERF_018:
+    """Simulator.run_batch / iter_batch."""
+
+    @pytest.mark.parametrize("oversample", [1, 2])
+    @pytest.mark.parametrize("n_sources", [1, 3])
+    def test_matches_individual_runs(self, oversample, n_sources):
+        sim = _make_simulator(n_sources=n_sources)
+        orientations = _orientations(3)
+        images = sim.run_batch(orientations, batch_size=2, oversample=oversample)
+        assert images.shape == (3, 24, 24)
+
+        for i in range(3):
+            reference = _reoriented_run(_make_simulator(n_sources=n_sources), orientations[i], oversample=oversample)
+            torch.testing.assert_close(images[i], reference, rtol=1e-10, atol=1e-30)
+        assert not torch.equal(images[0], images[2])
+
+    def test_identity_matches_run(self):
+        sim = _make_simulator(detector_thick_um=100.0, detector_abs_um=300.0, detector_thicksteps=3)
+        images = sim.run_batch(torch.eye(3, dtype=torch.float64).expand(2, 3, 3))
+        reference = sim.run()
+        torch.testing.assert_close(images[0], reference, rtol=1e-10, atol=1e-30)
+        torch.testing.assert_close(images[1], reference, rtol=1e-10, atol=1e-30)
+
+    @pytest.mark.parametrize("shape", [CrystalShape.SQUARE, CrystalShape.GAUSS, CrystalShape.TOPHAT])
+    def test_per_shot_size_and_fluence(self, shape):
+        sim = _make_simulator(shape=shape)
+        orientations = _orientations(2)
+        N_cells = torch.tensor([[5, 5, 5], [7, 6, 4]], dtype=torch.float64)
+        fluence = torch.tensor([1e12, 3e12], dtype=torch.float64)
+        images = sim.run_batch(orientations, N_cells=N_cells, fluence=fluence)
+
+        for i in range(2):
+            reference_sim = _make_simulator(
+                N_cells=tuple(int(n) for n in N_cells[i]), fluence=float(fluence[i]), shape=shape
+            )
+            reference = _reoriented_run(reference_sim, orientations[i])
+            torch.testing.assert_close(images[i], reference, rtol=1e-10, atol=1e-30)
+
+    def test_streaming_matches_batch(self):
+        sim = _make_simulator()
+        orientations = _orientations(5)
+        images = sim.run_batch(orientations)
+        streamed = list(sim.iter_batch(orientations, batch_size=2))
+        assert len(streamed) == 5
+        for image, shot in zip(images, streamed):
+            assert shot.shape == (24, 24)
+            torch.testing.assert_close(shot, image, rtol=1e-12, atol=0.0)
+
+    def test_memory_budget_splits_shots(self):
+        sim = _make_simulator()
+        orientations = _orientations(4)
+        full = sim.run_batch(orientations)
+        shot_bytes = 24 * 24 * 2 * 32 * 8
+        chunks = list(sim._batch_chunks(orientations, None, None, None, 2 * shot_bytes, None, None, None))
+        assert [c.shape[0] for c in chunks] == [2, 2]
+        torch.testing.assert_close(torch.cat(chunks), full, rtol=1e-12, atol=0.0)
+
+    def test_invalid_shapes(self):
+        sim = _make_simulator()
+        orientations = _orientations(2)
+        with pytest.raises(ValueError, match="orientations"):
+            sim.run_batch(torch.eye(3, dtype=torch.float64))
+        with pytest.raises(ValueError, match="N_cells"):
+            sim.run_batch(orientations, N_cells=torch.ones(3, 3))
+        with pytest.raises(ValueError, match="fluence"):
+            sim.iter_batch(orientations, fluence=torch.ones(3))
+        with pytest.raises(ValueError, match="batch_size"):
+            sim.run_batch(orientations, batch_size=0)
@@ -0,0 +1,153 @@
+"""
+AT-PERF-019: Multi-process frame farm (PERF-FARM-001).
+
+Tests that row blocks and sweep frames rendered by worker processes are
+bit-identical to the same work done in one process, that shared inputs and
+the output buffer live in shared memory, and that worker failures surface
+in the parent.
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pytest
+import torch
+
+from nanobrag_torch.config import CrystalConfig, DetectorConfig, BeamConfig
+from nanobrag_torch.models.crystal import Crystal
+from nanobrag_torch.models.detector import Detector
+from nanobrag_torch.simulator import Simulator
+from nanobrag_torch.utils.frame_farm import FrameFarm, share_tensors
+
+os.environ['KMP_DUPLICATE_LIB_OK'] = 'TRUE'
+
+
+@pytest.fixture
+def single_thread():
+    """Worker processes run single-threaded; match that for references."""
+    threads = torch.get_num_threads()
+    torch.set_num_threads(1)
+    yield
+    torch.set_num_threads(threads)
+
+
+def _make_simulator(**detector_kwargs):
+    crystal_config = CrystalConfig(
+        cell_a=100.0, cell_b=100.0, cell_c=100.0,
+        N_cells=(5, 5, 5),
+        default_F=100.0,
+        misset_deg=(10.0, 5.0, 3.0),
+        phi_steps=2,
+        osc_range_deg=0.5,
+    )
+    detector_config = DetectorConfig(
+        spixels=40, fpixels=32, distance_mm=100.0, pixel_size_mm=0.2, **detector_kwargs
+    )
+    beam_config = BeamConfig(wavelength_A=1.0, fluence=1e12)
+    crystal = Crystal(crystal_config, beam_config=beam_config, dtype=torch.float64)
+    crystal.hkl_data = torch.full((11, 11, 11), 100.0, dtype=torch.float64)
+    crystal.hkl_metadata = {
+        'h_min': -5, 'h_max': 5, 'k_min': -5, 'k_max': 5, 'l_min': -5, 'l_max': 5,
+        'h_range': 11, 'k_range': 11, 'l_range': 11,
+    }
+    detector = Detector(detector_config, dtype=torch.float64)
+    return Simulator(crystal, detector, beam_config=beam_config, dtype=torch.float64)
+
+
+def _square(index):
+    return torch.full((3,), float(index * index))
+
+
+def _fail_on_two(index):
+    if index == 2:
+        raise ArithmeticError("boom")
+    return torch.zeros(3)
+
+
+def _fail_always(index):
+    raise ArithmeticError("boom " * 600)
+
+
+class TestFrameFarm:
+    """Process pool mechanics."""
+
+    @pytest.mark.parametrize("nproc", [1, 3])
+    def test_fills_shared_buffer(self, nproc):
+        output = torch.zeros(7, 3)
+        FrameFarm(nproc).map(_square, output, list(range(7)))
+        expected = torch.arange(7, dtype=torch.float32).pow(2).unsqueeze(1).expand(7, 3)
+        assert torch.equal(output, expected)
+        if nproc > 1:
+            assert output.is_shared()
+
+    def test_worker_error_is_raised(self):
+        with pytest.raises(RuntimeError, match="item 2 failed(.|\n)*ArithmeticError"):
+            FrameFarm(2).map(_fail_on_two, torch.zeros(5, 3), list(range(5)))
+
+    def test_many_failing_workers_do_not_hang(self):
+        # Every worker fails on its first item; their reports must not fill the pipe
+        with pytest.raises(RuntimeError, match="failed(.|\n)*ArithmeticError"):
+            FrameFarm(16).map(_fail_always, torch.zeros(32, 3), list(range(32)))
+
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError, match="nproc"):
+            FrameFarm(0)
+        with pytest.raises(ValueError, match="threads_per_worker"):
+            FrameFarm(2, threads_per_worker=0)
+
+    def test_share_tensors(self):
+        t = torch.zeros(4)
+        share_tensors(t, None)
+        assert t.is_shared()
+
+
+class TestAT_PERF_019:
+    """Simulator integration."""
+
+    def test_row_blocks_bit_identical(self, single_thread):
+        sim = _make_simulator(detector_thick_um=100.0, detector_abs_um=300.0, detector_thicksteps=2)
+        farmed = sim.run_parallel(nproc=3, block_rows=7, oversample=2)
+        single = sim.run_parallel(nproc=1, block_rows=7, oversample=2)
+        assert torch.equal(farmed, single)
+        torch.testing.assert_close(farmed, sim.run(oversample=2), rtol=1e-12, atol=0.0)
+        assert sim.crystal.hkl_data.is_shared()
+        assert sim._row_window is None
+
+    def test_sweep_frames_bit_identical(self, single_thread):
+        sim = _make_simulator()
+        farmed = list(sim.run_sweep(2.0, 0.5, 4, nproc=3, oversample=1))
+        single = list(sim.run_sweep(2.0, 0.5, 4, oversample=1))
+        assert len(farmed) == 4
+        for a, b in zip(farmed, single):
+            assert torch.equal(a, b)
+        assert sim.crystal.config.phi_start_deg == 0.0
+
+    def test_invalid_arguments(self):
+        sim = _make_simulator()
+        with pytest.raises(ValueError, match="nproc"):
+            sim.run_parallel(nproc=0)
+        with pytest.raises(ValueError, match="block_rows"):
+            sim.run_parallel(nproc=2, block_rows=0)
+
+    def test_cli_nproc(self):
+        common = [
+            "-cell", "100", "100", "100", "90", "90", "90",
+            "-default_F", "100", "-lambda", "1.0", "-N", "5",
+            "-distance", "100", "-detpixels", "24", "-dtype", "float64",
+        ]
+        env = dict(os.environ, OMP_NUM_THREADS="1")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmpdir = Path(tmpdir)
+            images = {}
+            for nproc in ("1", "3"):
+                path = tmpdir / f"nproc_{nproc}.bin"
+                cmd = [sys.executable, "-m", "nanobrag_torch", *common, "-nproc", nproc,
+                       "-floatfile", str(path)]
+                result = subprocess.run(cmd, capture_output=True, text=True, env=env)
+                assert result.returncode == 0, f"CLI failed: {result.stderr}"
+                images[nproc] = np.fromfile(path, dtype=np.float32)
+            np.testing.assert_array_equal(images["1"], images["3"])
@@ -0,0 +1,152 @@
+"""
+AT-PERF-020: Distributed pixel-domain decomposition (PERF-DIST-001).
+
+Tests the cost-balanced block assignment, and that run(distributed=True)
+over several local gloo ranks assembles on rank 0 the same image as
+rendering the same row blocks in one process, in dense and sparse mode.
+"""
+
+import os
+import tempfile
+from pathlib import Path
+
+import pytest
+import torch
+import torch.distributed as dist
+import torch.multiprocessing as mp
+
+from nanobrag_torch.config import CrystalConfig, DetectorConfig, BeamConfig
+from nanobrag_torch.models.crystal import Crystal
+from nanobrag_torch.models.detector import Detector
+from nanobrag_torch.simulator import Simulator
+from nanobrag_torch.utils.distributed import balance_blocks
+
+os.environ['KMP_DUPLICATE_LIB_OK'] = 'TRUE'
+
+
+def _make_simulator(**detector_kwargs):
+    crystal_config = CrystalConfig(
+        cell_a=100.0, cell_b=100.0, cell_c=100.0,
+        N_cells=(10, 10, 10),
+        default_F=100.0,
+        misset_deg=(10.0, 5.0, 3.0),
+        phi_steps=2,
+        osc_range_deg=0.2,
+    )
+    detector_config = DetectorConfig(
+        spixels=64, fpixels=48, distance_mm=100.0, pixel_size_mm=0.2, **detector_kwargs
+    )
+    beam_config = BeamConfig(wavelength_A=1.0, fluence=1e12)
+    crystal = Crystal(crystal_config, beam_config=beam_config, dtype=torch.float64)
+    detector = Detector(detector_config, dtype=torch.float64)
+    return Simulator(crystal, detector, beam_config=beam_config, dtype=torch.float64)
+
+
+def _rank_main(rank, world_size, init_file, result_path, run_kwargs):
+    torch.set_num_threads(1)
+    dist.init_process_group(
+        "gloo", init_method=f"file://{init_file}", rank=rank, world_size=world_size
+    )
+    try:
+        image = _make_simulator().run(distributed=True, **run_kwargs)
+        if rank == 0:
+            torch.save(image, result_path)
+        elif image is not None:
+            raise AssertionError("Only rank 0 should receive the image")
+    finally:
+        dist.destroy_process_group()
+
+
+def _run_ranks(world_size, run_kwargs):
+    ctx = mp.get_context("fork")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmpdir = Path(tmpdir)
+        result_path = tmpdir / "image.pt"
+        ranks = [
+            ctx.Process(
+                target=_rank_main,
+                args=(rank, world_size, str(tmpdir / "init"), str(result_path), run_kwargs),
+            )
+            for rank in range(world_size)
+        ]
+        for process in ranks:
+            process.start()
+        for process in ranks:
+            process.join(timeout=600)
+        assert [process.exitcode for process in ranks] == [0] * world_size
+        return torch.load(result_path)
+
+
+class TestBalanceBlocks:
+    """LPT assignment."""
+
+    def test_covers_every_block_once(self):
+        costs = [5.0, 1.0, 1.0, 8.0, 2.0, 0.0, 3.0]
+        assignment = balance_blocks(costs, 3)
+        assert sorted(i for blocks in assignment for i in blocks) == list(range(len(costs)))
+        loads = [sum(costs[i] for i in blocks) for blocks in assignment]
+        assert max(loads) <= 4 / 3 * max(sum(costs) / 3, max(costs)) + 1e-12
+
+    def test_heavy_blocks_spread(self):
+        assignment = balance_blocks([10.0, 10.0, 1.0, 1.0, 1.0, 1.0], 2)
+        rank_of = {block: rank for rank, blocks in enumerate(assignment) for block in blocks}
+        assert rank_of[0] != rank_of[1]
+        assert [len(blocks) for blocks in assignment] == [3, 3]
+
+    def test_more_ranks_than_blocks(self):
+        assert balance_blocks([1.0, 2.0], 4) == [[1], [0], [], []]
+
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError, match="n_ranks"):
+            balance_blocks([1.0], 0)
+        with pytest.raises(ValueError, match="non-negative"):
+            balance_blocks([1.0, -1.0], 2)
+
+
+class TestAT_PERF_020:
+    """Simulator.run(distributed=True)."""
+
+    @pytest.mark.parametrize("run_kwargs", [
+        dict(oversample=2),
+        dict(oversample=1, sparse_cutoff=1e-3),
+    ])
+    def test_matches_single_process(self, run_kwargs):
+        image = _run_ranks(3, run_kwargs)
+
+        threads = torch.get_num_threads()
+        torch.set_num_threads(1)
+        try:
+            sim = _make_simulator()
+            blocks = sim.run_parallel(nproc=1, **run_kwargs)
+            full = sim.run(**run_kwargs)
+        finally:
+            torch.set_num_threads(threads)
+        assert torch.equal(image, blocks)
+        torch.testing.assert_close(image, full, rtol=1e-12, atol=0.0)
+
+    def test_sparse_costs_follow_spots(self):
+        sim = _make_simulator()
+        sim._refresh_geometry()
+        blocks = [slice(start, start + 16) for start in range(0, 64, 16)]
+        dense = sim._block_costs(blocks, {})
+        assert dense == [16.0 * 48] * 4
+        sparse = sim._block_costs(blocks, {"sparse_cutoff": 1e-3})
+        assert len(set(sparse)) > 1
+        assert max(sparse) <= 16 * 48 * 1.01
+
+    def test_dense_costs_follow_mask(self):
+        mask = torch.ones(64, 48)
+        mask[:26] = 0  # Rows 0-25 masked (a beamstop)
+        mask[32:36] = 0  # Rows 32-35 masked (a module gap)
+        sim = _make_simulator(mask_array=mask)
+        sim._refresh_geometry()
+        blocks = [slice(start, start + 16) for start in range(0, 64, 16)]
+        costs = sim._block_costs(blocks, {})
+        assert costs[0] == pytest.approx(0.01 * 16 * 48)
+        assert costs[1] == pytest.approx(6 * 48 + 0.01 * 16 * 48)
+        # Mostly active blocks are rendered whole, masked rows included
+        assert costs[2] == costs[3] == pytest.approx(16 * 48 * 1.01)
+
+    def test_requires_process_group(self):
+        with pytest.raises(ValueError, match="process group"):
+            _make_simulator().run(distributed=True)
@@ -0,0 +1,152 @@
+"""
+AT-PERF-021: Compacted execution and pixel-list API (PERF-COMPACT-001).
+
+Tests that run_pixels returns run() at the requested pixels, that runs
+with a small ROI or a mask evaluate the physics only for active pixels
+while producing the same image as the uncompacted full-detector run, and
+that compacted runs reuse cached geometry factors.
+"""
+
+import os
+import pytest
+import torch
+
+from nanobrag_torch.config import CrystalConfig, DetectorConfig, BeamConfig
+from nanobrag_torch.models.crystal import Crystal
+from nanobrag_torch.models.detector import Detector
+from nanobrag_torch.simulator import Simulator
+
+os.environ['KMP_DUPLICATE_LIB_OK'] = 'TRUE'
+
+
+def _make_simulator(n_sources=1, water_size_um=0.0, **detector_kwargs):
+    crystal_config = CrystalConfig(
+        cell_a=100.0, cell_b=100.0, cell_c=100.0,
+        N_cells=(5, 5, 5),
+        default_F=100.0,
+        misset_deg=(10.0, 5.0, 3.0),
+        phi_steps=2,
+        osc_range_deg=0.2,
+    )
+    detector_config = DetectorConfig(
+        spixels=40, fpixels=32, distance_mm=100.0, pixel_size_mm=0.2, **detector_kwargs
+    )
+    beam_kwargs = dict(wavelength_A=1.0, fluence=1e12, polarization_factor=0.5, water_size_um=water_size_um)
+    if n_sources > 1:
+        angles = torch.linspace(-2e-3, 2e-3, n_sources, dtype=torch.float64)
+        beam_kwargs.update(
+            source_directions=torch.stack(
+                [-torch.cos(angles), torch.sin(angles), torch.zeros_like(angles)], dim=1
+            ),
+            source_wavelengths=torch.full((n_sources,), 1e-10, dtype=torch.float64),
+        )
+    beam_config = BeamConfig(**beam_kwargs)
+    crystal = Crystal(crystal_config, beam_config=beam_config, dtype=torch.float64)
+    detector = Detector(detector_config, dtype=torch.float64)
+    return Simulator(crystal, detector, beam_config=beam_config, dtype=torch.float64)
+
+
+def _count_evaluated_pixels(sim):
+    """Wrap the physics entry point and record how many positions it evaluates."""
+    counts = []
+    original = sim._compute_physics_for_position
+
+    def counting(pixel_coords_angstroms, *args, **kwargs):
+        counts.append(pixel_coords_angstroms.numel() // 3)
+        return original(pixel_coords_angstroms, *args, **kwargs)
+
+    sim._compute_physics_for_position = counting
+    return counts
+
+
+class TestRunPixels:
+    """Simulator.run_pixels."""
+
+    @pytest.mark.parametrize("oversample", [1, 2])
+    @pytest.mark.parametrize("n_sources", [1, 3])
+    def test_matches_full_image(self, oversample, n_sources):
+        sim = _make_simulator(
+            n_sources=n_sources, water_size_um=50.0,
+            detector_thick_um=100.0, detector_abs_um=300.0, detector_thicksteps=2,
+        )
+        image = sim.run(oversample=oversample)
+        generator = torch.Generator().manual_seed(0)
+        slow = torch.randint(0, 40, (6, 5), generator=generator)
+        fast = torch.randint(0, 32, (6, 5), generator=generator)
+        slow[0, 0], fast[0, 0] = slow[1, 1], fast[1, 1]  # duplicates are allowed
+
+        values = sim.run_pixels(slow, fast, oversample=oversample)
+        assert values.shape == (6, 5)
+        torch.testing.assert_close(values, image[slow, fast], rtol=1e-12, atol=0.0)
+
+    def test_cost_scales_with_pixel_count(self):
+        sim = _make_simulator()
+        counts = _count_evaluated_pixels(sim)
+        sim.run_pixels(torch.tensor([3, 4, 5]), torch.tensor([7, 7, 7]))
+        assert counts == [3]
+
+    def test_invalid_indices(self):
+        sim = _make_simulator()
+        with pytest.raises(ValueError, match="same shape"):
+            sim.run_pixels(torch.tensor([1, 2]), torch.tensor([1]))
+        with pytest.raises(ValueError, match="out of range"):
+            sim.run_pixels(torch.tensor([40]), torch.tensor([0]))
+        assert sim.run_pixels(torch.tensor([], dtype=torch.long), torch.tensor([], dtype=torch.long)).numel() == 0
+
+
+class TestAT_PERF_021:
+    """Compaction inside run()."""
+
+    def test_roi_evaluates_only_active_pixels(self):
+        full = _make_simulator(water_size_um=50.0).run()
+        sim = _make_simulator(water_size_um=50.0, roi_xmin=10, roi_xmax=14, roi_ymin=20, roi_ymax=29)
+        counts = _count_evaluated_pixels(sim)
+        image = sim.run()
+        assert counts == [5 * 10]
+
+        expected = torch.zeros_like(full)
+        expected[20:30, 10:15] = full[20:30, 10:15]
+        torch.testing.assert_close(image, expected, rtol=1e-12, atol=0.0)
+
+    @pytest.mark.parametrize("oversample", [1, 3])
+    def test_mask_matches_masked_full_run(self, oversample):
+        mask = torch.ones(40, 32, dtype=torch.float64)
+        mask[15:25, 10:22] = 0  # beamstop
+        mask[:, 16] = 0  # module gap
+        full = _make_simulator().run(oversample=oversample)
+        image = _make_simulator(mask_array=mask).run(oversample=oversample)
+        torch.testing.assert_close(image, full * mask, rtol=1e-12, atol=0.0)
+
+    def test_mostly_active_mask_is_not_compacted(self):
+        mask = torch.ones(40, 32, dtype=torch.float64)
+        mask[:, 16] = 0  # module gap
+        sim = _make_simulator(mask_array=mask)
+        counts = _count_evaluated_pixels(sim)
+        sim.run()
+        assert counts == [40 * 32]
+
+    def test_compacted_runs_reuse_geometry(self):
+        sim = _make_simulator(roi_xmin=10, roi_xmax=14, roi_ymin=20, roi_ymax=29)
+        first = sim.run()
+        misses = sim.geometry_cache.stats()['misses']
+        second = sim.run()
+        stats = sim.geometry_cache.stats()
+        assert stats['misses'] == misses and stats['hits'] > 0
+        assert torch.equal(first, second)
+
+        # A different pixel list gets its own entries
+        sim.run_pixels(torch.tensor([3, 4]), torch.tensor([7, 7]))
+        assert sim.geometry_cache.stats()['misses'] > misses
+
+    def test_full_detector_is_not_compacted(self):
+        sim = _make_simulator()
+        counts = _count_evaluated_pixels(sim)
+        sim.run()
+        assert counts == [40 * 32]
+
+    def test_gradients_flow_through_compaction(self):
+        sim = _make_simulator(roi_xmin=4, roi_xmax=20, roi_ymin=4, roi_ymax=30)
+        fluence = torch.tensor(1e12, dtype=torch.float64, requires_grad=True)
+        sim.fluence = fluence
+        sim.run().sum().backward()
+        assert fluence.grad is not None and fluence.grad > 0
@@ -0,0 +1,119 @@
+"""
+AT-PERF-022: Adaptive per-pixel oversampling (PERF-ADAPTIVE-001).
+
+Tests the curvature-based pixel selection, and that run_adaptive refines
+only sharp pixels while matching run() at the full oversample there.
+"""
+
+import os
+import pytest
+import torch
+
+from nanobrag_torch.config import CrystalConfig, DetectorConfig, BeamConfig
+from nanobrag_torch.models.crystal import Crystal
+from nanobrag_torch.models.detector import Detector
+from nanobrag_torch.simulator import Simulator
+from nanobrag_torch.utils.adaptive_sampling import curvature_indicator, refinement_mask
+
+os.environ['KMP_DUPLICATE_LIB_OK'] = 'TRUE'
+
+
+def _make_simulator(**detector_kwargs):
+    crystal_config = CrystalConfig(
+        cell_a=100.0, cell_b=100.0, cell_c=100.0,
+        N_cells=(20, 20, 20),
+        default_F=100.0,
+        misset_deg=(10.0, 5.0, 3.0),
+    )
+    detector_config = DetectorConfig(
+        spixels=48, fpixels=40, distance_mm=100.0, pixel_size_mm=0.2, **detector_kwargs
+    )
+    beam_config = BeamConfig(wavelength_A=1.0, fluence=1e12, water_size_um=20.0)
+    crystal = Crystal(crystal_config, beam_config=beam_config, dtype=torch.float64)
+    detector = Detector(detector_config, dtype=torch.float64)
+    return Simulator(crystal, detector, beam_config=beam_config, dtype=torch.float64)
+
+
+class TestRefinementMask:
+    """Curvature-based selection."""
+
+    def test_flat_and_masked_regions_have_no_curvature(self):
+        image = torch.full((10, 12), 3.0, dtype=torch.float64)
+        valid = torch.ones(10, 12, dtype=torch.bool)
+        valid[3:6, 4:8] = False
+        image[~valid] = 0.0
+        assert torch.equal(curvature_indicator(image, valid), torch.zeros_like(image))
+        assert not refinement_mask(image, 0.01, valid).any()
+
+    def test_selects_spot_neighbourhood(self):
+        s, f = torch.meshgrid(torch.arange(32.0), torch.arange(32.0), indexing="ij")
+        image = torch.exp(-((s - 10) ** 2 + (f - 20) ** 2) / 2.0).double()
+        selected = refinement_mask(image, 0.05, dilate=0)
+        assert selected[10, 20]
+        rows, cols = torch.nonzero(selected, as_tuple=True)
+        assert ((rows - 10).abs() <= 4).all() and ((cols - 20).abs() <= 4).all()
+        grown = refinement_mask(image, 0.05, dilate=1)
+        assert (grown | selected).equal(grown) and grown.sum() > selected.sum()
+
+    def test_threshold_zero_selects_all_valid(self):
+        valid = torch.rand(6, 7, generator=torch.Generator().manual_seed(1)) > 0.3
+        assert torch.equal(refinement_mask(torch.zeros(6, 7), 0.0, valid), valid)
+
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError, match="threshold"):
+            refinement_mask(torch.zeros(3, 3), 1.5)
+        with pytest.raises(ValueError, match="dilate"):
+            refinement_mask(torch.zeros(3, 3), 0.1, dilate=-1)
+
+
+class TestAT_PERF_022:
+    """Simulator.run_adaptive."""
+
+    def test_threshold_zero_matches_full_oversample(self):
+        sim = _make_simulator()
+        full = sim.run(oversample=3)
+        torch.testing.assert_close(sim.run_adaptive(0.0, oversample=3), full, rtol=1e-12, atol=0.0)
+
+    def test_refines_only_sharp_pixels(self):
+        sim = _make_simulator()
+        full = sim.run(oversample=4)
+        coarse = sim.run(oversample=1)
+
+        refined_counts = []
+        original = sim.run_pixels
+
+        def counting(slow_idx, fast_idx, **kwargs):
+            refined_counts.append(slow_idx.numel())
+            return original(slow_idx, fast_idx, **kwargs)
+
+        sim.run_pixels = counting
+        image = sim.run_adaptive(0.01, oversample=4)
+
+        assert len(refined_counts) == 1
+        assert 0 < refined_counts[0] < 0.5 * full.numel()
+        refined = image != coarse
+        torch.testing.assert_close(image[refined], full[refined], rtol=1e-12, atol=0.0)
+        # Unrefined pixels keep the coarse value, which is close to the oversampled one
+        error = (image - full).abs().max()
+        assert error < 0.05 * full.max()
+        assert error < (coarse - full).abs().max()
+
+    def test_respects_roi(self):
+        sim = _make_simulator(roi_xmin=5, roi_xmax=30, roi_ymin=10, roi_ymax=40)
+        image = sim.run_adaptive(0.01, oversample=2)
+        outside = sim._cached_roi_mask == 0
+        assert outside.any() and (image[outside] == 0).all()
+
+    def test_no_refinement_needed(self):
+        sim = _make_simulator()
+        torch.testing.assert_close(
+            sim.run_adaptive(0.01, coarse_oversample=2, oversample=2), sim.run(oversample=2),
+            rtol=0.0, atol=0.0,
+        )
+
+    def test_invalid_arguments(self):
+        sim = _make_simulator()
+        with pytest.raises(ValueError, match="threshold"):
+            sim.run_adaptive(-0.1)
+        with pytest.raises(ValueError, match="coarse_oversample"):
+            sim.run_adaptive(0.1, coarse_oversample=0)
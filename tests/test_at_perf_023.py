@@ -0,0 +1,116 @@
+"""
+AT-PERF-023: Low-discrepancy and stratified mosaic sampling (PERF-MOSAIC-001).
+
+Tests that the Sobol, Halton and stratified samplers are deterministic for
+a seed, draw from the same axis/angle distribution as the default sampler,
+estimate mosaic averages more accurately for the same number of domains,
+and keep mosaic_spread_deg differentiable.
+"""
+
+import math
+import os
+
+import pytest
+import torch
+from torch.autograd import gradcheck
+
+from nanobrag_torch.config import CrystalConfig, MosaicSampling
+from nanobrag_torch.models.crystal import Crystal
+from nanobrag_torch.utils.mosaic_sampling import (
+    mosaic_base_samples,
+    radical_inverse,
+    unit_cube_points,
+)
+
+os.environ['KMP_DUPLICATE_LIB_OK'] = 'TRUE'
+
+QUASI_RANDOM = [MosaicSampling.SOBOL, MosaicSampling.HALTON, MosaicSampling.STRATIFIED]
+
+
+def _mosaic_average_error(method, n, seed):
+    """Error of the estimate of E[z² + cos(s)] = 1/3 + e^(-1/2) for axis z-component and angle scale s."""
+    axes, scales = mosaic_base_samples(method, n, seed)
+    axes = axes / torch.norm(axes, dim=1, keepdim=True)
+    estimate = (axes[:, 2] ** 2 + torch.cos(scales)).mean()
+    return abs(estimate.item() - (1.0 / 3.0 + math.exp(-0.5)))
+
+
+class TestPointSets:
+    """Unit-cube point sets."""
+
+    def test_radical_inverse(self):
+        values = radical_inverse(torch.arange(1, 7), 2)
+        assert values.tolist() == [0.5, 0.25, 0.75, 0.125, 0.625, 0.375]
+        assert radical_inverse(torch.tensor([1, 2, 3, 4]), 3).tolist() == pytest.approx([1 / 3, 2 / 3, 1 / 9, 4 / 9])
+
+    @pytest.mark.parametrize("method", QUASI_RANDOM)
+    def test_deterministic_per_seed(self, method):
+        a = unit_cube_points(method, 64, seed=-12345678)
+        assert a.shape == (64, 3)
+        assert ((a >= 0) & (a < 1)).all()
+        assert torch.equal(a, unit_cube_points(method, 64, seed=-12345678))
+        assert not torch.equal(a, unit_cube_points(method, 64, seed=7))
+
+    def test_stratified_fills_every_stratum(self):
+        n = 50
+        points = unit_cube_points(MosaicSampling.STRATIFIED, n, seed=3)
+        for dim in range(3):
+            strata = torch.floor(points[:, dim] * n).long()
+            assert torch.equal(torch.sort(strata).values, torch.arange(n))
+
+    def test_random_is_unchanged(self):
+        gen = torch.Generator()
+        gen.manual_seed(-12345678 & 0x7FFFFFFF)
+        axes, scales = mosaic_base_samples(MosaicSampling.RANDOM, 10, -12345678)
+        assert torch.equal(axes, torch.randn(10, 3, dtype=torch.float64, generator=gen))
+        assert torch.equal(scales, torch.randn(10, dtype=torch.float64, generator=gen))
+
+
+class TestAT_PERF_023:
+    """Mosaic domains drawn by Crystal."""
+
+    @pytest.mark.parametrize("method", QUASI_RANDOM)
+    def test_same_distribution(self, method):
+        axes, scales = mosaic_base_samples(method, 1024, seed=11)
+        torch.testing.assert_close(torch.norm(axes, dim=1), torch.ones(1024, dtype=torch.float64))
+        assert axes.mean(dim=0).abs().max() < 0.05
+        # Uniform axes: each squared component averages 1/3
+        torch.testing.assert_close(axes.pow(2).mean(dim=0), torch.full((3,), 1 / 3, dtype=torch.float64),
+                                   rtol=0.0, atol=0.03)
+        assert abs(scales.mean().item()) < 0.05
+        assert abs(scales.std().item() - 1.0) < 0.05
+
+    @pytest.mark.parametrize("method", QUASI_RANDOM)
+    def test_faster_convergence(self, method):
+        n, seeds = 256, range(8)
+        random_rms = math.sqrt(sum(_mosaic_average_error(MosaicSampling.RANDOM, n, s) ** 2 for s in seeds) / 8)
+        method_rms = math.sqrt(sum(_mosaic_average_error(method, n, s) ** 2 for s in seeds) / 8)
+        assert method_rms < 0.5 * random_rms
+
+    @pytest.mark.parametrize("method", QUASI_RANDOM)
+    def test_crystal_rotations(self, method):
+        crystal = Crystal(device=torch.device("cpu"), dtype=torch.float64)
+        config = CrystalConfig(mosaic_spread_deg=0.5, mosaic_domains=16, mosaic_seed=42,
+                               mosaic_sampling=method)
+        (a1, _, _), _ = crystal.get_rotated_real_vectors(config)
+        (a2, _, _), _ = crystal.get_rotated_real_vectors(config)
+        assert a1.shape == (1, 16, 3)
+        assert torch.equal(a1, a2)
+        # Rotations preserve length and spread around the unrotated vector
+        torch.testing.assert_close(torch.norm(a1, dim=-1), torch.norm(crystal.a).expand(1, 16))
+        default = CrystalConfig(mosaic_spread_deg=0.5, mosaic_domains=16, mosaic_seed=42)
+        (a_default, _, _), _ = crystal.get_rotated_real_vectors(default)
+        assert not torch.allclose(a1, a_default)
+
+    @pytest.mark.parametrize("method", QUASI_RANDOM)
+    def test_spread_gradcheck(self, method):
+        mosaic_spread = torch.tensor(0.5, dtype=torch.float64, requires_grad=True)
+
+        def loss_fn(mosaic_param):
+            crystal = Crystal(device=torch.device("cpu"), dtype=torch.float64)
+            config = CrystalConfig(mosaic_spread_deg=mosaic_param, mosaic_domains=4,
+                                   mosaic_seed=42, mosaic_sampling=method)
+            (a_rot, b_rot, c_rot), _ = crystal.get_rotated_real_vectors(config)
+            return a_rot.sum() + b_rot.sum() + c_rot.sum()
+
+        assert gradcheck(loss_fn, (mosaic_spread,), eps=1e-4, atol=1e-4, rtol=0.02)
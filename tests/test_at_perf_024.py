@@ -0,0 +1,128 @@
+"""
+AT-PERF-024: Blocked sparse structure-factor storage (PERF-HKLBLOCK-001).
+
+Tests that BlockedHKLGrid returns the same values as the dense grid for
+any index, that its memory follows the occupied bricks rather than the
+bounding box, and that simulations with nearest-neighbour and tricubic
+structure factors are unchanged when the grid is bricked.
+"""
+
+import os
+import tempfile
+from pathlib import Path
+
+import pytest
+import torch
+
+from nanobrag_torch.config import CrystalConfig, DetectorConfig, BeamConfig
+from nanobrag_torch.io.hkl import read_hkl_file
+from nanobrag_torch.models.crystal import Crystal
+from nanobrag_torch.models.detector import Detector
+from nanobrag_torch.simulator import Simulator
+from nanobrag_torch.utils.hkl_blocks import BlockedHKLGrid
+
+os.environ['KMP_DUPLICATE_LIB_OK'] = 'TRUE'
+
+
+def _random_grid(shape=(21, 19, 23), fill=0.3, default_F=0.0, seed=0):
+    generator = torch.Generator().manual_seed(seed)
+    grid = torch.full(shape, default_F, dtype=torch.float64)
+    present = torch.rand(shape, generator=generator) < fill
+    grid[present] = torch.rand(int(present.sum()), generator=generator, dtype=torch.float64) * 100 + 1
+    return grid
+
+
+def _make_simulator(hkl_data, interpolate):
+    crystal_config = CrystalConfig(
+        cell_a=70.0, cell_b=80.0, cell_c=90.0,
+        N_cells=(5, 5, 5),
+        default_F=0.0,
+        misset_deg=(10.0, 5.0, 3.0),
+    )
+    detector_config = DetectorConfig(spixels=32, fpixels=32, distance_mm=80.0, pixel_size_mm=0.4)
+    beam_config = BeamConfig(wavelength_A=1.0, fluence=1e12)
+    crystal = Crystal(crystal_config, beam_config=beam_config, dtype=torch.float64)
+    crystal.hkl_data = hkl_data
+    crystal.hkl_metadata = {
+        'h_min': -10, 'h_max': 10, 'k_min': -9, 'k_max': 9, 'l_min': -11, 'l_max': 11,
+        'h_range': 21, 'k_range': 19, 'l_range': 23,
+    }
+    crystal.interpolate = interpolate
+    detector = Detector(detector_config, dtype=torch.float64)
+    return Simulator(crystal, detector, beam_config=beam_config, dtype=torch.float64)
+
+
+class TestBlockedHKLGrid:
+    """Storage and lookup."""
+
+    @pytest.mark.parametrize("brick_size", [1, 4, 8])
+    def test_lookup_matches_dense(self, brick_size):
+        dense = _random_grid(default_F=2.5)
+        blocked = BlockedHKLGrid.from_dense(dense, default_F=2.5, brick_size=brick_size)
+        assert blocked.shape == dense.shape
+        assert torch.equal(blocked.to_dense(), dense)
+
+        generator = torch.Generator().manual_seed(1)
+        idx = [torch.randint(0, n, (5, 7), generator=generator) for n in dense.shape]
+        assert torch.equal(blocked[idx[0], idx[1], idx[2]], dense[idx[0], idx[1], idx[2]])
+        # Broadcast indexing as used to gather tricubic neighbourhoods
+        h, k, l = (torch.arange(4)[:, None, None], torch.arange(4)[None, :, None], torch.arange(4)[None, None, :])
+        assert torch.equal(blocked[h + 3, k + 5, l + 7], dense[h + 3, k + 5, l + 7])
+
+    def test_repeated_reflections_last_wins(self):
+        indices = torch.tensor([[1, 2, 3], [0, 0, 0], [1, 2, 3]])
+        values = torch.tensor([5.0, 6.0, 7.0])
+        blocked = BlockedHKLGrid.from_reflections(indices, values, (4, 4, 4), default_F=1.0)
+        expected = torch.ones(4, 4, 4)
+        expected[0, 0, 0], expected[1, 2, 3] = 6.0, 7.0
+        assert torch.equal(blocked.to_dense(), expected)
+
+    def test_memory_follows_reflections(self):
+        # One octant of a resolution sphere (an asymmetric unit) in a 128³ box
+        n = 128
+        axes = torch.arange(n) - n // 2
+        h, k, l = torch.meshgrid(axes, axes, axes, indexing="ij")
+        present = (h * h + k * k + l * l < (n // 2) ** 2) & (h >= 0) & (k >= 0) & (l >= 0)
+        indices = torch.nonzero(present)
+        blocked = BlockedHKLGrid.from_reflections(indices, torch.ones(len(indices)), (n, n, n))
+        dense_bytes = n ** 3 * 4
+        assert blocked.nbytes < 0.15 * dense_bytes
+        assert blocked.num_bricks < 0.1 * (n // 8) ** 3
+
+    def test_to_and_tensors(self):
+        blocked = BlockedHKLGrid.from_dense(_random_grid())
+        as32 = blocked.to(dtype=torch.float32)
+        assert as32.dtype == torch.float32 and as32.brick_index.dtype == torch.int32
+        bricks, index = as32.tensors()
+        assert bricks.shape[1:] == (8, 8, 8) and index.shape == (3, 3, 3)
+
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError, match="power of two"):
+            BlockedHKLGrid.from_reflections(torch.zeros(1, 3), torch.ones(1), (4, 4, 4), brick_size=6)
+        with pytest.raises(ValueError, match="outside"):
+            BlockedHKLGrid.from_reflections(torch.tensor([[4, 0, 0]]), torch.ones(1), (4, 4, 4))
+
+
+class TestAT_PERF_024:
+    """Reader and simulator integration."""
+
+    def test_read_hkl_file_blocked(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "P1.hkl"
+            path.write_text("-3 0 2 10.5\n4 -1 0 3.25\n0 0 0 7\n4 -1 0 4.0\n")
+            dense, meta = read_hkl_file(str(path), default_F=1.0, dtype=torch.float64)
+            blocked, blocked_meta = read_hkl_file(str(path), default_F=1.0, dtype=torch.float64, storage="blocked")
+            assert blocked_meta == meta
+            assert isinstance(blocked, BlockedHKLGrid)
+            assert torch.equal(blocked.to_dense(), dense)
+            with pytest.raises(ValueError, match="storage"):
+                read_hkl_file(str(path), storage="sparse")
+
+    @pytest.mark.parametrize("interpolate", [False, True])
+    def test_simulation_unchanged(self, interpolate):
+        dense = _random_grid(fill=0.6)
+        expected = _make_simulator(dense, interpolate).run(oversample=1)
+        blocked = BlockedHKLGrid.from_dense(dense)
+        image = _make_simulator(blocked, interpolate).run(oversample=1)
+        assert expected.max() > 0
+        assert torch.equal(image, expected)
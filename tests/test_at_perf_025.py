@@ -0,0 +1,132 @@
+"""
+AT-PERF-025: Precomputed tricubic coefficients (PERF-TRICUBIC-001).
+
+Tests that the cached per-cell polynomials reproduce polin3 interpolation,
+including gradients with respect to the Miller indices, that the cache
+follows the HKL grid it was built from, and that interpolated simulations
+are unchanged.
+"""
+
+import os
+
+import pytest
+import torch
+
+from nanobrag_torch.config import CrystalConfig, DetectorConfig, BeamConfig
+from nanobrag_torch.models.crystal import Crystal
+from nanobrag_torch.models.detector import Detector
+from nanobrag_torch.simulator import Simulator
+from nanobrag_torch.utils.physics import polin3_vectorized
+from nanobrag_torch.utils.tricubic import evaluate_tricubic, tricubic_coefficients
+
+os.environ['KMP_DUPLICATE_LIB_OK'] = 'TRUE'
+
+METADATA = {
+    'h_min': -6, 'h_max': 6, 'k_min': -5, 'k_max': 5, 'l_min': -7, 'l_max': 7,
+    'h_range': 13, 'k_range': 11, 'l_range': 15,
+}
+
+
+def _grid(seed=0):
+    generator = torch.Generator().manual_seed(seed)
+    return torch.rand(13, 11, 15, generator=generator, dtype=torch.float64) * 100
+
+
+def _make_crystal(tricubic_cache, grid=None):
+    config = CrystalConfig(
+        cell_a=70.0, cell_b=80.0, cell_c=90.0, N_cells=(5, 5, 5),
+        misset_deg=(10.0, 5.0, 3.0), tricubic_cache=tricubic_cache,
+    )
+    crystal = Crystal(config, dtype=torch.float64)
+    crystal.hkl_data = _grid() if grid is None else grid
+    crystal.hkl_metadata = dict(METADATA)
+    crystal.interpolate = True
+    return crystal
+
+
+def _interior_points(n, seed=1):
+    generator = torch.Generator().manual_seed(seed)
+    lo = torch.tensor([-5.0, -4.0, -6.0], dtype=torch.float64)
+    hi = torch.tensor([4.999, 3.999, 5.999], dtype=torch.float64)
+    points = lo + (hi - lo) * torch.rand(n, 3, generator=generator, dtype=torch.float64)
+    return points[:, 0], points[:, 1], points[:, 2]
+
+
+class TestTricubicCoefficients:
+    """Coefficient construction and evaluation."""
+
+    def test_matches_polin3(self):
+        grid = _grid()
+        coefficients = tricubic_coefficients(grid)
+        assert coefficients.shape == (10, 8, 12, 4, 4, 4)
+
+        h, k, l = _interior_points(500)
+        floors = [torch.floor(x).long() for x in (h, k, l)]
+        offsets = torch.arange(-1, 3)
+        coords = [f[:, None] + offsets for f in floors]
+        neighbourhood = grid[
+            (coords[0] + 6)[:, :, None, None], (coords[1] + 5)[:, None, :, None], (coords[2] + 7)[:, None, None, :]
+        ]
+        expected = polin3_vectorized(*(c.double() for c in coords), neighbourhood, h, k, l)
+
+        cells = coefficients[floors[0] + 5, floors[1] + 4, floors[2] + 6]
+        values = evaluate_tricubic(cells, h - floors[0], k - floors[1], l - floors[2])
+        torch.testing.assert_close(values, expected, rtol=1e-11, atol=1e-11)
+
+    def test_reproduces_grid_nodes(self):
+        grid = _grid()
+        coefficients = tricubic_coefficients(grid)
+        torch.testing.assert_close(coefficients[..., 0, 0, 0], grid[1:-2, 1:-2, 1:-2], rtol=1e-13, atol=1e-12)
+
+    def test_too_small_grid(self):
+        with pytest.raises(ValueError, match="at least 4"):
+            tricubic_coefficients(torch.zeros(3, 5, 5))
+
+
+class TestAT_PERF_025:
+    """Crystal and simulator integration."""
+
+    def test_interpolation_and_gradients_match(self):
+        h, k, l = _interior_points(200, seed=2)
+        results = []
+        for cache in (False, True):
+            hkl = [x.clone().requires_grad_(True) for x in (h, k, l)]
+            F = _make_crystal(cache).get_structure_factor(*hkl)
+            F.sum().backward()
+            results.append((F.detach(), [x.grad for x in hkl]))
+        torch.testing.assert_close(results[1][0], results[0][0], rtol=1e-11, atol=1e-11)
+        for cached_grad, grad in zip(results[1][1], results[0][1]):
+            torch.testing.assert_close(cached_grad, grad, rtol=1e-9, atol=1e-9)
+
+    def test_cache_follows_grid(self):
+        crystal = _make_crystal(True)
+        first = crystal.get_tricubic_coefficients()
+        assert crystal.get_tricubic_coefficients() is first
+
+        crystal.hkl_data[3, 3, 3] += 1.0
+        rebuilt = crystal.get_tricubic_coefficients()
+        assert rebuilt is not first and not torch.equal(rebuilt, first)
+
+        crystal.hkl_data = _grid(seed=5)
+        assert not torch.equal(crystal.get_tricubic_coefficients(), rebuilt)
+
+        crystal.hkl_data = _grid().requires_grad_(True)
+        assert crystal.get_tricubic_coefficients() is None
+        assert _make_crystal(False).get_tricubic_coefficients() is None
+
+    def test_out_of_range_fallback_unchanged(self):
+        crystal = _make_crystal(True)
+        F = crystal.get_structure_factor(torch.tensor([5.5]), torch.tensor([0.0]), torch.tensor([0.0]))
+        assert F.item() == 0.0
+        assert crystal.interpolate is False
+
+    def test_simulation_unchanged(self):
+        images = []
+        for cache in (False, True):
+            crystal = _make_crystal(cache)
+            detector = Detector(DetectorConfig(spixels=24, fpixels=24, distance_mm=300.0, pixel_size_mm=0.1),
+                                dtype=torch.float64)
+            beam_config = BeamConfig(wavelength_A=1.0, fluence=1e12)
+            images.append(Simulator(crystal, detector, beam_config=beam_config, dtype=torch.float64).run(oversample=1))
+        assert images[0].max() > 0
+        torch.testing.assert_close(images[1], images[0], rtol=1e-10, atol=0.0)
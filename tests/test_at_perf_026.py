@@ -0,0 +1,175 @@
+"""
+AT-PERF-026: Deduplicated tricubic neighborhoods on a halo-padded grid (PERF-TRICUBIC-002).
+
+Tests that the padded grid matches the original inside the halo, that
+interpolation decides the out-of-range fallback per sample (default_F for
+those samples, polin3 for the rest) without reading the flag back until
+check_interpolation_range(), and that values and gradients of the
+deduplicated gather match a direct per-sample gather.
+"""
+
+import os
+
+import pytest
+import torch
+
+from nanobrag_torch.config import CrystalConfig, DetectorConfig, BeamConfig
+from nanobrag_torch.models.crystal import Crystal
+from nanobrag_torch.models.detector import Detector
+from nanobrag_torch.simulator import Simulator
+from nanobrag_torch.utils.hkl_blocks import BlockedHKLGrid
+from nanobrag_torch.utils.physics import polin3_vectorized
+from nanobrag_torch.utils.tricubic import HKL_HALO, pad_grid
+
+os.environ['KMP_DUPLICATE_LIB_OK'] = 'TRUE'
+
+METADATA = {
+    'h_min': -6, 'h_max': 6, 'k_min': -5, 'k_max': 5, 'l_min': -7, 'l_max': 7,
+    'h_range': 13, 'k_range': 11, 'l_range': 15,
+}
+DEFAULT_F = 7.5
+
+
+def _grid(seed=0):
+    generator = torch.Generator().manual_seed(seed)
+    return torch.rand(13, 11, 15, generator=generator, dtype=torch.float64) * 100
+
+
+def _make_crystal(grid=None, **config):
+    config = CrystalConfig(
+        cell_a=70.0, cell_b=80.0, cell_c=90.0, N_cells=(5, 5, 5),
+        misset_deg=(10.0, 5.0, 3.0), default_F=DEFAULT_F, **config,
+    )
+    crystal = Crystal(config, dtype=torch.float64)
+    crystal.hkl_data = _grid() if grid is None else grid
+    crystal.hkl_metadata = dict(METADATA)
+    crystal.interpolate = True
+    return crystal
+
+
+def _queries(n, seed=1):
+    """Points clustered in a few cells, a quarter of them out of range."""
+    generator = torch.Generator().manual_seed(seed)
+    cells = torch.randint(-4, 4, (8, 3), generator=generator).double()
+    points = cells[torch.randint(0, 8, (n,), generator=generator)] + torch.rand(n, 3, generator=generator,
+                                                                                 dtype=torch.float64)
+    points[::4, 0] += 6.0  # floor(h) + 2 > h_max
+    return points[:, 0], points[:, 1], points[:, 2]
+
+
+def _reference(grid, h, k, l):
+    """Per-sample 4x4x4 gather and polin3, default_F out of range."""
+    floors = [torch.floor(x).long() for x in (h, k, l)]
+    mins = (METADATA['h_min'], METADATA['k_min'], METADATA['l_min'])
+    maxs = (METADATA['h_max'], METADATA['k_max'], METADATA['l_max'])
+    inside = torch.ones_like(h, dtype=torch.bool)
+    for f, lo, hi in zip(floors, mins, maxs):
+        inside &= (f - 1 >= lo) & (f + 2 <= hi)
+    offsets = torch.arange(-1, 3)
+    coords = [f[inside, None] + offsets for f in floors]
+    neighbourhood = grid[
+        (coords[0] - mins[0])[:, :, None, None],
+        (coords[1] - mins[1])[:, None, :, None],
+        (coords[2] - mins[2])[:, None, None, :],
+    ]
+    values = polin3_vectorized(*(c.double() for c in coords), neighbourhood, h[inside], k[inside], l[inside])
+    expected = torch.full_like(h, DEFAULT_F)
+    expected[inside] = values
+    return expected, inside
+
+
+class TestHaloPadding:
+    """Padded copies of dense and bricked grids."""
+
+    def test_dense_padding(self):
+        grid = _grid()
+        padded = pad_grid(grid, DEFAULT_F)
+        assert padded.shape == tuple(n + 2 * HKL_HALO for n in grid.shape)
+        inner = (slice(HKL_HALO, -HKL_HALO),) * 3
+        assert torch.equal(padded[inner], grid)
+        border = torch.ones_like(padded, dtype=torch.bool)
+        border[inner] = False
+        assert torch.all(padded[border] == DEFAULT_F)
+
+    def test_blocked_padding_matches_dense(self):
+        dense = _grid()
+        dense[dense < 50] = DEFAULT_F
+        blocked = BlockedHKLGrid.from_dense(dense, default_F=DEFAULT_F, brick_size=4)
+        padded = blocked.padded(HKL_HALO)
+        assert isinstance(padded, BlockedHKLGrid)
+        assert torch.equal(padded.to_dense(), pad_grid(dense, DEFAULT_F))
+
+    def test_crystal_caches_padded_grid(self):
+        crystal = _make_crystal()
+        first = crystal.get_padded_hkl_data()
+        assert crystal.get_padded_hkl_data() is first
+        crystal.hkl_data[0, 0, 0] += 1.0
+        rebuilt = crystal.get_padded_hkl_data()
+        assert rebuilt is not first and rebuilt[HKL_HALO, HKL_HALO, HKL_HALO] == crystal.hkl_data[0, 0, 0]
+
+
+class TestAT_PERF_026:
+    """Per-element bounds and deduplicated gathers."""
+
+    @pytest.mark.parametrize("tricubic_cache", [False, True])
+    def test_mixed_batch_per_element(self, tricubic_cache):
+        crystal = _make_crystal(tricubic_cache=tricubic_cache)
+        h, k, l = _queries(400)
+        F = crystal.get_structure_factor(h, k, l)
+        expected, inside = _reference(crystal.hkl_data, h, k, l)
+        assert inside.any() and not inside.all()
+        torch.testing.assert_close(F, expected, rtol=1e-11, atol=1e-11)
+        # The C policy still applies to later calls
+        assert crystal.interpolate is False
+
+    def test_blocked_grid_matches_dense(self):
+        h, k, l = _queries(200, seed=3)
+        dense = _make_crystal()._tricubic_interpolation(h, k, l)
+        blocked = _make_crystal(BlockedHKLGrid.from_dense(_grid()))._tricubic_interpolation(h, k, l)
+        assert torch.equal(blocked, dense)
+
+    def test_gradients_match_direct_gather(self):
+        h, k, l = _queries(300, seed=4)
+        grid = _grid().requires_grad_(True)
+        hkl = [x.clone().requires_grad_(True) for x in (h, k, l)]
+        _make_crystal(grid)._tricubic_interpolation(*hkl).sum().backward()
+
+        reference_grid = _grid().requires_grad_(True)
+        reference_hkl = [x.clone().requires_grad_(True) for x in (h, k, l)]
+        _reference(reference_grid, *reference_hkl)[0].sum().backward()
+
+        torch.testing.assert_close(grid.grad, reference_grid.grad, rtol=1e-11, atol=1e-11)
+        for grad, reference in zip((x.grad for x in hkl), (x.grad for x in reference_hkl)):
+            torch.testing.assert_close(grad, reference, rtol=1e-9, atol=1e-9)
+
+    def test_grid_smaller_than_neighborhood(self):
+        crystal = _make_crystal(torch.ones(3, 3, 3, dtype=torch.float64))
+        crystal.hkl_metadata = {'h_min': -1, 'h_max': 1, 'k_min': -1, 'k_max': 1, 'l_min': -1, 'l_max': 1,
+                                'h_range': 3, 'k_range': 3, 'l_range': 3}
+        h = torch.tensor([0.5, -3.2, 40.0], dtype=torch.float64)
+        F = crystal._tricubic_interpolation(h, torch.zeros(3, dtype=torch.float64), torch.zeros(3, dtype=torch.float64))
+        assert torch.equal(F, torch.full((3,), DEFAULT_F, dtype=torch.float64))
+
+    def test_deferred_range_check(self, capsys):
+        crystal = _make_crystal()
+        crystal._defer_range_check = True
+        h, k, l = _queries(64)
+        crystal._tricubic_interpolation(h, k, l)
+        crystal._tricubic_interpolation(h + 0.25, k, l)
+        assert crystal.interpolate is True
+        assert "WARNING" not in capsys.readouterr().out
+
+        crystal.check_interpolation_range()
+        assert crystal.interpolate is False
+        assert capsys.readouterr().out.count("out of range for three point interpolation") == 1
+
+    def test_simulation_checks_range_once_per_run(self, capsys):
+        crystal = _make_crystal()
+        detector = Detector(DetectorConfig(spixels=48, fpixels=48, distance_mm=50.0, pixel_size_mm=0.5),
+                            dtype=torch.float64)
+        beam_config = BeamConfig(wavelength_A=1.0, fluence=1e12)
+        simulator = Simulator(crystal, detector, beam_config=beam_config, dtype=torch.float64)
+        image = simulator.run(oversample=1)
+        assert image.max() > 0
+        assert crystal.interpolate is False
+        assert capsys.readouterr().out.count("out of range for three point interpolation") == 1
@@ -0,0 +1,126 @@
+"""
+AT-PERF-027: Vectorized HKL text parser (PERF-HKLPARSE-001).
+
+Tests that the array-based reader produces the same grid, metadata and
+warnings as the sequential line-by-line reader for well-formed files and
+for files with comments, short or malformed lines and repeated
+reflections.
+"""
+
+import os
+
+import numpy as np
+import pytest
+import torch
+
+from nanobrag_torch.io.hkl import read_hkl_file
+from nanobrag_torch.utils.hkl_blocks import BlockedHKLGrid
+
+os.environ['KMP_DUPLICATE_LIB_OK'] = 'TRUE'
+
+
+def _sequential_read(path, default_F):
+    """The line-by-line reader the vectorized one replaces."""
+    reflections = []
+    warning = None
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            parts = line.split()
+            if len(parts) < 4:
+                continue
+            try:
+                h, k, l, F = (float(p) for p in parts[:4])
+                if warning is None and (h != int(h) or k != int(k) or l != int(l)):
+                    warning = f"WARNING: Non-integer h,k,l values found: {h}, {k}, {l}"
+                reflections.append((int(round(h)), int(round(k)), int(round(l)), F))
+            except ValueError:
+                continue
+    mins = [min(r[i] for r in reflections) for i in range(3)]
+    maxs = [max(r[i] for r in reflections) for i in range(3)]
+    grid = torch.full(tuple(hi - lo + 1 for lo, hi in zip(mins, maxs)), default_F, dtype=torch.float64)
+    for h, k, l, F in reflections:
+        grid[h - mins[0], k - mins[1], l - mins[2]] = F
+    return grid, mins, maxs, warning
+
+
+def _write(tmp_path, text, name="test.hkl"):
+    path = tmp_path / name
+    path.write_text(text)
+    return str(path)
+
+
+def _random_reflections(n, seed=0):
+    rng = np.random.default_rng(seed)
+    hkl = rng.integers(-20, 21, size=(n, 3))
+    F = rng.uniform(0, 1000, size=n).round(3)
+    return "".join(f"{h} {k} {l} {f}\n" for (h, k, l), f in zip(hkl, F))
+
+
+class TestHKLParser:
+    """Agreement with the sequential reader."""
+
+    @pytest.mark.parametrize("extra_columns", ["", " 12.5", " 3.1 90.0"])
+    def test_well_formed_file(self, tmp_path, extra_columns):
+        lines = _random_reflections(5000).splitlines()
+        path = _write(tmp_path, "".join(line + extra_columns + "\n" for line in lines))
+        grid, meta = read_hkl_file(path, default_F=2.0, dtype=torch.float64)
+        expected, mins, maxs, _ = _sequential_read(path, 2.0)
+        assert (meta['h_min'], meta['k_min'], meta['l_min']) == tuple(mins)
+        assert (meta['h_max'], meta['k_max'], meta['l_max']) == tuple(maxs)
+        assert torch.equal(grid, expected)
+
+    def test_messy_file(self, tmp_path, capsys):
+        text = (
+            "# header comment\n"
+            "\n"
+            "   \n"
+            "1 2 3 10.0\n"
+            "1 2 3 11.0   # repeated, last wins\n"
+            "4 5\n"
+            "a b c d\n"
+            "nan 0 0 5.0\n"
+            "1 2 3 #4\n"
+            "-2 0 1.5 7.0\n"
+            "0 0 0.5 8.0\n"
+            "-3 -1 2 4#x\n"
+            "\t0\t1\t-1\t2.5e1\n"
+        )
+        path = _write(tmp_path, text)
+        grid, meta = read_hkl_file(path, dtype=torch.float64)
+        out = capsys.readouterr().out
+        expected, mins, maxs, warning = _sequential_read(path, 0.0)
+        assert out.strip() == warning
+        assert out.count("Non-integer") == 1
+        assert (meta['h_min'], meta['h_max']) == (mins[0], maxs[0])
+        assert torch.equal(grid, expected)
+
+    def test_no_reflections(self, tmp_path):
+        path = _write(tmp_path, "# only a comment\n1 2 3\n")
+        with pytest.raises(ValueError, match="No valid reflections"):
+            read_hkl_file(path)
+        with pytest.raises(ValueError, match="No valid reflections"):
+            read_hkl_file(_write(tmp_path, "", name="empty.hkl"))
+
+
+class TestAT_PERF_027:
+    """Storage modes and dtypes."""
+
+    def test_blocked_storage_matches_dense(self, tmp_path):
+        text = _random_reflections(3000, seed=1) + _random_reflections(500, seed=2)
+        path = _write(tmp_path, text)
+        dense, meta = read_hkl_file(path, default_F=1.0, dtype=torch.float64)
+        blocked, blocked_meta = read_hkl_file(path, default_F=1.0, dtype=torch.float64, storage="blocked")
+        assert isinstance(blocked, BlockedHKLGrid)
+        assert blocked_meta == meta
+        assert torch.equal(blocked.to_dense(), dense)
+
+    def test_float32_grid(self, tmp_path):
+        path = _write(tmp_path, "0 0 0 0.1\n1 1 1 123456.789\n")
+        grid, _ = read_hkl_file(path)
+        assert grid.dtype == torch.float32
+        assert grid[0, 0, 0] == torch.tensor(0.1, dtype=torch.float32)
+        assert grid[1, 1, 1] == torch.tensor(123456.789, dtype=torch.float32)
+        assert grid[0, 1, 0] == 0.0
@@ -0,0 +1,134 @@
+"""
+AT-PERF-028: Fdump v2 cache (PERF-FDUMP-001).
+
+Tests the fixed-header float32/float64 format and its memory-mapped
+reader, atomic replacement, and the content-addressed cache directory:
+hits for an unchanged HKL file and default_F, misses after either
+changes, and least-recently-used eviction.
+"""
+
+import os
+
+import numpy as np
+import pytest
+import torch
+
+from nanobrag_torch.io.fdump_cache import (
+    HEADER_SIZE, FdumpCache, hkl_source_hash, read_fdump_v2, read_fdump_v2_header, write_fdump_v2,
+)
+from nanobrag_torch.io.hkl import read_hkl_file
+from nanobrag_torch.utils.hkl_blocks import BlockedHKLGrid
+
+os.environ['KMP_DUPLICATE_LIB_OK'] = 'TRUE'
+
+
+def _write_hkl(path, seed=0, n=400):
+    rng = np.random.default_rng(seed)
+    hkl = rng.integers(-8, 9, size=(n, 3))
+    F = rng.uniform(0, 500, size=n)
+    path.write_text("".join(f"{h} {k} {l} {f:.4f}\n" for (h, k, l), f in zip(hkl, F)))
+    return path
+
+
+class TestFdumpV2Format:
+    """Header, payload and atomic writes."""
+
+    @pytest.mark.parametrize("dtype", [torch.float32, torch.float64])
+    def test_roundtrip(self, tmp_path, dtype):
+        grid, meta = read_hkl_file(str(_write_hkl(tmp_path / "P1.hkl")), default_F=3.0, dtype=torch.float64)
+        source_hash = hkl_source_hash(tmp_path / "P1.hkl", 3.0)
+        path = tmp_path / "grid.fdump2"
+        write_fdump_v2(grid, meta, path, default_F=3.0, source_hash=source_hash, dtype=dtype)
+
+        header = read_fdump_v2_header(path)
+        assert header['dtype'] == dtype and header['default_F'] == 3.0
+        assert header['source_hash'] == source_hash
+        assert os.path.getsize(path) == HEADER_SIZE + grid.numel() * grid.to(dtype).element_size()
+
+        for mmap in (True, False):
+            loaded, loaded_meta = read_fdump_v2(path, mmap=mmap)
+            assert loaded_meta == meta
+            assert loaded.dtype == dtype
+            assert torch.equal(loaded, grid.to(dtype))
+        as64, _ = read_fdump_v2(path, dtype=torch.float64)
+        assert as64.dtype == torch.float64
+
+    def test_atomic_replace(self, tmp_path):
+        meta = {'h_min': 0, 'h_max': 1, 'k_min': 0, 'k_max': 1, 'l_min': 0, 'l_max': 1}
+        path = tmp_path / "grid.fdump2"
+        write_fdump_v2(torch.ones(2, 2, 2), meta, path)
+        write_fdump_v2(torch.full((2, 2, 2), 2.0), meta, path)
+        assert torch.equal(read_fdump_v2(path)[0], torch.full((2, 2, 2), 2.0))
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["grid.fdump2"]
+
+    def test_invalid_files(self, tmp_path):
+        meta = {'h_min': 0, 'h_max': 1, 'k_min': 0, 'k_max': 1, 'l_min': 0, 'l_max': 1}
+        with pytest.raises(ValueError, match="does not match"):
+            write_fdump_v2(torch.ones(3, 2, 2), meta, tmp_path / "bad.fdump2")
+        with pytest.raises(ValueError, match="float32 or float64"):
+            write_fdump_v2(torch.ones(2, 2, 2), meta, tmp_path / "bad.fdump2", dtype=torch.float16)
+        legacy = tmp_path / "Fdump.bin"
+        legacy.write_bytes(b"0 1 0 1 0 1\n\f" + bytes(216))
+        with pytest.raises(ValueError, match="not an Fdump v2"):
+            read_fdump_v2(legacy)
+        path = tmp_path / "truncated.fdump2"
+        write_fdump_v2(torch.ones(2, 2, 2), meta, path)
+        path.write_bytes(path.read_bytes()[:-4])
+        with pytest.raises(ValueError, match="expected"):
+            read_fdump_v2(path)
+
+
+class TestAT_PERF_028:
+    """Content-addressed cache directory."""
+
+    def test_hit_and_miss(self, tmp_path):
+        hkl = _write_hkl(tmp_path / "P1.hkl")
+        cache = FdumpCache(tmp_path / "cache")
+        first, meta = cache.load(hkl, default_F=1.0)
+        second, second_meta = cache.load(hkl, default_F=1.0)
+        assert cache.stats()['misses'] == 1 and cache.stats()['hits'] == 1
+        assert second_meta == meta and torch.equal(second, first)
+        assert torch.equal(first, read_hkl_file(str(hkl), default_F=1.0)[0])
+
+        cache.load(hkl, default_F=2.0)  # default_F is part of the key
+        _write_hkl(hkl, seed=1)  # so is the content
+        changed, _ = cache.load(hkl, default_F=1.0)
+        assert cache.stats()['misses'] == 3 and cache.stats()['entries'] == 3
+        assert torch.equal(changed, read_hkl_file(str(hkl), default_F=1.0)[0])
+
+    def test_blocked_storage(self, tmp_path):
+        hkl = _write_hkl(tmp_path / "P1.hkl")
+        cache = FdumpCache(tmp_path / "cache")
+        dense, _ = cache.load(hkl)
+        blocked, _ = cache.load(hkl, storage="blocked")
+        assert isinstance(blocked, BlockedHKLGrid)
+        assert torch.equal(blocked.to_dense(), dense)
+
+    def test_damaged_entry_is_rebuilt(self, tmp_path):
+        hkl = _write_hkl(tmp_path / "P1.hkl")
+        cache = FdumpCache(tmp_path / "cache")
+        expected, _ = cache.load(hkl)
+        path = cache.path_for(hkl_source_hash(hkl, 0.0), torch.float32)
+        path.write_bytes(b"garbage")
+        rebuilt, _ = cache.load(hkl)
+        assert torch.equal(rebuilt, expected)
+        assert cache.stats()['misses'] == 2
+
+    def test_lru_eviction(self, tmp_path):
+        paths = [_write_hkl(tmp_path / f"{i}.hkl", seed=i) for i in range(3)]
+        cache = FdumpCache(tmp_path / "cache")
+        cache.load(paths[0])
+        entry_bytes = cache.stats()['bytes']
+        cache.load(paths[1])
+        files = {i: cache.path_for(hkl_source_hash(p, 0.0), torch.float32) for i, p in enumerate(paths[:2])}
+        os.utime(files[0], ns=(10**18, 10**18))  # 0 used more recently than 1
+        os.utime(files[1], ns=(10**9, 10**9))
+
+        cache.max_bytes = 2 * entry_bytes + entry_bytes // 2
+        cache.load(paths[2])
+        assert files[0].exists() and not files[1].exists()
+        assert cache.stats()['entries'] == 2
+
+    def test_invalid_size(self, tmp_path):
+        with pytest.raises(ValueError, match="positive"):
+            FdumpCache(tmp_path, max_bytes=0)
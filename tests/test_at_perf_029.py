@@ -0,0 +1,145 @@
+"""
+AT-PERF-029: On-disk result cache (PERF-RESULTCACHE-001).
+
+Tests the canonical configuration hash (stable for equal inputs, sensitive
+to configuration, HKL content and exact float values), that Simulator.run
+returns stored images for repeated runs and simulates again after any
+input changes, which runs are never cached, and the LRU cache directory.
+"""
+
+import os
+
+import numpy as np
+import pytest
+import torch
+
+from nanobrag_torch.config import CrystalConfig, DetectorConfig, BeamConfig
+from nanobrag_torch.io.result_cache import ResultCache, canonical_hash
+from nanobrag_torch.models.crystal import Crystal
+from nanobrag_torch.models.detector import Detector
+from nanobrag_torch.simulator import Simulator
+
+os.environ['KMP_DUPLICATE_LIB_OK'] = 'TRUE'
+
+
+def _make_simulator(cache, hkl_data=None, debug_config=None, **crystal_kwargs):
+    crystal_config = CrystalConfig(
+        cell_a=100.0, cell_b=100.0, cell_c=100.0,
+        N_cells=(5, 5, 5),
+        default_F=100.0,
+        misset_deg=(10.0, 5.0, 3.0),
+        **crystal_kwargs,
+    )
+    detector_config = DetectorConfig(spixels=24, fpixels=20, distance_mm=100.0, pixel_size_mm=0.2)
+    beam_config = BeamConfig(wavelength_A=1.0, fluence=1e12)
+    crystal = Crystal(crystal_config, beam_config=beam_config, dtype=torch.float64)
+    if hkl_data is not None:
+        crystal.hkl_data, crystal.hkl_metadata = hkl_data
+    detector = Detector(detector_config, dtype=torch.float64)
+    return Simulator(crystal, detector, beam_config=beam_config, dtype=torch.float64,
+                     debug_config=debug_config, result_cache=cache)
+
+
+def _hkl_data(F=50.0):
+    grid = torch.full((5, 5, 5), F, dtype=torch.float64)
+    metadata = {'h_min': -2, 'h_max': 2, 'k_min': -2, 'k_max': 2, 'l_min': -2, 'l_max': 2,
+                'h_range': 5, 'k_range': 5, 'l_range': 5}
+    return grid, metadata
+
+
+def _no_render(**kwargs):
+    raise AssertionError("cache hit expected")
+
+
+class TestCanonicalHash:
+    """Stability and sensitivity of the key."""
+
+    def test_equal_inputs_equal_keys(self):
+        first = {'config': CrystalConfig(cell_a=80.0), 'grid': torch.arange(8.0), 'seed': 3}
+        second = {'seed': 3, 'grid': torch.arange(8.0), 'config': CrystalConfig(cell_a=80.0)}
+        assert canonical_hash(first) == canonical_hash(second)
+        assert canonical_hash(np.arange(8.0)) == canonical_hash(np.arange(8.0))
+
+    def test_sensitivity(self):
+        base = canonical_hash((CrystalConfig(cell_a=80.0), torch.arange(8.0)))
+        assert canonical_hash((CrystalConfig(cell_a=81.0), torch.arange(8.0))) != base
+        assert canonical_hash((CrystalConfig(cell_a=80.0), torch.arange(1.0, 9.0))) != base
+        assert canonical_hash((CrystalConfig(cell_a=80.0), torch.arange(8.0).float())) != base
+        assert canonical_hash(0.1 + 0.2) != canonical_hash(0.3)
+        assert canonical_hash(torch.zeros(2, 4)) != canonical_hash(torch.zeros(4, 2))
+
+    def test_unkeyable_values(self):
+        with pytest.raises(ValueError, match="requires grad"):
+            canonical_hash(torch.ones(3, requires_grad=True))
+        with pytest.raises(ValueError, match="Cannot key"):
+            canonical_hash(object())
+
+
+class TestAT_PERF_029:
+    """Simulator runs through the cache and the cache directory."""
+
+    def test_repeated_run_is_a_hit(self, tmp_path, monkeypatch):
+        cache = ResultCache(tmp_path)
+        image = _make_simulator(cache).run(oversample=1)
+        assert cache.stats()['misses'] == 1 and cache.stats()['entries'] == 1
+
+        simulator = _make_simulator(cache)
+        monkeypatch.setattr(simulator, "_render", _no_render)
+        cached = simulator.run(oversample=1)
+        assert cache.stats()['hits'] == 1
+        assert cached.dtype == image.dtype and torch.equal(cached, image)
+        assert simulator.last_result_key is not None
+
+    def test_changed_inputs_miss(self, tmp_path):
+        cache = ResultCache(tmp_path)
+        keys = set()
+        for simulator, kwargs in [
+            (_make_simulator(cache), {}),
+            (_make_simulator(cache), {'oversample': 2}),
+            (_make_simulator(cache, mosaic_seed=7), {}),
+            (_make_simulator(cache, hkl_data=_hkl_data()), {}),
+            (_make_simulator(cache, hkl_data=_hkl_data(F=51.0)), {}),
+        ]:
+            simulator.run(**kwargs)
+            keys.add(simulator.last_result_key)
+        assert len(keys) == 5 and None not in keys
+        assert cache.stats()['misses'] == 5 and cache.stats()['hits'] == 0
+
+    def test_uncached_runs(self, tmp_path):
+        cache = ResultCache(tmp_path)
+        uncached = _make_simulator(None)
+        uncached.run(oversample=1)
+        assert uncached.last_result_key is None
+
+        stats = _make_simulator(cache, debug_config={'hkl_stats': True})
+        stats.run(oversample=1)
+        assert stats.last_result_key is None
+
+        simulator = _make_simulator(cache)
+        a_star = simulator.crystal.a_star.detach().clone().requires_grad_(True)
+        image = simulator.run(oversample=1, override_a_star=a_star)
+        assert image.requires_grad and simulator.last_result_key is None
+        assert cache.stats()['entries'] == 0
+
+    def test_store_load_and_lru(self, tmp_path):
+        cache = ResultCache(tmp_path)
+        assert cache.load("missing") is None
+        first = cache.store("a", image=np.ones((4, 4)), noise=np.arange(16, dtype=np.uint16))
+        loaded = cache.load("a")
+        assert set(loaded) == {'image', 'noise'} and loaded['noise'].dtype == np.uint16
+        entry_bytes = cache.stats()['bytes']
+
+        second = cache.store("b", image=np.ones((4, 4)))
+        os.utime(first, ns=(10**18, 10**18))  # a used more recently than b
+        os.utime(second, ns=(10**9, 10**9))
+        cache.max_bytes = 2 * entry_bytes
+        cache.store("c", image=np.ones((4, 4)))
+        assert cache.load("a") is not None and cache.load("b") is None
+
+        assert cache.clear() == 2
+        stats = cache.stats()
+        assert (stats['hits'], stats['misses'], stats['entries']) == (0, 0, 0)
+
+    def test_invalid_size(self, tmp_path):
+        with pytest.raises(ValueError, match="positive"):
+            ResultCache(tmp_path, max_bytes=-1)
@@ -0,0 +1,126 @@
+"""
+AT-PERF-030: Compiled-kernel cache (PERF-KERNELCACHE-001).
+
+Tests least-recently-used eviction, keys built from every specialization
+input, first-call compile timing, persisted compiler artifacts, and that
+Simulators with matching configurations share one compiled kernel while
+a changed specialization compiles another.
+"""
+
+import os
+
+import pytest
+import torch
+
+from nanobrag_torch import simulator as simulator_module
+from nanobrag_torch.config import CrystalConfig, DetectorConfig, BeamConfig
+from nanobrag_torch.models.crystal import Crystal
+from nanobrag_torch.models.detector import Detector
+from nanobrag_torch.simulator import Simulator
+from nanobrag_torch.utils.runtime_cache import CompiledKernelCache, make_key
+
+os.environ['KMP_DUPLICATE_LIB_OK'] = 'TRUE'
+
+
+def _identity_compiler(fn):
+    return fn
+
+
+def _kernel(x):
+    return x + 1
+
+
+class TestCompiledKernelCache:
+    """Keys, LRU eviction and statistics."""
+
+    def test_key_covers_specialization(self):
+        base = make_key(torch.device("cpu"), torch.float32, shape="SQUARE", ranks=(0, 0, 0))
+        assert base == make_key("cpu", torch.float32, ranks=(0, 0, 0), shape="SQUARE")
+        assert base != make_key("cpu", torch.float64, shape="SQUARE", ranks=(0, 0, 0))
+        assert base != make_key("cpu", torch.float32, shape="ROUND", ranks=(0, 0, 0))
+        assert base != make_key("cpu", torch.float32, shape="SQUARE", ranks=(1, 0, 0))
+
+    def test_lru_eviction(self):
+        cache = CompiledKernelCache(max_entries=2)
+        for name in "abc":
+            cache.put((name,), _kernel)
+            if name == "b":
+                assert cache.get(("a",)) is _kernel  # a used more recently than b
+        assert cache.get(("a",)) is _kernel and cache.get(("c",)) is _kernel
+        assert cache.get(("b",)) is None
+        stats = cache.stats()
+        assert stats['size'] == 2 and stats['evictions'] == 1
+        assert stats['hits'] == 3 and stats['misses'] == 1
+
+    def test_compile_counts_and_times_first_call(self):
+        cache = CompiledKernelCache()
+        calls = []
+
+        def compiler(fn):
+            calls.append(fn)
+            return fn
+
+        first = cache.compile(("k",), _kernel, compiler)
+        assert cache.compile(("k",), _kernel, compiler) is first
+        assert len(calls) == 1
+        assert cache.stats()['compiles'] == 0  # torch.compile compiles on the first call
+        assert first(1) == 2 and first(2) == 3
+        stats = cache.stats()
+        assert stats['compiles'] == 1 and stats['compile_seconds'] >= 0.0
+        assert stats['hits'] == 1 and stats['misses'] == 1 and stats['artifacts'] is None
+
+    def test_invalid_size(self):
+        with pytest.raises(ValueError, match="positive"):
+            CompiledKernelCache(max_entries=0)
+
+
+class TestAT_PERF_030:
+    """Persisted artifacts and Simulator integration."""
+
+    def test_artifacts_persist_across_caches(self, tmp_path, monkeypatch):
+        loaded = []
+        monkeypatch.setattr(torch.compiler, "save_cache_artifacts", lambda: (b"artifacts", None), raising=False)
+        monkeypatch.setattr(torch.compiler, "load_cache_artifacts", loaded.append, raising=False)
+
+        writer = CompiledKernelCache(directory=tmp_path)
+        writer.compile(("k",), _kernel, _identity_compiler)(1)
+        assert writer.stats()['artifacts']['entries'] == 1
+
+        # A fresh process: loads the artifacts before compiling
+        reader = CompiledKernelCache(directory=tmp_path)
+        reader.compile(("k",), _kernel, _identity_compiler)
+        assert loaded == [b"artifacts"] and reader.stats()['artifact_loads'] == 1
+        reader.compile(("other",), _kernel, _identity_compiler)
+        assert reader.stats()['artifacts']['misses'] == 1
+
+        reader.clear(artifacts=True)
+        assert reader.stats()['artifacts']['entries'] == 0
+
+    def test_simulators_share_compiled_kernels(self, monkeypatch):
+        monkeypatch.delenv("NANOBRAG_DISABLE_COMPILE", raising=False)
+        monkeypatch.delenv("NANOBRAGG_DISABLE_COMPILE", raising=False)
+        cache = CompiledKernelCache()
+        monkeypatch.setattr(simulator_module, "get_global_kernel_cache", lambda: cache)
+        monkeypatch.setattr(simulator_module.torch, "compile", lambda **kwargs: _identity_compiler)
+
+        def make(nopolar=False, N_cells=(5, 5, 5)):
+            beam_config = BeamConfig(wavelength_A=1.0, nopolar=nopolar)
+            crystal = Crystal(CrystalConfig(N_cells=N_cells, default_F=100.0), beam_config=beam_config)
+            detector = Detector(DetectorConfig(spixels=16, fpixels=16))
+            return Simulator(crystal, detector, beam_config=beam_config)
+
+        first, second = make(), make(N_cells=(7, 7, 7))
+        assert second._compiled_compute_physics is first._compiled_compute_physics
+        unpolarized = make(nopolar=True)
+        assert unpolarized._compiled_compute_physics is not first._compiled_compute_physics
+        assert cache.stats()['size'] == 2 and cache.stats()['hits'] == 1
+
+        # Loading HKL data after construction selects another entry at run time
+        first.crystal.hkl_data = torch.full((5, 5, 5), 100.0)
+        first.crystal.hkl_metadata = {
+            'h_min': -2, 'h_max': 2, 'k_min': -2, 'k_max': 2, 'l_min': -2, 'l_max': 2,
+            'h_range': 5, 'k_range': 5, 'l_range': 5,
+        }
+        first.run(oversample=1)
+        assert first._compiled_compute_physics is not second._compiled_compute_physics
+        assert cache.stats()['size'] == 3
@@ -0,0 +1,104 @@
+"""
+AT-PERF-031: Compiled chunked execution (PERF-BUCKET-001).
+
+Tests that pixel_batch_size chunks run the compiled kernel with a single
+input shape (the short final chunk is padded and sliced off) and that the
+chunked image matches the unchunked one, with and without oversampling
+and multiple sources.
+"""
+
+import os
+
+import pytest
+import torch
+
+from nanobrag_torch import simulator as simulator_module
+from nanobrag_torch.config import CrystalConfig, DetectorConfig, BeamConfig
+from nanobrag_torch.models.crystal import Crystal
+from nanobrag_torch.models.detector import Detector
+from nanobrag_torch.simulator import Simulator
+from nanobrag_torch.utils.runtime_cache import CompiledKernelCache
+
+os.environ['KMP_DUPLICATE_LIB_OK'] = 'TRUE'
+
+
+@pytest.fixture
+def shapes(monkeypatch):
+    """Stand-in compiler recording the pixel-coordinate shapes of compiled calls."""
+    monkeypatch.delenv("NANOBRAG_DISABLE_COMPILE", raising=False)
+    monkeypatch.delenv("NANOBRAGG_DISABLE_COMPILE", raising=False)
+    recorded = []
+
+    def compiler(kernel):
+        def compiled(*args, **kwargs):
+            coords = kwargs.get('pixel_coords_angstroms', args[0] if args else None)
+            recorded.append(tuple(coords.shape))
+            return kernel(*args, **kwargs)
+        return compiled
+
+    cache = CompiledKernelCache()
+    monkeypatch.setattr(simulator_module, "get_global_kernel_cache", lambda: cache)
+    monkeypatch.setattr(simulator_module.torch, "compile", lambda **kwargs: compiler)
+    return recorded
+
+
+def _make_simulator(n_sources=1):
+    crystal_config = CrystalConfig(
+        cell_a=100.0, cell_b=100.0, cell_c=100.0,
+        N_cells=(5, 5, 5),
+        default_F=100.0,
+        misset_deg=(10.0, 5.0, 3.0),
+    )
+    detector_config = DetectorConfig(spixels=23, fpixels=16, distance_mm=100.0, pixel_size_mm=0.2)
+    beam_kwargs = dict(wavelength_A=1.0, fluence=1e12)
+    if n_sources > 1:
+        angles = torch.linspace(-2e-3, 2e-3, n_sources, dtype=torch.float64)
+        beam_kwargs.update(
+            source_directions=torch.stack(
+                [-torch.cos(angles), torch.sin(angles), torch.zeros_like(angles)], dim=1
+            ),
+            source_wavelengths=torch.linspace(0.99e-10, 1.01e-10, n_sources, dtype=torch.float64),
+        )
+    beam_config = BeamConfig(**beam_kwargs)
+    crystal = Crystal(crystal_config, beam_config=beam_config, dtype=torch.float64)
+    detector = Detector(detector_config, dtype=torch.float64)
+    return Simulator(crystal, detector, beam_config=beam_config, dtype=torch.float64)
+
+
+class TestChunkPadding:
+    """One kernel input shape for every chunk."""
+
+    @pytest.mark.parametrize("oversample", [1, 2])
+    def test_single_chunk_shape(self, shapes, oversample):
+        sim = _make_simulator()
+        sim.run(pixel_batch_size=5, oversample=oversample)
+        assert len(shapes) == 5  # 23 rows: four full chunks and a padded one
+        assert len(set(shapes)) == 1
+
+    def test_eager_paths_are_not_padded(self, monkeypatch):
+        monkeypatch.setenv("NANOBRAG_DISABLE_COMPILE", "1")
+        sim = _make_simulator()
+        recorded = []
+        kernel = sim._physics_kernel
+
+        def spy(*args, **kwargs):
+            recorded.append(kwargs['pixel_coords_angstroms'].shape[0])
+            return kernel(*args, **kwargs)
+
+        sim._physics_kernel = sim._compiled_compute_physics = spy
+        sim.run(pixel_batch_size=5, oversample=1)
+        assert recorded == [5, 5, 5, 5, 3]
+
+
+class TestAT_PERF_031:
+    """Chunked images match the unchunked image."""
+
+    @pytest.mark.parametrize("n_sources", [1, 3])
+    @pytest.mark.parametrize("oversample", [1, 2])
+    def test_matches_unchunked(self, shapes, n_sources, oversample):
+        sim = _make_simulator(n_sources=n_sources)
+        reference = sim.run(oversample=oversample)
+        for batch in (4, 7, 22):
+            chunked = sim.run(pixel_batch_size=batch, oversample=oversample)
+            assert chunked.shape == reference.shape
+            torch.testing.assert_close(chunked, reference, rtol=1e-9, atol=0.0)
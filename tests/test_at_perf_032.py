@@ -0,0 +1,128 @@
+"""
+AT-PERF-032: Vectorized C-compatible random number generators (PERF-RNG-001).
+
+Tests that the jump-ahead LCG states, lcg_random and CLCG.ran1_block
+reproduce the scalar sequences exactly (including the generator state
+left behind), that the batched mosaic_rotation_umat returns unitary
+matrices from consecutive deviates of one stream, and that it keeps a
+tensor mosaicity differentiable and generates MosaicSampling.CAP domains.
+"""
+
+import math
+import os
+
+import pytest
+import torch
+
+from nanobrag_torch.config import CrystalConfig, MosaicSampling
+from nanobrag_torch.models.crystal import Crystal
+from nanobrag_torch.utils.c_random import CLCG, lcg_states, mosaic_rotation_umat
+from nanobrag_torch.utils.noise import lcg_random
+
+os.environ['KMP_DUPLICATE_LIB_OK'] = 'TRUE'
+
+
+def _sequential_states(x0, n, multiplier, increment, modulus):
+    states = []
+    for _ in range(n):
+        x0 = (multiplier * x0 + increment) % modulus
+        states.append(x0)
+    return states
+
+
+def _sequential_lcg_random(seed, n):
+    """The per-element loop lcg_random replaces."""
+    values = []
+    current = seed
+    for _ in range(n):
+        current = (1103515245 * current + 12345) & 2147483647
+        values.append(float(current) / float(2147483647))
+    return values
+
+
+class TestLCGStates:
+    """Jump-ahead against the recurrence."""
+
+    @pytest.mark.parametrize("n", [0, 1, 2, 3, 17, 1000])
+    @pytest.mark.parametrize("constants", [(1103515245, 12345, 2 ** 31), (16807, 0, 2 ** 31 - 1)])
+    def test_matches_recurrence(self, n, constants):
+        for x0 in (1, 12345, 2 ** 31 - 2):
+            states = lcg_states(x0, n, *constants)
+            assert states.dtype == torch.int64
+            assert states.tolist() == _sequential_states(x0, n, *constants)
+
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError, match="modulus"):
+            lcg_states(1, 4, 3, 1, 2 ** 32)
+        with pytest.raises(ValueError, match="non-negative"):
+            lcg_states(1, -1, 3, 1, 2 ** 31)
+
+    @pytest.mark.parametrize("seed", [1, 12345, -12345678])
+    def test_lcg_random(self, seed):
+        values = lcg_random(seed, 5000, dtype=torch.float64)
+        assert values.tolist() == _sequential_lcg_random(seed, 5000)
+        as32 = lcg_random(seed, 50)
+        assert as32.dtype == torch.float32
+        assert torch.equal(as32, torch.tensor(_sequential_lcg_random(seed, 50), dtype=torch.float32))
+
+
+class TestAT_PERF_032:
+    """ran1 blocks and batched mosaic rotations."""
+
+    @pytest.mark.parametrize("seed", [0, 12345, -12345678])
+    def test_ran1_block_matches_scalar(self, seed):
+        scalar = CLCG(seed)
+        expected = [scalar.ran1() for _ in range(3000)]
+        block = CLCG(seed)
+        values = block.ran1_block(3000)
+        assert values.dtype == torch.float64
+        assert values.tolist() == expected
+        assert (block.idum, block.iy, block.iv) == (scalar.idum, scalar.iy, scalar.iv)
+
+    def test_mixed_scalar_and_block_calls(self):
+        reference = CLCG(42)
+        expected = [reference.ran1() for _ in range(100)]
+        rng = CLCG(42)
+        values = [rng.ran1()] + rng.ran1_block(40).tolist() + [rng.ran1()] + rng.ran1_block(0).tolist()
+        values += rng.ran1_block(58).tolist()
+        assert values == expected
+
+    def test_batched_mosaic_rotation_umat(self):
+        mosaicity = 0.3
+        batch = mosaic_rotation_umat(mosaicity, seed=-12345678, dtype=torch.float64, n=500)
+        assert batch.shape == (500, 3, 3)
+        identity = torch.eye(3, dtype=torch.float64).expand(500, 3, 3)
+        torch.testing.assert_close(batch @ batch.transpose(1, 2), identity, rtol=0.0, atol=1e-12)
+
+        # Matrix i uses deviates 3i..3i+2 of one stream, as successive C calls
+        single = mosaic_rotation_umat(mosaicity, seed=-12345678, dtype=torch.float64)
+        torch.testing.assert_close(batch[0], single, rtol=0.0, atol=1e-15)
+        prefix = mosaic_rotation_umat(mosaicity, seed=-12345678, dtype=torch.float64, n=7)
+        torch.testing.assert_close(batch[:7], prefix, rtol=0.0, atol=0.0)
+        assert not torch.allclose(batch[1], batch[0])
+
+        as32 = mosaic_rotation_umat(mosaicity, seed=-12345678, dtype=torch.float32, n=3)
+        assert as32.dtype == torch.float32
+
+    def test_tensor_mosaicity(self):
+        mosaicity = torch.tensor(0.3, dtype=torch.float64, requires_grad=True)
+        umat = mosaic_rotation_umat(mosaicity, seed=-12345678, dtype=torch.float64)
+        torch.testing.assert_close(
+            umat, mosaic_rotation_umat(0.3, seed=-12345678, dtype=torch.float64), rtol=0.0, atol=0.0
+        )
+        umat.sum().backward()
+        assert mosaicity.grad is not None and mosaicity.grad != 0
+
+    def test_cap_mosaic_domains(self):
+        crystal = Crystal(device=torch.device("cpu"), dtype=torch.float64)
+        spread = torch.tensor(0.5, dtype=torch.float64, requires_grad=True)
+        config = CrystalConfig(mosaic_spread_deg=spread, mosaic_domains=16, mosaic_seed=42,
+                               mosaic_sampling=MosaicSampling.CAP)
+        umats = crystal._generate_mosaic_rotations(config)
+        expected = mosaic_rotation_umat(math.radians(0.5), seed=42, dtype=torch.float64, n=16)
+        torch.testing.assert_close(umats, expected, rtol=0.0, atol=1e-15)
+
+        (a_rot, _, _), _ = crystal.get_rotated_real_vectors(config)
+        assert a_rot.shape == (1, 16, 3)
+        a_rot.sum().backward()
+        assert spread.grad is not None
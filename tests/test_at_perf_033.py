@@ -0,0 +1,142 @@
+"""
+AT-PERF-033: Counter-based noise (PERF-PHILOX-001).
+
+Tests Philox-4x32-10 against the Random123 known-answer vectors, that
+noise depends only on (seed, frame, pixel index) so chunked generation
+reproduces the whole image, the Poisson statistics of all three regimes,
+that the normal approximation after the last rejection round has its own
+draw, and that Simulator.run_noise gives the same image for any block
+size and the same image as the CLI path, intfile_scale included.
+"""
+
+import os
+
+import pytest
+import torch
+
+from nanobrag_torch.config import CrystalConfig, DetectorConfig, BeamConfig, NoiseConfig
+from nanobrag_torch.models.crystal import Crystal
+from nanobrag_torch.models.detector import Detector
+from nanobrag_torch.simulator import Simulator
+from nanobrag_torch.utils import noise as noise_module
+from nanobrag_torch.utils.noise import (
+    counter_noise_image,
+    counter_poisson,
+    counter_uniforms,
+    generate_counter_noise,
+    philox4x32,
+)
+
+os.environ['KMP_DUPLICATE_LIB_OK'] = 'TRUE'
+
+
+def _make_simulator():
+    crystal_config = CrystalConfig(
+        cell_a=100.0, cell_b=100.0, cell_c=100.0,
+        N_cells=(5, 5, 5),
+        default_F=100.0,
+        misset_deg=(10.0, 5.0, 3.0),
+    )
+    detector_config = DetectorConfig(spixels=23, fpixels=16, distance_mm=100.0, pixel_size_mm=0.2)
+    beam_config = BeamConfig(wavelength_A=1.0, fluence=1e12)
+    crystal = Crystal(crystal_config, beam_config=beam_config, dtype=torch.float64)
+    detector = Detector(detector_config, dtype=torch.float64)
+    return Simulator(crystal, detector, beam_config=beam_config, dtype=torch.float64)
+
+
+class TestPhilox:
+    """Block function and uniform deviates."""
+
+    @pytest.mark.parametrize("counter, key, expected", [
+        ((0, 0, 0, 0), (0, 0), (0x6627e8d5, 0xe169c58d, 0xbc57ac4c, 0x9b00dbd8)),
+        ((0xffffffff,) * 4, (0xffffffff,) * 2, (0x408f276d, 0x41c83b0e, 0xa20bc7c6, 0x6d5451fd)),
+        ((0x243f6a88, 0x85a308d3, 0x13198a2e, 0x03707344), (0xa4093822, 0x299f31d0),
+         (0xd16cfe09, 0x94fdcceb, 0x5001e420, 0x24126ea1)),
+    ])
+    def test_known_answers(self, counter, key, expected):
+        words = philox4x32(torch.tensor([counter], dtype=torch.int64), key)
+        assert words[0].tolist() == list(expected)
+
+    def test_uniforms(self):
+        pixels = torch.arange(100000)
+        u = counter_uniforms(7, 0, pixels, 0)
+        assert u.shape == (100000, 2) and u.dtype == torch.float64
+        assert 0.0 < u.min().item() and u.max().item() < 1.0
+        assert abs(u.mean().item() - 0.5) < 0.005
+        # Every counter word and the key change the stream
+        for other in (counter_uniforms(8, 0, pixels, 0), counter_uniforms(7, 1, pixels, 0),
+                      counter_uniforms(7, 0, pixels, 1), counter_uniforms(7, 0, pixels + 2 ** 32, 0)):
+            assert not torch.equal(other, u)
+
+
+class TestAT_PERF_033:
+    """Chunk invariance, statistics and block-wise rendering."""
+
+    def test_chunks_reproduce_whole_image(self):
+        generator = torch.Generator().manual_seed(0)
+        mean = torch.rand(40, 30, generator=generator, dtype=torch.float64) * 50.0
+        mean[0, :5] = torch.tensor([0.5, 20.0, 3e3, 5e6, 0.0])
+        whole, overloads = generate_counter_noise(mean, seed=-12345, frame=3)
+        assert whole.dtype == torch.int32
+
+        pixel_index = torch.arange(mean.numel()).view(40, 30)
+        rows = torch.cat([
+            generate_counter_noise(mean[s:s + 7], seed=-12345, frame=3, pixel_index=pixel_index[s:s + 7])[0]
+            for s in range(0, 40, 7)
+        ])
+        assert torch.equal(rows, whole)
+        # Any subset and order of pixels
+        order = torch.randperm(mean.numel(), generator=generator)
+        shuffled, _ = generate_counter_noise(mean.view(-1)[order], seed=-12345, frame=3, pixel_index=order)
+        assert torch.equal(shuffled, whole.view(-1)[order])
+        assert not torch.equal(generate_counter_noise(mean, seed=-12345, frame=4)[0], whole)
+        assert overloads == int((whole >= 65535).sum())
+
+    @pytest.mark.parametrize("lam", [0.3, 5.0, 11.9, 12.0, 40.0, 2500.0, 4e6])
+    def test_poisson_moments(self, lam):
+        n = 200000
+        counts = counter_poisson(torch.full((n,), lam, dtype=torch.float64), seed=11)
+        assert torch.equal(counts, torch.round(counts)) and counts.min().item() >= 0
+        mean, var = counts.mean().item(), counts.var().item()
+        assert abs(mean - lam) < 5 * (lam / n) ** 0.5
+        assert abs(var / lam - 1.0) < 0.03
+
+    def test_rejection_fallback_has_own_draw(self, monkeypatch):
+        monkeypatch.setattr(noise_module, "_MAX_REJECTION_ROUNDS", 0)
+        lam = torch.full((1000,), 40.0, dtype=torch.float64)
+        pixels = torch.arange(1000)
+        counts = counter_poisson(lam, seed=5)
+
+        def normal_approximation(draw):
+            z = noise_module._box_muller(counter_uniforms(5, 0, pixels, draw))
+            return torch.clamp(torch.round(lam + torch.sqrt(lam) * z), min=0.0)
+
+        assert torch.equal(counts, normal_approximation(noise_module._DRAW_FALLBACK))
+        assert not torch.equal(counts, normal_approximation(noise_module._DRAW_REJECTION))
+
+    def test_run_noise_block_invariance(self):
+        simulator = _make_simulator()
+        noise_config = NoiseConfig(seed=99, adc_offset=40.0, readout_noise=3.0)
+        reference, overloads = simulator.run_noise(noise_config, block_rows=23)
+        assert reference.shape == (23, 16) and reference.dtype == torch.int32
+        for block_rows in (1, 5, 8):
+            blocks, block_overloads = simulator.run_noise(noise_config, block_rows=block_rows)
+            assert torch.equal(blocks, reference) and block_overloads == overloads
+
+        # Same as noise applied to the whole float image
+        intensity = simulator.run()
+        noisy, _ = generate_counter_noise(intensity, seed=99, adc_offset=40.0, readout_noise=3.0)
+        assert torch.equal(torch.where(intensity > 0, noisy, torch.zeros_like(noisy)), reference)
+
+    def test_run_noise_matches_cli_image(self):
+        simulator = _make_simulator()
+        noise_config = NoiseConfig(seed=7, adc_offset=10.0, readout_noise=0.0, intfile_scale=2.5)
+        blocks, _ = simulator.run_noise(noise_config, block_rows=5)
+        whole = counter_noise_image(simulator.run(), noise_config, 7)
+        assert torch.equal(blocks, whole)
+        unscaled = counter_noise_image(simulator.run(), NoiseConfig(seed=7, adc_offset=10.0, readout_noise=0.0), 7)
+        assert not torch.equal(whole, unscaled)
+
+    def test_invalid_block_rows(self):
+        with pytest.raises(ValueError, match="positive"):
+            _make_simulator().run_noise(NoiseConfig(seed=1), block_rows=0)